@@ -1,9 +1,15 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from cities.models import City
 
+from backend.model_tracking import FieldTrackerMixin
+
+
+class Article(FieldTrackerMixin, models.Model):
+    # Moving an article refreshes both city contexts (see cities.signals)
+    tracked_fields = ("city",)
 
-class Article(models.Model):
     city = models.ForeignKey(
         City, related_name="articles", on_delete=models.CASCADE, db_index=True
     )
@@ -33,6 +39,9 @@ class Article(models.Model):
     )  # Frequently ordered by
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text search document, maintained by a database trigger (PostgreSQL)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         indexes = [
             models.Index(
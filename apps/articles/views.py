@@ -1,8 +1,11 @@
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiExample, OpenApiParameter, extend_schema
+from packages.cache import cache_response
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 
+from backend.query_budget import query_budget
+
 from .models import Article
 from .serializers import ArticleListSerializer, ArticleSerializer
 
@@ -90,6 +93,12 @@ class ArticleViewSet(viewsets.ModelViewSet):
             ),
         ],
     )
+    @cache_response(
+        timeout=600,
+        key_prefix="articles",
+        vary_on_params=["city", "search", "ordering", "page"],
+    )
+    @query_budget(2)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -137,5 +146,6 @@ class ArticleViewSet(viewsets.ModelViewSet):
             ),
         ],
     )
+    @cache_response(timeout=600, key_prefix="article")
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,79 @@
+"""
+Management command to store price breakdown snapshots for bookings created
+before snapshots existed. Until then those bookings are repriced on every read.
+Usage: python manage.py backfill_price_breakdowns [--batch-size 200] [--dry-run]
+"""
+
+import logging
+
+from django.core.management.base import BaseCommand
+
+from bookings.models import Booking
+from bookings.services.booking_service import BookingService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Store price breakdown snapshots for bookings that have none"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count bookings without a snapshot without writing",
+        )
+
+    def handle(self, *args, **options):
+        pending = Booking.objects.filter(price_breakdown__isnull=True)
+        total_count = pending.count()
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"DRY RUN: {total_count} bookings have no price breakdown"
+                )
+            )
+            return
+
+        bookings = (
+            pending.select_related(
+                "package", "selected_hotel_tier", "selected_transport"
+            )
+            .prefetch_related("selected_experiences")
+            .order_by("pk")
+        )
+
+        success_count = 0
+        error_count = 0
+        batch = []
+        for booking in bookings.iterator(chunk_size=options["batch_size"]):
+            try:
+                booking.price_breakdown = (
+                    BookingService.compute_price_breakdown_snapshot(booking)
+                )
+            except Exception as e:
+                error_count += 1
+                logger.error(f"Error pricing booking #{booking.id}: {str(e)}")
+                continue
+
+            batch.append(booking)
+            if len(batch) >= options["batch_size"]:
+                Booking.objects.bulk_update(batch, ["price_breakdown"])
+                success_count += len(batch)
+                batch = []
+
+        if batch:
+            Booking.objects.bulk_update(batch, ["price_breakdown"])
+            success_count += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Stored price breakdowns for {success_count} bookings"
+            )
+        )
+        if error_count > 0:
+            self.stdout.write(
+                self.style.ERROR(f"Failed to price {error_count} bookings (check logs)")
+            )
@@ -9,7 +9,11 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 
 from bookings.models import Booking
-from bookings.services.booking_service import BookingService
+from bookings.services.booking_service import (
+    TRANSITION_CHUNK_SIZE,
+    TRANSITION_TIME_BUDGET,
+    BookingService,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,18 @@ class Command(BaseCommand):
             action="store_true",
             help="Show what would be expired without actually expiring",
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=TRANSITION_CHUNK_SIZE,
+            help="Bookings expired per transaction",
+        )
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=TRANSITION_TIME_BUDGET,
+            help="Seconds after which no new chunk is started",
+        )
 
     def handle(self, *args, **options):
         dry_run = options.get("dry_run", False)
@@ -53,43 +69,32 @@ class Command(BaseCommand):
                 self.stdout.write(f"  ... and {total_count - 10} more")
             return
 
-        # Expire bookings
-        success_count = 0
-        error_count = 0
-
-        for booking in expired_bookings:
-            try:
-                if BookingService.transition_status(booking, "EXPIRED"):
-                    success_count += 1
-                    logger.info(
-                        f"Expired booking #{booking.id} "
-                        f"(User: {booking.user.email}, "
-                        f"Package: {booking.package.name})"
-                    )
-                else:
-                    error_count += 1
-                    logger.warning(
-                        f"Failed to expire booking #{booking.id}: "
-                        f"Invalid state transition"
-                    )
-            except Exception as e:
-                error_count += 1
-                logger.error(f"Error expiring booking #{booking.id}: {str(e)}")
+        # Expire bookings in set-based chunks
+        result = BookingService.transition_many(
+            expired_bookings,
+            "EXPIRED",
+            chunk_size=options["chunk_size"],
+            time_budget=options["time_budget"],
+        )
 
         # Output summary
         self.stdout.write(
-            self.style.SUCCESS(f"Successfully expired {success_count} bookings")
+            self.style.SUCCESS(
+                f"Successfully expired {result['transitioned']} bookings "
+                f"in {result['chunks']} chunks"
+            )
         )
 
-        if error_count > 0:
+        if not result["complete"]:
             self.stdout.write(
-                self.style.ERROR(
-                    f"Failed to expire {error_count} bookings (check logs)"
+                self.style.WARNING(
+                    "Time budget exhausted; remaining bookings will be expired "
+                    "on the next run"
                 )
             )
 
         # Log summary
         logger.info(
             f"Booking expiry job completed: "
-            f"{success_count} expired, {error_count} errors"
+            f"{result['transitioned']} expired, complete={result['complete']}"
         )
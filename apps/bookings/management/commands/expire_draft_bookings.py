@@ -9,6 +9,11 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 
 from bookings.models import Booking
+from bookings.services.booking_service import (
+    TRANSITION_CHUNK_SIZE,
+    TRANSITION_TIME_BUDGET,
+    BookingService,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +27,18 @@ class Command(BaseCommand):
             action="store_true",
             help="Show what would be expired without actually expiring",
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=TRANSITION_CHUNK_SIZE,
+            help="Bookings expired per transaction",
+        )
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=TRANSITION_TIME_BUDGET,
+            help="Seconds after which no new chunk is started",
+        )
 
     def handle(self, *args, **options):
         dry_run = options["dry_run"]
@@ -48,24 +65,15 @@ class Command(BaseCommand):
                     f"Package: {booking.package.name}, Expired: {booking.expires_at})"
                 )
         else:
-            expired_count = 0
-            for booking in expired_bookings:
-                try:
-                    booking.transition_to("EXPIRED")
-                    expired_count += 1
-                    logger.info(
-                        f"Expired booking #{booking.id} (User: {booking.user.email})"
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to expire booking #{booking.id}: {str(e)}")
-                    self.stdout.write(
-                        self.style.ERROR(
-                            f"Failed to expire booking #{booking.id}: {str(e)}"
-                        )
-                    )
-
+            result = BookingService.transition_many(
+                expired_bookings,
+                "EXPIRED",
+                chunk_size=options["chunk_size"],
+                time_budget=options["time_budget"],
+            )
             self.stdout.write(
                 self.style.SUCCESS(
-                    f"Successfully expired {expired_count} out of {count} bookings"
+                    f"Successfully expired {result['transitioned']} out of "
+                    f"{count} bookings"
                 )
             )
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-16 20:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0011_add_vehicle_allocation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="price_breakdown",
+            field=models.JSONField(
+                blank=True,
+                editable=False,
+                help_text="Price breakdown snapshot taken when the booking was priced",
+                null=True,
+            ),
+        ),
+    ]
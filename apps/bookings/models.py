@@ -7,8 +7,10 @@ from django.utils import timezone
 
 from packages.models import Experience, HotelTier, Package, TransportOption
 
+from backend.model_tracking import FieldTrackerMixin
 
-class Booking(models.Model):
+
+class Booking(FieldTrackerMixin, models.Model):
     STATUS_CHOICES = [
         ("DRAFT", "Draft"),
         ("PENDING_PAYMENT", "Pending Payment"),
@@ -17,6 +19,18 @@ class Booking(models.Model):
         ("EXPIRED", "Expired"),
     ]
 
+    # Allowed status transitions (source -> targets)
+    TRANSITIONS = {
+        "DRAFT": ["PENDING_PAYMENT", "EXPIRED", "CANCELLED"],
+        "PENDING_PAYMENT": ["CONFIRMED", "CANCELLED", "EXPIRED"],
+        "CONFIRMED": ["CANCELLED"],
+        "CANCELLED": [],
+        "EXPIRED": [],
+    }
+
+    # Status changes drive notifications (see notifications.signals)
+    tracked_fields = ("status",)
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=True
     )
@@ -121,6 +135,15 @@ class Booking(models.Model):
         help_text="Total hotel cost (all nights × all rooms)",
     )
 
+    # Price breakdown as shown to the customer, frozen when the booking is
+    # priced (BookingService.build_price_breakdown_snapshot)
+    price_breakdown = models.JSONField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Price breakdown snapshot taken when the booking was priced",
+    )
+
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
@@ -154,14 +177,16 @@ class Booking(models.Model):
         return f"Booking #{self.id} - {self.customer_name} - {self.booking_date}"
 
     def can_transition_to(self, new_status):
-        transitions = {
-            "DRAFT": ["PENDING_PAYMENT", "EXPIRED", "CANCELLED"],
-            "PENDING_PAYMENT": ["CONFIRMED", "CANCELLED", "EXPIRED"],
-            "CONFIRMED": ["CANCELLED"],
-            "CANCELLED": [],
-            "EXPIRED": [],
-        }
-        return new_status in transitions.get(self.status, [])
+        return new_status in self.TRANSITIONS.get(self.status, [])
+
+    @classmethod
+    def statuses_allowed_to_transition_to(cls, new_status):
+        """Source statuses from which new_status can be reached"""
+        return [
+            status
+            for status, targets in cls.TRANSITIONS.items()
+            if new_status in targets
+        ]
 
     def transition_to(self, new_status):
         """
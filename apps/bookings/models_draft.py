@@ -8,6 +8,7 @@ Protocol Compliance:
 - Automatic expiration after 24 hours
 """
 
+import time
 from datetime import timedelta
 
 from django.conf import settings
@@ -155,12 +156,23 @@ class BookingDraft(models.Model):
         }
 
     @classmethod
-    def cleanup_expired(cls):
+    def cleanup_expired(cls, chunk_size=1000, time_budget=30.0):
         """
-        Delete all expired drafts.
+        Delete all expired drafts, chunk_size rows per DELETE so no statement
+        holds locks on the whole backlog. Stops starting new chunks after
+        time_budget seconds; the next run picks up the rest.
         Should be called by a periodic task (celery beat).
         """
-        expired_count = cls.objects.filter(expires_at__lt=timezone.now()).delete()[0]
+        started = time.monotonic()
+        expired = cls.objects.filter(expires_at__lt=timezone.now())
+        expired_count = 0
+        while time.monotonic() - started <= time_budget:
+            pks = list(expired.order_by("pk").values_list("pk", flat=True)[:chunk_size])
+            if not pks:
+                break
+            expired_count += cls.objects.filter(pk__in=pks).delete()[0]
+            if len(pks) < chunk_size:
+                break
         return expired_count
 
     @classmethod
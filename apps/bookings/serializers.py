@@ -115,90 +115,17 @@ class BookingSerializer(serializers.ModelSerializer):
         SECURITY: All price calculations done on backend.
         Frontend NEVER calculates - only displays these values.
         Includes age-based pricing calculations.
+
+        Served from the snapshot stored when the booking was priced, so
+        bookings keep the price they were sold at. Bookings created before
+        snapshots existed are repriced against the current rules.
         """
-        from pricing_engine.services.pricing_service import PricingService
+        if obj.price_breakdown is not None:
+            return obj.price_breakdown
 
         from .services.booking_service import BookingService
 
-        # Get detailed breakdown from pricing service with traveler details
-        # PHASE 1: Include date range and room count for accurate hotel pricing
-        breakdown = PricingService.get_price_breakdown(
-            obj.package,
-            obj.selected_experiences.all(),
-            obj.selected_hotel_tier,
-            obj.selected_transport,
-            obj.traveler_details if obj.traveler_details else None,
-            start_date=obj.booking_start_date or obj.booking_date,
-            end_date=obj.booking_end_date,
-            num_rooms=obj.num_rooms_required,
-            num_travelers=obj.num_travelers,
-        )
-
-        amounts = BookingService.get_canonical_amounts(
-            obj, recalculated_total=breakdown["final_total"]
-        )
-        total_amount = amounts["total_amount"]
-        per_person_price = amounts["per_person_amount"]
-        chargeable_count = amounts["chargeable_travelers"]
-
-        return {
-            # Individual component prices (backend calculated)
-            "base_experience_total": str(breakdown["base_experience_total"]),
-            "base_experience_per_person": str(
-                breakdown.get(
-                    "base_experience_per_person", breakdown["base_experience_total"]
-                )
-            ),
-            "transport_cost": str(breakdown["transport_cost"]),
-            "subtotal_before_hotel": str(breakdown["subtotal_before_hotel"]),
-            "hotel_multiplier": str(breakdown["hotel_multiplier"]),
-            "subtotal_after_hotel": str(breakdown["subtotal_after_hotel"]),
-            "total_markup": str(breakdown["total_markup"]),
-            "total_discount": str(breakdown["total_discount"]),
-            "applied_rules": breakdown["applied_rules"],
-            # PHASE 1: New hotel pricing fields
-            "hotel_cost": (
-                str(breakdown["hotel_cost"]) if breakdown.get("hotel_cost") else None
-            ),
-            "hotel_cost_per_night": (
-                str(breakdown["hotel_cost_per_night"])
-                if breakdown.get("hotel_cost_per_night")
-                else None
-            ),
-            "hotel_num_nights": breakdown.get("hotel_num_nights"),
-            "hotel_num_rooms": breakdown.get("hotel_num_rooms"),
-            "uses_new_hotel_pricing": breakdown.get("uses_new_hotel_pricing", False),
-            # Per-person and total (backend calculated)
-            "per_person_price": str(per_person_price),
-            "num_travelers": obj.num_travelers,
-            "chargeable_travelers": chargeable_count,
-            "total_amount": str(total_amount),
-            "chargeable_age_threshold": breakdown.get(
-                "chargeable_age_threshold",
-                PricingService.get_chargeable_age_threshold(),
-            ),
-            # Individual experience prices
-            "experiences": [
-                {
-                    "id": exp.id,
-                    "name": exp.name,
-                    "price": str(exp.base_price),
-                }
-                for exp in obj.selected_experiences.all()
-            ],
-            # Hotel and transport details
-            "hotel_tier": {
-                "name": obj.selected_hotel_tier.name,
-                "multiplier": str(obj.selected_hotel_tier.price_multiplier),
-            },
-            "transport": {
-                "name": obj.selected_transport.name,
-                "price": str(obj.selected_transport.base_price),
-            },
-            # Currency
-            "currency": "INR",
-            "currency_symbol": "₹",
-        }
+        return BookingService.compute_price_breakdown_snapshot(obj)
 
 
 class BookingCreateSerializer(serializers.ModelSerializer):
@@ -575,6 +502,9 @@ class BookingUpdateSerializer(serializers.ModelSerializer):
     )
     hotel_tier_id = serializers.IntegerField(write_only=True, required=False)
     transport_option_id = serializers.IntegerField(write_only=True, required=False)
+    num_rooms = serializers.IntegerField(
+        source="num_rooms_required", min_value=1, required=False
+    )
 
     # Traveler details
     traveler_details = serializers.ListField(
@@ -658,9 +588,18 @@ class BookingUpdateSerializer(serializers.ModelSerializer):
         from packages.models import Experience, HotelTier, TransportOption
         from pricing_engine.services.pricing_service import PricingService
 
+        from .services.booking_service import BookingService
+
         # Check if price-affecting fields changed
         price_changed = False
-        price_affecting_fields = {"booking_date", "num_travelers", "traveler_details"}
+        price_affecting_fields = {
+            "booking_date",
+            "booking_end_date",
+            "num_rooms_required",
+            "num_travelers",
+            "traveler_details",
+            "vehicle_allocation",
+        }
 
         experience_ids = validated_data.pop("selected_experience_ids", None)
         hotel_tier_id = validated_data.pop("hotel_tier_id", None)
@@ -698,9 +637,10 @@ class BookingUpdateSerializer(serializers.ModelSerializer):
             # Recalculate price if selections changed
             # Pass traveler/date/room context and keep canonical total fields in sync.
             if price_changed:
-                calculated_price = PricingService.calculate_total(
+                experiences = list(instance.selected_experiences.all())
+                quote = PricingService.quote(
                     instance.package,
-                    instance.selected_experiences.all(),
+                    experiences,
                     instance.selected_hotel_tier,
                     instance.selected_transport,
                     travelers=(
@@ -710,9 +650,21 @@ class BookingUpdateSerializer(serializers.ModelSerializer):
                     end_date=instance.booking_end_date,
                     num_rooms=instance.num_rooms_required,
                     num_travelers=instance.num_travelers,
+                    vehicle_allocation=(
+                        instance.vehicle_allocation
+                        if instance.vehicle_allocation
+                        else None
+                    ),
+                )
+                instance.total_price = quote.final_total
+                instance.total_amount_paid = quote.final_total
+                instance.price_breakdown = BookingService.snapshot_from_quote(
+                    quote,
+                    experiences,
+                    instance.selected_hotel_tier,
+                    instance.selected_transport,
+                    instance.num_travelers,
                 )
-                instance.total_price = calculated_price
-                instance.total_amount_paid = calculated_price
 
             instance.save()
 
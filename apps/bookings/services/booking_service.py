@@ -1,7 +1,9 @@
 import logging
+import time
 from decimal import Decimal
 
 from django.db import transaction
+from django.utils import timezone
 
 from notifications.services.notification_service import NotificationService
 from packages.models import Experience, HotelTier, TransportOption
@@ -11,6 +13,10 @@ from ..models import Booking
 
 logger = logging.getLogger(__name__)
 
+# transition_many defaults
+TRANSITION_CHUNK_SIZE = 1000
+TRANSITION_TIME_BUDGET = 30.0  # seconds
+
 
 class BookingService:
     @staticmethod
@@ -126,6 +132,141 @@ class BookingService:
             "chargeable_travelers": chargeable_count,
         }
 
+    @staticmethod
+    def build_price_breakdown_snapshot(
+        breakdown, experiences, hotel_tier, transport_option, num_travelers, amounts
+    ):
+        """
+        Customer-facing price breakdown, as exposed by BookingSerializer.
+        All amounts are strings so the snapshot can be stored as JSON.
+
+        Args:
+            breakdown: Mapping from PricingService.get_price_breakdown (or
+                PriceQuote.breakdown())
+            experiences: Priced Experience instances
+            hotel_tier: Priced HotelTier instance
+            transport_option: Priced TransportOption instance
+            num_travelers: Number of travelers on the booking
+            amounts: dict with total_amount, per_person_amount and
+                chargeable_travelers (see get_canonical_amounts)
+
+        Returns:
+            dict: JSON-serializable breakdown
+        """
+        return {
+            # Individual component prices (backend calculated)
+            "base_experience_total": str(breakdown["base_experience_total"]),
+            "base_experience_per_person": str(
+                breakdown.get(
+                    "base_experience_per_person", breakdown["base_experience_total"]
+                )
+            ),
+            "transport_cost": str(breakdown["transport_cost"]),
+            "subtotal_before_hotel": str(breakdown["subtotal_before_hotel"]),
+            "hotel_multiplier": str(breakdown["hotel_multiplier"]),
+            "subtotal_after_hotel": str(breakdown["subtotal_after_hotel"]),
+            "total_markup": str(breakdown["total_markup"]),
+            "total_discount": str(breakdown["total_discount"]),
+            "applied_rules": list(breakdown["applied_rules"]),
+            # PHASE 1: New hotel pricing fields
+            "hotel_cost": (
+                str(breakdown["hotel_cost"]) if breakdown.get("hotel_cost") else None
+            ),
+            "hotel_cost_per_night": (
+                str(breakdown["hotel_cost_per_night"])
+                if breakdown.get("hotel_cost_per_night")
+                else None
+            ),
+            "hotel_num_nights": breakdown.get("hotel_num_nights"),
+            "hotel_num_rooms": breakdown.get("hotel_num_rooms"),
+            "uses_new_hotel_pricing": breakdown.get("uses_new_hotel_pricing", False),
+            # Per-person and total (backend calculated)
+            "per_person_price": str(amounts["per_person_amount"]),
+            "num_travelers": num_travelers,
+            "chargeable_travelers": amounts["chargeable_travelers"],
+            "total_amount": str(amounts["total_amount"]),
+            "chargeable_age_threshold": breakdown.get(
+                "chargeable_age_threshold",
+                PricingService.get_chargeable_age_threshold(),
+            ),
+            # Individual experience prices
+            "experiences": [
+                {
+                    "id": exp.id,
+                    "name": exp.name,
+                    "price": str(exp.base_price),
+                }
+                for exp in experiences
+            ],
+            # Hotel and transport details
+            "hotel_tier": {
+                "name": hotel_tier.name,
+                "multiplier": str(hotel_tier.price_multiplier),
+            },
+            "transport": {
+                "name": transport_option.name,
+                "price": str(transport_option.base_price),
+            },
+            # Currency
+            "currency": "INR",
+            "currency_symbol": "₹",
+        }
+
+    @staticmethod
+    def snapshot_from_quote(
+        quote, experiences, hotel_tier, transport_option, num_travelers
+    ):
+        """
+        Breakdown snapshot for a booking priced with ``quote``
+        (total_amount_paid == quote.final_total).
+        """
+        return BookingService.build_price_breakdown_snapshot(
+            quote.breakdown(),
+            experiences,
+            hotel_tier,
+            transport_option,
+            num_travelers,
+            {
+                "total_amount": quote.final_total,
+                "per_person_amount": quote.per_person_price,
+                "chargeable_travelers": quote.chargeable_travelers,
+            },
+        )
+
+    @staticmethod
+    def compute_price_breakdown_snapshot(booking):
+        """
+        Reprice a booking against the current rules and build its breakdown.
+        Only for bookings priced before snapshots existed (and for explicit
+        revalidation); stored snapshots are never recomputed.
+        """
+        experiences = list(booking.selected_experiences.all())
+        breakdown = PricingService.get_price_breakdown(
+            booking.package,
+            experiences,
+            booking.selected_hotel_tier,
+            booking.selected_transport,
+            booking.traveler_details if booking.traveler_details else None,
+            start_date=booking.booking_start_date or booking.booking_date,
+            end_date=booking.booking_end_date,
+            num_rooms=booking.num_rooms_required,
+            num_travelers=booking.num_travelers,
+            vehicle_allocation=(
+                booking.vehicle_allocation if booking.vehicle_allocation else None
+            ),
+        )
+        amounts = BookingService.get_canonical_amounts(
+            booking, recalculated_total=breakdown["final_total"]
+        )
+        return BookingService.build_price_breakdown_snapshot(
+            breakdown,
+            experiences,
+            booking.selected_hotel_tier,
+            booking.selected_transport,
+            booking.num_travelers,
+            amounts,
+        )
+
     @staticmethod
     def transition_status(booking, new_status):
         """
@@ -163,6 +304,76 @@ class BookingService:
             )
             return False
 
+    @staticmethod
+    def transition_many(
+        queryset,
+        new_status,
+        chunk_size=TRANSITION_CHUNK_SIZE,
+        time_budget=TRANSITION_TIME_BUDGET,
+    ):
+        """
+        Set-based status transition for every booking in queryset.
+
+        Bookings whose current status cannot reach new_status (see
+        Booking.TRANSITIONS) are left untouched. Each chunk is one short
+        transaction: lock up to chunk_size rows (skipping rows locked by
+        someone else), one UPDATE, one INSERT of in-app notifications.
+        No model signals fire, and no push, email or SMS is sent; use
+        transition_status for single bookings that need those.
+
+        Args:
+            queryset: Booking queryset selecting the candidates
+            new_status: Target status
+            chunk_size: Maximum bookings per transaction
+            time_budget: Seconds after which no new chunk is started
+
+        Returns:
+            dict: {"transitioned": int, "notified": int, "chunks": int,
+                   "complete": bool}; complete is False when the time budget
+                   ran out with candidates left
+        """
+        allowed = Booking.statuses_allowed_to_transition_to(new_status)
+        candidates = (
+            queryset.filter(status__in=allowed).order_by("pk")
+            if allowed
+            else queryset.none()
+        )
+
+        started = time.monotonic()
+        result = {"transitioned": 0, "notified": 0, "chunks": 0, "complete": True}
+        while True:
+            if time.monotonic() - started > time_budget:
+                result["complete"] = not candidates.exists()
+                break
+
+            with transaction.atomic():
+                rows = list(
+                    candidates.select_for_update(
+                        skip_locked=True, of=("self",)
+                    ).values_list("pk", "user_id", "package__name")[:chunk_size]
+                )
+                if not rows:
+                    break
+
+                updated = Booking.objects.filter(
+                    pk__in=[pk for pk, _, _ in rows], status__in=allowed
+                ).update(status=new_status, updated_at=timezone.now())
+                notified = NotificationService.create_booking_status_notifications(
+                    rows, new_status
+                )
+
+            result["transitioned"] += updated
+            result["notified"] += notified
+            result["chunks"] += 1
+            logger.info(
+                f"Transitioned {updated} bookings to {new_status} "
+                f"(chunk {result['chunks']}, {result['transitioned']} total)"
+            )
+            if len(rows) < chunk_size:
+                break
+
+        return result
+
     @staticmethod
     def calculate_and_create_booking(
         package,
@@ -232,7 +443,8 @@ class BookingService:
             # Calculate total price on backend only (aggregate for all chargeable travelers)
             # PHASE 1: Pass date range and room count
             # VEHICLE OPTIMIZATION: Pass vehicle_allocation
-            calculated_price = PricingService.calculate_total(
+            # Totals-only quote: no breakdown rows are built here
+            quote = PricingService.quote(
                 package,
                 experiences,
                 hotel_tier,
@@ -244,22 +456,21 @@ class BookingService:
                 num_travelers=num_travelers,
                 vehicle_allocation=vehicle_allocation,
             )
+            calculated_price = quote.final_total
 
             # calculated_price is the TOTAL for all chargeable travelers.
             # Set total_amount_paid to the same aggregate total.
             total_amount_paid = calculated_price
 
-            age_threshold = PricingService.get_chargeable_age_threshold()
-            if traveler_details:
-                chargeable_count = sum(
-                    1 for t in traveler_details if t.get("age", 0) >= age_threshold
-                )
-            else:
-                chargeable_count = num_travelers
+            age_threshold = quote.age_threshold
+            chargeable_count = quote.chargeable_travelers
+
+            # PHASE 1: Hotel costs for the booking record (from the same quote)
+            hotel_cost_info = quote.hotel_cost_info()
 
-            # PHASE 1: Calculate hotel costs separately for breakdown
-            hotel_cost_info = PricingService.calculate_hotel_cost(
-                hotel_tier, booking_date, booking_end_date, num_rooms
+            # Frozen breakdown served by BookingSerializer (from the same quote)
+            price_breakdown = BookingService.snapshot_from_quote(
+                quote, experiences, hotel_tier, transport_option, num_travelers
             )
 
             logger.info(
@@ -297,6 +508,7 @@ class BookingService:
                     # PHASE 1: Hotel cost breakdown
                     hotel_cost_per_night=hotel_cost_info.get("cost_per_night"),
                     total_hotel_cost=hotel_cost_info.get("total_cost"),
+                    price_breakdown=price_breakdown,
                     # Existing fields
                     num_travelers=num_travelers,
                     traveler_details=traveler_details or [],
@@ -435,14 +647,14 @@ class BookingService:
                 'message': str
             }
         """
-        from pricing_engine.models import PricingConfiguration
+        from pricing_engine.services.pricing_plan import get_config_snapshot
 
         try:
-            # Get configuration
-            config = PricingConfiguration.get_config()
+            # Get configuration (compiled snapshot, no SQL when warm)
+            config = get_config_snapshot()
 
-            # Recalculate current price
-            breakdown = PricingService.get_price_breakdown(
+            # Recalculate current price (totals only)
+            current_price = PricingService.calculate_total(
                 package,
                 experiences,
                 hotel_tier,
@@ -452,8 +664,6 @@ class BookingService:
                 num_rooms=num_rooms,
                 num_travelers=num_travelers,
             )
-
-            current_price = breakdown["final_total"]
             previous_price = Decimal(str(previous_price))
 
             # Calculate change
@@ -0,0 +1,159 @@
+"""
+Tests for set-based booking status transitions.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bookings.models import Booking
+from bookings.models_draft import BookingDraft
+from bookings.services.booking_service import BookingService
+from notifications.models import Notification
+from packages.models import City, HotelTier, Package, TransportOption
+
+User = get_user_model()
+
+
+class BulkTransitionTests(TestCase):
+    """transition_many moves whole sets of bookings in chunks"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="bulk@example.com", password="testpass123"
+        )
+        city = City.objects.create(
+            name="Test City", slug="test-city", description="Test"
+        )
+        self.package = Package.objects.create(
+            city=city, name="Test Package", slug="test-package", description="Test"
+        )
+        self.hotel_tier = HotelTier.objects.create(
+            name="Budget", description="Budget tier", price_multiplier=1.0
+        )
+        self.transport = TransportOption.objects.create(
+            name="Bus", description="Bus transport", base_price=50
+        )
+
+    def create_bookings(self, count, status="DRAFT", **kwargs):
+        return [
+            Booking.objects.create(
+                user=self.user,
+                package=self.package,
+                selected_hotel_tier=self.hotel_tier,
+                selected_transport=self.transport,
+                total_price=Decimal("1000.00"),
+                status=status,
+                **kwargs,
+            )
+            for _ in range(count)
+        ]
+
+    def statuses(self):
+        return dict(Booking.objects.values_list("pk", "status"))
+
+    def test_only_allowed_sources_transition(self):
+        drafts = self.create_bookings(2, status="DRAFT")
+        confirmed = self.create_bookings(1, status="CONFIRMED")
+
+        result = BookingService.transition_many(Booking.objects.all(), "EXPIRED")
+
+        self.assertEqual(result["transitioned"], 2)
+        self.assertTrue(result["complete"])
+        statuses = self.statuses()
+        self.assertTrue(all(statuses[b.pk] == "EXPIRED" for b in drafts))
+        self.assertEqual(statuses[confirmed[0].pk], "CONFIRMED")
+
+    def test_chunks_and_constant_query_count(self):
+        self.create_bookings(2)
+        with CaptureQueriesContext(connection) as small:
+            BookingService.transition_many(
+                Booking.objects.all(), "CANCELLED", chunk_size=10
+            )
+
+        self.create_bookings(8)
+        with CaptureQueriesContext(connection) as large:
+            result = BookingService.transition_many(
+                Booking.objects.filter(status="DRAFT"), "CANCELLED", chunk_size=10
+            )
+
+        self.assertEqual(result["transitioned"], 8)
+        self.assertEqual(len(large), len(small))
+
+        self.create_bookings(5)
+        result = BookingService.transition_many(
+            Booking.objects.filter(status="DRAFT"), "CANCELLED", chunk_size=2
+        )
+        self.assertEqual(result["transitioned"], 5)
+        self.assertEqual(result["chunks"], 3)
+
+    def test_time_budget_leaves_work_for_next_run(self):
+        self.create_bookings(3)
+
+        result = BookingService.transition_many(
+            Booking.objects.all(), "EXPIRED", time_budget=-1
+        )
+
+        self.assertEqual(result["transitioned"], 0)
+        self.assertFalse(result["complete"])
+        self.assertEqual(Booking.objects.filter(status="DRAFT").count(), 3)
+
+    def test_notifications_created_in_bulk(self):
+        bookings = self.create_bookings(3)
+
+        result = BookingService.transition_many(Booking.objects.all(), "CANCELLED")
+
+        self.assertEqual(result["notified"], 3)
+        messages = list(
+            Notification.objects.filter(user=self.user).values_list(
+                "message", flat=True
+            )
+        )
+        self.assertEqual(len(messages), 3)
+        for booking in bookings:
+            self.assertTrue(any(f"#{booking.id}" in m for m in messages))
+
+    def test_expired_bookings_are_not_notified(self):
+        self.create_bookings(2)
+
+        result = BookingService.transition_many(Booking.objects.all(), "EXPIRED")
+
+        self.assertEqual(result["notified"], 0)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_expire_bookings_command(self):
+        past = timezone.now() - timedelta(minutes=5)
+        expired = self.create_bookings(3, expires_at=past)
+        fresh = self.create_bookings(
+            1, expires_at=timezone.now() + timedelta(minutes=5)
+        )
+
+        out = StringIO()
+        call_command("expire_bookings", "--chunk-size", "2", stdout=out)
+
+        self.assertIn("Successfully expired 3 bookings in 2 chunks", out.getvalue())
+        statuses = self.statuses()
+        self.assertTrue(all(statuses[b.pk] == "EXPIRED" for b in expired))
+        self.assertEqual(statuses[fresh[0].pk], "DRAFT")
+
+
+class DraftCleanupTests(TestCase):
+    def test_cleanup_expired_deletes_in_chunks(self):
+        city = City.objects.create(name="Draft City", slug="draft-city")
+        package = Package.objects.create(city=city, name="Draft", slug="draft")
+        past = timezone.now() - timedelta(hours=1)
+        for _ in range(5):
+            BookingDraft.objects.create(package=package, expires_at=past)
+        kept = BookingDraft.objects.create(
+            package=package, expires_at=timezone.now() + timedelta(hours=1)
+        )
+
+        self.assertEqual(BookingDraft.cleanup_expired(chunk_size=2), 5)
+        self.assertEqual(list(BookingDraft.objects.all()), [kept])
@@ -0,0 +1,206 @@
+"""
+Tests for persisted booking price breakdown snapshots.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer, BookingUpdateSerializer
+from bookings.services.booking_service import BookingService
+from packages.models import City, Experience, HotelTier, Package, TransportOption
+from pricing_engine.models import PricingRule
+from pricing_engine.services.pricing_plan import clear_local_plans
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+class PriceBreakdownSnapshotTests(TestCase):
+    """Bookings are served with the breakdown they were priced with"""
+
+    def setUp(self):
+        cache.clear()
+        clear_local_plans()
+        self.user = User.objects.create_user(
+            email="snapshot@example.com", password="testpass123"
+        )
+        self.city = City.objects.create(
+            name="Test City", slug="test-city", description="Test description"
+        )
+        self.package = Package.objects.create(
+            name="Test Package",
+            slug="test-package",
+            city=self.city,
+            description="Test package description",
+        )
+        self.experiences = [
+            Experience.objects.create(
+                name=f"Experience {i}",
+                description="Test experience",
+                base_price=1000 * i,
+                duration_hours=2,
+            )
+            for i in (1, 2)
+        ]
+        self.package.experiences.add(*self.experiences)
+        self.hotel_tier = HotelTier.objects.create(
+            name="Standard",
+            description="Standard hotel",
+            price_multiplier=Decimal("1.0"),
+            base_price_per_night=Decimal("2000.00"),
+        )
+        self.package.hotel_tiers.add(self.hotel_tier)
+        self.transport = TransportOption.objects.create(
+            name="Bus", description="Bus transport", base_price=500
+        )
+        self.package.transport_options.add(self.transport)
+
+    def create_booking(self, num_travelers=2):
+        start = date.today() + timedelta(days=10)
+        return BookingService.calculate_and_create_booking(
+            package=self.package,
+            experience_ids=[exp.id for exp in self.experiences],
+            hotel_tier_id=self.hotel_tier.id,
+            transport_option_id=self.transport.id,
+            user=self.user,
+            booking_date=start,
+            booking_end_date=start + timedelta(days=3),
+            num_travelers=num_travelers,
+            customer_name="Test User",
+            customer_email="snapshot@example.com",
+            customer_phone="9999999999",
+        )
+
+    def add_discount(self):
+        PricingRule.objects.create(
+            name="Flash sale",
+            rule_type="DISCOUNT",
+            value=Decimal("10.00"),
+            is_percentage=True,
+            active_from=timezone.now() - timedelta(days=1),
+        )
+
+    def test_snapshot_stored_at_creation(self):
+        booking = self.create_booking()
+
+        self.assertEqual(
+            booking.price_breakdown,
+            BookingService.compute_price_breakdown_snapshot(booking),
+        )
+        self.assertEqual(
+            booking.price_breakdown["total_amount"], str(booking.total_amount_paid)
+        )
+        self.assertEqual(
+            [exp["id"] for exp in booking.price_breakdown["experiences"]],
+            [exp.id for exp in self.experiences],
+        )
+
+    def test_rule_changes_do_not_reprice_existing_bookings(self):
+        booking = self.create_booking()
+        stored = Booking.objects.get(pk=booking.pk)
+
+        self.add_discount()
+
+        data = BookingSerializer(stored).data["price_breakdown"]
+        self.assertEqual(data, booking.price_breakdown)
+        self.assertEqual(data["total_discount"], "0.00")
+        # Repricing would have mixed today's discount into a historical booking
+        self.assertEqual(
+            BookingService.compute_price_breakdown_snapshot(stored)["total_discount"],
+            "1250.00",
+        )
+
+    def test_update_refreshes_snapshot(self):
+        booking = self.create_booking(num_travelers=2)
+        self.add_discount()
+
+        serializer = BookingUpdateSerializer(
+            booking, data={"num_travelers": 3}, partial=True
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        booking = serializer.save()
+
+        booking.refresh_from_db()
+        self.assertEqual(booking.price_breakdown["num_travelers"], 3)
+        self.assertNotEqual(booking.price_breakdown["total_discount"], "0.00")
+        self.assertEqual(
+            booking.price_breakdown["total_amount"], str(booking.total_amount_paid)
+        )
+
+    def test_update_prices_the_vehicle_allocation(self):
+        van = TransportOption.objects.create(
+            name="Van", description="Van transport", base_price=1800
+        )
+        self.package.transport_options.add(van)
+        unallocated = self.create_booking(num_travelers=2).price_breakdown
+        booking = self.create_booking(num_travelers=2)
+
+        serializer = BookingUpdateSerializer(
+            booking,
+            data={"vehicle_allocation": [{"transport_option_id": van.id, "count": 2}]},
+            partial=True,
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        booking.refresh_from_db()
+        self.assertNotEqual(
+            booking.price_breakdown["transport_cost"], unallocated["transport_cost"]
+        )
+        self.assertEqual(
+            booking.price_breakdown,
+            BookingService.compute_price_breakdown_snapshot(booking),
+        )
+
+        # Later updates keep pricing the allocated vehicles
+        serializer = BookingUpdateSerializer(
+            booking, data={"num_travelers": 3}, partial=True
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        booking.refresh_from_db()
+        self.assertEqual(booking.price_breakdown["num_travelers"], 3)
+        self.assertEqual(
+            booking.price_breakdown,
+            BookingService.compute_price_breakdown_snapshot(booking),
+        )
+
+    def test_list_query_count_is_constant(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        self.create_booking()
+        with CaptureQueriesContext(connection) as one_booking:
+            response = client.get("/api/bookings/")
+        self.assertEqual(response.status_code, 200)
+
+        for _ in range(19):
+            self.create_booking()
+        with CaptureQueriesContext(connection) as page:
+            response = client.get("/api/bookings/")
+
+        self.assertEqual(len(response.json()["results"]), 20)
+        self.assertEqual(len(page), len(one_booking))
+
+    def test_legacy_bookings_fall_back_and_backfill(self):
+        booking = self.create_booking()
+        expected = booking.price_breakdown
+        Booking.objects.filter(pk=booking.pk).update(price_breakdown=None)
+        legacy = Booking.objects.get(pk=booking.pk)
+
+        self.assertEqual(BookingSerializer(legacy).data["price_breakdown"], expected)
+
+        call_command("backfill_price_breakdowns", stdout=StringIO())
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.price_breakdown, expected)
@@ -17,6 +17,8 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from backend.query_budget import query_budget
+
 from .models import Booking
 from .serializers import (
     BookingCreateResponseSerializer,
@@ -55,12 +57,19 @@ class BookingViewSet(viewsets.ModelViewSet):
 
         return (
             Booking.objects.select_related(
-                "user", "package__city", "selected_hotel_tier", "selected_transport"
+                "user",
+                "package__city",
+                "package__price_range",
+                "package__featured_image",
+                "selected_hotel_tier__featured_image",
+                "selected_transport",
             )
             .prefetch_related(
-                "selected_experiences",
-                "package__experiences",
-                "package__hotel_tiers",
+                "selected_experiences__city",
+                "selected_experiences__featured_image",
+                "package__experiences__city",
+                "package__experiences__featured_image",
+                "package__hotel_tiers__featured_image",
                 "package__transport_options",
             )
             .filter(user=self.request.user)
@@ -83,6 +92,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         description="Retrieve a paginated list of bookings for the authenticated user.",
         responses={200: BookingSerializer(many=True)},
     )
+    @query_budget(8)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -157,6 +167,7 @@ class BookingViewSet(viewsets.ModelViewSet):
             ),
         },
     )
+    @query_budget(7)
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CitiesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "cities"
+
+    def ready(self):
+        # Register model signals
+        from . import signals  # noqa: F401
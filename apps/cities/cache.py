@@ -0,0 +1,161 @@
+"""
+Cached city context (the public SSR payload behind CityContextView)
+
+Every city has a content version in the cache, embedded in the payload key.
+Signals (cities.signals) bump it whenever the city or anything rendered in
+its context changes: highlights, travel tips, articles, packages and gallery
+media. Stale payloads are never read again and age out through their TTL.
+
+Slugs are resolved to city ids through a small lookup cache, so a warm
+request costs three cache reads and no database query. The cold path
+renders the payload with a fixed number of queries whatever the size of
+the city. Payloads are stored with their ETag and Last-Modified time
+(packages.cache.CachedResponse) for conditional requests.
+"""
+
+import logging
+import random
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from articles.models import Article
+from media_library.models import Media
+from packages.cache import CachedResponse
+from packages.models import Package
+
+from .models import City
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CITY_CONTEXT_TIMEOUT = 3600  # seconds
+
+
+def _version_key(city_id: int) -> str:
+    return f"city_content:{city_id}"
+
+
+def _slug_key(slug: str) -> str:
+    return f"city_slug:{slug}"
+
+
+def _context_key(city_id: int, version: int) -> str:
+    return f"city_context:{city_id}:v{version}"
+
+
+def _timeout() -> int:
+    return getattr(settings, "CACHE_TTL", {}).get(
+        "city_context", DEFAULT_CITY_CONTEXT_TIMEOUT
+    )
+
+
+def get_city_content_version(city_id: int) -> int:
+    key = _version_key(city_id)
+    version = cache.get(key)
+    if version is None:
+        # Random start, so a recreated counter never matches a live payload key
+        cache.add(key, random.getrandbits(48), None)
+        version = cache.get(key)
+    return version or 0
+
+
+def bump_city_content_version(city_id: Optional[int]) -> None:
+    """Invalidate the cached context of one city in O(1)"""
+    if city_id is None:
+        return
+    key = _version_key(city_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, random.getrandbits(48), None)
+
+
+def forget_city_slug(slug: Optional[str]) -> None:
+    """Drop a slug -> city id mapping (slug renamed, city unpublished or deleted)"""
+    if slug:
+        cache.delete(_slug_key(slug))
+
+
+def city_content_type_id() -> int:
+    # get_for_model is cached per process after the first lookup
+    return ContentType.objects.get_for_model(City).pk
+
+
+def build_city_context(city_id: int, slug: str) -> Optional[Dict[str, Any]]:
+    """
+    Render the context of a published city (six queries), or None if no
+    published city has this id and slug.
+    """
+    from .serializers import CityContextSerializer
+
+    city = (
+        City.objects.defer("search_vector")
+        .prefetch_related(
+            "highlights",
+            "travel_tips",
+            Prefetch(
+                "articles",
+                queryset=Article.objects.only(
+                    "id", "city_id", "title", "slug", "author", "created_at"
+                ),
+            ),
+            Prefetch(
+                "packages",
+                queryset=Package.objects.only(
+                    "id", "city_id", "name", "slug", "description"
+                ),
+            ),
+        )
+        .filter(pk=city_id, slug=slug, status="PUBLISHED")
+        .first()
+    )
+    if city is None:
+        return None
+
+    city.gallery_items = list(
+        Media.objects.filter(content_type_id=city_content_type_id(), object_id=city.pk)
+    )
+    return CityContextSerializer(city).data
+
+
+def get_city_context(slug: str) -> Optional[CachedResponse]:
+    """
+    Cached context payload of the published city with this slug
+
+    Returns:
+        CachedResponse with the serialized city context, or None if the city
+        does not exist or is not published
+    """
+    timeout = _timeout()
+
+    city_id = cache.get(_slug_key(slug))
+    if city_id is None:
+        city_id = (
+            City.objects.filter(slug=slug, status="PUBLISHED")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if city_id is None:
+            return None
+        cache.set(_slug_key(slug), city_id, timeout)
+
+    # Read the version before rendering: a concurrent change bumps it and
+    # this render is stored under a key nobody reads any more
+    cache_key = _context_key(city_id, get_city_content_version(city_id))
+    entry = cache.get(cache_key)
+    if entry is not None:
+        return entry
+
+    data = build_city_context(city_id, slug)
+    if data is None:
+        # Renamed or unpublished since the slug was cached
+        forget_city_slug(slug)
+        return None
+
+    entry = CachedResponse.build(data)
+    cache.set(cache_key, entry, timeout)
+    logger.debug(f"Rendered city context: {cache_key}")
+    return entry
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-16 20:02
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cities", "0003_alter_city_hero_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="city",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+    ]
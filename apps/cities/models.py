@@ -1,5 +1,8 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+from backend.model_tracking import FieldTrackerMixin
+
 
 def city_image_upload_path(instance, filename):
     """
@@ -15,7 +18,10 @@ def city_image_upload_path(instance, filename):
     return f"city_{safe_name}_hero{ext}"
 
 
-class City(models.Model):
+class City(FieldTrackerMixin, models.Model):
+    # Cached contexts are looked up by slug (see cities.cache)
+    tracked_fields = ("slug",)
+
     name = models.CharField(max_length=100, db_index=True)  # Frequently searched
     slug = models.SlugField(unique=True, db_index=True)  # Primary lookup field
     description = models.TextField()
@@ -38,6 +44,9 @@ class City(models.Model):
     )  # Frequently ordered by
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text search document, maintained by a database trigger (PostgreSQL)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         verbose_name_plural = "Cities"
         indexes = [
@@ -84,7 +93,9 @@ class City(models.Model):
         return None
 
 
-class Highlight(models.Model):
+class Highlight(FieldTrackerMixin, models.Model):
+    tracked_fields = ("city",)
+
     city = models.ForeignKey(
         City, related_name="highlights", on_delete=models.CASCADE, db_index=True
     )
@@ -101,7 +112,9 @@ class Highlight(models.Model):
         return f"{self.city.name} - {self.title}"
 
 
-class TravelTip(models.Model):
+class TravelTip(FieldTrackerMixin, models.Model):
+    tracked_fields = ("city",)
+
     city = models.ForeignKey(
         City, related_name="travel_tips", on_delete=models.CASCADE, db_index=True
     )
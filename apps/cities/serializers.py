@@ -123,10 +123,10 @@ class CityContextSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(serializers.ListField(child=serializers.DictField()))
     def get_gallery(self, obj) -> List[Dict[str, Any]]:
-        from django.contrib.contenttypes.models import ContentType
-
-        content_type = ContentType.objects.get_for_model(obj)
-        media_items = Media.objects.filter(content_type=content_type, object_id=obj.id)
+        # Loaded up front by cities.cache.build_city_context
+        media_items = getattr(obj, "gallery_items", None)
+        if media_items is None:
+            media_items = obj.media_gallery
         return MediaSerializer(media_items, many=True).data
 
     def _append_cache_buster(self, url: str, version_source) -> str:
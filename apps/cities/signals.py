@@ -0,0 +1,64 @@
+"""
+Signal handlers that keep cached city contexts fresh (see cities.cache).
+
+A change to a city or to anything rendered in its context bumps that city's
+content version. Rows moved to another city (or media re-attached) bump
+both the old and the new city. City changes also invalidate the cached city
+and article endpoints (articles embed their city's name and slug) and the
+package and experience responses tagged with the city.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from articles.models import Article
+from media_library.models import Media
+from packages.cache import bump_namespace, invalidate_tags
+from packages.models import Package
+
+from .cache import (
+    bump_city_content_version,
+    city_content_type_id,
+    forget_city_slug,
+)
+from .models import City, Highlight, TravelTip
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def invalidate_city_context(sender, instance, **kwargs):
+    forget_city_slug(instance.slug)
+    if instance.has_changed("slug"):
+        forget_city_slug(instance.original_value("slug"))
+    bump_city_content_version(instance.pk)
+    bump_namespace("cities")
+    bump_namespace("articles")
+    invalidate_tags(f"city:{instance.pk}")
+
+
+@receiver(post_save, sender=Highlight)
+@receiver(post_delete, sender=Highlight)
+@receiver(post_save, sender=TravelTip)
+@receiver(post_delete, sender=TravelTip)
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+@receiver(post_save, sender=Package)
+@receiver(post_delete, sender=Package)
+def invalidate_city_context_on_content_change(sender, instance, **kwargs):
+    bump_city_content_version(instance.city_id)
+    if kwargs["signal"] is post_save and instance.has_changed("city"):
+        bump_city_content_version(instance.original_value("city"))
+
+
+@receiver(post_save, sender=Media)
+@receiver(post_delete, sender=Media)
+def invalidate_city_context_on_media_change(sender, instance, **kwargs):
+    city_type = city_content_type_id()
+    if instance.content_type_id == city_type:
+        bump_city_content_version(instance.object_id)
+    if (
+        kwargs["signal"] is post_save
+        and instance.original_value("content_type") == city_type
+        and (instance.has_changed("content_type") or instance.has_changed("object_id"))
+    ):
+        bump_city_content_version(instance.original_value("object_id"))
@@ -0,0 +1,160 @@
+"""
+Tests for the cached city context endpoint.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from articles.models import Article
+from cities.models import City, Highlight, TravelTip
+from media_library.models import Media
+from packages.models import Package
+from rest_framework.test import APIClient
+
+
+class CityContextTests(TestCase):
+    """City context is rendered once per content version"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.city = City.objects.create(
+            name="Goa", slug="goa", description="Beaches", status="PUBLISHED"
+        )
+        self.other_city = City.objects.create(
+            name="Delhi", slug="delhi", description="Capital", status="PUBLISHED"
+        )
+        self.add_content(self.city, 1)
+
+    def add_content(self, city, index):
+        Highlight.objects.create(
+            city=city, title=f"Highlight {index}", description="Nice"
+        )
+        TravelTip.objects.create(city=city, title=f"Tip {index}", content="Go early")
+        Article.objects.create(
+            city=city,
+            title=f"Article {index}",
+            slug=f"{city.slug}-article-{index}",
+            content="Text",
+            status="PUBLISHED",
+        )
+        Package.objects.create(
+            city=city,
+            name=f"Package {index}",
+            slug=f"{city.slug}-package-{index}",
+            description="Tour",
+        )
+        Media.objects.create(
+            file=f"library/{city.slug}-{index}.jpg",
+            title=f"Photo {index}",
+            content_type=ContentType.objects.get_for_model(City),
+            object_id=city.pk,
+        )
+
+    def get_context(self, slug="goa"):
+        return self.client.get(f"/api/cities/city-context/{slug}/")
+
+    def test_payload(self):
+        response = self.get_context()
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["slug"], "goa")
+        self.assertEqual([h["title"] for h in data["highlights"]], ["Highlight 1"])
+        self.assertEqual([t["title"] for t in data["travel_tips"]], ["Tip 1"])
+        self.assertEqual([a["title"] for a in data["articles"]], ["Article 1"])
+        self.assertEqual([p["name"] for p in data["packages"]], ["Package 1"])
+        self.assertEqual([m["title"] for m in data["gallery"]], ["Photo 1"])
+
+    def test_cold_path_query_count_is_fixed(self):
+        with CaptureQueriesContext(connection) as small:
+            self.get_context()
+
+        for index in range(2, 6):
+            self.add_content(self.city, index)
+        cache.clear()
+        with CaptureQueriesContext(connection) as large:
+            response = self.get_context()
+
+        self.assertEqual(len(response.json()["packages"]), 5)
+        self.assertEqual(len(response.json()["gallery"]), 5)
+        self.assertEqual(len(large), len(small))
+        self.assertLessEqual(len(large), 8)
+
+    def test_warm_path_runs_no_queries(self):
+        self.get_context()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_context()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 0)
+
+    def test_content_changes_refresh_the_payload(self):
+        self.get_context()
+
+        Highlight.objects.create(city=self.city, title="Fort", description="Old")
+        self.assertEqual(len(self.get_context().json()["highlights"]), 2)
+
+        package = Package.objects.get(slug="goa-package-1")
+        package.name = "Renamed"
+        package.save()
+        self.assertEqual(self.get_context().json()["packages"][0]["name"], "Renamed")
+
+        Media.objects.filter(title="Photo 1").get().delete()
+        self.assertEqual(self.get_context().json()["gallery"], [])
+
+    def test_moved_content_refreshes_both_cities(self):
+        self.get_context("goa")
+        self.get_context("delhi")
+
+        article = Article.objects.get(slug="goa-article-1")
+        article.city = self.other_city
+        article.save()
+
+        self.assertEqual(self.get_context("goa").json()["articles"], [])
+        self.assertEqual(len(self.get_context("delhi").json()["articles"]), 1)
+
+        media = Media.objects.get(title="Photo 1")
+        media.object_id = self.other_city.pk
+        media.save()
+
+        self.assertEqual(self.get_context("goa").json()["gallery"], [])
+        self.assertEqual(len(self.get_context("delhi").json()["gallery"]), 1)
+
+    def test_unpublished_and_renamed_cities(self):
+        self.get_context()
+
+        self.city.slug = "goa-india"
+        self.city.save()
+        self.assertEqual(self.get_context("goa").status_code, 404)
+        self.assertEqual(self.get_context("goa-india").status_code, 200)
+
+        self.city.status = "DRAFT"
+        self.city.save()
+        self.assertEqual(self.get_context("goa-india").status_code, 404)
+        self.assertEqual(self.get_context("missing").status_code, 404)
+
+    def test_conditional_request_returns_not_modified(self):
+        response = self.get_context()
+        etag = response["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/cities/city-context/goa/", HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(len(queries), 0)
+
+        Highlight.objects.create(city=self.city, title="Fort", description="Old")
+        response = self.client.get(
+            "/api/cities/city-context/goa/", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
@@ -1,10 +1,14 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiExample, OpenApiParameter, extend_schema
+from packages.cache import cache_response, respond_from_cache
 from rest_framework import filters, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from backend.query_budget import query_budget
+
+from .cache import get_city_context
 from .models import City
 from .serializers import CityContextSerializer, CitySerializer
 
@@ -33,6 +37,12 @@ class CityListView(generics.ListAPIView):
         description="Retrieve a list of all published cities available for travel packages.",
         tags=["Cities"],
     )
+    @cache_response(
+        timeout=3600,
+        key_prefix="cities",
+        vary_on_params=["name", "search", "ordering", "page"],
+    )
+    @query_budget(2)
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
@@ -52,6 +62,8 @@ class CityDetailView(generics.RetrieveAPIView):
         description="Retrieve details of a specific city by ID.",
         tags=["Cities"],
     )
+    @cache_response(timeout=3600, key_prefix="city")
+    @query_budget(1)
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
@@ -130,23 +142,8 @@ class CityContextView(APIView):
         ],
     )
     def get(self, request, slug):
-        try:
-            # Optimized query with select_related for ForeignKey and prefetch_related for reverse ForeignKeys
-            city = (
-                City.objects.select_related()
-                .prefetch_related(
-                    "highlights",  # Reverse ForeignKey
-                    "travel_tips",  # Reverse ForeignKey
-                    "articles__city",  # Reverse ForeignKey with select_related on nested ForeignKey
-                    "packages__city",  # Reverse ForeignKey with select_related on nested ForeignKey
-                    "packages__experiences",  # ManyToMany through packages
-                    "packages__hotel_tiers",  # ManyToMany through packages
-                    "packages__transport_options",  # ManyToMany through packages
-                )
-                .get(slug=slug, status="PUBLISHED")
-            )
-
-            serializer = CityContextSerializer(city)
-            return Response(serializer.data)
-        except City.DoesNotExist:
+        # Rendered once per city content version (see cities.cache)
+        entry = get_city_context(slug)
+        if entry is None:
             return Response({"error": "City not found"}, status=404)
+        return respond_from_cache(request, entry)
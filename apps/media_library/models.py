@@ -2,8 +2,14 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
 
+from backend.model_tracking import FieldTrackerMixin
+
+
+class Media(FieldTrackerMixin, models.Model):
+    # Replaced files are removed from storage (see media_library.signals);
+    # re-attached media refresh the previous owner (see cities.signals)
+    tracked_fields = ("file", "content_type", "object_id")
 
-class Media(models.Model):
     file = models.FileField(upload_to="library/")
     alt_text = models.CharField(max_length=255, blank=True)
     title = models.CharField(max_length=255, blank=True)
@@ -9,26 +9,14 @@ from .services.media_service import MediaService
 logger = logging.getLogger(__name__)
 
 
-def _invalidate_media_related_caches() -> None:
+def _invalidate_media_related_caches(media_id: int) -> None:
     """
-    Invalidate cached responses that embed media URLs.
+    Invalidate cached responses that embed this media's URL.
     """
     try:
-        from packages.cache import invalidate_cache
-
-        patterns = [
-            "packages:*",
-            "package:*",
-            "experiences:*",
-            "experience:*",
-            # Legacy prefixes kept for compatibility with older keys
-            "api:packages:*",
-            "api:package:*",
-            "api:experiences:*",
-            "api:experience:*",
-        ]
-        for pattern in patterns:
-            invalidate_cache(pattern)
+        from packages.cache import invalidate_tags
+
+        invalidate_tags(f"media:{media_id}")
     except Exception as exc:
         logger.warning("Failed to invalidate media-related caches: %s", exc)
 
@@ -39,25 +27,20 @@ def delete_previous_file_on_replace(sender, instance: Media, **kwargs):
     If a Media file is replaced, remove the old file from storage/cloudinary.
     Also ensure updated_at is refreshed.
     """
-    if not instance.pk:
-        return
-
-    try:
-        previous = sender.objects.get(pk=instance.pk)
-    except sender.DoesNotExist:
+    if not instance.has_changed("file"):
         return
 
-    previous_name = previous.file.name if previous.file else None
+    previous_name = instance.original_value("file")
     current_name = instance.file.name if instance.file else None
 
-    if previous_name and previous_name != current_name:
+    if previous_name:
         logger.info(
             "Media id=%s file changed from %s to %s, deleting old file",
             instance.pk,
             previous_name,
             current_name,
         )
-        MediaService.delete_media_file(previous)
+        MediaService.delete_media_file(sender(pk=instance.pk, file=previous_name))
 
         # Force update of updated_at timestamp for cache busting
         # This is automatically handled by auto_now=True, but we log it
@@ -74,9 +57,9 @@ def delete_media_file_on_delete(sender, instance: Media, **kwargs):
 
 @receiver(post_save, sender=Media)
 def invalidate_media_cache_on_save(sender, instance: Media, **kwargs):
-    _invalidate_media_related_caches()
+    _invalidate_media_related_caches(instance.pk)
 
 
 @receiver(post_delete, sender=Media)
 def invalidate_media_cache_on_delete(sender, instance: Media, **kwargs):
-    _invalidate_media_related_caches()
+    _invalidate_media_related_caches(instance.pk)
@@ -4,7 +4,7 @@ from django.shortcuts import redirect, render
 from django.urls import path
 from django.utils.html import format_html
 
-from .models import Notification
+from .models import Notification, NotificationBroadcast
 from .models_push import PushSubscription
 from .services.notification_service import NotificationService
 
@@ -104,18 +104,11 @@ class NotificationAdmin(admin.ModelAdmin):
             user_ids = request.session.get("selected_users", [])
 
             if title and message and user_ids:
-                from django.contrib.auth import get_user_model
-
-                User = get_user_model()
-                users = User.objects.filter(id__in=user_ids)
-
-                notifications = NotificationService.create_bulk_notifications(
-                    list(users), title, message
-                )
+                count = NotificationService.notify_users(user_ids, title, message)
 
                 self.message_user(
                     request,
-                    f"Sent notification to {len(notifications)} users.",
+                    f"Sent notification to {count} users.",
                     messages.SUCCESS,
                 )
                 return redirect("admin:notifications_notification_changelist")
@@ -148,6 +141,31 @@ class NotificationAdmin(admin.ModelAdmin):
         return super().changelist_view(request, extra_context)
 
 
+@admin.register(NotificationBroadcast)
+class NotificationBroadcastAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "title",
+        "status",
+        "created_count",
+        "send_push",
+        "created_at",
+        "completed_at",
+    ]
+    list_filter = ["status", "send_push"]
+    search_fields = ["title"]
+    readonly_fields = [
+        "status",
+        "last_user_id",
+        "created_count",
+        "last_error",
+        "notifications_written_at",
+        "created_at",
+        "updated_at",
+        "completed_at",
+    ]
+
+
 @admin.register(PushSubscription)
 class PushSubscriptionAdmin(admin.ModelAdmin):
     list_display = [
@@ -209,19 +227,14 @@ class PushSubscriptionAdmin(admin.ModelAdmin):
         """Send test push notification to selected subscriptions"""
         from .services.push_service import PushNotificationService
 
-        success_count = 0
-        failed_count = 0
-
-        for subscription in queryset:
-            if PushNotificationService.send_push_notification(
-                subscription=subscription,
-                title="Test Notification",
-                message="This is a test push notification from admin",
-                url="/dashboard",
-            ):
-                success_count += 1
-            else:
-                failed_count += 1
+        result = PushNotificationService.send_to_subscriptions(
+            queryset,
+            title="Test Notification",
+            message="This is a test push notification from admin",
+            url="/dashboard",
+        )
+        success_count = result["success"]
+        failed_count = result["failed"]
 
         self.message_user(
             request,
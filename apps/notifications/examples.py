@@ -73,8 +73,8 @@ def marketing_notifications_example():
 
     users_with_bookings = User.objects.filter(booking__isnull=False).distinct()
 
-    NotificationService.create_bulk_notifications(
-        users=list(users_with_bookings),
+    NotificationService.notify_users(
+        users=users_with_bookings,
         title="Thank You for Traveling With Us!",
         message="We hope you enjoyed your recent trip. Please leave us a review "
         "and get 10% off your next booking!",
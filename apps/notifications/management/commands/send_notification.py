@@ -1,7 +1,11 @@
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
-from notifications.services.notification_service import NotificationService
+from notifications.models import NotificationBroadcast
+from notifications.services.notification_service import (
+    BULK_NOTIFICATION_BATCH_SIZE,
+    NotificationService,
+)
 
 User = get_user_model()
 
@@ -10,20 +14,60 @@ class Command(BaseCommand):
     help = "Send notification to users"
 
     def add_arguments(self, parser):
-        parser.add_argument("title", type=str, help="Notification title")
-        parser.add_argument("message", type=str, help="Notification message")
+        parser.add_argument("title", type=str, nargs="?", help="Notification title")
+        parser.add_argument("message", type=str, nargs="?", help="Notification message")
         parser.add_argument("--user-id", type=int, help="Send to specific user ID")
         parser.add_argument(
             "--all-users", action="store_true", help="Send to all active users"
         )
+        parser.add_argument(
+            "--push",
+            action="store_true",
+            help="Also send a push notification (with --all-users)",
+        )
+        parser.add_argument(
+            "--resume",
+            type=int,
+            metavar="BROADCAST_ID",
+            help="Continue an interrupted --all-users broadcast",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BULK_NOTIFICATION_BATCH_SIZE,
+            help="Notifications per INSERT for broadcasts",
+        )
+
+    def report_progress(self, done, total):
+        self.stdout.write(f"  {done}/{total} notifications created")
 
     def handle(self, *args, **options):
         title = options["title"]
         message = options["message"]
         user_id = options.get("user_id")
         all_users = options.get("all_users")
+        resume = options.get("resume")
 
-        if user_id:
+        if resume:
+            try:
+                broadcast = NotificationService.resume_broadcast(
+                    resume,
+                    batch_size=options["batch_size"],
+                    progress=self.report_progress,
+                )
+            except NotificationBroadcast.DoesNotExist:
+                raise CommandError(f"Broadcast {resume} not found")
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✅ Broadcast {broadcast.pk} sent to "
+                    f"{broadcast.created_count} users"
+                )
+            )
+        elif not (title and message):
+            raise CommandError("title and message are required")
+        elif user_id:
             notification = NotificationService.create_user_notification(
                 user_id, title, message
             )
@@ -34,7 +78,13 @@ class Command(BaseCommand):
             else:
                 self.stdout.write(self.style.ERROR(f"User {user_id} not found"))
         elif all_users:
-            count = NotificationService.notify_all_users(title, message)
+            count = NotificationService.notify_all_users(
+                title,
+                message,
+                send_push=options["push"],
+                batch_size=options["batch_size"],
+                progress=self.report_progress,
+            )
             self.stdout.write(self.style.SUCCESS(f"Notification sent to {count} users"))
         else:
             self.stdout.write(
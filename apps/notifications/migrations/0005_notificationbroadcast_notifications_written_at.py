@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-16 21:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0004_notificationbroadcast"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationbroadcast",
+            name="notifications_written_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class Notification(models.Model):
@@ -27,3 +30,52 @@ class Notification(models.Model):
 
     def __str__(self):
         return f"Notification for {self.user.id}"
+
+
+class NotificationBroadcast(models.Model):
+    """
+    One notification sent to a whole audience (all active users, or a fixed
+    list of user ids). Users are processed in id order and last_user_id is
+    advanced with every committed batch, so an interrupted broadcast resumes
+    where it stopped (see NotificationService.run_broadcast). Once every
+    notification is written, notifications_written_at is set and a resumed
+    broadcast only retries the push stage.
+    """
+
+    # A RUNNING broadcast not updated for this long lost its worker and may
+    # be resumed (every committed batch updates it)
+    STALE_AFTER = timedelta(minutes=30)
+
+    STATUS_CHOICES = [
+        ("RUNNING", "Running"),
+        ("COMPLETED", "Completed"),
+        ("FAILED", "Failed"),
+    ]
+
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    # None = every active user
+    user_ids = models.JSONField(null=True, blank=True)
+    send_push = models.BooleanField(default=False)
+
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="RUNNING", db_index=True
+    )
+    last_user_id = models.PositiveBigIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    notifications_written_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Broadcast #{self.pk}: {self.title} ({self.status})"
+
+    def is_stale(self, at=None):
+        """Whether a RUNNING broadcast stopped making progress"""
+        return self.updated_at <= (at or timezone.now()) - self.STALE_AFTER
@@ -1,22 +1,58 @@
 import logging
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Callable, Dict, Optional
 
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import QuerySet
 from django.utils import timezone
 
-from ..models import Notification
+from ..models import Notification, NotificationBroadcast
+from ..models_push import PushSubscription
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
+# In-app notification sent when a booking enters a status:
+# status -> (title, message template formatted with booking_id and package_name)
+BOOKING_STATUS_NOTIFICATIONS = {
+    "PENDING_PAYMENT": (
+        "Payment Initiated",
+        "Payment for booking #{booking_id} is pending. "
+        "Please complete payment to confirm your booking.",
+    ),
+    "CONFIRMED": (
+        "Booking Confirmed!",
+        "Your booking for {package_name} has been confirmed! "
+        "Check your email for details.",
+    ),
+    "CANCELLED": (
+        "Booking Cancelled",
+        "Booking #{booking_id} for {package_name} has been cancelled. "
+        "Refunds will be processed within 5-7 business days.",
+    ),
+}
+
+
+# Rows per INSERT (and per committed broadcast batch) for bulk notifications
+BULK_NOTIFICATION_BATCH_SIZE = 2000
+
+
 class NotificationService:
     """
     Service class for notification business logic
     Handles creation, bulk operations, and notification management
     """
 
+    @staticmethod
+    def booking_status_notification(status, booking_id, package_name):
+        """(title, message) for a booking entering status, or None"""
+        if status not in BOOKING_STATUS_NOTIFICATIONS:
+            return None
+        title, template = BOOKING_STATUS_NOTIFICATIONS[status]
+        return title, template.format(booking_id=booking_id, package_name=package_name)
+
     @staticmethod
     def create_notification(
         user: User, title: str, message: str, send_push: bool = True
@@ -61,25 +97,24 @@ class NotificationService:
         )
 
     @staticmethod
-    def notify_payment_pending(booking):
-        """Send notification when payment initiated"""
+    def _notify_booking_status(booking, status):
+        title, message = NotificationService.booking_status_notification(
+            status, booking.id, booking.package.name
+        )
         return NotificationService.create_notification(
-            user=booking.user,
-            title="Payment Initiated",
-            message=f"Payment for booking #{booking.id} is pending. "
-            f"Please complete payment to confirm your booking.",
+            user=booking.user, title=title, message=message
         )
 
+    @staticmethod
+    def notify_payment_pending(booking):
+        """Send notification when payment initiated"""
+        return NotificationService._notify_booking_status(booking, "PENDING_PAYMENT")
+
     @staticmethod
     def notify_booking_confirmed(booking):
         """Send notification when booking confirmed"""
         # Create in-app notification
-        notification = NotificationService.create_notification(
-            user=booking.user,
-            title="Booking Confirmed!",
-            message=f"Your booking for {booking.package.name} has been confirmed! "
-            f"Check your email for details.",
-        )
+        notification = NotificationService._notify_booking_status(booking, "CONFIRMED")
 
         # Send email confirmation
         try:
@@ -112,24 +147,73 @@ class NotificationService:
     @staticmethod
     def notify_booking_cancelled(booking):
         """Send notification when booking cancelled"""
-        return NotificationService.create_notification(
-            user=booking.user,
-            title="Booking Cancelled",
-            message=f"Booking #{booking.id} for {booking.package.name} has been cancelled. "
-            f"Refunds will be processed within 5-7 business days.",
+        return NotificationService._notify_booking_status(booking, "CANCELLED")
+
+    @staticmethod
+    def create_booking_status_notifications(bookings, status) -> int:
+        """
+        In-app notifications for many bookings entering status, in one INSERT.
+        No push, email or SMS is sent (see BookingService.transition_many).
+
+        Args:
+            bookings: Iterable of (booking_id, user_id, package_name)
+            status: Status the bookings entered
+
+        Returns:
+            Number of notifications created
+        """
+        if status not in BOOKING_STATUS_NOTIFICATIONS:
+            return 0
+
+        notifications = []
+        for booking_id, user_id, package_name in bookings:
+            title, message = NotificationService.booking_status_notification(
+                status, booking_id, package_name
+            )
+            notifications.append(
+                Notification(user_id=user_id, title=title, message=message)
+            )
+        return len(Notification.objects.bulk_create(notifications))
+
+    @staticmethod
+    def _bulk_create_for_users(user_ids, title: str, message: str) -> int:
+        Notification.objects.bulk_create(
+            [
+                Notification(user_id=user_id, title=title, message=message)
+                for user_id in user_ids
+            ]
         )
+        return len(user_ids)
 
     @staticmethod
     def create_bulk_notifications(
-        users: List[User], title: str, message: str
-    ) -> List[Notification]:
+        users, title: str, message: str, batch_size=BULK_NOTIFICATION_BATCH_SIZE
+    ) -> int:
         """
-        Create notifications for multiple users efficiently
+        Create one notification per user, batch_size rows per INSERT.
+        Querysets are streamed as ids, so memory stays bounded.
+
+        Args:
+            users: User queryset, or an iterable of users or user ids
+
+        Returns:
+            Number of notifications created
         """
-        notifications = [
-            Notification(user=user, title=title, message=message) for user in users
-        ]
-        return Notification.objects.bulk_create(notifications)
+        if isinstance(users, QuerySet):
+            user_ids = (
+                users.order_by()
+                .values_list("pk", flat=True)
+                .iterator(chunk_size=batch_size)
+            )
+        else:
+            user_ids = (getattr(user, "pk", user) for user in users)
+
+        created = 0
+        while True:
+            batch = list(islice(user_ids, batch_size))
+            if not batch:
+                return created
+            created += NotificationService._bulk_create_for_users(batch, title, message)
 
     @staticmethod
     def create_user_notification(
@@ -157,16 +241,178 @@ class NotificationService:
         )
 
     @staticmethod
-    def notify_all_users(title: str, message: str) -> int:
+    def notify_all_users(
+        title: str,
+        message: str,
+        send_push: bool = False,
+        batch_size=BULK_NOTIFICATION_BATCH_SIZE,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
         """
-        Send notification to all active users
+        Send notification to all active users as a resumable broadcast
         Returns count of notifications created
         """
-        active_users = User.objects.filter(is_active=True)
-        notifications = NotificationService.create_bulk_notifications(
-            list(active_users), title, message
+        broadcast = NotificationBroadcast.objects.create(
+            title=title, message=message, send_push=send_push
+        )
+        broadcast = NotificationService.run_broadcast(
+            broadcast, batch_size=batch_size, progress=progress
+        )
+        return broadcast.created_count
+
+    @staticmethod
+    def notify_users(
+        users,
+        title: str,
+        message: str,
+        send_push: bool = False,
+        batch_size=BULK_NOTIFICATION_BATCH_SIZE,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Send notification to the given active users as a resumable broadcast.
+        The target ids are stored on the broadcast, so a resume sends to the
+        same audience.
+
+        Args:
+            users: User queryset, or an iterable of users or user ids
+
+        Returns:
+            Number of notifications created
+        """
+        if isinstance(users, QuerySet):
+            user_ids = users.order_by("pk").values_list("pk", flat=True)
+        else:
+            user_ids = sorted({getattr(user, "pk", user) for user in users})
+
+        broadcast = NotificationBroadcast.objects.create(
+            title=title, message=message, user_ids=list(user_ids), send_push=send_push
+        )
+        broadcast = NotificationService.run_broadcast(
+            broadcast, batch_size=batch_size, progress=progress
+        )
+        return broadcast.created_count
+
+    @staticmethod
+    def run_broadcast(
+        broadcast: NotificationBroadcast,
+        batch_size=BULK_NOTIFICATION_BATCH_SIZE,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> NotificationBroadcast:
+        """
+        Write the broadcast's notifications, then optionally push them.
+
+        Active users are streamed in id order; every batch is one INSERT
+        committed together with the broadcast cursor (last_user_id), so
+        running an interrupted broadcast again continues after the last
+        committed batch. Push delivery starts once every notification is
+        written (notifications_written_at); running a broadcast whose
+        notifications are written only pushes again.
+
+        Args:
+            broadcast: NotificationBroadcast to (continue to) send
+            batch_size: Notifications per INSERT
+            progress: Called as progress(done, total) after every batch
+
+        Returns:
+            The broadcast, COMPLETED (or FAILED, with the error re-raised)
+        """
+        audience = User.objects.filter(is_active=True)
+        if broadcast.user_ids is not None:
+            audience = audience.filter(pk__in=broadcast.user_ids)
+
+        try:
+            if broadcast.notifications_written_at is None:
+                NotificationService._write_broadcast(
+                    broadcast, audience, batch_size, progress
+                )
+
+            if broadcast.send_push:
+                from .push_service import PushNotificationService
+
+                PushNotificationService.send_to_subscriptions(
+                    PushSubscription.objects.filter(is_active=True, user__in=audience),
+                    title=broadcast.title,
+                    message=broadcast.message,
+                    url="/dashboard/notifications",
+                )
+        except Exception as e:
+            logger.error(f"Broadcast {broadcast.pk} failed: {str(e)}")
+            # The cursor only moves with committed batches
+            broadcast.refresh_from_db(
+                fields=["last_user_id", "created_count", "notifications_written_at"]
+            )
+            broadcast.status = "FAILED"
+            broadcast.last_error = str(e)
+            broadcast.save(update_fields=["status", "last_error", "updated_at"])
+            raise
+
+        broadcast.status = "COMPLETED"
+        broadcast.completed_at = timezone.now()
+        broadcast.save(update_fields=["status", "completed_at", "updated_at"])
+        logger.info(
+            f"Broadcast {broadcast.pk} completed: "
+            f"{broadcast.created_count} notifications"
+        )
+        return broadcast
+
+    @staticmethod
+    def _write_broadcast(broadcast, audience, batch_size, progress):
+        """Write the notifications of the users after the broadcast cursor"""
+        pending = audience.filter(pk__gt=broadcast.last_user_id).order_by("pk")
+        total = broadcast.created_count + pending.count()
+        user_ids = pending.values_list("pk", flat=True).iterator(chunk_size=batch_size)
+
+        while True:
+            batch = list(islice(user_ids, batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                NotificationService._bulk_create_for_users(
+                    batch, broadcast.title, broadcast.message
+                )
+                broadcast.last_user_id = batch[-1]
+                broadcast.created_count += len(batch)
+                broadcast.save(
+                    update_fields=["last_user_id", "created_count", "updated_at"]
+                )
+            if progress:
+                progress(broadcast.created_count, total)
+
+        broadcast.notifications_written_at = timezone.now()
+        broadcast.save(update_fields=["notifications_written_at", "updated_at"])
+
+    @staticmethod
+    def resume_broadcast(
+        broadcast_id: int,
+        batch_size=BULK_NOTIFICATION_BATCH_SIZE,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> NotificationBroadcast:
+        """
+        Continue an interrupted broadcast after its last committed batch.
+        The broadcast row is locked while it is claimed, so two workers
+        cannot resume it at once.
+
+        Raises:
+            NotificationBroadcast.DoesNotExist: unknown broadcast id
+            ValueError: the broadcast already completed, or is still running
+                (RUNNING and updated within NotificationBroadcast.STALE_AFTER)
+        """
+        with transaction.atomic():
+            broadcast = NotificationBroadcast.objects.select_for_update().get(
+                pk=broadcast_id
+            )
+            if broadcast.status == "COMPLETED":
+                raise ValueError(f"Broadcast {broadcast_id} already completed")
+            if broadcast.status == "RUNNING" and not broadcast.is_stale():
+                raise ValueError(f"Broadcast {broadcast_id} is still running")
+            broadcast.status = "RUNNING"
+            broadcast.last_error = ""
+            broadcast.save(update_fields=["status", "last_error", "updated_at"])
+
+        return NotificationService.run_broadcast(
+            broadcast, batch_size=batch_size, progress=progress
         )
-        return len(notifications)
 
     @staticmethod
     def get_user_stats(user: User) -> Dict[str, int]:
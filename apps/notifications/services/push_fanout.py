@@ -0,0 +1,233 @@
+"""
+Concurrent Web Push fan-out
+
+Sends one notification to many subscriptions:
+- subscriptions are streamed from the database in batches (iterator())
+- the payload is serialized once and the VAPID key is loaded once; the signed
+  VAPID header is cached per push service origin until shortly before the
+  token expires
+- deliveries run on a thread pool, with at most per_host_limit requests in
+  flight per push service host (FCM, Mozilla autopush, ...)
+- delivery results are written back with one UPDATE per outcome per batch
+
+Worker threads only make HTTP requests; every database query runs on the
+calling thread.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Now
+
+import requests
+from py_vapid import Vapid
+from pywebpush import WebPusher
+
+from backend.metrics import PUSH_NOTIFICATIONS
+
+from ..models_push import PushSubscription
+
+logger = logging.getLogger(__name__)
+
+SENT = "sent"
+FAILED = "failed"
+GONE = "gone"  # 404/410: the subscription no longer exists
+
+# Number of error messages kept in a fan-out result
+MAX_REPORTED_ERRORS = 20
+
+
+def _push_setting(name, default):
+    return getattr(settings, "PUSH_NOTIFICATION_SETTINGS", {}).get(name, default)
+
+
+class VapidSigner:
+    """
+    Signs VAPID headers with one key, once per push service origin.
+    Tokens are valid for 12 hours and re-signed REFRESH_MARGIN before expiry.
+    """
+
+    TOKEN_LIFETIME = 12 * 60 * 60  # seconds
+    REFRESH_MARGIN = 10 * 60  # seconds
+
+    def __init__(self, private_key: str, claims: Dict):
+        self._vapid = Vapid.from_string(private_key=private_key)
+        self._claims = dict(claims)
+        self._headers: Dict[str, Tuple[int, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def headers_for(self, endpoint: str) -> Dict[str, str]:
+        url = urlparse(endpoint)
+        audience = f"{url.scheme}://{url.netloc}"
+        now = int(time.time())
+        with self._lock:
+            cached = self._headers.get(audience)
+            if cached is None or cached[0] - self.REFRESH_MARGIN <= now:
+                expires = now + self.TOKEN_LIFETIME
+                headers = self._vapid.sign(
+                    {**self._claims, "aud": audience, "exp": expires}
+                )
+                cached = self._headers[audience] = (expires, headers)
+        return dict(cached[1])
+
+
+class PushFanout:
+    """
+    Deliver one serialized payload to a queryset of PushSubscription rows.
+
+    Usage:
+        fanout = PushFanout(signer, payload)
+        result = fanout.send(PushSubscription.objects.filter(is_active=True))
+    """
+
+    def __init__(
+        self,
+        signer: VapidSigner,
+        payload: str,
+        max_workers: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+        ttl: Optional[int] = None,
+    ):
+        self.signer = signer
+        self.payload = payload
+        self.max_workers = max_workers or _push_setting("FANOUT_MAX_WORKERS", 32)
+        self.per_host_limit = per_host_limit or _push_setting(
+            "FANOUT_PER_HOST_LIMIT", 8
+        )
+        self.batch_size = batch_size or _push_setting("FANOUT_BATCH_SIZE", 500)
+        self.timeout = timeout or _push_setting("FANOUT_TIMEOUT", 10)
+        self.ttl = ttl if ttl is not None else _push_setting("NOTIFICATION_TTL", 0)
+        self.max_failures = _push_setting("MAX_FAILURES_BEFORE_DEACTIVATE", 3)
+
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions = []
+
+    def send(self, subscriptions) -> Dict[str, object]:
+        """
+        Send to every subscription in the queryset.
+
+        Returns:
+            Dict with total, success, failed and deactivated counts, plus up
+            to MAX_REPORTED_ERRORS error messages
+        """
+        result = {"total": 0, "success": 0, "failed": 0, "deactivated": 0}
+        errors = []
+        rows = subscriptions.values_list("pk", "endpoint", "p256dh", "auth").iterator(
+            chunk_size=self.batch_size
+        )
+
+        # The first batch is full whenever more follow, so it bounds the
+        # useful number of threads; a single subscription (one device of
+        # send_to_user) is delivered inline
+        batch = list(islice(rows, self.batch_size))
+        workers = min(self.max_workers, len(batch))
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        deliver_all = executor.map if executor else map
+
+        try:
+            while batch:
+                outcomes = list(deliver_all(self._deliver, batch))
+                self._record(outcomes, result)
+                errors.extend(error for _, _, error in outcomes if error)
+                del errors[MAX_REPORTED_ERRORS:]
+                batch = list(islice(rows, self.batch_size))
+        finally:
+            if executor:
+                executor.shutdown()
+            for session in self._sessions:
+                session.close()
+
+        logger.info(
+            f"Push fan-out finished: {result['success']} sent, "
+            f"{result['failed']} failed, {result['deactivated']} deactivated"
+        )
+        return {**result, "errors": errors}
+
+    def _deliver(self, row: Tuple) -> Tuple[int, str, Optional[str]]:
+        pk, endpoint, p256dh, auth = row
+        subscription_info = {
+            "endpoint": endpoint,
+            "keys": {"p256dh": p256dh, "auth": auth},
+        }
+        try:
+            with self._host_slot(urlparse(endpoint).netloc):
+                response = WebPusher(
+                    subscription_info, requests_session=self._session()
+                ).send(
+                    self.payload,
+                    self.signer.headers_for(endpoint),
+                    ttl=self.ttl,
+                    timeout=self.timeout,
+                )
+        except Exception as e:
+            return pk, FAILED, str(e)
+
+        if response.status_code <= 202:
+            return pk, SENT, None
+        error = f"Push failed: {response.status_code} {response.reason}"
+        return pk, GONE if response.status_code in (404, 410) else FAILED, error
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(
+                    self.per_host_limit
+                )
+        return slot
+
+    def _session(self) -> requests.Session:
+        """One keep-alive session per worker thread"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            with self._host_slots_lock:
+                self._sessions.append(session)
+        return session
+
+    def _record(self, outcomes: Iterable[Tuple], result: Dict[str, int]) -> None:
+        """Bulk bookkeeping, mirroring PushSubscription.mark_success/mark_failed"""
+        by_outcome = defaultdict(list)
+        for pk, outcome, _ in outcomes:
+            by_outcome[outcome].append(pk)
+
+        subscriptions = PushSubscription.objects
+        if by_outcome[SENT]:
+            subscriptions.filter(pk__in=by_outcome[SENT]).update(
+                failure_count=0, last_used_at=Now()
+            )
+        if by_outcome[FAILED]:
+            # failure_count in the CASE is the value before the increment
+            subscriptions.filter(pk__in=by_outcome[FAILED]).update(
+                failure_count=F("failure_count") + 1,
+                last_failure_at=Now(),
+                is_active=Case(
+                    When(failure_count__gte=self.max_failures - 1, then=Value(False)),
+                    default=F("is_active"),
+                ),
+            )
+        if by_outcome[GONE]:
+            subscriptions.filter(pk__in=by_outcome[GONE]).update(
+                failure_count=F("failure_count") + 1,
+                last_failure_at=Now(),
+                is_active=False,
+            )
+
+        for outcome, pks in by_outcome.items():
+            PUSH_NOTIFICATIONS.labels(outcome).inc(len(pks))
+        result["total"] += sum(len(pks) for pks in by_outcome.values())
+        result["success"] += len(by_outcome[SENT])
+        result["failed"] += len(by_outcome[FAILED]) + len(by_outcome[GONE])
+        result["deactivated"] += len(by_outcome[GONE])
@@ -14,6 +14,7 @@ from django.contrib.auth import get_user_model
 from pywebpush import WebPushException, webpush
 
 from ..models_push import PushSubscription
+from .push_fanout import PushFanout, VapidSigner
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -148,6 +149,38 @@ class PushNotificationService:
         vapid_keys = PushNotificationService.get_vapid_keys()
         return vapid_keys["public_key"]
 
+    @staticmethod
+    def get_vapid_claims() -> Dict[str, str]:
+        vapid_claims = dict(getattr(settings, "VAPID_CLAIMS", {}) or {})
+        if "sub" not in vapid_claims:
+            vapid_claims["sub"] = f"mailto:{settings.DEFAULT_FROM_EMAIL}"
+        return vapid_claims
+
+    @staticmethod
+    def build_payload(
+        title: str,
+        message: str,
+        data: Optional[Dict] = None,
+        icon: Optional[str] = None,
+        badge: Optional[str] = None,
+        tag: Optional[str] = None,
+        url: Optional[str] = None,
+    ) -> str:
+        """Serialized notification payload read by the service worker"""
+        payload = {
+            "title": title,
+            "body": message,
+            "icon": icon or "/icon.png",
+            "badge": badge or "/badge.png",
+            "tag": tag or "notification",
+            "data": dict(data or {}),
+        }
+
+        if url:
+            payload["data"]["url"] = url
+
+        return json.dumps(payload)
+
     @staticmethod
     def subscribe_user(
         user: User,
@@ -268,29 +301,14 @@ class PushNotificationService:
                 "keys": {"p256dh": subscription.p256dh, "auth": subscription.auth},
             }
 
-            # Prepare notification payload
-            payload = {
-                "title": title,
-                "body": message,
-                "icon": icon or "/icon.png",
-                "badge": badge or "/badge.png",
-                "tag": tag or "notification",
-                "data": data or {},
-            }
-
-            if url:
-                payload["data"]["url"] = url
-
-            vapid_claims = dict(getattr(settings, "VAPID_CLAIMS", {}) or {})
-            if "sub" not in vapid_claims:
-                vapid_claims["sub"] = f"mailto:{settings.DEFAULT_FROM_EMAIL}"
-
             # Send push notification
             webpush(
                 subscription_info=subscription_info,
-                data=json.dumps(payload),
+                data=PushNotificationService.build_payload(
+                    title, message, data, icon, badge, tag, url
+                ),
                 vapid_private_key=vapid_keys["private_key"],
-                vapid_claims=vapid_claims,
+                vapid_claims=PushNotificationService.get_vapid_claims(),
             )
 
             # Mark as successful
@@ -330,6 +348,40 @@ class PushNotificationService:
             subscription.mark_failed()
             return False, str(e)
 
+    @staticmethod
+    def send_to_subscriptions(
+        subscriptions,
+        title: str,
+        message: str,
+        data: Optional[Dict] = None,
+        icon: Optional[str] = None,
+        url: Optional[str] = None,
+        **fanout_options,
+    ) -> Dict[str, object]:
+        """
+        Send one notification to every subscription in a queryset through
+        PushFanout (streamed, concurrent, bulk bookkeeping).
+
+        Args:
+            subscriptions: PushSubscription queryset
+            fanout_options: PushFanout overrides (max_workers, per_host_limit,
+                batch_size, timeout, ttl)
+
+        Returns:
+            Dict with total, success, failed and deactivated counts and errors
+        """
+        vapid_keys = PushNotificationService.get_vapid_keys()
+        fanout = PushFanout(
+            VapidSigner(
+                vapid_keys["private_key"], PushNotificationService.get_vapid_claims()
+            ),
+            PushNotificationService.build_payload(
+                title, message, data=data, icon=icon, url=url
+            ),
+            **fanout_options,
+        )
+        return fanout.send(subscriptions)
+
     @staticmethod
     def send_to_user(
         user: User,
@@ -345,11 +397,16 @@ class PushNotificationService:
         Returns:
             Dict with success and failure counts
         """
-        subscriptions = PushNotificationService.get_user_subscriptions(
-            user, active_only=True
+        result = PushNotificationService.send_to_subscriptions(
+            PushSubscription.objects.filter(user=user, is_active=True),
+            title=title,
+            message=message,
+            data=data,
+            icon=icon,
+            url=url,
         )
 
-        if not subscriptions:
+        if not result["total"]:
             logger.info(f"No active push subscriptions for user {user.id}")
             return {
                 "success": 0,
@@ -357,42 +414,20 @@ class PushNotificationService:
                 "errors": ["No active subscriptions found for user"],
             }
 
-        success_count = 0
-        failed_count = 0
-        failure_reasons: List[str] = []
-
-        for subscription in subscriptions:
-            sent, error_reason = (
-                PushNotificationService.send_push_notification_with_error(
-                    subscription=subscription,
-                    title=title,
-                    message=message,
-                    data=data,
-                    icon=icon,
-                    url=url,
-                )
-            )
-            if sent:
-                success_count += 1
-            else:
-                failed_count += 1
-                if error_reason:
-                    failure_reasons.append(error_reason)
-
         logger.info(
             f"Push notifications sent to user {user.id}: "
-            f"{success_count} success, {failed_count} failed"
+            f"{result['success']} success, {result['failed']} failed"
         )
 
         return {
-            "success": success_count,
-            "failed": failed_count,
-            "errors": failure_reasons,
+            "success": result["success"],
+            "failed": result["failed"],
+            "errors": result["errors"],
         }
 
     @staticmethod
     def send_to_multiple_users(
-        users: List[User],
+        users,
         title: str,
         message: str,
         data: Optional[Dict] = None,
@@ -402,25 +437,27 @@ class PushNotificationService:
         """
         Send push notification to multiple users
 
+        Args:
+            users: User queryset (preferred: sent as a subquery) or list
+
         Returns:
             Dict with total success and failure counts
         """
-        total_success = 0
-        total_failed = 0
-
-        for user in users:
-            result = PushNotificationService.send_to_user(
-                user=user, title=title, message=message, data=data, icon=icon, url=url
-            )
-            total_success += result["success"]
-            total_failed += result["failed"]
+        result = PushNotificationService.send_to_subscriptions(
+            PushSubscription.objects.filter(user__in=users, is_active=True),
+            title=title,
+            message=message,
+            data=data,
+            icon=icon,
+            url=url,
+        )
 
         logger.info(
             f"Bulk push notifications sent: "
-            f"{total_success} success, {total_failed} failed"
+            f"{result['success']} success, {result['failed']} failed"
         )
 
-        return {"success": total_success, "failed": total_failed}
+        return {"success": result["success"], "failed": result["failed"]}
 
     @staticmethod
     def cleanup_inactive_subscriptions(days: int = 90) -> int:
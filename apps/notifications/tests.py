@@ -1,14 +1,19 @@
 from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from .models import Notification
+from .models import Notification, NotificationBroadcast
 from .services.notification_service import NotificationService
 
 User = get_user_model()
@@ -59,13 +64,23 @@ class NotificationServiceTest(TestCase):
 
     def test_create_bulk_notifications(self):
         users = [self.user1, self.user2]
-        notifications = NotificationService.create_bulk_notifications(
+        count = NotificationService.create_bulk_notifications(
             users=users, title="Bulk Test", message="Bulk test message"
         )
 
-        self.assertEqual(len(notifications), 2)
+        self.assertEqual(count, 2)
         self.assertEqual(Notification.objects.count(), 2)
 
+    def test_create_bulk_notifications_streams_querysets(self):
+        with CaptureQueriesContext(connection) as queries:
+            count = NotificationService.create_bulk_notifications(
+                User.objects.all(), "Bulk", "Bulk message", batch_size=1
+            )
+
+        self.assertEqual(count, 2)
+        # One SELECT of ids, one INSERT per batch
+        self.assertEqual(len(queries), 3)
+
     def test_get_user_stats(self):
         # Create some notifications
         NotificationService.create_notification(self.user1, "Test 1", "Message 1")
@@ -250,3 +265,132 @@ class NotificationAPITest(APITestCase):
 
         # Verify old notification is deleted
         self.assertFalse(Notification.objects.filter(id=old_notification.id).exists())
+
+
+class NotificationBroadcastTest(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(email=f"user{i}@example.com", password="pw")
+            for i in range(5)
+        ]
+        User.objects.create_user(
+            email="inactive@example.com", password="pw", is_active=False
+        )
+        Notification.objects.all().delete()
+
+    def test_notify_all_users_in_batches(self):
+        progress = []
+
+        count = NotificationService.notify_all_users(
+            "Sale",
+            "Everything 20% off",
+            batch_size=2,
+            progress=lambda done, total: progress.append((done, total)),
+        )
+
+        self.assertEqual(count, 5)
+        self.assertEqual(progress, [(2, 5), (4, 5), (5, 5)])
+        self.assertEqual(
+            sorted(Notification.objects.values_list("user_id", flat=True)),
+            [user.id for user in self.users],
+        )
+        broadcast = NotificationBroadcast.objects.get()
+        self.assertEqual(broadcast.status, "COMPLETED")
+        self.assertEqual(broadcast.last_user_id, self.users[-1].id)
+
+    def test_interrupted_broadcast_resumes_after_last_batch(self):
+        broadcast = NotificationBroadcast.objects.create(title="Hi", message="There")
+        original = NotificationService._bulk_create_for_users
+        calls = []
+
+        def fail_on_second_batch(user_ids, title, message):
+            calls.append(user_ids)
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            return original(user_ids, title, message)
+
+        with mock.patch.object(
+            NotificationService, "_bulk_create_for_users", fail_on_second_batch
+        ):
+            with self.assertRaises(RuntimeError):
+                NotificationService.run_broadcast(broadcast, batch_size=2)
+
+        broadcast.refresh_from_db()
+        self.assertEqual(broadcast.status, "FAILED")
+        self.assertEqual(broadcast.created_count, 2)
+        self.assertEqual(Notification.objects.count(), 2)
+
+        out = StringIO()
+        call_command("send_notification", "--resume", str(broadcast.pk), stdout=out)
+
+        broadcast.refresh_from_db()
+        self.assertEqual(broadcast.status, "COMPLETED")
+        self.assertEqual(broadcast.created_count, 5)
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertEqual(Notification.objects.values("user_id").distinct().count(), 5)
+        self.assertIn("5/5 notifications created", out.getvalue())
+
+    def test_broadcast_hands_off_to_push_fanout(self):
+        with mock.patch(
+            "notifications.services.push_service.PushNotificationService"
+            ".send_to_subscriptions"
+        ) as send:
+            NotificationService.notify_all_users("Hi", "There", send_push=True)
+
+        send.assert_called_once()
+        subscriptions = send.call_args.args[0]
+        self.assertEqual(subscriptions.model.__name__, "PushSubscription")
+
+    def test_targeted_broadcast_stores_its_audience(self):
+        targets = [self.users[3], self.users[1]]
+
+        count = NotificationService.notify_users(targets, "Hi", "There")
+
+        self.assertEqual(count, 2)
+        broadcast = NotificationBroadcast.objects.get()
+        self.assertEqual(broadcast.user_ids, [self.users[1].id, self.users[3].id])
+        self.assertEqual(
+            sorted(Notification.objects.values_list("user_id", flat=True)),
+            broadcast.user_ids,
+        )
+
+    def test_resume_refuses_a_broadcast_still_running(self):
+        broadcast = NotificationBroadcast.objects.create(title="Hi", message="There")
+
+        with self.assertRaises(ValueError):
+            NotificationService.resume_broadcast(broadcast.pk)
+        self.assertEqual(Notification.objects.count(), 0)
+
+        # A worker that stopped updating it is assumed dead
+        NotificationBroadcast.objects.filter(pk=broadcast.pk).update(
+            updated_at=timezone.now() - NotificationBroadcast.STALE_AFTER
+        )
+        broadcast = NotificationService.resume_broadcast(broadcast.pk)
+        self.assertEqual(broadcast.status, "COMPLETED")
+        self.assertEqual(broadcast.created_count, 5)
+
+    def test_resume_after_push_failure_only_pushes(self):
+        push = (
+            "notifications.services.push_service.PushNotificationService"
+            ".send_to_subscriptions"
+        )
+        with mock.patch(push, side_effect=RuntimeError("push service down")):
+            with self.assertRaises(RuntimeError):
+                NotificationService.notify_all_users("Hi", "There", send_push=True)
+
+        broadcast = NotificationBroadcast.objects.get()
+        self.assertEqual(broadcast.status, "FAILED")
+        self.assertIsNotNone(broadcast.notifications_written_at)
+
+        with (
+            mock.patch(push) as send,
+            mock.patch.object(
+                NotificationService, "_bulk_create_for_users"
+            ) as bulk_create,
+        ):
+            broadcast = NotificationService.resume_broadcast(broadcast.pk)
+
+        bulk_create.assert_not_called()
+        send.assert_called_once()
+        self.assertEqual(broadcast.status, "COMPLETED")
+        self.assertEqual(Notification.objects.count(), 5)
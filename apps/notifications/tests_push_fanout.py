@@ -0,0 +1,241 @@
+import base64
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from pywebpush import WebPusher
+
+from .models_push import PushSubscription
+from .services.push_fanout import SENT, PushFanout, VapidSigner
+from .services.push_service import PushNotificationService
+
+User = get_user_model()
+
+
+class StubPushService(ThreadingHTTPServer):
+    """
+    Local push service: /gone/* answers 410, /error/* answers 500, anything
+    else 201. Tracks the highest number of requests in flight.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, delay=0.0):
+        super().__init__(("127.0.0.1", 0), StubPushHandler)
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubPushHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+            server.requests.append(
+                (self.path, {k.lower(): v for k, v in self.headers.items()}, body)
+            )
+
+        if self.path.startswith("/gone/"):
+            status = 410
+        elif self.path.startswith("/error/"):
+            status = 500
+        else:
+            status = 201
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def browser_keys():
+    """p256dh/auth pair as a browser would register them"""
+    public_key = ec.generate_private_key(ec.SECP256R1()).public_key()
+    p256dh = public_key.public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+    )
+    encode = lambda raw: base64.urlsafe_b64encode(raw).decode().rstrip("=")  # noqa
+    return encode(p256dh), encode(os.urandom(16))
+
+
+def webpush_can_encrypt():
+    """pywebpush 1.14 cannot encrypt with cryptography releases >= 42"""
+    p256dh, auth = browser_keys()
+    subscription_info = {
+        "endpoint": "http://localhost/",
+        "keys": {"p256dh": p256dh, "auth": auth},
+    }
+    try:
+        WebPusher(subscription_info).encode("probe")
+    except TypeError:
+        return False
+    return True
+
+
+requires_encryption = skipUnless(
+    webpush_can_encrypt(), "installed pywebpush cannot encrypt payloads"
+)
+
+
+class PushFanoutTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.p256dh, cls.auth = browser_keys()
+
+    def setUp(self):
+        self.server = StubPushService()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.user = User.objects.create_user(
+            email="push@example.com", password="testpass123"
+        )
+
+    def subscribe(self, path, **kwargs):
+        return PushSubscription.objects.create(
+            user=self.user,
+            endpoint=f"{self.server.url}/{path}",
+            p256dh=self.p256dh,
+            auth=self.auth,
+            **kwargs,
+        )
+
+    def fanout(self, **kwargs):
+        keys = PushNotificationService.get_vapid_keys()
+        return PushFanout(
+            VapidSigner(keys["private_key"], {"sub": "mailto:test@example.com"}),
+            PushNotificationService.build_payload("Hello", "World"),
+            **kwargs,
+        )
+
+    @requires_encryption
+    def test_delivers_and_bookkeeps_in_bulk(self):
+        sent = [self.subscribe(f"ok/{i}", failure_count=2) for i in range(5)]
+        gone = self.subscribe("gone/1")
+        failing = self.subscribe("error/1", failure_count=2)
+        retrying = self.subscribe("error/2")
+
+        with CaptureQueriesContext(connection) as queries:
+            result = self.fanout(batch_size=100).send(PushSubscription.objects.all())
+
+        self.assertEqual(result["total"], 8)
+        self.assertEqual(result["success"], 5)
+        self.assertEqual(result["failed"], 3)
+        self.assertEqual(result["deactivated"], 1)
+        self.assertEqual(len(self.server.requests), 8)
+        # One SELECT and one UPDATE per outcome, whatever the audience size
+        self.assertEqual(len(queries), 4)
+
+        for subscription in sent:
+            subscription.refresh_from_db()
+            self.assertEqual(subscription.failure_count, 0)
+            self.assertIsNotNone(subscription.last_used_at)
+        gone.refresh_from_db()
+        self.assertFalse(gone.is_active)
+        failing.refresh_from_db()
+        self.assertEqual(failing.failure_count, 3)
+        self.assertFalse(failing.is_active)
+        retrying.refresh_from_db()
+        self.assertEqual(retrying.failure_count, 1)
+        self.assertTrue(retrying.is_active)
+
+    @requires_encryption
+    def test_requests_are_encrypted_and_signed(self):
+        self.subscribe("ok/1")
+        self.subscribe("ok/2")
+
+        self.fanout().send(PushSubscription.objects.all())
+
+        for _, headers, body in self.server.requests:
+            self.assertEqual(headers["content-encoding"], "aes128gcm")
+            self.assertTrue(headers["authorization"].startswith("vapid "))
+            self.assertNotIn(b"Hello", body)
+        # The VAPID token is signed once for the push service origin
+        authorizations = {h["authorization"] for _, h, _ in self.server.requests}
+        self.assertEqual(len(authorizations), 1)
+
+    @requires_encryption
+    def test_per_host_limit_is_respected(self):
+        self.server.delay = 0.05
+        for i in range(12):
+            self.subscribe(f"ok/{i}")
+
+        result = self.fanout(max_workers=8, per_host_limit=3, batch_size=5).send(
+            PushSubscription.objects.all()
+        )
+
+        self.assertEqual(result["success"], 12)
+        self.assertLessEqual(self.server.max_in_flight, 3)
+
+    @mock.patch.object(PushFanout, "_deliver", lambda self, row: (row[0], SENT, None))
+    def test_pool_is_sized_to_the_audience(self):
+        self.subscribe("ok/1")
+        executor = "notifications.services.push_fanout.ThreadPoolExecutor"
+
+        with mock.patch(executor) as pool:
+            result = self.fanout().send(PushSubscription.objects.all())
+        pool.assert_not_called()
+        self.assertEqual(result["success"], 1)
+
+        self.subscribe("ok/2")
+        self.subscribe("ok/3")
+        with mock.patch(executor, wraps=ThreadPoolExecutor) as pool:
+            result = self.fanout(max_workers=32).send(PushSubscription.objects.all())
+        pool.assert_called_once_with(max_workers=3)
+        self.assertEqual(result["success"], 3)
+
+    def test_unreachable_endpoint_counts_as_failure(self):
+        subscription = PushSubscription.objects.create(
+            user=self.user,
+            endpoint="http://127.0.0.1:9/unreachable",
+            p256dh=self.p256dh,
+            auth=self.auth,
+        )
+
+        result = self.fanout(timeout=1).send(PushSubscription.objects.all())
+
+        self.assertEqual(result["failed"], 1)
+        self.assertTrue(result["errors"])
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.failure_count, 1)
+
+    @requires_encryption
+    def test_send_to_user_uses_active_subscriptions(self):
+        self.subscribe("ok/1")
+        self.subscribe("ok/2", is_active=False)
+
+        result = PushNotificationService.send_to_user(self.user, "Hi", "There")
+
+        self.assertEqual(result, {"success": 1, "failed": 0, "errors": []})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_send_to_user_without_subscriptions(self):
+        result = PushNotificationService.send_to_user(self.user, "Hi", "There")
+
+        self.assertEqual(result["success"], 0)
+        self.assertEqual(result["errors"], ["No active subscriptions found for user"])
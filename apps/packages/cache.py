@@ -1,19 +1,159 @@
 """
 Caching utilities for packages app
 Provides decorators and functions for caching API responses
+
+Cached data is grouped into namespaces (pricing, packages, experiences,
+search, seo). Every namespace has a generation counter in the cache that is
+embedded in its keys, so invalidating a namespace is a single counter bump:
+old entries are simply never read again and age out through their TTL.
+This works on any cache backend and never touches unrelated data (OTPs,
+rate-limit counters, other namespaces).
+
+Cached payloads are stored with an ETag and a Last-Modified time, so
+conditional requests (If-None-Match / If-Modified-Since) are answered with
+304 Not Modified straight from the cache entry, without serializing or
+even rendering the body.
+
+cache_response also protects expensive views from cache stampedes:
+- only one worker recomputes a key at a time (a single-flight lock in the
+  cache); concurrent requests are served the previous entry meanwhile, even
+  right after the namespace was invalidated
+- entries have a soft TTL and are kept for a while after it (stale while
+  revalidate)
+- entries may be refreshed a little before their soft TTL, with a
+  probability that grows with their age and with the time the view took to
+  compute them, so popular keys rarely expire for everyone at once
+
+Responses are also indexed by tag (package:<id>, city:<id>, media:<id>,
+experiences, ...). Serializers tag every object they render with
+tag_response(), and invalidate_tags() deletes exactly the entries that
+embed an object. On Redis a tag is a sorted set of cache keys scored by
+their expiry, so invalidation never scans the keyspace and expired keys
+are dropped whenever the tag is registered again (tags of every listing,
+such as "experiences", stay as small as the live entries).
+
+Models keep their tags current through packages.signals.
 """
 
 import hashlib
+import json
 import logging
+import math
+import random
+import time
+from contextvars import ContextVar
 from functools import wraps
-from typing import Callable, Optional
+from typing import Any, Callable, Iterable, NamedTuple, Optional, Set
 
 from django.conf import settings
 from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
 from django.http import HttpRequest
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from backend.metrics import CACHE_REQUESTS
 
 logger = logging.getLogger("packages.cache")
 
+# Single-flight recomputation lock, released as soon as the view returns
+RECOMPUTE_LOCK_TIMEOUT = 30  # seconds
+# Requests with nothing to serve wait this long for the worker holding the lock
+RECOMPUTE_WAIT = 2.0  # seconds
+RECOMPUTE_POLL_INTERVAL = 0.05  # seconds
+# Early refresh aggressiveness (0 disables early refresh)
+EARLY_REFRESH_BETA = 1.0
+# Tag sets outlive every entry they index (refreshed on each registration)
+TAG_INDEX_TIMEOUT = 24 * 60 * 60  # seconds
+
+# Tags collected while a cached view renders its response
+_response_tags: ContextVar[Optional[Set[str]]] = ContextVar(
+    "response_tags", default=None
+)
+
+CACHE_NAMESPACES = (
+    "pricing",
+    "packages",
+    "experiences",
+    "search",
+    "seo",
+    "cities",
+    "articles",
+)
+
+# Key prefixes used by cache_response / invalidation patterns -> namespace
+PREFIX_NAMESPACES = {
+    "package": "packages",
+    "packages": "packages",
+    "price_range": "pricing",
+    "price_calendar": "pricing",
+    "experience": "experiences",
+    "experiences": "experiences",
+    "search": "search",
+    "seo": "seo",
+    "city": "cities",
+    "cities": "cities",
+    "article": "articles",
+    "articles": "articles",
+}
+
+
+def _namespace_version_key(namespace: str) -> str:
+    return f"cache_ns:{namespace}"
+
+
+def _initial_generation() -> int:
+    # Random start, so a counter recreated after eviction or a flush never
+    # matches a generation that is still embedded in live keys
+    return random.getrandbits(48)
+
+
+def get_namespace_version(namespace: str) -> int:
+    """
+    Get the current generation of a cache namespace
+    """
+    key = _namespace_version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_generation(), None)
+        version = cache.get(key)
+    return version or 0
+
+
+def namespaced_key(namespace: str, key: str) -> str:
+    """
+    Embed the current namespace generation in a cache key
+
+    Example:
+        namespaced_key("search", "search:goa:all:10") -> "search:v123:search:goa:all:10"
+    """
+    return f"{namespace}:v{get_namespace_version(namespace)}:{key}"
+
+
+def bump_namespace(namespace: str) -> None:
+    """
+    Invalidate every entry of a cache namespace in O(1)
+    """
+    if namespace not in CACHE_NAMESPACES:
+        raise ValueError(f"Unknown cache namespace: {namespace}")
+
+    key = _namespace_version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter missing (evicted or never read); any new value invalidates
+        cache.add(key, _initial_generation(), None)
+    logger.info(f"Invalidated cache namespace: {namespace}")
+
+
+def namespace_for_prefix(prefix: str) -> Optional[str]:
+    """
+    Map a key prefix (or pattern such as "api:packages:*") to its namespace
+    """
+    parts = [part for part in prefix.split(":") if part and part != "api"]
+    if not parts:
+        return None
+    return PREFIX_NAMESPACES.get(parts[0].rstrip("*"))
+
 
 def get_cache_key(prefix: str, *args, **kwargs) -> str:
     """
@@ -33,20 +173,236 @@ def get_cache_key(prefix: str, *args, **kwargs) -> str:
     return key_string
 
 
+class CachedResponse(NamedTuple):
+    """Response data stored together with its validators"""
+
+    data: Any
+    etag: str
+    last_modified: int  # Unix timestamp (seconds)
+    fresh_until: float = 0.0  # soft expiry (Unix timestamp)
+    compute_time: float = 0.0  # seconds the view took to compute data
+
+    @classmethod
+    def build(
+        cls, data: Any, fresh_until: float = 0.0, compute_time: float = 0.0
+    ) -> "CachedResponse":
+        return cls(
+            data, compute_etag(data), int(time.time()), fresh_until, compute_time
+        )
+
+    def needs_refresh(self, beta: float = EARLY_REFRESH_BETA) -> bool:
+        """
+        True once the soft TTL has passed, or (probabilistic early refresh)
+        with a probability that rises as the soft TTL approaches. Slow views
+        start refreshing earlier.
+        """
+        now = time.time()
+        if now >= self.fresh_until:
+            return True
+        if beta <= 0 or not self.compute_time:
+            return False
+        # -log(u) for u in (0, 1] is exponentially distributed with mean 1
+        head_start = -self.compute_time * beta * math.log(1.0 - random.random())
+        return now + head_start >= self.fresh_until
+
+
+def compute_etag(data: Any) -> str:
+    """Weak ETag of response data (stable across renderers and key order)"""
+    body = json.dumps(
+        data, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":")
+    )
+    return f'W/"{hashlib.md5(body.encode()).hexdigest()}"'
+
+
+def is_not_modified(request: HttpRequest, etag: str, last_modified: int) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since for a GET or HEAD request.
+    If-None-Match takes precedence (RFC 9110 13.2.2); ETags are compared
+    weakly.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return False
+
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        opaque = etag.removeprefix("W/")
+        return any(
+            tag == "*" or tag.removeprefix("W/") == opaque
+            for tag in parse_etags(if_none_match)
+        )
+
+    if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE"))
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+def respond_from_cache(request: HttpRequest, entry: CachedResponse):
+    """
+    Response for a cached entry: 304 Not Modified when the client already
+    has it, the cached data otherwise. Both carry ETag and Last-Modified.
+    """
+    from rest_framework.response import Response
+
+    if is_not_modified(request, entry.etag, entry.last_modified):
+        response = Response(status=304)
+    else:
+        response = Response(entry.data)
+    return set_validators(response, entry)
+
+
+def set_validators(response, entry: CachedResponse):
+    response["ETag"] = entry.etag
+    response["Last-Modified"] = http_date(entry.last_modified)
+    return response
+
+
+def _tag_index_key(tag: str) -> str:
+    # Not "tag:": those keys held the unscored sets of earlier releases
+    return f"tag_index:{tag}"
+
+
+def _redis_connection():
+    """Raw Redis connection when the cache is django-redis, else None"""
+    if not hasattr(cache, "delete_pattern"):
+        return None
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def tag_response(*tags: str, **objects: Optional[int]) -> None:
+    """
+    Tag the response being cached (no-op outside cache_response)
+
+    Example:
+        tag_response("experiences", package=package.pk, media=package.featured_image_id)
+        # -> experiences, package:12, media:34 (None ids are skipped)
+    """
+    collected = _response_tags.get()
+    if collected is None:
+        return
+    collected.update(tags)
+    collected.update(f"{kind}:{pk}" for kind, pk in objects.items() if pk is not None)
+
+
+def register_tags(cache_key: str, tags: Iterable[str], timeout: float) -> None:
+    """
+    Index a cache key under each of its tags until it expires (timeout
+    seconds), dropping the expired keys of those tags
+    """
+    tags = set(tags)
+    if not tags:
+        return
+    now = time.time()
+    try:
+        redis = _redis_connection()
+        if redis is not None:
+            pipe = redis.pipeline(transaction=False)
+            for tag in tags:
+                index_key = cache.make_key(_tag_index_key(tag))
+                pipe.zremrangebyscore(index_key, "-inf", now)
+                pipe.zadd(index_key, {cache_key: now + timeout})
+                pipe.expire(index_key, TAG_INDEX_TIMEOUT)
+            pipe.execute()
+            return
+
+        # Other backends: the index is a plain cached dict of expiry times
+        # (not atomic, fine for local development and tests)
+        for tag in tags:
+            keys = cache.get(_tag_index_key(tag)) or {}
+            keys = {key: expiry for key, expiry in keys.items() if expiry > now}
+            keys[cache_key] = now + timeout
+            cache.set(_tag_index_key(tag), keys, TAG_INDEX_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Could not register cache tags for {cache_key}: {e}")
+
+
+def invalidate_tags(*tags: str) -> int:
+    """
+    Delete every cached response registered under any of the tags
+
+    Returns:
+        Number of cache keys deleted
+    """
+    keys = set()
+    try:
+        redis = _redis_connection()
+        if redis is not None:
+            # Read and drop each index atomically, so keys registered
+            # concurrently end up in a fresh index
+            pipe = redis.pipeline(transaction=True)
+            for tag in tags:
+                index_key = cache.make_key(_tag_index_key(tag))
+                pipe.zrangebyscore(index_key, time.time(), "+inf")
+                pipe.delete(index_key)
+            results = pipe.execute()
+            for members in results[::2]:
+                keys.update(member.decode() for member in members)
+        else:
+            now = time.time()
+            for tag in tags:
+                index = cache.get(_tag_index_key(tag)) or {}
+                keys.update(key for key, expiry in index.items() if expiry > now)
+                cache.delete(_tag_index_key(tag))
+
+        if keys:
+            cache.delete_many(list(keys))
+    except Exception as e:
+        logger.warning(f"Could not invalidate cache tags {tags}: {e}")
+        return 0
+
+    logger.info(f"Invalidated {len(keys)} cache keys tagged {', '.join(tags)}")
+    return len(keys)
+
+
+def record_lookup(key_prefix: str, result: str) -> None:
+    """Count a cache_response lookup (hit, stale or miss)"""
+    getattr(cache_stats, f"record_{result}")()
+    CACHE_REQUESTS.labels(key_prefix, result).inc()
+
+
+def _wait_for_entry(cache_key: str) -> Optional[CachedResponse]:
+    """Poll for an entry another worker is computing"""
+    deadline = time.monotonic() + RECOMPUTE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(RECOMPUTE_POLL_INTERVAL)
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return entry
+    return None
+
+
 def cache_response(
     timeout: Optional[int] = None,
     key_prefix: str = "api",
     vary_on_user: bool = False,
     vary_on_params: Optional[list] = None,
+    namespace: Optional[str] = None,
+    stale_timeout: Optional[int] = None,
+    beta: float = EARLY_REFRESH_BETA,
+    tags: Iterable[str] = (),
 ):
     """
     Decorator to cache API responses
 
+    Responses carry ETag and Last-Modified headers; conditional requests
+    that match the cached entry get 304 Not Modified.
+
+    Entries are fresh for timeout seconds. Once stale (or invalidated), one
+    request recomputes them while concurrent requests keep getting the
+    previous entry for up to stale_timeout more seconds.
+
     Args:
-        timeout: Cache timeout in seconds (None = use default)
+        timeout: Soft cache timeout in seconds (None = use default)
         key_prefix: Prefix for cache key
         vary_on_user: Include user ID in cache key
         vary_on_params: List of query params to include in cache key
+        namespace: Cache namespace (default: derived from key_prefix)
+        stale_timeout: How long stale entries may still be served while
+            being recomputed (None = same as timeout)
+        beta: Probabilistic early refresh factor (0 disables it)
+        tags: Tags of every response of this view, on top of those added
+            with tag_response() while rendering (e.g. "experiences" for a
+            listing that must go when experiences are added)
 
     Example:
         @cache_response(timeout=300, key_prefix="experiences", vary_on_params=["city"])
@@ -54,6 +410,9 @@ def cache_response(
             return super().list(request, *args, **kwargs)
     """
 
+    cache_namespace = namespace or namespace_for_prefix(key_prefix)
+    static_tags = tuple(tags)
+
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(self, request: HttpRequest, *args, **kwargs):
@@ -79,32 +438,83 @@ def cache_response(
             key_parts.extend(str(arg) for arg in args)
             key_parts.extend(f"{k}={v}" for k, v in kwargs.items())
 
-            cache_key = get_cache_key(*key_parts)
-
-            # Try to get from cache
-            cached_data = cache.get(cache_key)
-            if cached_data is not None:
-                logger.info(f"Cache hit: {cache_key}")
-                # Return cached data as Response
-                from rest_framework.response import Response
-
-                return Response(cached_data)
+            key = get_cache_key(*key_parts)
+            cache_key = namespaced_key(cache_namespace, key) if cache_namespace else key
+            # Last entry regardless of namespace generation, served while an
+            # invalidated key is being recomputed
+            stale_key = f"stale:{key}"
+            lock_key = f"lock:{cache_key}"
+
+            entry = cache.get(cache_key)
+            if entry is not None and not isinstance(entry, CachedResponse):
+                # Entry written before validators were stored
+                entry = CachedResponse.build(entry)
+            if entry is not None and not entry.needs_refresh(beta):
+                record_lookup(key_prefix, "hit")
+                logger.debug(f"Cache hit: {cache_key}")
+                return respond_from_cache(request, entry)
+
+            # Entries of an earlier namespace generation are stale however young
+            stale = entry is None or time.time() >= entry.fresh_until
+            if entry is None:
+                entry = cache.get(stale_key)
+            if not cache.add(lock_key, 1, RECOMPUTE_LOCK_TIMEOUT):
+                # Another worker is recomputing this key
+                if entry is None:
+                    entry = _wait_for_entry(cache_key)
+                    stale = False
+                if entry is not None:
+                    if stale:
+                        record_lookup(key_prefix, "stale")
+                    else:
+                        record_lookup(key_prefix, "hit")
+                    logger.debug(f"Cache hit during recompute: {cache_key}")
+                    return respond_from_cache(request, entry)
+                # Lock holder is slow or gone: compute without the lock
+                locked = False
+            else:
+                locked = True
+
+            record_lookup(key_prefix, "miss")
+            logger.debug(f"Cache miss: {cache_key}")
+            started = time.monotonic()
+            collected_tags = set(static_tags)
+            tags_token = _response_tags.set(collected_tags)
+            try:
+                response = func(self, request, *args, **kwargs)
 
-            # Call the function
-            logger.info(f"Cache miss: {cache_key}")
-            response = func(self, request, *args, **kwargs)
-
-            # Cache the response data if successful
-            if hasattr(response, "status_code") and 200 <= response.status_code < 300:
-                cache_timeout = timeout or getattr(settings, "CACHE_TTL", {}).get(
-                    key_prefix, 300
-                )
                 # Cache the data, not the Response object
-                if hasattr(response, "data"):
-                    cache.set(cache_key, response.data, cache_timeout)
-                    logger.info(
+                if (
+                    hasattr(response, "status_code")
+                    and 200 <= response.status_code < 300
+                    and hasattr(response, "data")
+                ):
+                    cache_timeout = timeout or getattr(settings, "CACHE_TTL", {}).get(
+                        key_prefix, 300
+                    )
+                    entry = CachedResponse.build(
+                        response.data,
+                        fresh_until=time.time() + cache_timeout,
+                        compute_time=time.monotonic() - started,
+                    )
+                    hard_timeout = cache_timeout + (
+                        cache_timeout if stale_timeout is None else stale_timeout
+                    )
+                    cache.set_many({cache_key: entry, stale_key: entry}, hard_timeout)
+                    # response.data is serialized, so collected_tags is complete.
+                    # The stale copy is not indexed: it is only served while
+                    # another worker recomputes the key
+                    register_tags(cache_key, collected_tags, hard_timeout)
+                    logger.debug(
                         f"Cached response data: {cache_key} (timeout={cache_timeout}s)"
                     )
+                    if is_not_modified(request, entry.etag, entry.last_modified):
+                        return respond_from_cache(request, entry)
+                    set_validators(response, entry)
+            finally:
+                _response_tags.reset(tags_token)
+                if locked:
+                    cache.delete(lock_key)
 
             return response
 
@@ -117,78 +527,66 @@ def invalidate_cache(pattern: str) -> int:
     """
     Invalidate cache keys matching a pattern
 
+    Patterns that belong to a cache namespace (e.g., "experiences:*") bump
+    that namespace's generation. Other patterns are deleted with
+    delete_pattern where the backend supports it (django-redis).
+
     Args:
         pattern: Pattern to match (e.g., "experiences:*")
 
     Returns:
-        Number of keys deleted
+        Number of keys deleted (namespace bumps report 0)
     """
     try:
+        namespace = namespace_for_prefix(pattern)
+        if namespace:
+            bump_namespace(namespace)
+            return 0
+
         # This works with django-redis backend
         if hasattr(cache, "delete_pattern"):
             deleted = cache.delete_pattern(pattern)
             logger.info(f"Invalidated {deleted} cache keys matching: {pattern}")
             return deleted
-        else:
-            # Fallback: clear entire cache
-            cache.clear()
-            logger.warning(
-                "Cache backend doesn't support patterns, cleared entire cache"
-            )
-            return 0
+
+        logger.warning(
+            f"Cache backend doesn't support patterns, nothing invalidated for: {pattern}"
+        )
+        return 0
     except Exception as e:
         logger.error(f"Error invalidating cache: {e}")
         return 0
 
 
-def invalidate_package_cache(package_slug: str) -> None:
+def invalidate_package_cache(package_id: int) -> int:
     """
-    Invalidate all cache entries related to a package
+    Invalidate the cached responses that embed a package
     """
-    patterns = [
-        f"package:*{package_slug}*",
-        "packages:*",
-        f"price_range:*{package_slug}*",
-        # Legacy prefixes kept for backward compatibility
-        f"api:package:*{package_slug}*",
-        "api:packages:*",
-        f"api:price_range:*{package_slug}*",
-    ]
+    return invalidate_tags(f"package:{package_id}")
 
-    for pattern in patterns:
-        invalidate_cache(pattern)
 
-
-def invalidate_experience_cache(experience_id: Optional[int] = None) -> None:
+def invalidate_experience_cache(experience_id: Optional[int] = None) -> int:
     """
-    Invalidate all cache entries related to experiences
+    Invalidate the cached responses that embed an experience (all
+    experience responses if no id is given)
     """
-    if experience_id:
-        patterns = [
-            f"experience:*{experience_id}*",
-            "experiences:*",
-            # Legacy prefixes
-            f"api:experience:*{experience_id}*",
-            "api:experiences:*",
-        ]
-    else:
-        patterns = [
-            "experiences:*",
-            "api:experiences:*",
-        ]
-
-    for pattern in patterns:
-        invalidate_cache(pattern)
+    if experience_id is None:
+        return invalidate_tags("experiences")
+    return invalidate_tags(f"experience:{experience_id}")
 
 
 class CacheStats:
     """
-    Track cache hit/miss statistics
+    Track cache hit/miss statistics (per process)
+
+    Stale responses (served while another worker recomputes the key) count
+    as served from cache in the hit rate.
     """
 
     def __init__(self):
         self.hits = 0
         self.misses = 0
+        self.stale = 0
 
     def record_hit(self):
         self.hits += 1
@@ -196,18 +594,25 @@ class CacheStats:
     def record_miss(self):
         self.misses += 1
 
+    def record_stale(self):
+        self.stale += 1
+
     def get_hit_rate(self) -> float:
-        total = self.hits + self.misses
+        total = self.hits + self.misses + self.stale
         if total == 0:
             return 0.0
-        return (self.hits / total) * 100
+        return ((self.hits + self.stale) / total) * 100
 
     def reset(self):
         self.hits = 0
         self.misses = 0
+        self.stale = 0
 
     def __str__(self):
-        return f"Cache Stats: {self.hits} hits, {self.misses} misses, {self.get_hit_rate():.1f}% hit rate"
+        return (
+            f"Cache Stats: {self.hits} hits, {self.stale} stale, "
+            f"{self.misses} misses, {self.get_hit_rate():.1f}% hit rate"
+        )
 
 
 # Global cache stats instance
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-16 20:02
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packages", "0013_hoteltier_curation_promise_hoteltier_featured_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="experience",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="package",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+    ]
@@ -1,8 +1,11 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 from cities.models import City
 
+from backend.model_tracking import FieldTrackerMixin
+
 
 class Experience(models.Model):
     DIFFICULTY_CHOICES = [
@@ -81,6 +84,9 @@ class Experience(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text search document, maintained by a database trigger (PostgreSQL)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         indexes = [
             models.Index(fields=["name", "base_price"]),  # Search + price filter
@@ -231,7 +237,10 @@ class TransportOption(models.Model):
         return self.base_price
 
 
-class Package(models.Model):
+class Package(FieldTrackerMixin, models.Model):
+    # Moving a package refreshes both city contexts (see cities.signals)
+    tracked_fields = ("city",)
+
     city = models.ForeignKey(
         City, related_name="packages", on_delete=models.CASCADE, db_index=True
     )
@@ -256,6 +265,9 @@ class Package(models.Model):
     is_active = models.BooleanField(default=True, db_index=True)  # Frequently filtered
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
+    # Full-text search document, maintained by a database trigger (PostgreSQL)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         indexes = [
             models.Index(fields=["city", "is_active"]),  # City packages filter
@@ -5,6 +5,7 @@ from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from .cache import tag_response
 from .models import Experience, HotelTier, Package, TransportOption
 
 
@@ -32,6 +33,15 @@ class ExperienceSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    def to_representation(self, instance):
+        tag_response(
+            "experiences",
+            experience=instance.pk,
+            city=instance.city_id,
+            media=instance.featured_image_id,
+        )
+        return super().to_representation(instance)
+
     @extend_schema_field(serializers.CharField(allow_null=True))
     def get_featured_image_url(self, obj) -> Optional[str]:
         if obj.featured_image and obj.featured_image.file:
@@ -134,6 +144,10 @@ class HotelTierSerializer(serializers.ModelSerializer):
             "uses_new_pricing",
         ]
 
+    def to_representation(self, instance):
+        tag_response(hotel_tier=instance.pk, media=instance.featured_image_id)
+        return super().to_representation(instance)
+
     def get_effective_price_per_night(self, obj):
         """Get the effective price, preferring new model over legacy"""
         return obj.get_effective_price_per_night()
@@ -185,6 +199,10 @@ class TransportOptionSerializer(serializers.ModelSerializer):
         model = TransportOption
         fields = ["id", "name", "description", "base_price"]
 
+    def to_representation(self, instance):
+        tag_response(transport_option=instance.pk)
+        return super().to_representation(instance)
+
 
 class PackageSerializer(serializers.ModelSerializer):
     experiences = ExperienceSerializer(many=True, read_only=True)
@@ -192,6 +210,14 @@ class PackageSerializer(serializers.ModelSerializer):
     transport_options = TransportOptionSerializer(many=True, read_only=True)
     city_name = serializers.CharField(source="city.name", read_only=True)
     featured_image_url = serializers.SerializerMethodField()
+    # Materialized "from ₹X" price (PackagePriceRange); null until computed
+    price_from = serializers.DecimalField(
+        source="price_range.min_price",
+        max_digits=12,
+        decimal_places=2,
+        read_only=True,
+        allow_null=True,
+    )
 
     class Meta:
         model = Package
@@ -205,10 +231,19 @@ class PackageSerializer(serializers.ModelSerializer):
             "experiences",
             "hotel_tiers",
             "transport_options",
+            "price_from",
             "is_active",
             "created_at",
         ]
 
+    def to_representation(self, instance):
+        tag_response(
+            package=instance.pk,
+            city=instance.city_id,
+            media=instance.featured_image_id,
+        )
+        return super().to_representation(instance)
+
     @extend_schema_field(serializers.CharField(allow_null=True))
     def get_featured_image_url(self, obj) -> Optional[str]:
         if obj.featured_image and obj.featured_image.file:
@@ -0,0 +1,76 @@
+"""
+Signal handlers that evict the cached catalog responses (see packages.cache).
+
+Serializers tag every response with the objects it embeds, so a change
+only deletes the responses tagged with the changed object. New objects are
+not embedded anywhere yet: they evict the listings instead ("packages" and
+"experiences" tags). Component membership changes evict the responses of
+the package and, for reverse changes, of the component.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import (
+    invalidate_experience_cache,
+    invalidate_package_cache,
+    invalidate_tags,
+)
+from .models import Experience, HotelTier, Package, TransportOption
+
+
+@receiver(post_save, sender=Package)
+@receiver(post_delete, sender=Package)
+def invalidate_package_responses(sender, instance, created=False, **kwargs):
+    if created:
+        invalidate_tags("packages")
+    else:
+        invalidate_package_cache(instance.pk)
+
+
+@receiver(post_save, sender=Experience)
+@receiver(post_delete, sender=Experience)
+def invalidate_experience_responses(sender, instance, created=False, **kwargs):
+    invalidate_experience_cache(None if created else instance.pk)
+
+
+@receiver(post_save, sender=HotelTier)
+@receiver(post_delete, sender=HotelTier)
+def invalidate_hotel_tier_responses(sender, instance, **kwargs):
+    invalidate_tags(f"hotel_tier:{instance.pk}")
+
+
+@receiver(post_save, sender=TransportOption)
+@receiver(post_delete, sender=TransportOption)
+def invalidate_transport_option_responses(sender, instance, **kwargs):
+    invalidate_tags(f"transport_option:{instance.pk}")
+
+
+COMPONENT_TAGS = {
+    Package.experiences.through: "experience",
+    Package.hotel_tiers.through: "hotel_tier",
+    Package.transport_options.through: "transport_option",
+}
+
+
+@receiver(m2m_changed, sender=Package.experiences.through)
+@receiver(m2m_changed, sender=Package.hotel_tiers.through)
+@receiver(m2m_changed, sender=Package.transport_options.through)
+def invalidate_package_responses_on_components_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    Forward changes touch one package. Reverse changes (e.g.
+    experience.package_set.add(...)) touch the packages in pk_set and the
+    packages that embedded the component (a reverse clear() reports none).
+    """
+    if not action.startswith("post_"):
+        return
+
+    if not reverse:
+        invalidate_package_cache(instance.pk)
+        return
+    invalidate_tags(
+        f"{COMPONENT_TAGS[sender]}:{instance.pk}",
+        *(f"package:{package_id}" for package_id in pk_set or ()),
+    )
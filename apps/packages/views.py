@@ -12,6 +12,7 @@ from drf_spectacular.utils import (
     extend_schema,
     inline_serializer,
 )
+from pricing_engine.services.pricing_plan import get_pricing_plan
 from pricing_engine.services.pricing_service import PricingService
 from rest_framework import serializers, status, viewsets
 from rest_framework.decorators import action
@@ -21,6 +22,8 @@ from rest_framework.permissions import (
 )
 from rest_framework.response import Response
 
+from backend.query_budget import query_budget
+
 from .cache import cache_response
 from .logging import AuditLogger, get_client_ip
 from .models import Experience, HotelTier, Package, TransportOption
@@ -34,20 +37,199 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
+def _as_int(value):
+    """Coerce a request ID to int for plan lookups (None if not numeric)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _price_payload(breakdown, experiences, hotel_tier, transport_option):
+    """Build the calculate_price response body for one priced selection"""
+    return {
+        "total_price": str(breakdown["final_total"]),
+        "currency": "INR",
+        "breakdown": {
+            "experiences": [
+                {
+                    "id": exp.id,
+                    "name": exp.name,
+                    "price": str(exp.base_price),
+                }
+                for exp in experiences
+            ],
+            "hotel_tier": {
+                "id": hotel_tier.id,
+                "name": hotel_tier.name,
+                "price_multiplier": str(hotel_tier.price_multiplier),
+                # PHASE 2: Add new pricing fields
+                "base_price_per_night": (
+                    str(hotel_tier.base_price_per_night)
+                    if hotel_tier.base_price_per_night
+                    else None
+                ),
+            },
+            "transport": (
+                {
+                    "id": transport_option.id,
+                    "name": transport_option.name,
+                    "price": str(transport_option.base_price),
+                }
+                if transport_option
+                else None
+            ),
+            "base_experience_total": str(breakdown["base_experience_total"]),
+            "transport_cost": str(breakdown["transport_cost"]),
+            "hotel_multiplier": str(breakdown["hotel_multiplier"]),
+            # NEW: Detailed pricing breakdown including taxes
+            "subtotal_before_hotel": str(breakdown["subtotal_before_hotel"]),
+            "subtotal_after_hotel": str(breakdown["subtotal_after_hotel"]),
+            # PHASE 2: Hotel cost breakdown
+            "hotel_cost": (
+                str(breakdown["hotel_cost"]) if breakdown.get("hotel_cost") else None
+            ),
+            "hotel_cost_per_night": (
+                str(breakdown["hotel_cost_per_night"])
+                if breakdown.get("hotel_cost_per_night")
+                else None
+            ),
+            "hotel_num_nights": breakdown.get("hotel_num_nights", 1),
+            "hotel_num_rooms": breakdown.get("hotel_num_rooms", 1),
+            "uses_new_hotel_pricing": breakdown.get("uses_new_hotel_pricing", False),
+            # PHASE 2: Traveler count
+            "num_travelers": breakdown.get("num_travelers", 1),
+            "base_experience_per_person": str(
+                breakdown.get("base_experience_per_person", "0.00")
+            ),
+            "per_person_price": str(breakdown.get("per_person_price", "0.00")),
+            "total_amount": str(
+                breakdown.get("total_amount", breakdown["final_total"])
+            ),
+            # PHASE 3: Age-based pricing
+            "chargeable_travelers": breakdown.get(
+                "chargeable_travelers", breakdown.get("num_travelers", 1)
+            ),
+            "chargeable_age_threshold": breakdown.get(
+                "chargeable_age_threshold",
+                PricingService.get_chargeable_age_threshold(),
+            ),
+            # End PHASE 2
+            "applied_rules": breakdown["applied_rules"],
+            "total_markup": str(breakdown["total_markup"]),
+            "total_discount": str(breakdown["total_discount"]),
+        },
+        "pricing_note": "Price includes all applicable taxes and charges. No hidden fees.",
+    }
+
+
+def _parse_price_selection(item):
+    """
+    Validate one calculate_prices selection.
+    Applies the same input rules as calculate_price.
+
+    Returns:
+        tuple: (combination dict for get_price_breakdowns_bulk, None)
+        or (None, error message)
+    """
+    from datetime import datetime
+
+    if not isinstance(item, dict):
+        return None, "Each selection must be an object"
+
+    experience_ids = item.get("experience_ids", [])
+    if not isinstance(experience_ids, list):
+        return None, "experience_ids must be a list"
+    if len(experience_ids) < 1:
+        return None, "Please select at least 1 experience"
+    if len(experience_ids) > 10:
+        return None, "Maximum 10 experiences can be selected"
+    try:
+        experience_ids = [int(id) for id in experience_ids]
+    except (ValueError, TypeError):
+        return None, "All experience IDs must be valid integers"
+    if len(experience_ids) != len(set(experience_ids)):
+        return None, "Duplicate experience IDs are not allowed"
+
+    hotel_tier_id = item.get("hotel_tier_id")
+    if hotel_tier_id is None:
+        return None, "hotel_tier_id is required"
+    hotel_tier_id = _as_int(hotel_tier_id)
+    if hotel_tier_id is None:
+        return None, "hotel_tier_id must be a valid integer"
+
+    transport_option_id = item.get("transport_option_id")
+    if transport_option_id is not None:
+        transport_option_id = _as_int(transport_option_id)
+        if transport_option_id is None:
+            return None, "transport_option_id must be a valid integer"
+
+    start_date = None
+    end_date = None
+    if item.get("start_date") and item.get("end_date"):
+        try:
+            start_date = datetime.strptime(item["start_date"], "%Y-%m-%d").date()
+            end_date = datetime.strptime(item["end_date"], "%Y-%m-%d").date()
+        except (ValueError, TypeError):
+            return None, "Invalid date format. Use YYYY-MM-DD"
+        if end_date <= start_date:
+            return None, "End date must be after start date"
+
+    num_rooms = _as_int(item.get("num_rooms", 1))
+    if num_rooms is None or num_rooms < 1:
+        return None, "num_rooms must be a positive integer"
+    num_travelers = _as_int(item.get("num_travelers", 1))
+    if num_travelers is None or num_travelers < 1:
+        return None, "num_travelers must be a positive integer"
+
+    # Age-based pricing reads each traveler's age
+    travelers = item.get("travelers")
+    if travelers is not None:
+        if not isinstance(travelers, list):
+            return None, "travelers must be a list"
+        parsed_travelers = []
+        for traveler in travelers:
+            if not isinstance(traveler, dict):
+                return None, "Each traveler must be an object"
+            age = _as_int(traveler.get("age"))
+            if age is None or age < 0:
+                return None, "Each traveler must have a non-negative integer age"
+            parsed_travelers.append({**traveler, "age": age})
+        travelers = parsed_travelers
+
+    return {
+        "experience_ids": experience_ids,
+        "hotel_tier_id": hotel_tier_id,
+        "transport_option_id": transport_option_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "num_rooms": num_rooms,
+        "num_travelers": num_travelers,
+        "travelers": travelers,
+    }, None
+
+
 @extend_schema(tags=["Packages"])
 class PackageViewSet(viewsets.ModelViewSet):
     serializer_class = PackageSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = "slug"
 
+    # Pricing actions read components from the compiled pricing plan,
+    # so they skip the component prefetches
+    pricing_actions = ("calculate_price", "calculate_prices", "price_calendar")
+
     def get_queryset(self):
         # Optimized queryset with select_related and prefetch_related
-        queryset = (
-            Package.objects.select_related("city")
-            .prefetch_related("experiences", "hotel_tiers", "transport_options")
-            .filter(is_active=True)
-            .order_by("-created_at")
-        )
+        queryset = Package.objects.select_related("city", "price_range")
+        if self.action not in self.pricing_actions:
+            queryset = queryset.select_related("featured_image").prefetch_related(
+                "experiences__city",
+                "experiences__featured_image",
+                "hotel_tiers__featured_image",
+                "transport_options",
+            )
+        queryset = queryset.filter(is_active=True).order_by("-created_at")
 
         # Filter by city if provided
         city_id = self.request.query_params.get("city", None)
@@ -105,8 +287,12 @@ class PackageViewSet(viewsets.ModelViewSet):
     )
     @method_decorator(ratelimit(key="ip", rate="100/m", method="GET", block=True))
     @cache_response(
-        timeout=300, key_prefix="packages", vary_on_params=["city", "search", "page"]
+        timeout=300,
+        key_prefix="packages",
+        vary_on_params=["city", "search", "page"],
+        tags=["packages"],
     )
+    @query_budget(7)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -138,6 +324,7 @@ class PackageViewSet(viewsets.ModelViewSet):
         },
     )
     @cache_response(timeout=600, key_prefix="package")
+    @query_budget(6)
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -621,19 +808,26 @@ class PackageViewSet(viewsets.ModelViewSet):
                     {"error": "hotel_tier_id is required"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            # Get components
-            experiences = Experience.objects.filter(
-                id__in=experience_ids, is_active=True
-            )
-            hotel_tier = get_object_or_404(HotelTier, id=hotel_tier_id)
+            # Get components from the compiled pricing plan (no SQL when warm).
+            # IDs outside the package fall back to the database so the
+            # validation errors below stay the same.
+            plan = get_pricing_plan(package)
+            experiences = plan.get_experiences(experience_ids)
+            if experiences is None:
+                experiences = Experience.objects.filter(
+                    id__in=experience_ids, is_active=True
+                )
+            hotel_tier = plan.hotel_tiers.get(
+                _as_int(hotel_tier_id)
+            ) or get_object_or_404(HotelTier, id=hotel_tier_id)
 
             # Transport is optional - will be selected on review page
             if transport_option_id is None:
                 transport_option = None
             else:
-                transport_option = get_object_or_404(
-                    TransportOption, id=transport_option_id
-                )
+                transport_option = plan.transport_options.get(
+                    _as_int(transport_option_id)
+                ) or get_object_or_404(TransportOption, id=transport_option_id)
 
             # Validation 6: Validate all experiences found and active
             if len(experiences) != len(experience_ids):
@@ -643,9 +837,7 @@ class PackageViewSet(viewsets.ModelViewSet):
                 )
 
             # Validation 7: Validate experiences belong to this package
-            package_experience_ids = set(
-                package.experiences.values_list("id", flat=True)
-            )
+            package_experience_ids = set(plan.experiences)
             for exp_id in experience_ids:
                 if exp_id not in package_experience_ids:
                     return Response(
@@ -709,90 +901,7 @@ class PackageViewSet(viewsets.ModelViewSet):
             )
 
             return Response(
-                {
-                    "total_price": str(total_price),
-                    "currency": "INR",
-                    "breakdown": {
-                        "experiences": [
-                            {
-                                "id": exp.id,
-                                "name": exp.name,
-                                "price": str(exp.base_price),
-                            }
-                            for exp in experiences
-                        ],
-                        "hotel_tier": {
-                            "id": hotel_tier.id,
-                            "name": hotel_tier.name,
-                            "price_multiplier": str(hotel_tier.price_multiplier),
-                            # PHASE 2: Add new pricing fields
-                            "base_price_per_night": (
-                                str(hotel_tier.base_price_per_night)
-                                if hotel_tier.base_price_per_night
-                                else None
-                            ),
-                        },
-                        "transport": (
-                            {
-                                "id": transport_option.id,
-                                "name": transport_option.name,
-                                "price": str(transport_option.base_price),
-                            }
-                            if transport_option
-                            else None
-                        ),
-                        "base_experience_total": str(
-                            breakdown["base_experience_total"]
-                        ),
-                        "transport_cost": str(breakdown["transport_cost"]),
-                        "hotel_multiplier": str(breakdown["hotel_multiplier"]),
-                        # NEW: Detailed pricing breakdown including taxes
-                        "subtotal_before_hotel": str(
-                            breakdown["subtotal_before_hotel"]
-                        ),
-                        "subtotal_after_hotel": str(breakdown["subtotal_after_hotel"]),
-                        # PHASE 2: Hotel cost breakdown
-                        "hotel_cost": (
-                            str(breakdown["hotel_cost"])
-                            if breakdown.get("hotel_cost")
-                            else None
-                        ),
-                        "hotel_cost_per_night": (
-                            str(breakdown["hotel_cost_per_night"])
-                            if breakdown.get("hotel_cost_per_night")
-                            else None
-                        ),
-                        "hotel_num_nights": breakdown.get("hotel_num_nights", 1),
-                        "hotel_num_rooms": breakdown.get("hotel_num_rooms", 1),
-                        "uses_new_hotel_pricing": breakdown.get(
-                            "uses_new_hotel_pricing", False
-                        ),
-                        # PHASE 2: Traveler count
-                        "num_travelers": breakdown.get("num_travelers", 1),
-                        "base_experience_per_person": str(
-                            breakdown.get("base_experience_per_person", "0.00")
-                        ),
-                        "per_person_price": str(
-                            breakdown.get("per_person_price", "0.00")
-                        ),
-                        "total_amount": str(
-                            breakdown.get("total_amount", breakdown["final_total"])
-                        ),
-                        # PHASE 3: Age-based pricing
-                        "chargeable_travelers": breakdown.get(
-                            "chargeable_travelers", breakdown.get("num_travelers", 1)
-                        ),
-                        "chargeable_age_threshold": breakdown.get(
-                            "chargeable_age_threshold",
-                            PricingService.get_chargeable_age_threshold(),
-                        ),
-                        # End PHASE 2
-                        "applied_rules": breakdown["applied_rules"],
-                        "total_markup": str(breakdown["total_markup"]),
-                        "total_discount": str(breakdown["total_discount"]),
-                    },
-                    "pricing_note": "Price includes all applicable taxes and charges. No hidden fees.",
-                }
+                _price_payload(breakdown, experiences, hotel_tier, transport_option)
             )
         except Exception as e:
             # Audit log failed price calculation
@@ -808,6 +917,368 @@ class PackageViewSet(viewsets.ModelViewSet):
             logger.error(f"Price calculation error: {str(e)}")
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    MAX_PRICE_SELECTIONS = 50
+
+    @extend_schema(
+        operation_id="calculate_package_prices",
+        summary="Calculate prices for many selections",
+        description="Price up to 50 component selections of one package in a single request (e.g. a hotel tier x transport x date comparison grid). Each selection accepts the same fields as calculate_price and each result has the same shape as a calculate_price response, or an error for that selection. Rate limited to 10 requests per minute per IP.",
+        parameters=[
+            OpenApiParameter(
+                name="slug",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.PATH,
+                description="Package slug identifier",
+            ),
+        ],
+        request=inline_serializer(
+            name="BatchPriceCalculationRequest",
+            fields={
+                "selections": serializers.ListField(
+                    child=serializers.DictField(),
+                    help_text="List of calculate_price request bodies (max 50)",
+                ),
+            },
+        ),
+        responses={
+            200: inline_serializer(
+                name="BatchPriceCalculationResponse",
+                fields={
+                    "currency": serializers.CharField(),
+                    "results": serializers.ListField(
+                        child=serializers.DictField(),
+                        help_text="One calculate_price response or {'error': ...} per selection, in request order",
+                    ),
+                },
+            ),
+            400: inline_serializer(
+                name="BatchPriceCalculationError",
+                fields={
+                    "error": serializers.CharField(),
+                },
+            ),
+        },
+        examples=[
+            OpenApiExample(
+                "Compare two hotel tiers",
+                value={
+                    "selections": [
+                        {"experience_ids": [1, 3], "hotel_tier_id": 1},
+                        {"experience_ids": [1, 3], "hotel_tier_id": 2},
+                    ]
+                },
+                request_only=True,
+            ),
+        ],
+    )
+    @method_decorator(ratelimit(key="ip", rate="10/m", method="POST", block=True))
+    @action(detail=True, methods=["post"], permission_classes=[AllowAny])
+    def calculate_prices(self, request, slug=None):
+        """
+        Price many component selections of one package in one request.
+        Components and rules are resolved once for the whole batch, so the
+        query count stays constant regardless of the number of selections.
+        """
+        package = self.get_object()
+        selections = request.data.get("selections")
+        ip_address = get_client_ip(request)
+        user_id = request.user.id if request.user.is_authenticated else None
+
+        if not isinstance(selections, list) or not selections:
+            error = "selections must be a non-empty list"
+        elif len(selections) > self.MAX_PRICE_SELECTIONS:
+            error = f"Maximum {self.MAX_PRICE_SELECTIONS} selections per request"
+        else:
+            error = None
+        if error:
+            AuditLogger.log_validation_failure(
+                endpoint="calculate_prices",
+                error_type="invalid_selections",
+                error_message=error,
+                user_id=user_id,
+                ip_address=ip_address,
+            )
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [None] * len(selections)
+        combinations = []
+        positions = []
+        for index, item in enumerate(selections):
+            combination, error = _parse_price_selection(item)
+            if error:
+                results[index] = {"error": error}
+            else:
+                combinations.append(combination)
+                positions.append(index)
+
+        try:
+            priced = PricingService.get_price_breakdowns_bulk(package, combinations)
+        except Exception as e:
+            # Price the selections one by one so an unexpected failure only
+            # affects the selection that caused it
+            logger.error(f"Batch price calculation error: {str(e)}")
+            priced = []
+            for combination in combinations:
+                try:
+                    priced.extend(
+                        PricingService.get_price_breakdowns_bulk(package, [combination])
+                    )
+                except Exception as e:
+                    priced.append({"error": str(e)})
+
+        for index, result in zip(positions, priced):
+            if "error" in result:
+                results[index] = {"error": result["error"]}
+            else:
+                results[index] = _price_payload(
+                    result["breakdown"],
+                    result["experiences"],
+                    result["hotel_tier"],
+                    result["transport_option"],
+                )
+
+        # One audit entry per selection, as calculate_price logs
+        for item, result in zip(selections, results):
+            experience_ids = (
+                item.get("experience_ids") if isinstance(item, dict) else None
+            )
+            AuditLogger.log_price_calculation(
+                user_id=user_id,
+                package_slug=package.slug,
+                experience_count=(
+                    len(experience_ids) if isinstance(experience_ids, list) else 0
+                ),
+                total_price=float(result.get("total_price", 0)),
+                ip_address=ip_address,
+                success="error" not in result,
+                error=result.get("error"),
+            )
+
+        priced_count = sum(1 for result in results if "error" not in result)
+        logger.info(
+            f"Batch price calculated for user {user_id or 'anonymous'}: "
+            f"package={package.slug}, selections={len(selections)}, priced={priced_count}"
+        )
+
+        return Response({"currency": "INR", "results": results})
+
+    PRICE_CALENDAR_MIN_DAYS = 30
+    PRICE_CALENDAR_MAX_DAYS = 90
+
+    @extend_schema(
+        operation_id="package_price_calendar",
+        summary="Price calendar for a selection",
+        description="Total price of one component selection for every start date in a 30-90 day window, plus the cheapest start date. Cached per package and selection; cache entries are invalidated when components or pricing rules change. Rate limited to 30 requests per minute per IP.",
+        parameters=[
+            OpenApiParameter(
+                name="slug",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.PATH,
+                description="Package slug identifier",
+            ),
+            OpenApiParameter(
+                name="experience_ids",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Comma-separated experience IDs (1-10)",
+                required=True,
+            ),
+            OpenApiParameter(
+                name="hotel_tier_id",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Selected hotel tier ID",
+                required=True,
+            ),
+            OpenApiParameter(
+                name="transport_option_id",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Selected transport option ID",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="nights",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Trip length in nights (1-30)",
+                required=True,
+            ),
+            OpenApiParameter(
+                name="start_date",
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description="First start date (YYYY-MM-DD, default: today)",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="days",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Number of start dates (30-90, default: 30)",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="num_rooms",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Number of rooms (default: 1)",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="num_travelers",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Number of travelers (default: 1)",
+                required=False,
+            ),
+        ],
+        responses={
+            200: inline_serializer(
+                name="PriceCalendarResponse",
+                fields={
+                    "currency": serializers.CharField(),
+                    "nights": serializers.IntegerField(),
+                    "days": serializers.ListField(
+                        child=inline_serializer(
+                            name="PriceCalendarDay",
+                            fields={
+                                "start_date": serializers.DateField(),
+                                "end_date": serializers.DateField(),
+                                "total_price": serializers.CharField(),
+                            },
+                        )
+                    ),
+                    "cheapest": inline_serializer(
+                        name="PriceCalendarCheapestDay",
+                        fields={
+                            "start_date": serializers.DateField(),
+                            "end_date": serializers.DateField(),
+                            "total_price": serializers.CharField(),
+                        },
+                    ),
+                },
+            ),
+            400: inline_serializer(
+                name="PriceCalendarError",
+                fields={
+                    "error": serializers.CharField(),
+                },
+            ),
+        },
+    )
+    @method_decorator(ratelimit(key="ip", rate="30/m", method="GET", block=True))
+    @action(detail=True, methods=["get"], permission_classes=[AllowAny])
+    def price_calendar(self, request, slug=None):
+        """
+        Total price of one selection for every start date in a window.
+        The stay is slid one day at a time, so a 90-day calendar costs about
+        as much as a single quote.
+        """
+        from datetime import datetime
+
+        from django.utils import timezone
+
+        package = self.get_object()
+        params = request.query_params
+
+        def bad_request(message):
+            return Response({"error": message}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            experience_ids = [
+                int(value)
+                for value in params.get("experience_ids", "").split(",")
+                if value.strip()
+            ]
+        except ValueError:
+            return bad_request("All experience IDs must be valid integers")
+        if len(experience_ids) < 1:
+            return bad_request("Please select at least 1 experience")
+        if len(experience_ids) > 10:
+            return bad_request("Maximum 10 experiences can be selected")
+        if len(experience_ids) != len(set(experience_ids)):
+            return bad_request("Duplicate experience IDs are not allowed")
+
+        hotel_tier_id = _as_int(params.get("hotel_tier_id"))
+        if hotel_tier_id is None:
+            return bad_request("hotel_tier_id is required")
+        transport_option_id = params.get("transport_option_id")
+        if transport_option_id is not None:
+            transport_option_id = _as_int(transport_option_id)
+            if transport_option_id is None:
+                return bad_request("transport_option_id must be a valid integer")
+
+        nights = _as_int(params.get("nights"))
+        if nights is None or not 1 <= nights <= 30:
+            return bad_request("nights must be an integer between 1 and 30")
+        days = _as_int(params.get("days", self.PRICE_CALENDAR_MIN_DAYS))
+        if (
+            days is None
+            or not self.PRICE_CALENDAR_MIN_DAYS <= days <= self.PRICE_CALENDAR_MAX_DAYS
+        ):
+            return bad_request(
+                f"days must be an integer between {self.PRICE_CALENDAR_MIN_DAYS} "
+                f"and {self.PRICE_CALENDAR_MAX_DAYS}"
+            )
+        num_rooms = _as_int(params.get("num_rooms", 1))
+        num_travelers = _as_int(params.get("num_travelers", 1))
+        if not num_rooms or num_rooms < 1 or not num_travelers or num_travelers < 1:
+            return bad_request("num_rooms and num_travelers must be positive integers")
+
+        start_date_str = params.get("start_date")
+        if start_date_str:
+            try:
+                first_start = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+            except ValueError:
+                return bad_request("Invalid date format. Use YYYY-MM-DD")
+        else:
+            first_start = timezone.localdate()
+
+        # Components come from the compiled pricing plan (no SQL when warm)
+        plan = get_pricing_plan(package)
+        experiences = plan.get_experiences(experience_ids)
+        if experiences is None:
+            return bad_request(
+                "One or more experiences not found, inactive or not part of this package"
+            )
+        hotel_tier = plan.hotel_tiers.get(hotel_tier_id) or get_object_or_404(
+            HotelTier, id=hotel_tier_id
+        )
+        transport_option = None
+        if transport_option_id is not None:
+            transport_option = plan.transport_options.get(
+                transport_option_id
+            ) or get_object_or_404(TransportOption, id=transport_option_id)
+
+        calendar = PricingService.get_price_calendar(
+            package,
+            experiences,
+            hotel_tier,
+            transport_option,
+            first_start,
+            days,
+            nights,
+            num_rooms=num_rooms,
+            num_travelers=num_travelers,
+        )
+
+        def serialize_day(day):
+            return {
+                "start_date": day["start_date"].isoformat(),
+                "end_date": day["end_date"].isoformat(),
+                "total_price": str(day["total_price"]),
+            }
+
+        return Response(
+            {
+                "currency": "INR",
+                "nights": nights,
+                "days": [serialize_day(day) for day in calendar["days"]],
+                "cheapest": serialize_day(calendar["cheapest"]),
+            }
+        )
+
 
 class ExperienceViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ExperienceSerializer
@@ -944,6 +1415,7 @@ class ExperienceViewSet(viewsets.ReadOnlyModelViewSet):
             "page",
         ],
     )
+    @query_budget(2)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -960,6 +1432,7 @@ class ExperienceViewSet(viewsets.ReadOnlyModelViewSet):
             ),
         },
     )
+    @cache_response(timeout=300, key_prefix="experience")
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -8,16 +8,11 @@ import logging
 from math import ceil
 
 from drf_spectacular.utils import extend_schema
-from pricing_engine.services.vehicle_optimization import (
-    VehicleOptimizationEngine,
-    VehicleType,
-)
+from pricing_engine.services.vehicle_suggestions import suggest_vehicles
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import TransportOption
-
 logger = logging.getLogger(__name__)
 
 
@@ -143,37 +138,17 @@ class VehicleSuggestionsView(APIView):
             )
 
         try:
-            # Get active vehicle types from database
-            transport_options = TransportOption.objects.filter(is_active=True)
+            # Memoized per fleet version and passenger count
+            solutions = suggest_vehicles(
+                passenger_count, num_days, max_solutions=max_solutions
+            )
 
-            if not transport_options.exists():
+            if not solutions:
                 return Response(
                     {"error": "No active vehicle types available"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Convert to VehicleType objects
-            vehicle_types = [
-                VehicleType(
-                    id=t.id,
-                    name=t.name,
-                    passenger_capacity=t.passenger_capacity,
-                    luggage_capacity=t.luggage_capacity,
-                    base_price_per_day=t.get_effective_price_per_day(),
-                    is_active=t.is_active,
-                )
-                for t in transport_options
-            ]
-
-            # Run optimization
-            engine = VehicleOptimizationEngine(
-                vehicle_types=vehicle_types,
-                passenger_count=passenger_count,
-                num_days=num_days,
-            )
-
-            solutions = engine.optimize(max_solutions=max_solutions)
-
             # Convert to response format
             response_data = {
                 "passenger_count": passenger_count,
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Payment
+from .models import Payment, WebhookEvent
+from .services.webhook_service import WebhookService
 
 
 @admin.register(Payment)
@@ -42,3 +43,37 @@ class PaymentAdmin(admin.ModelAdmin):
             .get_queryset(request)
             .select_related("booking__user", "booking__package__city")
         )
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = [
+        "event_id",
+        "event_type",
+        "status",
+        "attempts",
+        "received_at",
+        "processed_at",
+    ]
+    list_filter = ["status", "event_type", "received_at"]
+    search_fields = ["event_id"]
+    readonly_fields = [
+        "event_id",
+        "event_type",
+        "payload",
+        "status",
+        "attempts",
+        "last_error",
+        "received_at",
+        "last_attempt_at",
+        "processed_at",
+    ]
+    actions = ["retry_events"]
+
+    @admin.action(description="Retry selected failed events")
+    def retry_events(self, request, queryset):
+        event_pks = list(queryset.filter(status="FAILED").values_list("pk", flat=True))
+        WebhookEvent.objects.filter(pk__in=event_pks).update(status="PENDING")
+        for event_pk in event_pks:
+            WebhookService.enqueue(event_pk)
+        self.message_user(request, f"{len(event_pks)} events queued for retry")
@@ -2,8 +2,12 @@ from django.db import models
 
 from bookings.models import Booking
 
+from backend.model_tracking import FieldTrackerMixin
+
+
+class Payment(FieldTrackerMixin, models.Model):
+    tracked_fields = ("status",)
 
-class Payment(models.Model):
     booking = models.OneToOneField(
         Booking, on_delete=models.CASCADE, related_name="payment", db_index=True
     )
@@ -37,3 +41,41 @@ class Payment(models.Model):
 
     def __str__(self):
         return self.razorpay_order_id
+
+
+class WebhookEvent(models.Model):
+    """
+    Inbox of verified Razorpay webhook deliveries.
+    The webhook view only records the event; payments.tasks processes it.
+    """
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("PROCESSED", "Processed"),
+        ("IGNORED", "Ignored"),
+        ("FAILED", "Failed"),
+    ]
+
+    # X-Razorpay-Event-Id (identical across redeliveries of the same event)
+    event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=100, db_index=True)
+    payload = models.JSONField()
+
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="PENDING", db_index=True
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+
+    received_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "received_at"]),  # Pending sweep
+        ]
+        ordering = ["-received_at"]
+
+    def __str__(self):
+        return f"{self.event_type} ({self.event_id})"
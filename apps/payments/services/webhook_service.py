@@ -0,0 +1,257 @@
+"""
+Razorpay webhook inbox
+
+The webhook view verifies the signature, stores the event (a single INSERT,
+unique on the Razorpay event id) and acknowledges immediately. Events are
+applied by the payments.process_webhook_event task: the event row and the
+Payment it touches are locked with select_for_update, so redeliveries,
+replays and concurrent captures for the same order are applied once.
+
+Events that cannot be applied (validation failures, impossible booking
+transitions) are marked FAILED; anything else is raised so the task can
+retry with backoff.
+"""
+
+import hashlib
+import logging
+import time
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from bookings.services.booking_service import BookingService
+
+from backend.metrics import WEBHOOK_EVENTS, WEBHOOK_LATENCY
+
+from ..models import Payment, WebhookEvent
+from .payment_service import RazorpayService
+
+logger = logging.getLogger(__name__)
+
+# Events never picked up by a worker (e.g. the broker was down) are
+# re-enqueued by the sweep after this delay
+PENDING_SWEEP_DELAY = timedelta(minutes=1)
+# Events whose last attempt is older than this are assumed lost by the worker
+STALE_ATTEMPT_DELAY = timedelta(minutes=15)
+
+
+def _payment_entity(payload):
+    entity = payload["payload"]["payment"]["entity"]
+    return entity, entity.get("order_id"), entity.get("id")
+
+
+def _handle_payment_captured(payload):
+    entity, order_id, payment_id = _payment_entity(payload)
+
+    payment = (
+        Payment.objects.select_for_update()
+        .select_related("booking")
+        .get(razorpay_order_id=order_id)
+    )
+
+    if payment.status == "SUCCESS":
+        if payment.razorpay_payment_id == payment_id:
+            logger.info(f"Duplicate capture ignored: order={order_id}")
+            return
+        raise ValueError(
+            f"Order {order_id} already captured by payment "
+            f"{payment.razorpay_payment_id}"
+        )
+
+    is_valid, validation_message = RazorpayService.validate_payment_against_booking(
+        order_id, entity
+    )
+    if not is_valid:
+        # Acknowledged but never applied: the booking is NOT confirmed
+        raise ValueError(f"Payment validation failed: {validation_message}")
+
+    payment.razorpay_payment_id = payment_id
+    payment.status = "SUCCESS"
+    payment.save(update_fields=["razorpay_payment_id", "status"])
+
+    booking = payment.booking
+    if booking.status != "CONFIRMED" and not BookingService.transition_status(
+        booking, "CONFIRMED"
+    ):
+        raise ValueError(
+            f"Cannot confirm booking {booking.id} from status {booking.status}"
+        )
+
+    logger.info(
+        f"Payment SUCCESS and booking CONFIRMED: "
+        f"order={order_id}, payment={payment_id}, booking={booking.id}"
+    )
+
+
+def _handle_payment_failed(payload):
+    _, order_id, payment_id = _payment_entity(payload)
+
+    try:
+        payment = (
+            Payment.objects.select_for_update()
+            .select_related("booking")
+            .get(razorpay_order_id=order_id)
+        )
+    except Payment.DoesNotExist:
+        raise ValueError(f"Payment not found for failed event: {order_id}")
+
+    if payment.status == "SUCCESS":
+        # A failed attempt reported after another attempt captured the order
+        logger.info(f"Failed event ignored for captured order {order_id}")
+        return
+
+    payment.razorpay_payment_id = payment_id
+    payment.status = "FAILED"
+    payment.save(update_fields=["razorpay_payment_id", "status"])
+
+    # Revert booking to DRAFT
+    BookingService.transition_status(payment.booking, "DRAFT")
+
+    logger.warning(
+        f"Payment FAILED: order={order_id}, payment={payment_id}, "
+        f"booking={payment.booking.id}"
+    )
+
+
+EVENT_HANDLERS = {
+    "payment.captured": _handle_payment_captured,
+    "payment.failed": _handle_payment_failed,
+}
+
+
+class WebhookService:
+    @staticmethod
+    def get_event_id(headers, body):
+        """
+        Razorpay event id, stable across redeliveries of the same event.
+        Falls back to a digest of the raw body when the header is missing.
+        """
+        return (
+            headers.get("X-Razorpay-Event-Id")
+            or f"sha256:{hashlib.sha256(body.encode('utf-8')).hexdigest()}"
+        )
+
+    @staticmethod
+    def record_event(event_id, data):
+        """
+        Store a verified webhook event in the inbox.
+
+        Returns:
+            WebhookEvent, or None if the event was already received
+        """
+        try:
+            with transaction.atomic():
+                return WebhookEvent.objects.create(
+                    event_id=event_id,
+                    event_type=data.get("event", ""),
+                    payload=data,
+                )
+        except IntegrityError:
+            return None
+
+    @staticmethod
+    def enqueue(event_pk):
+        """Hand an event to the worker; the sweep retries if this fails"""
+        from ..tasks import process_webhook_event
+
+        try:
+            process_webhook_event.delay(event_pk)
+        except Exception as e:
+            logger.warning(
+                f"Could not enqueue webhook event {event_pk}, "
+                f"left for the pending sweep: {str(e)}"
+            )
+
+    @staticmethod
+    def process_event(event_pk):
+        """
+        Apply one inbox event. Safe to call repeatedly and concurrently:
+        only a PENDING event is applied, under a row lock.
+
+        Returns:
+            str: the resulting event status
+
+        Raises:
+            Exception: transient errors (nothing is committed; retry later)
+        """
+        now = timezone.now()
+        started = time.perf_counter()
+        with transaction.atomic():
+            event = WebhookEvent.objects.select_for_update().get(pk=event_pk)
+            if event.status != "PENDING":
+                logger.info(f"Webhook event {event.event_id} already {event.status}")
+                return event.status
+
+            event.attempts += 1
+            event.last_attempt_at = now
+            handler = EVENT_HANDLERS.get(event.event_type)
+            if handler is None:
+                event.status = "IGNORED"
+            else:
+                try:
+                    with transaction.atomic():
+                        handler(event.payload)
+                    event.status = "PROCESSED"
+                except ValueError as e:
+                    logger.error(
+                        f"Webhook event {event.event_id} ({event.event_type}) "
+                        f"rejected: {str(e)}"
+                    )
+                    event.status = "FAILED"
+                    event.last_error = str(e)
+
+            event.processed_at = now
+            event.save(
+                update_fields=[
+                    "status",
+                    "attempts",
+                    "last_attempt_at",
+                    "last_error",
+                    "processed_at",
+                ]
+            )
+
+        WEBHOOK_EVENTS.labels(event.event_type, event.status).inc()
+        WEBHOOK_LATENCY.labels(event.event_type).observe(time.perf_counter() - started)
+        logger.info(f"Webhook event {event.event_id} {event.status}")
+        return event.status
+
+    @staticmethod
+    def record_failure(event_pk, error, final=False):
+        """Count a failed attempt; final failures leave the inbox as FAILED"""
+        updates = {
+            "attempts": F("attempts") + 1,
+            "last_attempt_at": timezone.now(),
+            "last_error": str(error),
+        }
+        if final:
+            updates["status"] = "FAILED"
+        WebhookEvent.objects.filter(pk=event_pk, status="PENDING").update(**updates)
+
+    @staticmethod
+    def enqueue_pending_events():
+        """
+        Re-enqueue PENDING events that no worker picked up, or whose worker
+        disappeared mid-retry.
+
+        Returns:
+            int: number of events enqueued
+        """
+        now = timezone.now()
+        event_pks = list(
+            WebhookEvent.objects.filter(status="PENDING")
+            .filter(
+                Q(
+                    last_attempt_at__isnull=True,
+                    received_at__lt=now - PENDING_SWEEP_DELAY,
+                )
+                | Q(last_attempt_at__lt=now - STALE_ATTEMPT_DELAY)
+            )
+            .order_by("received_at")
+            .values_list("pk", flat=True)
+        )
+        for event_pk in event_pks:
+            WebhookService.enqueue(event_pk)
+        return len(event_pks)
@@ -0,0 +1,74 @@
+"""
+Celery tasks for payment processing.
+"""
+
+import logging
+import random
+
+from celery import shared_task
+
+from .models import WebhookEvent
+from .services.webhook_service import WebhookService
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_MAX_RETRIES = 8
+WEBHOOK_RETRY_BASE_DELAY = 5  # seconds
+WEBHOOK_RETRY_MAX_DELAY = 600  # seconds
+
+
+def retry_countdown(retries):
+    """Exponential backoff with jitter, capped at WEBHOOK_RETRY_MAX_DELAY"""
+    delay = min(WEBHOOK_RETRY_BASE_DELAY * 2**retries, WEBHOOK_RETRY_MAX_DELAY)
+    return delay + random.uniform(0, WEBHOOK_RETRY_BASE_DELAY)
+
+
+@shared_task(
+    bind=True,
+    name="payments.process_webhook_event",
+    max_retries=WEBHOOK_MAX_RETRIES,
+)
+def process_webhook_event(self, event_pk):
+    """
+    Apply one Razorpay webhook event from the inbox (see WebhookService).
+    Transient errors are retried with exponential backoff; after the last
+    retry the event is left FAILED for manual review.
+    """
+    try:
+        return WebhookService.process_event(event_pk)
+    except WebhookEvent.DoesNotExist:
+        logger.error(f"Webhook event {event_pk} not found")
+        return None
+    except Exception as exc:
+        final = self.request.retries >= self.max_retries
+        WebhookService.record_failure(event_pk, exc, final=final)
+        if final:
+            logger.error(
+                f"Webhook event {event_pk} failed after "
+                f"{self.request.retries + 1} attempts: {str(exc)}"
+            )
+            return "FAILED"
+
+        logger.warning(f"Webhook event {event_pk} failed, retrying: {str(exc)}")
+        raise self.retry(exc=exc, countdown=retry_countdown(self.request.retries))
+
+
+@shared_task(name="payments.enqueue_pending_webhook_events")
+def enqueue_pending_webhook_events():
+    """
+    Safety net for events that were stored but never processed
+    (e.g. the broker was unavailable when the webhook arrived).
+
+    Schedule this task to run every minute:
+
+    CELERY_BEAT_SCHEDULE = {
+        'enqueue-pending-webhook-events': {
+            'task': 'payments.enqueue_pending_webhook_events',
+            'schedule': crontab(),  # Every minute
+        },
+    }
+    """
+    count = WebhookService.enqueue_pending_events()
+    if count:
+        logger.info(f"Re-enqueued {count} pending webhook events")
+    return {"enqueued": count}
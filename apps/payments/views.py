@@ -5,12 +5,11 @@ from django.db import transaction
 from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
-from bookings.services.booking_service import BookingService
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 
-from .models import Payment
 from .services.payment_service import RazorpayService
+from .services.webhook_service import WebhookService
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +19,10 @@ logger = logging.getLogger(__name__)
 @permission_classes([AllowAny])
 def razorpay_webhook(request):
     """
-    Razorpay webhook handler with FULL VALIDATION.
+    Razorpay webhook receiver.
+    Verifies the signature, stores the event in the webhook inbox and acks
+    right away; validation, the payment update and the booking transition
+    run in a worker (see services.webhook_service).
     """
     try:
         signature = request.headers.get("X-Razorpay-Signature")
@@ -35,81 +37,21 @@ def razorpay_webhook(request):
         logger.error(f"Webhook signature verification error: {str(e)}")
         return HttpResponse(status=500)
 
-    data = json.loads(body)
-    event = data.get("event")
-
-    logger.info(f"Razorpay webhook event received: {event}")
-
-    if event == "payment.captured":
-        payment_entity = data["payload"]["payment"]["entity"]
-        order_id = payment_entity.get("order_id")
-        payment_id = payment_entity.get("id")
-
-        # Step 2: Validate payment against booking
-        is_valid, validation_message = RazorpayService.validate_payment_against_booking(
-            order_id, payment_entity
-        )
-
-        if not is_valid:
-            logger.error(
-                f"Payment validation failed for order {order_id}: {validation_message}"
-            )
-            # Still return 200 to acknowledge webhook, but DON'T transition booking
-            return HttpResponse(status=200)
-
-        # Step 3: Atomically update payment and booking
-        try:
-            with transaction.atomic():
-                payment = Payment.objects.get(razorpay_order_id=order_id)
-                payment.razorpay_payment_id = payment_id
-                payment.status = "SUCCESS"
-                payment.save(update_fields=["razorpay_payment_id", "status"])
-
-                # Transition booking to CONFIRMED
-                success = BookingService.transition_status(payment.booking, "CONFIRMED")
-
-                if success:
-                    logger.info(
-                        f"Payment SUCCESS and booking CONFIRMED: "
-                        f"order={order_id}, payment={payment_id}, booking={payment.booking.id}"
-                    )
-                else:
-                    logger.error(
-                        f"Failed to transition booking to CONFIRMED: "
-                        f"booking={payment.booking.id}"
-                    )
-                    # Transaction rolled back
-                    return HttpResponse(status=500)
-
-        except Payment.DoesNotExist:
-            logger.error(f"Payment not found for order {order_id}")
-            return HttpResponse(status=404)
-        except Exception as e:
-            logger.error(f"Webhook processing error: {str(e)}")
-            return HttpResponse(status=500)
-
-    elif event == "payment.failed":
-        payment_entity = data["payload"]["payment"]["entity"]
-        order_id = payment_entity.get("order_id")
-        payment_id = payment_entity.get("id")
-
-        try:
-            with transaction.atomic():
-                payment = Payment.objects.get(razorpay_order_id=order_id)
-                payment.razorpay_payment_id = payment_id
-                payment.status = "FAILED"
-                payment.save(update_fields=["razorpay_payment_id", "status"])
-
-                # Revert booking to DRAFT
-                BookingService.transition_status(payment.booking, "DRAFT")
-
-                logger.warning(
-                    f"Payment FAILED: order={order_id}, payment={payment_id}, "
-                    f"booking={payment.booking.id} reverted to DRAFT"
-                )
-        except Payment.DoesNotExist:
-            logger.warning(f"Payment not found for failed event: {order_id}")
-        except Exception as e:
-            logger.error(f"Failed payment processing error: {str(e)}")
+    try:
+        data = json.loads(body)
+    except ValueError:
+        logger.warning("Razorpay webhook with invalid JSON body")
+        return HttpResponse(status=400)
+
+    # Step 2: Store the event in the inbox and acknowledge.
+    # payments.tasks.process_webhook_event validates and applies it.
+    event_id = WebhookService.get_event_id(request.headers, body)
+    event = WebhookService.record_event(event_id, data)
+
+    if event is None:
+        logger.info(f"Duplicate Razorpay webhook event ignored: {event_id}")
+    else:
+        logger.info(f"Razorpay webhook event received: {event.event_type}")
+        transaction.on_commit(lambda: WebhookService.enqueue(event.pk))
 
     return HttpResponse(status=200)
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
-from .models import PricingConfiguration, PricingRule
+from .models import PackagePriceRange, PricingConfiguration, PricingRule
 
 
 @admin.register(PricingRule)
@@ -166,3 +166,29 @@ class PricingConfigurationAdmin(admin.ModelAdmin):
                 )
             )
         return super().changelist_view(request, extra_context)
+
+
+@admin.register(PackagePriceRange)
+class PackagePriceRangeAdmin(admin.ModelAdmin):
+    # Maintained by signals and the refresh_price_ranges command
+    list_display = [
+        "package",
+        "min_price",
+        "max_price",
+        "currency",
+        "valid_until",
+        "updated_at",
+    ]
+    search_fields = ["package__name", "package__slug"]
+    list_select_related = ["package"]
+    readonly_fields = [
+        "package",
+        "min_price",
+        "max_price",
+        "currency",
+        "valid_until",
+        "updated_at",
+    ]
+
+    def has_add_permission(self, request):
+        return False
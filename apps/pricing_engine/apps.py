@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PricingEngineConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pricing_engine"
+
+    def ready(self):
+        # Register pricing plan invalidation signals
+        from . import signals  # noqa: F401
@@ -0,0 +1,110 @@
+"""
+Management command to benchmark the vehicle optimization engine against the
+original backtracking engine on growing synthetic fleets.
+Usage: python manage.py benchmark_vehicle_optimizer [--passengers 40 ...] [--max-types 16]
+"""
+
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from pricing_engine.services.vehicle_optimization import (
+    BacktrackingVehicleOptimizationEngine,
+    VehicleOptimizationEngine,
+    VehicleType,
+)
+
+CAPACITIES = [4, 5, 6, 7, 8, 10, 12, 14, 17, 20, 26, 30, 45]
+
+
+def build_fleet(size, seed=0):
+    """Deterministic fleet of vehicle types priced roughly per seat"""
+    rng = random.Random(seed)
+    return [
+        VehicleType(
+            id=index + 1,
+            name=f"Vehicle {index + 1}",
+            passenger_capacity=capacity,
+            luggage_capacity=capacity // 2,
+            base_price_per_day=Decimal(capacity * rng.randint(200, 350)),
+            is_active=True,
+        )
+        for index, capacity in enumerate(rng.choice(CAPACITIES) for _ in range(size))
+    ]
+
+
+def _timed(engine_class, fleet, passengers, repeat):
+    """Best-of-N run; returns (last engine, its solutions, milliseconds)"""
+    best = None
+    for _ in range(repeat):
+        engine = engine_class(fleet, passengers, 1)
+        started = time.perf_counter()
+        solutions = engine.optimize()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return engine, solutions, best * 1000
+
+
+class Command(BaseCommand):
+    help = "Benchmark vehicle optimization against the backtracking engine"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--passengers",
+            type=int,
+            action="append",
+            help="Group size to benchmark (can be repeated, default: 10, 40)",
+        )
+        parser.add_argument(
+            "--max-types",
+            type=int,
+            default=16,
+            help="Largest fleet size (number of vehicle types)",
+        )
+        parser.add_argument(
+            "--legacy-max-types",
+            type=int,
+            default=12,
+            help="Largest fleet size to run the backtracking engine on",
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        passenger_counts = options["passengers"] or [10, 40]
+        repeat = max(1, options["repeat"])
+
+        self.stdout.write(
+            f"{'types':>5} {'pax':>5} {'dp ms':>9} {'nodes':>7} {'front':>6} "
+            f"{'legacy ms':>10} {'same best':>10}"
+        )
+        for size in range(2, options["max_types"] + 1, 2):
+            fleet = build_fleet(size, options["seed"])
+            for passengers in passenger_counts:
+                engine, solutions, dp_ms = _timed(
+                    VehicleOptimizationEngine, fleet, passengers, repeat
+                )
+                line = (
+                    f"{size:>5} {passengers:>5} {dp_ms:>9.2f} "
+                    f"{engine.nodes_expanded:>7} {len(engine.solutions):>6}"
+                )
+
+                if size <= options["legacy_max_types"]:
+                    _, legacy, legacy_ms = _timed(
+                        BacktrackingVehicleOptimizationEngine,
+                        fleet,
+                        passengers,
+                        repeat,
+                    )
+                    same = solutions[:1] == legacy[:1]
+                    line += f" {legacy_ms:>10.2f} {'yes' if same else 'NO':>10}"
+                else:
+                    line += f" {'-':>10} {'-':>10}"
+
+                if engine.budget_exhausted:
+                    line += "  (budget exhausted)"
+                self.stdout.write(line)
+
+        self.stdout.write(self.style.SUCCESS("✅ Benchmark complete"))
@@ -0,0 +1,37 @@
+"""
+Management command to rebuild the materialized package price ranges.
+Usage: python manage.py refresh_price_ranges [--package <slug> ...]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from packages.models import Package
+from pricing_engine.services.price_range import refresh_price_ranges
+
+
+class Command(BaseCommand):
+    help = "Recompute the min/max price range of every package (or selected packages)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--package",
+            action="append",
+            dest="packages",
+            metavar="SLUG",
+            help="Only refresh this package (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        package_ids = None
+        if options["packages"]:
+            slugs = set(options["packages"])
+            found = dict(
+                Package.objects.filter(slug__in=slugs).values_list("slug", "id")
+            )
+            missing = slugs - set(found)
+            if missing:
+                raise CommandError(f"Unknown package(s): {', '.join(sorted(missing))}")
+            package_ids = list(found.values())
+
+        count = refresh_price_ranges(package_ids)
+        self.stdout.write(self.style.SUCCESS(f"✅ Refreshed {count} price range(s)"))
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.16 on 2026-10-16 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packages", "0013_hoteltier_curation_promise_hoteltier_featured_image"),
+        ("pricing_engine", "0004_add_phase3_pricing_config"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PackagePriceRange",
+            fields=[
+                (
+                    "package",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="price_range",
+                        serialize=False,
+                        to="packages.package",
+                    ),
+                ),
+                ("min_price", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("max_price", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("currency", models.CharField(default="INR", max_length=3)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Package Price Range",
+                "verbose_name_plural": "Package Price Ranges",
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.16 on 2026-10-16 12:00
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_existing_ranges_stale(apps, schema_editor):
+    # Computed without a validity: refresh them on the next expiry sweep
+    PackagePriceRange = apps.get_model("pricing_engine", "PackagePriceRange")
+    PackagePriceRange.objects.update(valid_until=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pricing_engine", "0005_packagepricerange"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="packagepricerange",
+            name="valid_until",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(mark_existing_ranges_stale, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,20 @@
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 
+from backend.model_tracking import FieldTrackerMixin
 
-class PricingRule(models.Model):
+
+class PricingRule(FieldTrackerMixin, models.Model):
     RULE_TYPE_CHOICES = [
         ("MARKUP", "Markup"),
         ("DISCOUNT", "Discount"),
     ]
 
+    # A re-targeted rule refreshes both packages (see pricing_engine.signals)
+    tracked_fields = ("target_package",)
+
     name = models.CharField(max_length=100, db_index=True)
     description = models.TextField(blank=True, default="")
     rule_type = models.CharField(
@@ -181,3 +187,46 @@ class PricingConfiguration(models.Model):
         """Get or create the singleton configuration instance."""
         config, created = cls.objects.get_or_create(pk=1)
         return config
+
+
+class PackagePriceRange(models.Model):
+    """
+    Materialized min/max price estimate per package.
+    Maintained by pricing_engine.signals and the refresh_price_ranges
+    command so listings can show "from ₹X" without pricing each row.
+    Rows priced with time-bound rules are stale from valid_until, the next
+    rule start or expiry (see pricing_engine.services.price_range).
+    """
+
+    package = models.OneToOneField(
+        "packages.Package",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="price_range",
+    )
+    min_price = models.DecimalField(max_digits=12, decimal_places=2)
+    max_price = models.DecimalField(max_digits=12, decimal_places=2)
+    currency = models.CharField(max_length=3, default="INR")
+    # Next moment the active pricing rules change (None: never)
+    valid_until = models.DateTimeField(null=True, blank=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Package Price Range"
+        verbose_name_plural = "Package Price Ranges"
+
+    def __str__(self):
+        return f"{self.package_id}: {self.min_price} - {self.max_price} {self.currency}"
+
+    def is_stale(self, at=None) -> bool:
+        return self.valid_until is not None and self.valid_until <= (
+            at or timezone.now()
+        )
+
+    def as_dict(self):
+        """Same shape as PricingService.get_price_estimate_range"""
+        return {
+            "min_price": self.min_price,
+            "max_price": self.max_price,
+            "currency": self.currency,
+        }
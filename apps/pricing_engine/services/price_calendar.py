@@ -0,0 +1,111 @@
+"""
+Price Calendars
+
+Totals for one component selection over a range of start dates with a
+fixed trip length. Everything except the hotel depends only on the
+selection, so it is computed once with PriceQuote. The hotel stay is then
+slid one day at a time: only the night leaving and the night entering the
+window change the weekend-night count, and the total is rebuilt from that
+count exactly the way PriceQuote does, so every day matches a single quote.
+
+Rules are resolved once against the compiled plan's time-indexed rule set;
+the calendar stays valid until the next rule boundary.
+"""
+
+from datetime import timedelta
+
+from .price_quote import QUANT, WEEKEND_START, ZERO, PriceQuote, apply_rules
+
+
+def compute_price_calendar(
+    plan,
+    experiences,
+    hotel_tier,
+    transport_option,
+    first_start,
+    num_days,
+    trip_nights,
+    travelers=None,
+    num_rooms=1,
+    num_travelers=1,
+    vehicle_allocation=None,
+    at=None,
+):
+    """
+    Compute the total for every start date in [first_start, first_start + num_days).
+
+    Args:
+        plan: PricingPlan of the package
+        experiences, hotel_tier, transport_option, travelers, num_rooms,
+        num_travelers, vehicle_allocation: as in PricingService.get_price_breakdown
+        first_start: datetime.date - First start date
+        num_days: int - Number of start dates
+        trip_nights: int - Nights per stay
+        at: Optional datetime used to pick active rules (default: now)
+
+    Returns:
+        list of (start_date, end_date, final_total) tuples
+    """
+    if num_days <= 0:
+        return []
+
+    first_end = first_start + timedelta(days=trip_nights)
+    quote = PriceQuote.compute(
+        plan,
+        experiences,
+        hotel_tier,
+        transport_option,
+        travelers=travelers,
+        start_date=first_start,
+        end_date=first_end,
+        num_rooms=num_rooms,
+        num_travelers=num_travelers,
+        vehicle_allocation=vehicle_allocation,
+        at=at,
+    )
+    one_day = timedelta(days=1)
+
+    # Legacy (multiplier) hotel pricing does not depend on dates
+    if not quote.uses_dated_hotel_pricing:
+        return [
+            (first_start + one_day * i, first_end + one_day * i, quote.final_total)
+            for i in range(num_days)
+        ]
+
+    weekday_cost = hotel_tier.base_price_per_night * num_rooms
+    weekend_cost = (
+        hotel_tier.base_price_per_night * hotel_tier.weekend_multiplier * num_rooms
+    )
+    weekend_nights = sum(
+        1
+        for offset in range(trip_nights)
+        if (first_start + one_day * offset).weekday() >= WEEKEND_START
+    )
+
+    calendar = []
+    start_date, end_date = first_start, first_end
+    for i in range(num_days):
+        if i:
+            # Slide the stay by one night: the old first night leaves and
+            # the night before the new end date enters
+            leaving, entering = start_date, end_date
+            start_date += one_day
+            end_date += one_day
+            if leaving.weekday() >= WEEKEND_START:
+                weekend_nights -= 1
+            if entering.weekday() >= WEEKEND_START:
+                weekend_nights += 1
+
+        weekday_nights = trip_nights - weekend_nights
+        hotel_total = (
+            ZERO + weekday_cost * weekday_nights + weekend_cost * weekend_nights
+        )
+        hotel_cost = hotel_total.quantize(QUANT) or ZERO
+        current_total, _, _ = apply_rules(
+            quote.subtotal_before_hotel + hotel_cost, quote.rules
+        )
+        calendar.append(
+            (start_date, end_date, max(current_total, ZERO).quantize(QUANT))
+        )
+
+    return calendar
@@ -0,0 +1,429 @@
+"""
+Price Quotes
+
+PriceQuote is the core of the pricing engine: it computes the totals of a
+component selection with as little allocation as possible (no per-night
+rows, no per-vehicle or per-rule dicts, no string conversions).
+calculate_total() only needs final_total, so it stops there.
+
+PriceBreakdown is a read-only mapping over a quote with the same keys as
+the historical get_price_breakdown() dict. Scalar fields are quantized on
+first read; hotel_breakdown, vehicle_breakdown and applied_rules are only
+expanded when a caller (usually a serializer) actually reads them.
+"""
+
+import logging
+from collections.abc import Mapping
+from datetime import timedelta
+from decimal import Decimal
+from math import ceil
+
+logger = logging.getLogger(__name__)
+
+QUANT = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+# Friday=4, Saturday=5, Sunday=6 are weekend nights
+WEEKEND_START = 4
+
+
+def count_weekend_nights(start_date, num_nights):
+    """Count weekend nights in [start_date, start_date + num_nights)"""
+    if num_nights <= 0:
+        return 0
+    full_weeks, remainder = divmod(num_nights, 7)
+    first_weekday = start_date.weekday()
+    return full_weeks * 3 + sum(
+        1
+        for offset in range(remainder)
+        if (first_weekday + offset) % 7 >= WEEKEND_START
+    )
+
+
+def apply_rules(subtotal, rules, applied=None):
+    """
+    Apply markup/discount rules in order.
+
+    Args:
+        subtotal: Decimal amount before rules
+        rules: Iterable of PricingRule-like objects
+        applied: Optional list; per-rule detail dicts are appended to it
+
+    Returns:
+        tuple: (total after rules, total markup, total discount)
+    """
+    total_markup = ZERO
+    total_discount = ZERO
+    current_total = subtotal
+
+    for rule in rules:
+        rule_amount = ZERO
+
+        if rule.rule_type == "MARKUP":
+            if rule.is_percentage:
+                rule_amount = current_total * (rule.value / Decimal("100"))
+            else:
+                rule_amount = rule.value
+            total_markup += rule_amount
+            current_total += rule_amount
+
+        elif rule.rule_type == "DISCOUNT":
+            if rule.is_percentage:
+                rule_amount = current_total * (rule.value / Decimal("100"))
+            else:
+                rule_amount = rule.value
+            total_discount += rule_amount
+            current_total -= rule_amount
+
+        if applied is not None:
+            applied.append(
+                {
+                    "name": rule.name,
+                    "type": rule.rule_type,
+                    "value": str(rule.value),
+                    "is_percentage": rule.is_percentage,
+                    "amount_applied": str(rule_amount),
+                }
+            )
+
+    return current_total, total_markup, total_discount
+
+
+class PriceQuote:
+    """
+    Totals for one component selection, plus the inputs needed to expand
+    the detailed breakdown later.
+    """
+
+    __slots__ = (
+        "plan",
+        "hotel_tier",
+        "start_date",
+        "end_date",
+        "num_rooms",
+        "vehicle_allocation",
+        "num_days",
+        "rules",
+        "age_threshold",
+        "base_experience_per_person",
+        "base_experience_total",
+        "chargeable_travelers",
+        "total_travelers",
+        "transport_cost",
+        "uses_vehicle_allocation",
+        "hotel_cost",
+        "hotel_total_raw",
+        "hotel_num_nights",
+        "uses_new_hotel_pricing",
+        "uses_dated_hotel_pricing",
+        "subtotal_before_hotel",
+        "subtotal_after_hotel",
+        "total_markup",
+        "total_discount",
+        "final_total",
+    )
+
+    @classmethod
+    def compute(
+        cls,
+        plan,
+        experiences,
+        hotel_tier,
+        transport_option,
+        travelers=None,
+        start_date=None,
+        end_date=None,
+        num_rooms=1,
+        num_travelers=1,
+        vehicle_allocation=None,
+        at=None,
+    ):
+        """
+        Compute totals against a compiled PricingPlan.
+
+        Args mirror PricingService.get_price_breakdown; ``at`` selects the
+        moment used to pick active rules (default: now).
+        """
+        quote = cls()
+        quote.plan = plan
+        quote.hotel_tier = hotel_tier
+        quote.start_date = start_date
+        quote.end_date = end_date
+        quote.num_rooms = num_rooms
+
+        # 1. Experiences (only chargeable travelers pay)
+        base_experience_per_person = (
+            sum(Decimal(str(exp.base_price)) for exp in experiences)
+            if experiences
+            else ZERO
+        )
+        age_threshold = plan.config.chargeable_age_threshold
+        chargeable_travelers = num_travelers
+        total_travelers = num_travelers
+        if travelers:
+            total_travelers = len(travelers)
+            chargeable_travelers = sum(
+                1 for t in travelers if t.get("age", 0) >= age_threshold
+            )
+        base_experience_total = base_experience_per_person * Decimal(
+            str(chargeable_travelers)
+        )
+
+        quote.age_threshold = age_threshold
+        quote.base_experience_per_person = base_experience_per_person
+        quote.base_experience_total = base_experience_total
+        quote.chargeable_travelers = chargeable_travelers
+        quote.total_travelers = total_travelers
+
+        # 2. Transport
+        if vehicle_allocation and len(vehicle_allocation) > 0:
+            num_days = 1
+            if start_date and end_date:
+                num_days = max(1, ceil((end_date - start_date).days))
+
+            transport_cost = ZERO
+            for allocation in vehicle_allocation:
+                transport_id = allocation.get("transport_option_id")
+                count = allocation.get("count", 0)
+                if transport_id and count > 0:
+                    vehicle = plan.get_vehicle(transport_id)
+                    if vehicle is None:
+                        logger.warning(f"Transport option {transport_id} not found")
+                        continue
+                    transport_cost += (
+                        vehicle.get_effective_price_per_day() * count * num_days
+                    )
+
+            quote.vehicle_allocation = vehicle_allocation
+            quote.num_days = num_days
+            quote.uses_vehicle_allocation = True
+        else:
+            transport_cost = transport_option.base_price if transport_option else ZERO
+            quote.vehicle_allocation = None
+            quote.num_days = 1
+            quote.uses_vehicle_allocation = False
+        quote.transport_cost = transport_cost
+
+        # 3. Hotel
+        quote.uses_dated_hotel_pricing = False
+        quote.hotel_num_nights = 1
+        base_price_per_night = hotel_tier.base_price_per_night
+        if base_price_per_night:
+            quote.uses_new_hotel_pricing = True
+            if start_date and end_date:
+                num_nights = (end_date - start_date).days
+                weekend_nights = count_weekend_nights(start_date, num_nights)
+                weekday_nights = max(num_nights, 0) - weekend_nights
+                total_cost = (
+                    ZERO
+                    + base_price_per_night * num_rooms * weekday_nights
+                    + base_price_per_night
+                    * hotel_tier.weekend_multiplier
+                    * num_rooms
+                    * weekend_nights
+                )
+                hotel_cost = total_cost.quantize(QUANT) or ZERO
+                quote.hotel_total_raw = total_cost
+                quote.uses_dated_hotel_pricing = True
+                quote.hotel_num_nights = num_nights
+            else:
+                hotel_cost = base_price_per_night * num_rooms
+        else:
+            quote.uses_new_hotel_pricing = False
+            hotel_cost = ZERO
+        quote.hotel_cost = hotel_cost
+
+        # 4. Subtotals
+        subtotal_before_hotel = base_experience_total + transport_cost
+        if quote.uses_new_hotel_pricing:
+            subtotal_after_hotel = subtotal_before_hotel + hotel_cost
+        else:
+            subtotal_after_hotel = subtotal_before_hotel * hotel_tier.price_multiplier
+        quote.subtotal_before_hotel = subtotal_before_hotel
+        quote.subtotal_after_hotel = subtotal_after_hotel
+
+        # 5. Pricing rules
+        quote.rules = plan.active_rules(at)
+        current_total, total_markup, total_discount = apply_rules(
+            subtotal_after_hotel, quote.rules
+        )
+        quote.total_markup = total_markup
+        quote.total_discount = total_discount
+
+        # Ensure minimum price (never negative)
+        quote.final_total = max(current_total, ZERO).quantize(QUANT)
+        return quote
+
+    @property
+    def per_person_price(self):
+        if self.chargeable_travelers > 0:
+            return (
+                self.final_total / Decimal(str(self.chargeable_travelers))
+            ).quantize(QUANT)
+        return self.final_total
+
+    @property
+    def hotel_cost_per_night(self):
+        """Unquantized per-night hotel cost (None for legacy pricing)"""
+        if not self.uses_new_hotel_pricing:
+            return None
+        if not self.uses_dated_hotel_pricing:
+            return self.hotel_tier.base_price_per_night
+        if self.hotel_num_nights > 0:
+            return self.hotel_total_raw / self.hotel_num_nights
+        return self.hotel_total_raw
+
+    def hotel_cost_info(self):
+        """Hotel totals in the shape returned by PricingService.calculate_hotel_cost"""
+        per_night = self.hotel_cost_per_night
+        return {
+            "total_cost": (
+                self.hotel_cost.quantize(QUANT) if self.uses_new_hotel_pricing else None
+            ),
+            "cost_per_night": (
+                per_night.quantize(QUANT) if per_night is not None else None
+            ),
+            "num_nights": self.hotel_num_nights,
+            "num_rooms": self.num_rooms,
+            "uses_new_pricing": self.uses_new_hotel_pricing,
+        }
+
+    def hotel_breakdown(self):
+        """Per-night hotel rows (only for date-based hotel pricing)"""
+        if not self.uses_dated_hotel_pricing:
+            return []
+        breakdown = []
+        price_per_night = self.hotel_tier.base_price_per_night
+        weekend_price = price_per_night * self.hotel_tier.weekend_multiplier
+        current_date = self.start_date
+        while current_date < self.end_date:
+            is_weekend = current_date.weekday() >= WEEKEND_START
+            night_price = weekend_price if is_weekend else price_per_night
+            breakdown.append(
+                {
+                    "date": current_date,
+                    "is_weekend": is_weekend,
+                    "price_per_night": night_price,
+                    "num_rooms": self.num_rooms,
+                    "night_cost": night_price * self.num_rooms,
+                }
+            )
+            current_date += timedelta(days=1)
+        return breakdown
+
+    def vehicle_breakdown(self):
+        """Per-vehicle rows (only when a vehicle allocation was priced)"""
+        if not self.uses_vehicle_allocation:
+            return []
+        breakdown = []
+        for allocation in self.vehicle_allocation:
+            transport_id = allocation.get("transport_option_id")
+            count = allocation.get("count", 0)
+            if not transport_id or count <= 0:
+                continue
+            vehicle = self.plan.get_vehicle(transport_id)
+            if vehicle is None:
+                continue
+            price_per_day = vehicle.get_effective_price_per_day()
+            breakdown.append(
+                {
+                    "transport_option_id": transport_id,
+                    "name": vehicle.name,
+                    "count": count,
+                    "price_per_day": str(price_per_day),
+                    "total_cost": str(price_per_day * count * self.num_days),
+                }
+            )
+        return breakdown
+
+    def applied_rules(self):
+        """Per-rule detail dicts, in application order"""
+        applied = []
+        apply_rules(self.subtotal_after_hotel, self.rules, applied)
+        return applied
+
+    def breakdown(self):
+        return PriceBreakdown(self)
+
+
+class PriceBreakdown(Mapping):
+    """
+    Read-only, lazily materialized view of a PriceQuote.
+    Has the same keys and values as the historical breakdown dict.
+    """
+
+    DETAIL_FIELDS = {
+        "hotel_breakdown": PriceQuote.hotel_breakdown,
+        "vehicle_breakdown": PriceQuote.vehicle_breakdown,
+        "applied_rules": PriceQuote.applied_rules,
+    }
+
+    __slots__ = ("quote", "_scalars", "_details")
+
+    def __init__(self, quote):
+        self.quote = quote
+        self._scalars = None
+        self._details = {}
+
+    def _get_scalars(self):
+        if self._scalars is None:
+            quote = self.quote
+            per_night = quote.hotel_cost_per_night
+            self._scalars = {
+                "base_experience_total": quote.base_experience_total.quantize(QUANT),
+                "transport_cost": quote.transport_cost.quantize(QUANT),
+                "subtotal_before_hotel": quote.subtotal_before_hotel.quantize(QUANT),
+                "hotel_multiplier": quote.hotel_tier.price_multiplier,
+                "subtotal_after_hotel": quote.subtotal_after_hotel.quantize(QUANT),
+                "hotel_cost": (
+                    quote.hotel_cost.quantize(QUANT)
+                    if quote.uses_new_hotel_pricing
+                    else None
+                ),
+                "hotel_cost_per_night": (
+                    per_night.quantize(QUANT) if per_night else None
+                ),
+                "hotel_num_nights": quote.hotel_num_nights,
+                "hotel_num_rooms": quote.num_rooms,
+                "hotel_breakdown": None,
+                "uses_new_hotel_pricing": quote.uses_new_hotel_pricing,
+                "num_travelers": quote.total_travelers,
+                "base_experience_per_person": quote.base_experience_per_person.quantize(
+                    QUANT
+                ),
+                "uses_vehicle_allocation": quote.uses_vehicle_allocation,
+                "vehicle_breakdown": None,
+                "total_markup": quote.total_markup.quantize(QUANT),
+                "total_discount": quote.total_discount.quantize(QUANT),
+                "final_total": quote.final_total,
+                "applied_rules": None,
+                "chargeable_travelers": quote.chargeable_travelers,
+                "total_travelers": quote.total_travelers,
+                "total_amount": quote.final_total,
+                "per_person_price": quote.per_person_price,
+                "chargeable_age_threshold": quote.age_threshold,
+            }
+        return self._scalars
+
+    def __getitem__(self, key):
+        if key in self.DETAIL_FIELDS:
+            if key not in self._details:
+                self._details[key] = self.DETAIL_FIELDS[key](self.quote)
+            return self._details[key]
+        if key == "final_total" or key == "total_amount":
+            # Fast path: no need to quantize the other fields
+            return self.quote.final_total
+        return self._get_scalars()[key]
+
+    def __iter__(self):
+        return iter(self._get_scalars())
+
+    def __len__(self):
+        return len(self._get_scalars())
+
+    def __repr__(self):
+        return f"PriceBreakdown(final_total={self.quote.final_total})"
+
+    def to_dict(self):
+        """Fully materialized plain dict (e.g. for JSON storage)"""
+        return {key: self[key] for key in self}
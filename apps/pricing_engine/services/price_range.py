@@ -0,0 +1,192 @@
+"""
+Materialized Package Price Ranges
+
+The min/max estimate of a package is derived from its compiled pricing
+plan (cheapest vs. most expensive component combination) and stored in
+PackagePriceRange. Rows are refreshed in bulk by the refresh_price_ranges
+management command and incrementally, after commit, by the signal
+handlers in ``pricing_engine.signals``. Changes that affect every package
+(global rules, configuration, deleted components) refresh them in the
+pricing.refresh_price_ranges task, outside the request.
+
+A range only reflects the rules active when it was computed, so rows store
+valid_until, the plan's next rule boundary (a scheduled rule starts or
+expires). The pricing.refresh_expired_price_ranges task recomputes the rows
+past it, and get_price_estimate_range() never serves them.
+"""
+
+import logging
+import threading
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .price_quote import PriceQuote
+from .pricing_plan import get_pricing_plan
+
+logger = logging.getLogger(__name__)
+
+ALL_PACKAGES = "__all__"
+
+# Experiences priced in the most expensive combination
+MAX_RANGE_EXPERIENCES = 3
+
+_pending = threading.local()
+
+
+def compute_price_range(plan, at=None) -> dict:
+    """
+    Min/max price estimate of a compiled plan.
+
+    The cheapest combination is the cheapest experience, hotel tier and
+    transport option; the most expensive uses the three most expensive
+    experiences and the most expensive tier and transport option. Hotel
+    tiers with per-night pricing take precedence over legacy multiplier
+    tiers, as in the original query-based estimate. Rules are those active
+    at ``at`` (default: now).
+    """
+    experiences = sorted(plan.experiences.values(), key=lambda exp: exp.base_price)
+    per_night_tiers = sorted(
+        (t for t in plan.hotel_tiers.values() if t.base_price_per_night is not None),
+        key=lambda tier: tier.base_price_per_night,
+    )
+    legacy_tiers = sorted(
+        plan.hotel_tiers.values(), key=lambda tier: tier.price_multiplier
+    )
+    transports = sorted(
+        plan.transport_options.values(), key=lambda option: option.base_price
+    )
+
+    hotel_tiers = per_night_tiers or legacy_tiers
+
+    def total(selected, index):
+        hotel_tier = hotel_tiers[index] if hotel_tiers else None
+        transport = transports[index] if transports else None
+        return PriceQuote.compute(
+            plan, selected, hotel_tier, transport, at=at
+        ).final_total
+
+    try:
+        min_price = total(experiences[:1], 0)
+        max_price = total(experiences[::-1][:MAX_RANGE_EXPERIENCES], -1)
+    except Exception as e:
+        logger.error(
+            f"Error calculating price range for package {plan.package_id}: {str(e)}"
+        )
+        min_price = max_price = Decimal("0.00")
+
+    return {"min_price": min_price, "max_price": max_price, "currency": "INR"}
+
+
+def build_price_range(plan, at):
+    """Unsaved PackagePriceRange of a plan, valid until its next rule boundary"""
+    from ..models import PackagePriceRange
+
+    price_range = compute_price_range(plan, at)
+    return PackagePriceRange(
+        package_id=plan.package_id,
+        min_price=price_range["min_price"],
+        max_price=price_range["max_price"],
+        currency=price_range["currency"],
+        valid_until=plan.next_rule_boundary(at),
+    )
+
+
+def refresh_price_ranges(package_ids=None) -> int:
+    """
+    Recompute and store price ranges.
+
+    Args:
+        package_ids: Iterable of package IDs, or None for every package
+
+    Returns:
+        int: number of price ranges written
+    """
+    from packages.models import Package
+
+    from ..models import PackagePriceRange
+
+    packages = Package.objects.all()
+    if package_ids is not None:
+        packages = packages.filter(id__in=list(package_ids))
+
+    now = timezone.now()
+    rows = [build_price_range(get_pricing_plan(package), now) for package in packages]
+
+    PackagePriceRange.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["package"],
+        update_fields=[
+            "min_price",
+            "max_price",
+            "currency",
+            "valid_until",
+            "updated_at",
+        ],
+    )
+    logger.info(f"Refreshed {len(rows)} package price ranges")
+    return len(rows)
+
+
+def refresh_expired_price_ranges(now=None) -> int:
+    """
+    Recompute the price ranges whose valid_until has passed
+
+    Returns:
+        int: number of price ranges written
+    """
+    from ..models import PackagePriceRange
+
+    expired = PackagePriceRange.objects.filter(
+        valid_until__lte=now or timezone.now()
+    ).values_list("package_id", flat=True)
+    package_ids = list(expired)
+    if not package_ids:
+        return 0
+    return refresh_price_ranges(package_ids)
+
+
+def _flush_pending():
+    pending = getattr(_pending, "ids", None)
+    _pending.ids = None
+    if not pending:
+        return
+    if ALL_PACKAGES in pending:
+        # Recompiles every package: too slow for the request that saved
+        from ..tasks import refresh_all_price_ranges
+
+        try:
+            refresh_all_price_ranges.delay()
+        except Exception as e:
+            logger.error(f"Could not enqueue the price range refresh: {str(e)}")
+        return
+    try:
+        refresh_price_ranges(pending)
+    except Exception as e:
+        # Stale ranges are recomputed by the next change or the command
+        logger.error(f"Price range refresh failed: {str(e)}")
+
+
+def schedule_price_range_refresh(package_ids=None) -> None:
+    """
+    Refresh price ranges once the current transaction commits.
+    Requests made within one transaction are merged into a single refresh;
+    requests left over from a rolled back transaction are picked up by the
+    next commit.
+
+    Args:
+        package_ids: Iterable of package IDs, or None for every package
+    """
+    pending = getattr(_pending, "ids", None)
+    if pending is None:
+        pending = _pending.ids = set()
+
+    if package_ids is None:
+        pending.add(ALL_PACKAGES)
+    else:
+        pending.update(package_ids)
+
+    transaction.on_commit(_flush_pending)
@@ -0,0 +1,328 @@
+"""
+Compiled Pricing Plans
+
+A PricingPlan is an immutable, per-package snapshot of everything
+PricingService needs to quote a price:
+- The package's experiences, hotel tiers and transport options
+- All transport options (for multi-vehicle allocations)
+- The PricingConfiguration values used during pricing
+- The shared pricing rule index (``services.rule_index``)
+
+Plans are compiled once per process and reused until a version stamp
+changes. Version stamps live in the shared cache and are rotated by the
+signal handlers in ``pricing_engine.signals``, so a warm price quote is
+pure CPU work and issues no SQL.
+"""
+
+import logging
+import threading
+import uuid
+from dataclasses import dataclass, replace
+from datetime import datetime
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from django.core.cache import cache
+
+from .rule_index import (
+    RULES_VERSION_KEY,
+    RuleIndex,
+    clear_local_index,
+    get_rule_index,
+    initial_rules_version,
+)
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_VERSION_KEY = "pricing_plan_version:global"
+
+
+def _package_version_key(package_id) -> str:
+    return f"pricing_plan_version:{package_id if package_id else 'global'}"
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Pricing configuration values captured at compile time"""
+
+    chargeable_age_threshold: int
+    price_change_alert_threshold: Decimal
+    enable_price_change_alerts: bool
+
+
+@dataclass(frozen=True)
+class ExperienceSnapshot:
+    """Pricing-relevant fields of an Experience"""
+
+    id: int
+    name: str
+    base_price: Decimal
+    is_active: bool
+
+
+@dataclass(frozen=True)
+class HotelTierSnapshot:
+    """Pricing-relevant fields of a HotelTier"""
+
+    id: int
+    name: str
+    base_price_per_night: Optional[Decimal]
+    weekend_multiplier: Decimal
+    price_multiplier: Decimal
+
+
+@dataclass(frozen=True)
+class TransportSnapshot:
+    """Pricing-relevant fields of a TransportOption"""
+
+    id: int
+    name: str
+    base_price: Decimal
+    base_price_per_day: Optional[Decimal]
+    passenger_capacity: int
+    luggage_capacity: int
+    is_active: bool
+
+    def get_effective_price_per_day(self) -> Decimal:
+        """Mirror of TransportOption.get_effective_price_per_day"""
+        if self.base_price_per_day:
+            return self.base_price_per_day
+        return self.base_price
+
+
+@dataclass(frozen=True)
+class PricingPlan:
+    """Immutable pricing inputs for one package"""
+
+    package_id: Optional[int]
+    version: Tuple[str, str]
+    config: ConfigSnapshot
+    experiences: Mapping[int, ExperienceSnapshot]
+    hotel_tiers: Mapping[int, HotelTierSnapshot]
+    transport_options: Mapping[int, TransportSnapshot]
+    vehicles: Mapping[int, TransportSnapshot]
+    rule_index: RuleIndex
+
+    def active_rules(self, at: Optional[datetime] = None) -> tuple:
+        """
+        Rules in effect for this package at the given moment, in
+        chronological order. Rule windows are checked per lookup, so plans
+        stay correct across active_from/active_to boundaries.
+        """
+        return self.rule_index.active_rules(self.package_id, at)
+
+    def next_rule_boundary(self, at: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        The next moment after ``at`` when the set of active rules changes
+        (a rule starts or expires), or None if it never changes.
+        Results derived from active_rules(at) stay valid until then.
+        """
+        return self.rule_index.next_boundary(at)
+
+    def get_vehicle(self, transport_id) -> Optional[TransportSnapshot]:
+        """Look up any transport option by ID (used for vehicle allocations)"""
+        try:
+            return self.vehicles.get(int(transport_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_experiences(self, experience_ids) -> Optional[list]:
+        """
+        Resolve experience IDs to active snapshots (ordered by name).
+        Returns None if any ID is unknown to the package or inactive, so
+        callers can fall back to the database for precise error reporting.
+        """
+        wanted = set(experience_ids)
+        selected = [
+            exp
+            for exp in self.experiences.values()
+            if exp.id in wanted and exp.is_active
+        ]
+        if len(selected) != len(wanted):
+            return None
+        return selected
+
+
+_global_parts = {}
+_plans = {}
+_lock = threading.Lock()
+
+
+def _new_stamp() -> str:
+    return uuid.uuid4().hex
+
+
+def _read_versions(package_id):
+    """
+    Read the (global, package) plan stamps and the rule index version from
+    the shared cache in one round trip.
+
+    Returns:
+        tuple: (plan version, rules version); either is None when the cache
+        is unavailable, in which case plans are compiled fresh instead of
+        trusting a possibly stale local copy.
+    """
+    plan_keys = [GLOBAL_VERSION_KEY, _package_version_key(package_id)]
+    defaults = {key: _new_stamp for key in plan_keys}
+    defaults[RULES_VERSION_KEY] = initial_rules_version
+
+    stamps = cache.get_many(list(defaults))
+    for key, default in defaults.items():
+        if key not in stamps:
+            cache.add(key, default(), None)
+            stamps[key] = cache.get(key)
+
+    if any(stamps.get(key) is None for key in plan_keys):
+        plan_version = None
+    else:
+        plan_version = tuple(stamps[key] for key in plan_keys)
+    return plan_version, stamps.get(RULES_VERSION_KEY)
+
+
+def bump_global_version() -> None:
+    """Invalidate every compiled plan (config or components changed)"""
+    cache.set(GLOBAL_VERSION_KEY, _new_stamp(), None)
+
+
+def bump_package_version(package_id) -> None:
+    """Invalidate the compiled plan of a single package"""
+    cache.set(_package_version_key(package_id), _new_stamp(), None)
+
+
+def _snapshot_transport(option) -> TransportSnapshot:
+    return TransportSnapshot(
+        id=option.id,
+        name=option.name,
+        base_price=option.base_price,
+        base_price_per_day=option.base_price_per_day,
+        passenger_capacity=option.passenger_capacity,
+        luggage_capacity=option.luggage_capacity,
+        is_active=option.is_active,
+    )
+
+
+def _compile_global_parts(version: Optional[str]):
+    """Compile the package-independent part of a plan (config + fleet)"""
+    from packages.models import TransportOption
+
+    from ..models import PricingConfiguration
+
+    if version is not None:
+        cached = _global_parts.get("current")
+        if cached and cached[0] == version:
+            return cached[1], cached[2]
+
+    config = PricingConfiguration.get_config()
+    config_snapshot = ConfigSnapshot(
+        chargeable_age_threshold=config.chargeable_age_threshold,
+        price_change_alert_threshold=Decimal(str(config.price_change_alert_threshold)),
+        enable_price_change_alerts=config.enable_price_change_alerts,
+    )
+    vehicles = MappingProxyType(
+        {
+            option.id: _snapshot_transport(option)
+            for option in TransportOption.objects.all()
+        }
+    )
+
+    if version is not None:
+        _global_parts["current"] = (version, config_snapshot, vehicles)
+    return config_snapshot, vehicles
+
+
+def _compile_plan(package, version, global_version, rule_index) -> PricingPlan:
+    config, vehicles = _compile_global_parts(global_version)
+    package_id = package.id if package else None
+
+    if package is not None:
+        experiences = {
+            exp.id: ExperienceSnapshot(
+                id=exp.id,
+                name=exp.name,
+                base_price=exp.base_price,
+                is_active=exp.is_active,
+            )
+            for exp in package.experiences.all().order_by("name")
+        }
+        hotel_tiers = {
+            tier.id: HotelTierSnapshot(
+                id=tier.id,
+                name=tier.name,
+                base_price_per_night=tier.base_price_per_night,
+                weekend_multiplier=tier.weekend_multiplier,
+                price_multiplier=tier.price_multiplier,
+            )
+            for tier in package.hotel_tiers.all()
+        }
+        transport_ids = set(package.transport_options.values_list("id", flat=True))
+        transport_options = {
+            option_id: vehicles[option_id]
+            for option_id in transport_ids
+            if option_id in vehicles
+        }
+    else:
+        experiences, hotel_tiers, transport_options = {}, {}, {}
+
+    logger.info(
+        f"Compiled pricing plan for package {package_id or 'global'}: "
+        f"{len(experiences)} experiences, {len(hotel_tiers)} hotel tiers, "
+        f"{len(transport_options)} transport options"
+    )
+
+    return PricingPlan(
+        package_id=package_id,
+        version=version,
+        config=config,
+        experiences=MappingProxyType(experiences),
+        hotel_tiers=MappingProxyType(hotel_tiers),
+        transport_options=MappingProxyType(transport_options),
+        vehicles=vehicles,
+        rule_index=rule_index,
+    )
+
+
+def get_pricing_plan(package) -> PricingPlan:
+    """
+    Get the compiled pricing plan for a package (or the global plan for None).
+    Warm path: one cache round trip for the version stamps, no SQL.
+    Rule changes only swap in the new shared rule index; they do not
+    recompile plans.
+    """
+    package_id = package.id if package else None
+    version, rules_version = _read_versions(package_id)
+    rule_index = get_rule_index(rules_version)
+
+    if version is not None:
+        plan = _plans.get(package_id)
+        if plan is not None and plan.version == version:
+            if plan.rule_index is not rule_index:
+                plan = replace(plan, rule_index=rule_index)
+                with _lock:
+                    _plans[package_id] = plan
+            return plan
+
+    plan = _compile_plan(package, version, version[0] if version else None, rule_index)
+
+    if version is not None:
+        with _lock:
+            _plans[package_id] = plan
+    return plan
+
+
+def get_config_snapshot() -> ConfigSnapshot:
+    """Get the pricing configuration snapshot without touching the database"""
+    stamps = cache.get(GLOBAL_VERSION_KEY)
+    if stamps is None:
+        cache.add(GLOBAL_VERSION_KEY, _new_stamp(), None)
+        stamps = cache.get(GLOBAL_VERSION_KEY)
+    config, _ = _compile_global_parts(stamps)
+    return config
+
+
+def clear_local_plans() -> None:
+    """Drop all compiled plans (and the rule index) held by this process"""
+    with _lock:
+        _plans.clear()
+        _global_parts.clear()
+    clear_local_index()
@@ -2,10 +2,20 @@ import logging
 from decimal import Decimal
 
 from django.core.cache import cache
-from django.db.models import Q
 from django.utils import timezone
 
-from ..models import PricingRule
+from packages.cache import bump_namespace, namespaced_key
+
+from backend.metrics import PRICING_EVALUATIONS
+
+from .price_quote import PriceQuote
+from .pricing_plan import (
+    bump_global_version,
+    bump_package_version,
+    get_config_snapshot,
+    get_pricing_plan,
+)
+from .rule_index import bump_rules_version, get_rule_index
 
 logger = logging.getLogger(__name__)
 
@@ -19,13 +29,11 @@ class PricingService:
     def get_chargeable_age_threshold():
         """
         Get the chargeable age threshold from configuration.
+        Served from the compiled configuration snapshot (no SQL when warm).
         Falls back to default if configuration is not available.
         """
         try:
-            from ..models import PricingConfiguration
-
-            config = PricingConfiguration.get_config()
-            return config.chargeable_age_threshold
+            return get_config_snapshot().chargeable_age_threshold
         except Exception as e:
             logger.warning(
                 f"Failed to get age threshold from config: {e}. Using default."
@@ -113,6 +121,42 @@ class PricingService:
                 "uses_new_pricing": False,
             }
 
+    @staticmethod
+    def quote(
+        package,
+        experiences,
+        hotel_tier,
+        transport_option,
+        travelers=None,
+        start_date=None,
+        end_date=None,
+        num_rooms=1,
+        num_travelers=1,
+        vehicle_allocation=None,
+    ):
+        """
+        Core price computation: totals only, against the compiled pricing plan.
+        Detailed rows (per night, per vehicle, per rule) are not built here.
+
+        Args: same as get_price_breakdown.
+
+        Returns:
+            PriceQuote: totals (final_total, subtotals, markup/discount, ...)
+        """
+        PRICING_EVALUATIONS.labels("quote").inc()
+        return PriceQuote.compute(
+            get_pricing_plan(package),
+            experiences,
+            hotel_tier,
+            transport_option,
+            travelers=travelers,
+            start_date=start_date,
+            end_date=end_date,
+            num_rooms=num_rooms,
+            num_travelers=num_travelers,
+            vehicle_allocation=vehicle_allocation,
+        )
+
     @staticmethod
     def calculate_total(
         package,
@@ -147,8 +191,8 @@ class PricingService:
         Returns:
             Decimal: Total price (per-person if travelers not provided, total if provided)
         """
-        # Get price breakdown for detailed calculation
-        breakdown = PricingService.get_price_breakdown(
+        # Totals-only fast path: no breakdown is built
+        return PricingService.quote(
             package,
             experiences,
             hotel_tier,
@@ -159,9 +203,7 @@ class PricingService:
             num_rooms,
             num_travelers=num_travelers,
             vehicle_allocation=vehicle_allocation,
-        )
-
-        return breakdown["final_total"]
+        ).final_total
 
     @staticmethod
     def get_price_breakdown(
@@ -196,239 +238,268 @@ class PricingService:
             vehicle_allocation: Optional list of {"transport_option_id": int, "count": int}
 
         Returns:
-            dict: Detailed price breakdown including age-based calculations and hotel costs
+            PriceBreakdown: read-only mapping with the detailed breakdown including
+            age-based calculations and hotel costs. Detail lists (hotel_breakdown,
+            vehicle_breakdown, applied_rules) are expanded on first access; use
+            to_dict() for a plain dict.
+        """
+        return PricingService.quote(
+            package,
+            experiences,
+            hotel_tier,
+            transport_option,
+            travelers,
+            start_date,
+            end_date,
+            num_rooms,
+            num_travelers=num_travelers,
+            vehicle_allocation=vehicle_allocation,
+        ).breakdown()
+
+    @staticmethod
+    def get_price_breakdowns_bulk(package, combinations):
         """
-        from math import ceil
+        Price many component combinations of one package in a single pass.
 
-        # 1. Base experiences price (PHASE 3: Use chargeable travelers for age-based pricing)
-        base_experience_per_person = (
-            sum(Decimal(str(exp.base_price)) for exp in experiences)
-            if experiences
-            else Decimal("0.00")
-        )
+        All referenced components are resolved up front: package components
+        and rules come from the compiled pricing plan, and IDs outside the
+        package are loaded with at most one query per component type, so the
+        query count does not grow with the number of combinations.
 
-        # PHASE 3: Calculate chargeable travelers first for accurate pricing
-        age_threshold = PricingService.get_chargeable_age_threshold()
-        chargeable_travelers = num_travelers  # Default to all travelers
-        total_travelers = num_travelers
+        Args:
+            package: Package instance
+            combinations: list of dicts with keys
+                experience_ids: list of int
+                hotel_tier_id: int
+                transport_option_id: Optional int
+                travelers, start_date, end_date, num_rooms, num_travelers,
+                vehicle_allocation: as in get_price_breakdown (optional)
 
-        if travelers:
-            total_travelers = len(travelers)
-            chargeable_travelers = sum(
-                1 for t in travelers if t.get("age", 0) >= age_threshold
+        Returns:
+            list: one dict per combination, in order. Either
+                {"breakdown": PriceBreakdown, "experiences": [...],
+                 "hotel_tier": ..., "transport_option": ...}
+            or {"error": str} if that combination is invalid.
+        """
+        from packages.models import Experience, HotelTier, TransportOption
+
+        PRICING_EVALUATIONS.labels("bulk").inc(len(combinations))
+        plan = get_pricing_plan(package)
+
+        # Collect IDs the plan cannot resolve, then load each type in one query
+        missing_experience_ids = set()
+        missing_hotel_ids = set()
+        missing_transport_ids = set()
+        for combo in combinations:
+            for exp_id in combo.get("experience_ids", []):
+                if exp_id not in plan.experiences:
+                    missing_experience_ids.add(exp_id)
+            hotel_tier_id = combo.get("hotel_tier_id")
+            if hotel_tier_id not in plan.hotel_tiers:
+                missing_hotel_ids.add(hotel_tier_id)
+            transport_option_id = combo.get("transport_option_id")
+            if (
+                transport_option_id is not None
+                and transport_option_id not in plan.transport_options
+            ):
+                missing_transport_ids.add(transport_option_id)
+
+        # Experiences outside the package are only needed to tell
+        # "not found" apart from "does not belong to this package"
+        existing_experience_ids = (
+            set(
+                Experience.objects.filter(
+                    id__in=missing_experience_ids, is_active=True
+                ).values_list("id", flat=True)
             )
-
-        # Use chargeable travelers for experience cost calculation
-        base_experience_total = base_experience_per_person * Decimal(
-            str(chargeable_travelers)
+            if missing_experience_ids
+            else set()
+        )
+        extra_hotel_tiers = (
+            HotelTier.objects.in_bulk(missing_hotel_ids) if missing_hotel_ids else {}
+        )
+        extra_transport_options = (
+            TransportOption.objects.in_bulk(missing_transport_ids)
+            if missing_transport_ids
+            else {}
         )
 
-        # 2. Transport cost calculation (VEHICLE OPTIMIZATION)
-        if vehicle_allocation and len(vehicle_allocation) > 0:
-            # Use vehicle allocation pricing
-            from packages.models import TransportOption
-
-            num_days = 1
-            if start_date and end_date:
-                num_days = max(1, ceil((end_date - start_date).days))
-
-            transport_cost = Decimal("0.00")
-            vehicle_breakdown = []
-
-            for allocation in vehicle_allocation:
-                transport_id = allocation.get("transport_option_id")
-                count = allocation.get("count", 0)
-
-                if transport_id and count > 0:
-                    try:
-                        vehicle = TransportOption.objects.get(id=transport_id)
-                        price_per_day = vehicle.get_effective_price_per_day()
-                        vehicle_cost = price_per_day * count * num_days
-                        transport_cost += vehicle_cost
-
-                        vehicle_breakdown.append(
-                            {
-                                "transport_option_id": transport_id,
-                                "name": vehicle.name,
-                                "count": count,
-                                "price_per_day": str(price_per_day),
-                                "total_cost": str(vehicle_cost),
-                            }
-                        )
-                    except TransportOption.DoesNotExist:
-                        logger.warning(f"Transport option {transport_id} not found")
-
-            uses_vehicle_allocation = True
-        else:
-            # Legacy: Use single transport_option
-            transport_cost = (
-                transport_option.base_price if transport_option else Decimal("0.00")
-            )
-            vehicle_breakdown = []
-            uses_vehicle_allocation = False
-
-        # 3. Hotel cost calculation (PHASE 1: New logic)
-        hotel_cost_info = None
-        if hotel_tier.base_price_per_night:
-            # Use new date-based pricing if base_price_per_night is set
-            if start_date and end_date:
-                # Use provided dates
-                hotel_cost_info = PricingService.calculate_hotel_cost(
-                    hotel_tier, start_date, end_date, num_rooms
+        # One pricing moment for the whole batch keeps results comparable
+        now = timezone.now()
+        results = []
+        for combo in combinations:
+            experience_ids = combo.get("experience_ids", [])
+            experiences = plan.get_experiences(experience_ids)
+            if experiences is None:
+                foreign_ids = [i for i in experience_ids if i not in plan.experiences]
+                all_found = all(
+                    (
+                        plan.experiences[i].is_active
+                        if i in plan.experiences
+                        else i in existing_experience_ids
+                    )
+                    for i in experience_ids
                 )
-                hotel_cost = hotel_cost_info["total_cost"] or Decimal("0.00")
-            else:
-                # Fallback: Use 1 night with base price (better than multiplier)
-                hotel_cost = hotel_tier.base_price_per_night * num_rooms
-                hotel_cost_info = {
-                    "uses_new_pricing": True,
-                    "total_cost": hotel_cost,
-                    "cost_per_night": hotel_tier.base_price_per_night,
-                    "num_nights": 1,
-                    "num_rooms": num_rooms,
-                    "breakdown": [],
-                }
-        else:
-            # Legacy: Use multiplier-based pricing only if base_price_per_night not set
-            hotel_cost = Decimal("0.00")
-            hotel_cost_info = {
-                "uses_new_pricing": False,
-                "total_cost": None,
-                "cost_per_night": None,
-                "num_nights": 1,
-                "num_rooms": num_rooms,
-                "breakdown": [],
-            }
+                if all_found and foreign_ids:
+                    error = f"Experience ID {foreign_ids[0]} does not belong to this package"
+                else:
+                    error = "One or more experiences not found or inactive"
+                results.append({"error": error})
+                continue
 
-        # 4. Subtotal calculation
-        if hotel_cost_info["uses_new_pricing"]:
-            # New model: Add hotel cost directly
-            subtotal_before_rules = base_experience_total + transport_cost + hotel_cost
-            # For display: subtotal includes all components before taxes
-            subtotal_before_hotel = base_experience_total + transport_cost
-            subtotal_after_hotel = base_experience_total + transport_cost + hotel_cost
-        else:
-            # Legacy model: Apply multiplier
-            subtotal_before_hotel = base_experience_total + transport_cost
-            subtotal_after_hotel = subtotal_before_hotel * hotel_tier.price_multiplier
-            subtotal_before_rules = subtotal_after_hotel
+            hotel_tier_id = combo.get("hotel_tier_id")
+            hotel_tier = plan.hotel_tiers.get(hotel_tier_id) or extra_hotel_tiers.get(
+                hotel_tier_id
+            )
+            if hotel_tier is None:
+                results.append({"error": f"Hotel tier {hotel_tier_id} not found"})
+                continue
+
+            transport_option_id = combo.get("transport_option_id")
+            transport_option = None
+            if transport_option_id is not None:
+                transport_option = plan.transport_options.get(
+                    transport_option_id
+                ) or extra_transport_options.get(transport_option_id)
+                if transport_option is None:
+                    results.append(
+                        {"error": f"Transport option {transport_option_id} not found"}
+                    )
+                    continue
+
+            quote = PriceQuote.compute(
+                plan,
+                experiences,
+                hotel_tier,
+                transport_option,
+                travelers=combo.get("travelers"),
+                start_date=combo.get("start_date"),
+                end_date=combo.get("end_date"),
+                num_rooms=combo.get("num_rooms", 1),
+                num_travelers=combo.get("num_travelers", 1),
+                vehicle_allocation=combo.get("vehicle_allocation"),
+                at=now,
+            )
+            results.append(
+                {
+                    "breakdown": quote.breakdown(),
+                    "experiences": experiences,
+                    "hotel_tier": hotel_tier,
+                    "transport_option": transport_option,
+                }
+            )
 
-        # 5. Apply Pricing Rules
-        applicable_rules = PricingService.get_applicable_rules(package)
+        logger.info(
+            f"Priced {len(combinations)} combinations for package {package.slug}"
+        )
+        return results
 
-        total_markup = Decimal("0.00")
-        total_discount = Decimal("0.00")
-        applied_rules = []
+    @staticmethod
+    def get_price_calendar(
+        package,
+        experiences,
+        hotel_tier,
+        transport_option,
+        first_start,
+        num_days,
+        trip_nights,
+        num_rooms=1,
+        num_travelers=1,
+    ):
+        """
+        Get the total price of a selection for every start date in a window.
 
-        current_total = subtotal_before_rules
+        Cached per package + selection hash. The compiled plan and rule index
+        versions are part of the key, so component and rule changes
+        invalidate it, and the timeout never outlives the next pricing rule
+        start/expiry.
 
-        for rule in applicable_rules:
-            rule_amount = Decimal("0.00")
+        Args:
+            package: Package instance
+            experiences: list of Experience instances (or plan snapshots)
+            hotel_tier: HotelTier instance
+            transport_option: Optional TransportOption instance
+            first_start: datetime.date - First start date
+            num_days: int - Number of start dates
+            trip_nights: int - Nights per stay
+            num_rooms: Number of rooms required (default: 1)
+            num_travelers: Number of travelers (default: 1)
 
-            if rule.rule_type == "MARKUP":
-                if rule.is_percentage:
-                    rule_amount = current_total * (rule.value / Decimal("100"))
-                else:
-                    rule_amount = rule.value
-                total_markup += rule_amount
-                current_total += rule_amount
+        Returns:
+            dict: {
+                'days': list of {start_date, end_date, total_price},
+                'cheapest': the cheapest day (earliest on ties),
+            }
+        """
+        import hashlib
+        import json
+
+        from django.conf import settings
+
+        from .price_calendar import compute_price_calendar
+
+        plan = get_pricing_plan(package)
+        selection = {
+            "version": [plan.version, plan.rule_index.version],
+            "experiences": sorted(exp.id for exp in experiences),
+            "hotel_tier": hotel_tier.id,
+            "transport": transport_option.id if transport_option else None,
+            "first_start": first_start.isoformat(),
+            "num_days": num_days,
+            "trip_nights": trip_nights,
+            "num_rooms": num_rooms,
+            "num_travelers": num_travelers,
+        }
+        selection_hash = hashlib.sha256(
+            json.dumps(selection, sort_keys=True).encode()
+        ).hexdigest()
+        cache_key = namespaced_key(
+            "pricing", f"price_calendar:{package.id}:{selection_hash}"
+        )
 
-            elif rule.rule_type == "DISCOUNT":
-                if rule.is_percentage:
-                    rule_amount = current_total * (rule.value / Decimal("100"))
-                else:
-                    rule_amount = rule.value
-                total_discount += rule_amount
-                current_total -= rule_amount
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-            applied_rules.append(
-                {
-                    "name": rule.name,
-                    "type": rule.rule_type,
-                    "value": str(rule.value),
-                    "is_percentage": rule.is_percentage,
-                    "amount_applied": str(rule_amount),
-                }
-            )
+        now = timezone.now()
+        calendar = compute_price_calendar(
+            plan,
+            experiences,
+            hotel_tier,
+            transport_option,
+            first_start,
+            num_days,
+            trip_nights,
+            num_rooms=num_rooms,
+            num_travelers=num_travelers,
+            at=now,
+        )
+        days = [
+            {"start_date": start, "end_date": end, "total_price": total}
+            for start, end, total in calendar
+        ]
+        result = {
+            "days": days,
+            "cheapest": min(days, key=lambda day: day["total_price"], default=None),
+        }
 
-        # Ensure minimum price (never negative)
-        final_total = max(current_total, Decimal("0.00")).quantize(Decimal("0.01"))
+        timeout = getattr(settings, "CACHE_TTL", {}).get("price_calendar", 900)
+        if plan.version is not None and plan.rule_index.version is not None:
+            next_boundary = plan.next_rule_boundary(now)
+            if next_boundary is not None:
+                timeout = min(timeout, int((next_boundary - now).total_seconds()))
+            if timeout > 0:
+                cache.set(cache_key, result, timeout)
 
-        # Age-based pricing already applied in base calculation
-        # final_total is the total for all chargeable travelers
-        total_amount = final_total
-        if chargeable_travelers > 0:
-            per_person_price = (
-                total_amount / Decimal(str(chargeable_travelers))
-            ).quantize(Decimal("0.01"))
-        else:
-            per_person_price = total_amount
-
-        return {
-            "base_experience_total": base_experience_total.quantize(Decimal("0.01")),
-            "transport_cost": transport_cost.quantize(Decimal("0.01")),
-            "subtotal_before_hotel": subtotal_before_hotel.quantize(Decimal("0.01")),
-            "hotel_multiplier": hotel_tier.price_multiplier,
-            "subtotal_after_hotel": subtotal_after_hotel.quantize(Decimal("0.01")),
-            # PHASE 1: New hotel cost fields
-            "hotel_cost": (
-                hotel_cost.quantize(Decimal("0.01"))
-                if hotel_cost_info["uses_new_pricing"]
-                else None
-            ),
-            "hotel_cost_per_night": (
-                hotel_cost_info["cost_per_night"].quantize(Decimal("0.01"))
-                if hotel_cost_info["cost_per_night"]
-                else None
-            ),
-            "hotel_num_nights": hotel_cost_info["num_nights"],
-            "hotel_num_rooms": hotel_cost_info["num_rooms"],
-            "hotel_breakdown": hotel_cost_info["breakdown"],
-            "uses_new_hotel_pricing": hotel_cost_info["uses_new_pricing"],
-            # End PHASE 1 additions
-            # PHASE 2: Traveler count
-            "num_travelers": total_travelers if travelers else num_travelers,
-            "base_experience_per_person": base_experience_per_person.quantize(
-                Decimal("0.01")
-            ),
-            # End PHASE 2 additions
-            # VEHICLE OPTIMIZATION: Vehicle allocation fields
-            "uses_vehicle_allocation": uses_vehicle_allocation,
-            "vehicle_breakdown": vehicle_breakdown,
-            # End VEHICLE OPTIMIZATION additions
-            "total_markup": total_markup.quantize(Decimal("0.01")),
-            "total_discount": total_discount.quantize(Decimal("0.01")),
-            "final_total": final_total,  # Total price for all chargeable travelers
-            "applied_rules": applied_rules,
-            # Age-based pricing fields
-            "chargeable_travelers": chargeable_travelers,
-            "total_travelers": total_travelers if travelers else num_travelers,
-            "total_amount": total_amount,  # Same as final_total (already includes chargeable travelers)
-            "per_person_price": per_person_price,
-            "chargeable_age_threshold": age_threshold,
-        }
+        return result
 
     @staticmethod
     def get_applicable_rules(package):
         """
-        Get all pricing rules applicable to a package
+        Get all pricing rules applicable to a package (as rule snapshots),
+        in chronological order. Served from the shared rule index.
         """
-        cache_key = f"pricing_rules_{package.id if package else 'global'}"
-        cached_rules = cache.get(cache_key)
-
-        if cached_rules is not None:
-            return cached_rules
-
-        now = timezone.now()
-        active_rules = (
-            PricingRule.objects.filter(is_active=True, active_from__lte=now)
-            .filter(Q(active_to__gte=now) | Q(active_to__isnull=True))
-            .filter(Q(target_package=package) | Q(target_package__isnull=True))
-            .order_by("active_from")
-        )  # Apply rules in chronological order
-
-        # Cache for 5 minutes
-        cache.set(cache_key, list(active_rules), 300)
+        active_rules = get_rule_index().active_rules(package.id if package else None)
 
         logger.info(
             f"Applied {len(active_rules)} pricing rules for package {package.slug if package else 'global'}"
@@ -470,68 +541,49 @@ class PricingService:
     @staticmethod
     def get_price_estimate_range(package):
         """
-        Get min/max price estimates for a package
+        Get min/max price estimates for a package.
+        Served from the materialized PackagePriceRange row; a missing row,
+        or one past its valid_until (a pricing rule started or expired since),
+        is computed from the compiled pricing plan and stored.
         """
-        try:
-            # Get cheapest combination
-            cheapest_experiences = package.experiences.order_by("base_price")[:1]
-            cheapest_hotel = (
-                package.hotel_tiers.filter(base_price_per_night__isnull=False)
-                .order_by("base_price_per_night")
-                .first()
-                or package.hotel_tiers.order_by("price_multiplier").first()
-            )
-            cheapest_transport = package.transport_options.order_by(
-                "base_price"
-            ).first()
+        from ..models import PackagePriceRange
+        from .price_range import build_price_range
 
-            min_price = PricingService.calculate_total(
-                package, cheapest_experiences, cheapest_hotel, cheapest_transport
-            )
+        now = timezone.now()
+        try:
+            if not package.price_range.is_stale(now):
+                return package.price_range.as_dict()
+        except PackagePriceRange.DoesNotExist:
+            pass
 
-            # Get most expensive combination
-            most_expensive_experiences = package.experiences.order_by("-base_price")[
-                :3
-            ]  # Assume max 3 experiences
-            most_expensive_hotel = (
-                package.hotel_tiers.filter(base_price_per_night__isnull=False)
-                .order_by("-base_price_per_night")
-                .first()
-                or package.hotel_tiers.order_by("-price_multiplier").first()
-            )
-            most_expensive_transport = package.transport_options.order_by(
-                "-base_price"
-            ).first()
-
-            max_price = PricingService.calculate_total(
-                package,
-                most_expensive_experiences,
-                most_expensive_hotel,
-                most_expensive_transport,
+        row = build_price_range(get_pricing_plan(package), now)
+        try:
+            PackagePriceRange.objects.update_or_create(
+                package=package,
+                defaults={
+                    "min_price": row.min_price,
+                    "max_price": row.max_price,
+                    "currency": row.currency,
+                    "valid_until": row.valid_until,
+                },
             )
-
-            return {"min_price": min_price, "max_price": max_price, "currency": "INR"}
-
         except Exception as e:
-            logger.error(
-                f"Error calculating price range for package {package.slug}: {str(e)}"
+            logger.warning(
+                f"Could not store price range for package {package.slug}: {str(e)}"
             )
-            return {
-                "min_price": Decimal("0.00"),
-                "max_price": Decimal("0.00"),
-                "currency": "INR",
-            }
+        return row.as_dict()
 
     @staticmethod
     def clear_pricing_cache(package_id=None):
         """
-        Clear pricing cache for a specific package or all packages
+        Clear pricing cache for a specific package or all packages.
+        Only pricing data is invalidated; other cached data is untouched.
         """
         if package_id:
-            cache_key = f"pricing_rules_{package_id}"
-            cache.delete(cache_key)
+            bump_package_version(package_id)
         else:
-            # Clear all pricing caches (this is a simple approach)
-            cache.clear()
+            bump_global_version()
+            bump_rules_version()
+        bump_namespace("pricing")
 
         logger.info(f"Cleared pricing cache for package {package_id or 'all'}")
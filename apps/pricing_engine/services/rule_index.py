@@ -0,0 +1,212 @@
+"""
+Pricing Rule Index
+
+One in-process index over every active, unexpired PricingRule (global and
+per-package), shared by all packages. Rules are grouped by target and kept
+sorted by active_from, so the rules in effect at a moment are found with a
+bisect instead of a query.
+
+The index is rebuilt only when the rule version counter changes; the
+counter lives in the shared cache and is incremented by the PricingRule
+save/delete signal handlers. Rule windows are evaluated per lookup, so
+results are exact at active_from/active_to boundaries, and lookups are
+memoized per package for the stretch of time until the next boundary.
+"""
+
+import logging
+import random
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from heapq import merge
+from operator import attrgetter
+from typing import Optional
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+RULES_VERSION_KEY = "pricing_rules_version"
+
+_by_active_from = attrgetter("active_from")
+
+
+@dataclass(frozen=True)
+class RuleSnapshot:
+    """Pricing-relevant fields of a PricingRule"""
+
+    id: int
+    name: str
+    rule_type: str
+    value: Decimal
+    is_percentage: bool
+    target_package_id: Optional[int]
+    active_from: datetime
+    active_to: Optional[datetime]
+
+    def is_active_at(self, moment: datetime) -> bool:
+        if self.active_from > moment:
+            return False
+        return self.active_to is None or self.active_to >= moment
+
+
+class RuleIndex:
+    """Immutable interval index over pricing rules"""
+
+    def __init__(self, version, rules):
+        self.version = version
+        self.rules = tuple(sorted(rules, key=_by_active_from))
+
+        # Rules per target package (None = global), each sorted by active_from
+        by_target = {}
+        for rule in self.rules:
+            by_target.setdefault(rule.target_package_id, []).append(rule)
+        self._by_target = {
+            target: (tuple(rule.active_from for rule in group), tuple(group))
+            for target, group in by_target.items()
+        }
+
+        # The active set only changes when a rule starts (at active_from) or
+        # expires (right after active_to), so these two counts identify the
+        # stretch of time a lookup is valid for
+        self._starts = sorted(rule.active_from for rule in self.rules)
+        self._ends = sorted(
+            rule.active_to for rule in self.rules if rule.active_to is not None
+        )
+        self._memo = {}
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _segment(self, moment):
+        return bisect_right(self._starts, moment), bisect_left(self._ends, moment)
+
+    def _started(self, target, moment):
+        starts, group = self._by_target.get(target, ((), ()))
+        return group[: bisect_right(starts, moment)]
+
+    def active_rules(self, package_id=None, at: Optional[datetime] = None) -> tuple:
+        """
+        Rules in effect for a package at a moment, in chronological order.
+
+        Args:
+            package_id: Package ID, or None for global rules only
+            at: Moment to evaluate (default: now)
+        """
+        moment = at or timezone.now()
+        memo_key = (package_id, self._segment(moment))
+        rules = self._memo.get(memo_key)
+        if rules is None:
+            candidates = self._started(None, moment)
+            if package_id is not None:
+                candidates = merge(
+                    candidates,
+                    self._started(package_id, moment),
+                    key=_by_active_from,
+                )
+            rules = tuple(
+                rule
+                for rule in candidates
+                if rule.active_to is None or rule.active_to >= moment
+            )
+            self._memo[memo_key] = rules
+        return rules
+
+    def next_boundary(self, at: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        The next moment after ``at`` when any rule starts or expires, or None.
+        Anything derived from active_rules(at) stays valid until then.
+        """
+        moment = at or timezone.now()
+        candidates = []
+        i = bisect_right(self._starts, moment)
+        if i < len(self._starts):
+            candidates.append(self._starts[i])
+        j = bisect_left(self._ends, moment)
+        if j < len(self._ends):
+            candidates.append(self._ends[j])
+        return min(candidates, default=None)
+
+
+_index = {}
+_lock = threading.Lock()
+
+
+def initial_rules_version() -> int:
+    """
+    Starting value for the rule version counter. Random, so a counter
+    recreated after a cache flush never matches an index built earlier.
+    """
+    return random.getrandbits(48)
+
+
+def _read_version():
+    version = cache.get(RULES_VERSION_KEY)
+    if version is None:
+        cache.add(RULES_VERSION_KEY, initial_rules_version(), None)
+        version = cache.get(RULES_VERSION_KEY)
+    return version
+
+
+def bump_rules_version() -> None:
+    """Force every process to rebuild its rule index (a rule changed)"""
+    try:
+        cache.incr(RULES_VERSION_KEY)
+    except ValueError:
+        # Counter missing (cache flushed); any new value invalidates
+        cache.add(RULES_VERSION_KEY, initial_rules_version(), None)
+
+
+def _build_index(version) -> RuleIndex:
+    from ..models import PricingRule
+
+    now = timezone.now()
+    rules = [
+        RuleSnapshot(
+            id=rule.id,
+            name=rule.name,
+            rule_type=rule.rule_type,
+            value=rule.value,
+            is_percentage=rule.is_percentage,
+            target_package_id=rule.target_package_id,
+            active_from=rule.active_from,
+            active_to=rule.active_to,
+        )
+        for rule in PricingRule.objects.filter(is_active=True).filter(
+            Q(active_to__gte=now) | Q(active_to__isnull=True)
+        )
+    ]
+    logger.info(f"Built pricing rule index v{version}: {len(rules)} rules")
+    return RuleIndex(version, rules)
+
+
+def get_rule_index(version=None) -> RuleIndex:
+    """
+    Get the shared rule index, rebuilding it if the rule version changed.
+
+    Args:
+        version: Rule version already read from the cache (saves a round trip)
+    """
+    if version is None:
+        version = _read_version()
+
+    if version is not None:
+        index = _index.get("current")
+        if index is not None and index.version == version:
+            return index
+
+    index = _build_index(version)
+    if version is not None:
+        with _lock:
+            _index["current"] = index
+    return index
+
+
+def clear_local_index() -> None:
+    """Drop the rule index held by this process"""
+    with _lock:
+        _index.clear()
@@ -2,17 +2,20 @@
 Vehicle Selection Optimization Engine
 
 Implements mathematical optimization for multi-vehicle combinations:
-- Integer linear programming approach
+- Bounded knapsack dynamic programming over seat capacity
 - Lexicographic ranking (vehicle count > unused seats > cost)
 - Dominance elimination
-- Pruning for performance
+- Node and time budgets for performance
 """
 
+import heapq
+import itertools
 import logging
+import time
 from dataclasses import dataclass
 from decimal import Decimal
 from math import ceil
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -99,7 +102,402 @@ class VehicleCombination:
 class VehicleOptimizationEngine:
     """
     Mathematical optimization engine for vehicle selection.
-    Implements integer linear programming with pruning and dominance elimination.
+
+    Exact bounded-knapsack dynamic program over seat capacity:
+    - Vehicle types are processed one at a time, adding one vehicle at a
+      time; a partial allocation is a state (vehicle count, capacity) and
+      only its cheapest cost is kept. Ties are distinct Pareto solutions:
+      the first max_ties count vectors of a state (in enumeration order)
+      are kept, which is enough for the first max_ties solutions of every
+      tie, since a state's vectors all share the same completions
+    - A partial state is dropped when another with the same capacity, or a
+      final state with no unused seats, uses no more vehicles and costs no more
+    - A state that already seats everyone is final: adding any vehicle makes
+      it strictly worse on every criterion, so it cannot be on the Pareto front
+    - The Pareto front is extracted from the sorted final states, comparing
+      each state against the front only
+
+    The result is the Pareto front over all allocations with at most
+    ceil(passengers / capacity) vehicles of each type, ranked by
+    VehicleCombination.__lt__.
+    """
+
+    # Work limits; when exceeded the best front found so far is returned.
+    # Nodes count expanded states and the tied allocations they carry.
+    DEFAULT_MAX_NODES = 200_000
+    DEFAULT_TIME_BUDGET = 0.5  # seconds
+    # Tied allocations kept per state (the API returns at most 20 solutions)
+    DEFAULT_MAX_TIES = 20
+    # Nodes between two deadline checks
+    TIME_CHECK_INTERVAL = 1024
+
+    def __init__(
+        self,
+        vehicle_types: List[VehicleType],
+        passenger_count: int,
+        num_days: int,
+        max_nodes: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        max_ties: Optional[int] = None,
+    ):
+        """
+        Initialize optimization engine.
+
+        Args:
+            vehicle_types: List of available active vehicle types
+            passenger_count: Number of passengers to accommodate
+            num_days: Number of days for pricing calculation
+            max_nodes: Maximum number of states and tied allocations to
+                expand (default: DEFAULT_MAX_NODES)
+            time_budget: Maximum solve time in seconds (default: DEFAULT_TIME_BUDGET)
+            max_ties: Tied allocations kept per state (default: DEFAULT_MAX_TIES)
+        """
+        self.vehicle_types = [
+            v for v in vehicle_types if v.is_active and v.passenger_capacity > 0
+        ]
+        self.passenger_count = passenger_count
+        self.num_days = max(1, ceil(num_days))
+        self.best_vehicle_count = float("inf")
+        self.solutions: List[VehicleCombination] = []
+        self.max_nodes = max_nodes if max_nodes is not None else self.DEFAULT_MAX_NODES
+        self.time_budget = (
+            time_budget if time_budget is not None else self.DEFAULT_TIME_BUDGET
+        )
+        self.max_ties = max_ties if max_ties is not None else self.DEFAULT_MAX_TIES
+        self.nodes_expanded = 0
+        self.budget_exhausted = False
+
+        # Calculate upper bounds for each vehicle type
+        self.max_counts = {
+            v.id: ceil(passenger_count / v.passenger_capacity)
+            for v in self.vehicle_types
+        }
+
+    def optimize(self, max_solutions: int = 10) -> List[VehicleCombination]:
+        """
+        Find optimal vehicle combinations.
+
+        Args:
+            max_solutions: Maximum number of solutions to return
+
+        Returns:
+            List of VehicleCombination sorted by priority (best first)
+        """
+        if not self.vehicle_types:
+            logger.warning("No active vehicle types available for optimization")
+            return []
+
+        if self.passenger_count <= 0:
+            logger.warning("Invalid passenger count: %d", self.passenger_count)
+            return []
+
+        final_states, _ = self._solve(max_ties=max(self.max_ties, max_solutions))
+        if not final_states:
+            final_states = self._fallback_states()
+
+        # VehicleCombination.__lt__ order; ties keep the enumeration order
+        # of the count vector (first vehicle type varies slowest)
+        ranked = sorted(
+            (vehicle_count, capacity - self.passenger_count, cost, counts)
+            for (vehicle_count, capacity), (cost, count_vectors) in final_states.items()
+            for counts in count_vectors
+        )
+        self.solutions = [
+            self._build_combination(counts, cost)
+            for _, _, cost, counts in self._pareto_front(ranked)
+        ]
+        if self.solutions:
+            self.best_vehicle_count = self.solutions[0].total_vehicle_count
+
+        return self.solutions[:max_solutions]
+
+    def optimize_all_group_sizes(self) -> Dict[int, List[VehicleCombination]]:
+        """
+        Find the full ranked Pareto front for every group size from 1 to
+        passenger_count in one sweep.
+
+        One table of cheapest allocations per (vehicle count, capacity) is
+        built for the largest group; the front for a group of P is then
+        taken from the allocations seating P to P + largest capacity - 1
+        (every front allocation seats fewer than P without its last vehicle).
+
+        Returns:
+            dict: passenger count -> solutions, best first, with up to
+            max_ties allocations per tie (empty if the budget ran out)
+        """
+        if not self.vehicle_types or self.passenger_count <= 0:
+            return {}
+
+        final_states, partial_states = self._solve(prune_exact=False)
+        if self.budget_exhausted:
+            return {}
+
+        by_capacity = {}
+        for (vehicle_count, seats), (cost, count_vectors) in itertools.chain(
+            partial_states.items(), final_states.items()
+        ):
+            by_capacity.setdefault(seats, []).extend(
+                (vehicle_count, cost, counts) for counts in count_vectors
+            )
+
+        largest = max(v.passenger_capacity for v in self.vehicle_types)
+        fronts = {}
+        for passengers in range(1, self.passenger_count + 1):
+            ranked = sorted(
+                (vehicle_count, seats - passengers, cost, counts)
+                for seats in range(passengers, passengers + largest)
+                for vehicle_count, cost, counts in by_capacity.get(seats, ())
+            )
+            fronts[passengers] = [
+                self._build_combination(counts, cost, passengers)
+                for _, _, cost, counts in self._pareto_front(ranked)
+            ]
+        return fronts
+
+    def _solve(
+        self, prune_exact: bool = True, max_ties: Optional[int] = None
+    ) -> Tuple[dict, dict]:
+        """
+        Run the dynamic program.
+
+        Args:
+            prune_exact: Drop partial states beaten by an exact-fit final
+                state (only valid for this passenger count)
+            max_ties: Tied allocations kept per state (default: max_ties)
+
+        Returns:
+            tuple: (final states, partial states), each
+            (vehicle count, capacity) -> (cost per day, [count vectors]).
+            Partial states are the allocations over all vehicle types that
+            seat fewer than passenger_count (empty if the budget ran out).
+        """
+        passengers = self.passenger_count
+        num_types = len(self.vehicle_types)
+        max_ties = max_ties or self.max_ties
+        deadline = time.monotonic() + self.time_budget
+        next_time_check = self.TIME_CHECK_INTERVAL
+
+        # Partial allocations that still leave passengers without a seat
+        states = {(0, 0): (Decimal("0"), [()])}
+        final_states = {}
+        # (vehicle count, cost) of final allocations with no unused seats
+        exact = []
+
+        for index, vehicle in enumerate(self.vehicle_types):
+            capacity = vehicle.passenger_capacity
+            price = vehicle.base_price_per_day
+            padding = (0,) * (num_types - index - 1)
+
+            # Units of this type are added one at a time, in increasing
+            # capacity order, so every allocation is built exactly once
+            buckets = {}
+            for (vehicle_count, seats), (cost, count_vectors) in states.items():
+                buckets.setdefault(seats, {})[vehicle_count] = (
+                    cost,
+                    [v + (0,) for v in count_vectors],
+                )
+
+            next_states = {}
+            for seats in range(passengers):
+                bucket = buckets.pop(seats, None)
+                if not bucket:
+                    continue
+
+                for vehicle_count, (cost, count_vectors) in _undominated(bucket, exact):
+                    # Every tied allocation is copied below: count it as work
+                    self.nodes_expanded += len(count_vectors)
+                    if self.nodes_expanded >= next_time_check:
+                        next_time_check = self.nodes_expanded + self.TIME_CHECK_INTERVAL
+                        timed_out = time.monotonic() > deadline
+                    else:
+                        timed_out = False
+                    if self.nodes_expanded > self.max_nodes or timed_out:
+                        self.budget_exhausted = True
+                        logger.warning(
+                            f"Vehicle optimization budget exhausted after "
+                            f"{self.nodes_expanded} nodes "
+                            f"({passengers} passengers, {num_types} vehicle types)"
+                        )
+                        return final_states, {}
+
+                    next_states[(vehicle_count, seats)] = (cost, count_vectors)
+
+                    new_seats = seats + capacity
+                    new_cost = cost + price
+                    added = [v[:-1] + (v[-1] + 1,) for v in count_vectors]
+                    if new_seats >= passengers:
+                        _keep_cheapest(
+                            final_states,
+                            (vehicle_count + 1, new_seats),
+                            new_cost,
+                            [v + padding for v in added],
+                            max_ties,
+                        )
+                        if prune_exact and new_seats == passengers:
+                            exact.append((vehicle_count + 1, new_cost))
+                    else:
+                        _keep_cheapest(
+                            buckets.setdefault(new_seats, {}),
+                            vehicle_count + 1,
+                            new_cost,
+                            added,
+                            max_ties,
+                        )
+
+            states = next_states
+
+        return final_states, states
+
+    def _fallback_states(self) -> dict:
+        """
+        Single-type allocation of the largest vehicle, used when the budget
+        ran out before any allocation seating everyone was found.
+        """
+        index, vehicle = max(
+            enumerate(self.vehicle_types),
+            key=lambda item: item[1].passenger_capacity,
+        )
+        count = self.max_counts[vehicle.id]
+        counts = tuple(
+            count if i == index else 0 for i in range(len(self.vehicle_types))
+        )
+        return {
+            (count, count * vehicle.passenger_capacity): (
+                count * vehicle.base_price_per_day,
+                [counts],
+            )
+        }
+
+    def _build_combination(
+        self,
+        counts: Tuple[int, ...],
+        cost_per_day: Decimal,
+        passenger_count: Optional[int] = None,
+    ) -> VehicleCombination:
+        if passenger_count is None:
+            passenger_count = self.passenger_count
+        capacity = sum(
+            vehicle.passenger_capacity * count
+            for vehicle, count in zip(self.vehicle_types, counts)
+        )
+        return VehicleCombination(
+            vehicles=[
+                (vehicle, count)
+                for vehicle, count in zip(self.vehicle_types, counts)
+                if count > 0
+            ],
+            total_vehicle_count=sum(counts),
+            total_capacity=capacity,
+            unused_seats=capacity - passenger_count,
+            cost_per_day=cost_per_day,
+            total_cost=cost_per_day * self.num_days,
+            num_days=self.num_days,
+        )
+
+    def _pareto_front(self, ranked: List[tuple]) -> List[tuple]:
+        """
+        Remove dominated solutions from a ranked list.
+
+        A solution can only be dominated by one ranked before it, and if it
+        is dominated at all it is dominated by a front member, so each
+        solution is compared against the front found so far
+        (same rule as VehicleCombination.dominates).
+
+        Args:
+            ranked: sorted (vehicle count, unused seats, cost per day, counts)
+
+        Returns:
+            List of non-dominated entries, best first
+        """
+        front = []
+        # Distinct (vehicle count, unused seats, cost) of the front: ties are
+        # adjacent in ranked order and share their point's verdict
+        points = []
+        for entry in ranked:
+            point = entry[:3]
+            if points and points[-1] == point:
+                front.append(entry)
+                continue
+            vehicle_count, unused, cost = point
+            if not any(
+                kept[0] <= vehicle_count and kept[1] <= unused and kept[2] <= cost
+                for kept in points
+            ):
+                points.append(point)
+                front.append(entry)
+
+        logger.info(
+            f"Eliminated {len(ranked) - len(front)} dominated solutions "
+            f"({len(front)} remaining)"
+        )
+
+        return front
+
+    def get_recommended_combination(self) -> Optional[VehicleCombination]:
+        """
+        Get the top-ranked (recommended) combination.
+
+        Returns:
+            Best VehicleCombination or None if no solutions found
+        """
+        solutions = self.optimize(max_solutions=1)
+        return solutions[0] if solutions else None
+
+
+def _undominated(bucket: dict, exact: list):
+    """
+    Partial allocations of one capacity that can still reach the Pareto front.
+
+    A state is dropped when another with the same capacity (any completion
+    of it is dominated by the same completion of the other), or a final
+    allocation with no unused seats (any completion needs at least one more
+    vehicle), uses no more vehicles and costs no more.
+
+    Args:
+        bucket: vehicle count -> (cost per day, [count vectors])
+        exact: (vehicle count, cost per day) of final states with no unused seats
+
+    Yields:
+        (vehicle count, (cost per day, [count vectors])) by vehicle count
+    """
+    best_cost = None
+    for vehicle_count in sorted(bucket):
+        cost, count_vectors = bucket[vehicle_count]
+        if best_cost is not None and cost >= best_cost:
+            continue
+        if any(
+            exact_count <= vehicle_count and exact_cost <= cost
+            for exact_count, exact_cost in exact
+        ):
+            continue
+        best_cost = cost
+        yield vehicle_count, (cost, count_vectors)
+
+
+def _keep_cheapest(
+    states: dict, key: tuple, cost: Decimal, count_vectors: list, max_ties: int
+):
+    """
+    Record a state, keeping only its cheapest allocations: up to max_ties
+    tied count vectors, the first in enumeration order
+    """
+    current = states.get(key)
+    if current is None or cost < current[0]:
+        current = states[key] = (cost, count_vectors)
+    elif cost == current[0]:
+        current[1].extend(count_vectors)
+    else:
+        return
+    if len(current[1]) > max_ties:
+        current[1][:] = heapq.nsmallest(max_ties, current[1])
+
+
+class BacktrackingVehicleOptimizationEngine:
+    """
+    Original exhaustive backtracking engine.
+
+    Kept as the reference implementation for tests and the
+    benchmark_vehicle_optimizer command; use VehicleOptimizationEngine.
     """
 
     def __init__(
@@ -0,0 +1,197 @@
+"""
+Vehicle Suggestions
+
+Suggestions only depend on the active fleet and the group size: every cost
+scales linearly with the number of days, so the ranking and the Pareto front
+do not depend on it. Per-day fronts are memoized per (fleet version hash,
+passenger count) and num_days is applied when reading.
+
+When the fleet changes, the fronts for every group size up to
+VEHICLE_SUGGESTIONS_PRECOMPUTED_PASSENGERS are computed in one sweep
+(VehicleOptimizationEngine.optimize_all_group_sizes), so a suggestion is a
+dictionary lookup. Larger groups are solved on demand and cached.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import replace
+from math import ceil
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from packages.cache import namespaced_key
+
+from .pricing_plan import get_pricing_plan
+from .vehicle_optimization import (
+    VehicleCombination,
+    VehicleOptimizationEngine,
+    VehicleType,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRECOMPUTED_PASSENGERS = 60
+
+# In-process memo: "fleet" -> (vehicles mapping, fleet hash, vehicle types),
+# "fronts" -> (fleet hash, {passenger count: per-day front})
+_memo = {}
+_lock = threading.Lock()
+
+
+def _precomputed_passengers() -> int:
+    return getattr(
+        settings,
+        "VEHICLE_SUGGESTIONS_PRECOMPUTED_PASSENGERS",
+        DEFAULT_PRECOMPUTED_PASSENGERS,
+    )
+
+
+def _cache_timeout() -> int:
+    return getattr(settings, "CACHE_TTL", {}).get("vehicle_suggestions", 86400)
+
+
+def get_active_fleet() -> Tuple[str, List[VehicleType]]:
+    """
+    Active vehicle types and the hash identifying this version of the fleet.
+    Read from the compiled pricing plan, so the warm path issues no SQL.
+
+    Returns:
+        tuple: (fleet hash, vehicle types in fleet order)
+    """
+    vehicles = get_pricing_plan(None).vehicles
+    cached = _memo.get("fleet")
+    if cached is not None and cached[0] is vehicles:
+        return cached[1], cached[2]
+
+    vehicle_types = [
+        VehicleType(
+            id=vehicle.id,
+            name=vehicle.name,
+            passenger_capacity=vehicle.passenger_capacity,
+            luggage_capacity=vehicle.luggage_capacity,
+            base_price_per_day=vehicle.get_effective_price_per_day(),
+            is_active=vehicle.is_active,
+        )
+        for vehicle in vehicles.values()
+        if vehicle.is_active
+    ]
+    fleet_hash = hashlib.sha256(
+        json.dumps(
+            [
+                [
+                    v.id,
+                    v.name,
+                    v.passenger_capacity,
+                    v.luggage_capacity,
+                    str(v.base_price_per_day),
+                ]
+                for v in vehicle_types
+            ]
+        ).encode()
+    ).hexdigest()
+
+    with _lock:
+        _memo["fleet"] = (vehicles, fleet_hash, vehicle_types)
+    return fleet_hash, vehicle_types
+
+
+def _get_fronts(fleet_hash: str, vehicle_types) -> Dict[int, list]:
+    """Per-day fronts for group sizes 1..N, computed once per fleet version"""
+    cached = _memo.get("fronts")
+    if cached is not None and cached[0] == fleet_hash:
+        return cached[1]
+
+    cache_key = namespaced_key("pricing", f"vehicle_fronts:{fleet_hash}")
+    fronts = cache.get(cache_key)
+    if fronts is None:
+        max_passengers = _precomputed_passengers()
+        engine = VehicleOptimizationEngine(vehicle_types, max_passengers, 1)
+        fronts = engine.optimize_all_group_sizes()
+        if engine.budget_exhausted:
+            # Serve on demand instead of caching an incomplete sweep
+            return {}
+        cache.set(cache_key, fronts, _cache_timeout())
+        logger.info(
+            f"Precomputed vehicle suggestions for 1-{max_passengers} passengers "
+            f"({len(vehicle_types)} vehicle types, {engine.nodes_expanded} nodes)"
+        )
+
+    with _lock:
+        _memo["fronts"] = (fleet_hash, fronts)
+    return fronts
+
+
+def _get_front(fleet_hash: str, vehicle_types, passenger_count: int) -> list:
+    front = _get_fronts(fleet_hash, vehicle_types).get(passenger_count)
+    if front is not None:
+        return front
+
+    cache_key = namespaced_key(
+        "pricing", f"vehicle_front:{fleet_hash}:{passenger_count}"
+    )
+    front = cache.get(cache_key)
+    if front is None:
+        engine = VehicleOptimizationEngine(vehicle_types, passenger_count, 1)
+        engine.optimize()
+        front = engine.solutions
+        if not engine.budget_exhausted:
+            cache.set(cache_key, front, _cache_timeout())
+    return front
+
+
+def suggest_vehicles(
+    passenger_count: int, num_days, max_solutions: int = 10
+) -> List[VehicleCombination]:
+    """
+    Get ranked vehicle combinations for a group.
+
+    Args:
+        passenger_count: Number of passengers to accommodate
+        num_days: Number of days (fractional days are ceiled)
+        max_solutions: Maximum number of solutions to return
+
+    Returns:
+        List of VehicleCombination sorted by priority (best first); empty if
+        there are no active vehicle types
+    """
+    if passenger_count <= 0:
+        return []
+
+    fleet_hash, vehicle_types = get_active_fleet()
+    if not vehicle_types:
+        return []
+
+    days = max(1, ceil(num_days))
+    return [
+        replace(
+            solution,
+            num_days=days,
+            total_cost=solution.cost_per_day * days,
+        )
+        for solution in _get_front(fleet_hash, vehicle_types, passenger_count)[
+            :max_solutions
+        ]
+    ]
+
+
+def precompute_vehicle_suggestions() -> int:
+    """
+    Compute the suggestion fronts for the current fleet (after a fleet change)
+
+    Returns:
+        Number of precomputed group sizes
+    """
+    fleet_hash, vehicle_types = get_active_fleet()
+    if not vehicle_types:
+        return 0
+    return len(_get_fronts(fleet_hash, vehicle_types))
+
+
+def clear_local_suggestions() -> None:
+    """Drop the suggestion memo held by this process"""
+    with _lock:
+        _memo.clear()
@@ -0,0 +1,155 @@
+"""
+Signal handlers that keep compiled pricing plans fresh.
+
+Any change to the pricing configuration or a pricing component rotates
+the version stamps read by ``services.pricing_plan.get_pricing_plan``;
+rule changes bump the version of the shared rule index
+(``services.rule_index``). Every change also schedules a refresh of the
+materialized price ranges of the affected packages, and fleet changes
+precompute vehicle suggestions for the new fleet.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from packages.models import Experience, HotelTier, Package, TransportOption
+
+from .models import PricingConfiguration, PricingRule
+from .services.price_range import schedule_price_range_refresh
+from .services.pricing_plan import bump_global_version, bump_package_version
+from .services.rule_index import bump_rules_version
+from .services.vehicle_suggestions import precompute_vehicle_suggestions
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=PricingRule)
+@receiver(post_delete, sender=PricingRule)
+def rebuild_rule_index(sender, **kwargs):
+    """Rules live in one shared index; plans are not recompiled"""
+    bump_rules_version()
+
+
+@receiver(post_save, sender=Experience)
+@receiver(post_delete, sender=Experience)
+@receiver(post_save, sender=HotelTier)
+@receiver(post_delete, sender=HotelTier)
+@receiver(post_save, sender=TransportOption)
+@receiver(post_delete, sender=TransportOption)
+def invalidate_all_pricing_plans(sender, **kwargs):
+    """
+    Pricing components can belong to many packages at once.
+    """
+    bump_global_version()
+
+
+@receiver(post_save, sender=PricingConfiguration)
+def invalidate_pricing_plans_on_config_change(sender, instance, created, **kwargs):
+    """
+    The configuration is created lazily by get_config() while compiling a
+    plan; only later edits need to invalidate compiled plans.
+    """
+    if not created:
+        bump_global_version()
+
+
+@receiver(post_save, sender=Package)
+@receiver(post_delete, sender=Package)
+def invalidate_package_pricing_plan(sender, instance, **kwargs):
+    bump_package_version(instance.pk)
+
+
+@receiver(m2m_changed, sender=Package.experiences.through)
+@receiver(m2m_changed, sender=Package.hotel_tiers.through)
+@receiver(m2m_changed, sender=Package.transport_options.through)
+def invalidate_pricing_plan_on_components_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    Package component membership changed.
+    Forward changes touch one package; reverse changes (e.g.
+    experience.package_set.add(...)) touch the packages in pk_set.
+    """
+    if not action.startswith("post_"):
+        return
+
+    if not reverse:
+        bump_package_version(instance.pk)
+    elif pk_set:
+        for package_id in pk_set:
+            bump_package_version(package_id)
+    else:
+        # Reverse clear() does not report the affected packages
+        bump_global_version()
+
+
+# Price range refreshes run after the version bumps above (receivers are
+# called in registration order), so they always see the new plans.
+
+
+@receiver(post_save, sender=PricingRule)
+@receiver(post_delete, sender=PricingRule)
+def refresh_price_ranges_on_rule_change(sender, instance, created=False, **kwargs):
+    package_ids = {instance.target_package_id}
+    if kwargs["signal"] is post_save and instance.has_changed("target_package"):
+        # A re-targeted rule must refresh both its old and its new package
+        package_ids.add(instance.original_value("target_package"))
+
+    if None in package_ids:
+        # Global rules (or rules that used to be global) affect every package
+        schedule_price_range_refresh()
+    else:
+        schedule_price_range_refresh(package_ids)
+
+
+@receiver(post_save, sender=Experience)
+@receiver(post_save, sender=HotelTier)
+@receiver(post_save, sender=TransportOption)
+def refresh_price_ranges_on_component_change(sender, instance, **kwargs):
+    schedule_price_range_refresh(instance.package_set.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Experience)
+@receiver(post_delete, sender=HotelTier)
+@receiver(post_delete, sender=TransportOption)
+def refresh_price_ranges_on_component_delete(sender, instance, **kwargs):
+    # Membership rows are already gone, so the affected packages are unknown
+    schedule_price_range_refresh()
+
+
+@receiver(post_save, sender=PricingConfiguration)
+def refresh_price_ranges_on_config_change(sender, instance, created, **kwargs):
+    if not created:
+        schedule_price_range_refresh()
+
+
+@receiver(post_save, sender=Package)
+def refresh_package_price_range(sender, instance, **kwargs):
+    schedule_price_range_refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Package.experiences.through)
+@receiver(m2m_changed, sender=Package.hotel_tiers.through)
+@receiver(m2m_changed, sender=Package.transport_options.through)
+def refresh_price_ranges_on_components_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not action.startswith("post_"):
+        return
+
+    if not reverse:
+        schedule_price_range_refresh([instance.pk])
+    elif pk_set:
+        schedule_price_range_refresh(pk_set)
+    else:
+        schedule_price_range_refresh()
+
+
+@receiver(post_save, sender=TransportOption)
+@receiver(post_delete, sender=TransportOption)
+def precompute_vehicle_suggestions_on_fleet_change(sender, **kwargs):
+    """The fleet version changed; warm suggestions once the change is committed"""
+    transaction.on_commit(precompute_vehicle_suggestions)
@@ -0,0 +1,41 @@
+"""
+Celery tasks for the pricing engine.
+"""
+
+import logging
+
+from celery import shared_task
+
+from .services.price_range import refresh_expired_price_ranges, refresh_price_ranges
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="pricing.refresh_price_ranges")
+def refresh_all_price_ranges():
+    """
+    Recompute the price range of every package, enqueued after changes that
+    affect all of them (global rules, configuration, deleted components).
+    """
+    return {"refreshed": refresh_price_ranges()}
+
+
+@shared_task(name="pricing.refresh_expired_price_ranges")
+def refresh_expired_price_range_rows():
+    """
+    Recompute the price ranges a scheduled rule made stale (it started or
+    expired after they were computed).
+
+    Schedule this task to run every minute:
+
+    CELERY_BEAT_SCHEDULE = {
+        'refresh-expired-price-ranges': {
+            'task': 'pricing.refresh_expired_price_ranges',
+            'schedule': crontab(),  # Every minute
+        },
+    }
+    """
+    count = refresh_expired_price_ranges()
+    if count:
+        logger.info(f"Refreshed {count} expired package price ranges")
+    return {"refreshed": count}
@@ -0,0 +1,233 @@
+"""
+Tests for batch price quotes (get_price_breakdowns_bulk / calculate_prices).
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from cities.models import City
+from packages.models import Experience, HotelTier, Package, TransportOption
+from pricing_engine.models import PricingRule
+from pricing_engine.services.pricing_plan import clear_local_plans
+from pricing_engine.services.pricing_service import PricingService
+from rest_framework.test import APIClient
+
+
+class BulkPricingTests(TestCase):
+    """Batch quotes must match single quotes with a constant query count."""
+
+    def setUp(self):
+        cache.clear()
+        clear_local_plans()
+        city = City.objects.create(
+            name="Bulk City", slug="bulk-city", description="Test description"
+        )
+        self.package = Package.objects.create(
+            name="Bulk Package",
+            slug="bulk-package",
+            city=city,
+            description="Test package description",
+        )
+        self.experiences = [
+            Experience.objects.create(
+                name=f"Experience {i}",
+                description="Experience",
+                base_price=Decimal("500.00") * (i + 1),
+            )
+            for i in range(3)
+        ]
+        self.package.experiences.add(*self.experiences)
+        self.hotel_tiers = [
+            HotelTier.objects.create(
+                name="Budget",
+                description="Budget",
+                base_price_per_night=Decimal("1500.00"),
+                weekend_multiplier=Decimal("1.20"),
+            ),
+            HotelTier.objects.create(
+                name="Legacy",
+                description="Legacy",
+                price_multiplier=Decimal("1.80"),
+            ),
+        ]
+        self.package.hotel_tiers.add(*self.hotel_tiers)
+        self.transport = TransportOption.objects.create(
+            name="Cab", description="Cab", base_price=Decimal("900.00")
+        )
+        self.package.transport_options.add(self.transport)
+        self.outside_transport = TransportOption.objects.create(
+            name="Bus", description="Bus", base_price=Decimal("2500.00")
+        )
+        self.outside_experience = Experience.objects.create(
+            name="Elsewhere", description="Elsewhere", base_price=Decimal("100.00")
+        )
+        PricingRule.objects.create(
+            name="GST",
+            rule_type="MARKUP",
+            value=Decimal("18.00"),
+            is_percentage=True,
+            active_from=timezone.now() - timedelta(days=1),
+        )
+
+    def _combinations(self, count):
+        start = date(2026, 5, 1)
+        combos = []
+        for i in range(count):
+            combos.append(
+                {
+                    "experience_ids": [exp.id for exp in self.experiences[: i % 3 + 1]],
+                    "hotel_tier_id": self.hotel_tiers[i % 2].id,
+                    "transport_option_id": (
+                        self.transport.id if i % 3 else self.outside_transport.id
+                    ),
+                    "start_date": start + timedelta(days=i),
+                    "end_date": start + timedelta(days=i + 2 + i % 4),
+                    "num_rooms": 1 + i % 2,
+                    "num_travelers": 2,
+                }
+            )
+        return combos
+
+    def test_bulk_matches_single_breakdowns(self):
+        combos = self._combinations(6)
+        results = PricingService.get_price_breakdowns_bulk(self.package, combos)
+        self.assertEqual(len(results), len(combos))
+        for combo, result in zip(combos, results):
+            expected = PricingService.get_price_breakdown(
+                self.package,
+                Experience.objects.filter(id__in=combo["experience_ids"]),
+                HotelTier.objects.get(id=combo["hotel_tier_id"]),
+                TransportOption.objects.get(id=combo["transport_option_id"]),
+                start_date=combo["start_date"],
+                end_date=combo["end_date"],
+                num_rooms=combo["num_rooms"],
+                num_travelers=combo["num_travelers"],
+            )
+            self.assertEqual(result["breakdown"].to_dict(), expected.to_dict())
+
+    def test_query_count_is_constant(self):
+        PricingService.get_price_breakdowns_bulk(self.package, self._combinations(1))
+        with CaptureQueriesContext(connection) as small:
+            PricingService.get_price_breakdowns_bulk(
+                self.package, self._combinations(3)
+            )
+        with CaptureQueriesContext(connection) as large:
+            PricingService.get_price_breakdowns_bulk(
+                self.package, self._combinations(40)
+            )
+        self.assertEqual(len(small), len(large))
+        self.assertLessEqual(len(large), 1)
+
+    def test_invalid_combinations_report_errors_in_place(self):
+        combos = [
+            {"experience_ids": [self.experiences[0].id], "hotel_tier_id": 999999},
+            {
+                "experience_ids": [self.outside_experience.id],
+                "hotel_tier_id": self.hotel_tiers[0].id,
+            },
+            {"experience_ids": [999999], "hotel_tier_id": self.hotel_tiers[0].id},
+            {
+                "experience_ids": [self.experiences[0].id],
+                "hotel_tier_id": self.hotel_tiers[0].id,
+                "transport_option_id": 999999,
+            },
+            {
+                "experience_ids": [self.experiences[0].id],
+                "hotel_tier_id": self.hotel_tiers[0].id,
+            },
+        ]
+        results = PricingService.get_price_breakdowns_bulk(self.package, combos)
+        self.assertEqual(results[0], {"error": "Hotel tier 999999 not found"})
+        self.assertEqual(
+            results[1],
+            {
+                "error": f"Experience ID {self.outside_experience.id} "
+                "does not belong to this package"
+            },
+        )
+        self.assertEqual(
+            results[2], {"error": "One or more experiences not found or inactive"}
+        )
+        self.assertEqual(results[3], {"error": "Transport option 999999 not found"})
+        self.assertIn("breakdown", results[4])
+
+    def test_calculate_prices_endpoint(self):
+        client = APIClient()
+        url = f"/api/packages/packages/{self.package.slug}/calculate_prices/"
+        selection = {
+            "experience_ids": [self.experiences[0].id],
+            "hotel_tier_id": self.hotel_tiers[0].id,
+            "transport_option_id": self.transport.id,
+            "start_date": "2026-05-01",
+            "end_date": "2026-05-04",
+        }
+        response = client.post(
+            url,
+            {"selections": [selection, {"experience_ids": []}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(results[1], {"error": "Please select at least 1 experience"})
+
+        single = client.post(
+            f"/api/packages/packages/{self.package.slug}/calculate_price/",
+            selection,
+            format="json",
+        )
+        self.assertEqual(single.status_code, 200)
+        self.assertEqual(results[0], single.json())
+
+    def test_calculate_prices_reports_invalid_counts_per_selection(self):
+        client = APIClient()
+        url = f"/api/packages/packages/{self.package.slug}/calculate_prices/"
+        selection = {
+            "experience_ids": [self.experiences[0].id],
+            "hotel_tier_id": self.hotel_tiers[0].id,
+        }
+        with mock.patch(
+            "packages.views.AuditLogger.log_price_calculation"
+        ) as log_price_calculation:
+            response = client.post(
+                url,
+                {
+                    "selections": [
+                        {**selection, "num_rooms": 0},
+                        {**selection, "num_travelers": "many"},
+                        {**selection, "travelers": [{"name": "A"}]},
+                        {**selection, "travelers": [{"name": "A", "age": "8"}]},
+                    ]
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(results[0], {"error": "num_rooms must be a positive integer"})
+        self.assertEqual(
+            results[1], {"error": "num_travelers must be a positive integer"}
+        )
+        self.assertEqual(
+            results[2],
+            {"error": "Each traveler must have a non-negative integer age"},
+        )
+        self.assertIn("total_price", results[3])
+
+        # Each selection is audited with its own outcome and total
+        self.assertEqual(log_price_calculation.call_count, 4)
+        last = log_price_calculation.call_args_list[3].kwargs
+        self.assertTrue(last["success"])
+        self.assertEqual(last["total_price"], float(results[3]["total_price"]))
+        self.assertFalse(log_price_calculation.call_args_list[0].kwargs["success"])
+
+    def test_calculate_prices_rejects_oversized_batch(self):
+        client = APIClient()
+        url = f"/api/packages/packages/{self.package.slug}/calculate_prices/"
+        response = client.post(url, {"selections": [{}] * 51}, format="json")
+        self.assertEqual(response.status_code, 400)
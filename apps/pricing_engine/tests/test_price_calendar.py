@@ -0,0 +1,158 @@
+"""
+Tests for price calendars (sliding-window totals per start date).
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from cities.models import City
+from packages.models import Experience, HotelTier, Package, TransportOption
+from pricing_engine.models import PricingRule
+from pricing_engine.services.pricing_plan import clear_local_plans, get_pricing_plan
+from pricing_engine.services.pricing_service import PricingService
+from rest_framework.test import APIClient
+
+
+class PriceCalendarTests(TestCase):
+    """Every calendar day must equal a single quote for the same stay."""
+
+    def setUp(self):
+        cache.clear()
+        clear_local_plans()
+        city = City.objects.create(
+            name="Calendar City", slug="calendar-city", description="Test description"
+        )
+        self.package = Package.objects.create(
+            name="Calendar Package",
+            slug="calendar-package",
+            city=city,
+            description="Test package description",
+        )
+        self.experience = Experience.objects.create(
+            name="Cruise", description="Cruise", base_price=Decimal("1250.00")
+        )
+        self.package.experiences.add(self.experience)
+        self.hotel_tier = HotelTier.objects.create(
+            name="Boutique",
+            description="Boutique",
+            base_price_per_night=Decimal("2750.55"),
+            weekend_multiplier=Decimal("1.35"),
+        )
+        self.legacy_tier = HotelTier.objects.create(
+            name="Legacy", description="Legacy", price_multiplier=Decimal("2.00")
+        )
+        self.package.hotel_tiers.add(self.hotel_tier, self.legacy_tier)
+        self.transport = TransportOption.objects.create(
+            name="Cab", description="Cab", base_price=Decimal("800.00")
+        )
+        self.package.transport_options.add(self.transport)
+        now = timezone.now()
+        PricingRule.objects.create(
+            name="GST",
+            rule_type="MARKUP",
+            value=Decimal("18.00"),
+            is_percentage=True,
+            active_from=now - timedelta(days=1),
+        )
+        PricingRule.objects.create(
+            name="Early bird",
+            rule_type="DISCOUNT",
+            value=Decimal("250.00"),
+            is_percentage=False,
+            active_from=now - timedelta(days=1),
+            active_to=now + timedelta(days=3),
+        )
+        self.first_start = date(2026, 6, 3)
+
+    def _calendar(self, hotel_tier=None, num_days=45, nights=4):
+        return PricingService.get_price_calendar(
+            self.package,
+            [self.experience],
+            hotel_tier or self.hotel_tier,
+            self.transport,
+            self.first_start,
+            num_days,
+            nights,
+            num_rooms=2,
+            num_travelers=3,
+        )
+
+    def test_days_match_single_quotes(self):
+        for nights in (1, 4, 9):
+            calendar = self._calendar(nights=nights)
+            self.assertEqual(len(calendar["days"]), 45)
+            for day in calendar["days"]:
+                self.assertEqual(day["end_date"] - day["start_date"], timedelta(nights))
+                expected = PricingService.calculate_total(
+                    self.package,
+                    [self.experience],
+                    self.hotel_tier,
+                    self.transport,
+                    start_date=day["start_date"],
+                    end_date=day["end_date"],
+                    num_rooms=2,
+                    num_travelers=3,
+                )
+                self.assertEqual(day["total_price"], expected)
+            self.assertEqual(
+                calendar["cheapest"]["total_price"],
+                min(day["total_price"] for day in calendar["days"]),
+            )
+
+    def test_legacy_hotel_pricing_is_flat(self):
+        calendar = self._calendar(hotel_tier=self.legacy_tier)
+        totals = {day["total_price"] for day in calendar["days"]}
+        self.assertEqual(len(totals), 1)
+        self.assertEqual(calendar["cheapest"]["start_date"], self.first_start)
+
+    def test_calendar_is_cached_and_invalidated(self):
+        first = self._calendar()
+        with self.assertNumQueries(0):
+            self.assertEqual(self._calendar(), first)
+
+        PricingRule.objects.create(
+            name="Flash sale",
+            rule_type="DISCOUNT",
+            value=Decimal("100.00"),
+            is_percentage=False,
+            active_from=timezone.now() - timedelta(minutes=1),
+        )
+        updated = self._calendar()
+        self.assertEqual(
+            updated["days"][0]["total_price"],
+            first["days"][0]["total_price"] - Decimal("100.00"),
+        )
+
+    def test_next_rule_boundary(self):
+        now = timezone.now()
+        boundary = get_pricing_plan(self.package).next_rule_boundary(now)
+        self.assertAlmostEqual(
+            boundary, now + timedelta(days=3), delta=timedelta(seconds=5)
+        )
+
+    def test_price_calendar_endpoint(self):
+        client = APIClient()
+        url = f"/api/packages/packages/{self.package.slug}/price_calendar/"
+        params = {
+            "experience_ids": str(self.experience.id),
+            "hotel_tier_id": self.hotel_tier.id,
+            "transport_option_id": self.transport.id,
+            "nights": 4,
+            "start_date": self.first_start.isoformat(),
+            "days": 60,
+            "num_rooms": 2,
+            "num_travelers": 3,
+        }
+        response = client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["days"]), 60)
+        self.assertEqual(data["days"][0]["start_date"], "2026-06-03")
+        self.assertEqual(data["days"][0]["end_date"], "2026-06-07")
+
+        response = client.get(url, {**params, "days": 10})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,415 @@
+"""
+Equivalence tests for the totals-only pricing core and lazy breakdowns.
+
+reference_breakdown() is a frozen copy of the dict-building implementation
+that PricingService.get_price_breakdown used before the PriceQuote core;
+every scenario must produce exactly the same keys and values.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from math import ceil
+
+from django.db.models import Q
+from django.test import TestCase
+from django.utils import timezone
+
+from cities.models import City
+from packages.models import Experience, HotelTier, Package, TransportOption
+from pricing_engine.models import PricingConfiguration, PricingRule
+from pricing_engine.services.price_quote import PriceBreakdown, count_weekend_nights
+from pricing_engine.services.pricing_service import PricingService
+
+
+def reference_hotel_cost(hotel_tier, start_date, end_date, num_rooms):
+    total_cost = Decimal("0.00")
+    breakdown = []
+    current_date = start_date
+    while current_date < end_date:
+        is_weekend = current_date.weekday() >= 4
+        base_price = hotel_tier.base_price_per_night
+        if is_weekend:
+            price_per_night = base_price * hotel_tier.weekend_multiplier
+        else:
+            price_per_night = base_price
+        night_cost = price_per_night * num_rooms
+        total_cost += night_cost
+        breakdown.append(
+            {
+                "date": current_date,
+                "is_weekend": is_weekend,
+                "price_per_night": price_per_night,
+                "num_rooms": num_rooms,
+                "night_cost": night_cost,
+            }
+        )
+        current_date += timedelta(days=1)
+
+    num_nights = (end_date - start_date).days
+    cost_per_night = total_cost / num_nights if num_nights > 0 else total_cost
+    return {
+        "total_cost": total_cost.quantize(Decimal("0.01")),
+        "cost_per_night": cost_per_night.quantize(Decimal("0.01")),
+        "num_nights": num_nights,
+        "num_rooms": num_rooms,
+        "breakdown": breakdown,
+        "uses_new_pricing": True,
+    }
+
+
+def reference_breakdown(
+    package,
+    experiences,
+    hotel_tier,
+    transport_option,
+    travelers=None,
+    start_date=None,
+    end_date=None,
+    num_rooms=1,
+    num_travelers=1,
+    vehicle_allocation=None,
+):
+    q = Decimal("0.01")
+    base_experience_per_person = (
+        sum(Decimal(str(exp.base_price)) for exp in experiences)
+        if experiences
+        else Decimal("0.00")
+    )
+    age_threshold = PricingConfiguration.get_config().chargeable_age_threshold
+    chargeable_travelers = num_travelers
+    total_travelers = num_travelers
+    if travelers:
+        total_travelers = len(travelers)
+        chargeable_travelers = sum(
+            1 for t in travelers if t.get("age", 0) >= age_threshold
+        )
+    base_experience_total = base_experience_per_person * Decimal(
+        str(chargeable_travelers)
+    )
+
+    if vehicle_allocation and len(vehicle_allocation) > 0:
+        num_days = 1
+        if start_date and end_date:
+            num_days = max(1, ceil((end_date - start_date).days))
+        transport_cost = Decimal("0.00")
+        vehicle_breakdown = []
+        for allocation in vehicle_allocation:
+            transport_id = allocation.get("transport_option_id")
+            count = allocation.get("count", 0)
+            if transport_id and count > 0:
+                try:
+                    vehicle = TransportOption.objects.get(id=transport_id)
+                except TransportOption.DoesNotExist:
+                    continue
+                price_per_day = vehicle.get_effective_price_per_day()
+                vehicle_cost = price_per_day * count * num_days
+                transport_cost += vehicle_cost
+                vehicle_breakdown.append(
+                    {
+                        "transport_option_id": transport_id,
+                        "name": vehicle.name,
+                        "count": count,
+                        "price_per_day": str(price_per_day),
+                        "total_cost": str(vehicle_cost),
+                    }
+                )
+        uses_vehicle_allocation = True
+    else:
+        transport_cost = (
+            transport_option.base_price if transport_option else Decimal("0.00")
+        )
+        vehicle_breakdown = []
+        uses_vehicle_allocation = False
+
+    if hotel_tier.base_price_per_night:
+        if start_date and end_date:
+            hotel_cost_info = reference_hotel_cost(
+                hotel_tier, start_date, end_date, num_rooms
+            )
+            hotel_cost = hotel_cost_info["total_cost"] or Decimal("0.00")
+        else:
+            hotel_cost = hotel_tier.base_price_per_night * num_rooms
+            hotel_cost_info = {
+                "uses_new_pricing": True,
+                "total_cost": hotel_cost,
+                "cost_per_night": hotel_tier.base_price_per_night,
+                "num_nights": 1,
+                "num_rooms": num_rooms,
+                "breakdown": [],
+            }
+    else:
+        hotel_cost = Decimal("0.00")
+        hotel_cost_info = {
+            "uses_new_pricing": False,
+            "total_cost": None,
+            "cost_per_night": None,
+            "num_nights": 1,
+            "num_rooms": num_rooms,
+            "breakdown": [],
+        }
+
+    subtotal_before_hotel = base_experience_total + transport_cost
+    if hotel_cost_info["uses_new_pricing"]:
+        subtotal_after_hotel = base_experience_total + transport_cost + hotel_cost
+    else:
+        subtotal_after_hotel = subtotal_before_hotel * hotel_tier.price_multiplier
+
+    now = timezone.now()
+    rules = (
+        PricingRule.objects.filter(is_active=True, active_from__lte=now)
+        .filter(Q(active_to__gte=now) | Q(active_to__isnull=True))
+        .filter(Q(target_package=package) | Q(target_package__isnull=True))
+        .order_by("active_from")
+    )
+    total_markup = Decimal("0.00")
+    total_discount = Decimal("0.00")
+    applied_rules = []
+    current_total = subtotal_after_hotel
+    for rule in rules:
+        rule_amount = Decimal("0.00")
+        if rule.rule_type == "MARKUP":
+            if rule.is_percentage:
+                rule_amount = current_total * (rule.value / Decimal("100"))
+            else:
+                rule_amount = rule.value
+            total_markup += rule_amount
+            current_total += rule_amount
+        elif rule.rule_type == "DISCOUNT":
+            if rule.is_percentage:
+                rule_amount = current_total * (rule.value / Decimal("100"))
+            else:
+                rule_amount = rule.value
+            total_discount += rule_amount
+            current_total -= rule_amount
+        applied_rules.append(
+            {
+                "name": rule.name,
+                "type": rule.rule_type,
+                "value": str(rule.value),
+                "is_percentage": rule.is_percentage,
+                "amount_applied": str(rule_amount),
+            }
+        )
+
+    final_total = max(current_total, Decimal("0.00")).quantize(q)
+    if chargeable_travelers > 0:
+        per_person_price = (final_total / Decimal(str(chargeable_travelers))).quantize(
+            q
+        )
+    else:
+        per_person_price = final_total
+
+    return {
+        "base_experience_total": base_experience_total.quantize(q),
+        "transport_cost": transport_cost.quantize(q),
+        "subtotal_before_hotel": subtotal_before_hotel.quantize(q),
+        "hotel_multiplier": hotel_tier.price_multiplier,
+        "subtotal_after_hotel": subtotal_after_hotel.quantize(q),
+        "hotel_cost": (
+            hotel_cost.quantize(q) if hotel_cost_info["uses_new_pricing"] else None
+        ),
+        "hotel_cost_per_night": (
+            hotel_cost_info["cost_per_night"].quantize(q)
+            if hotel_cost_info["cost_per_night"]
+            else None
+        ),
+        "hotel_num_nights": hotel_cost_info["num_nights"],
+        "hotel_num_rooms": hotel_cost_info["num_rooms"],
+        "hotel_breakdown": hotel_cost_info["breakdown"],
+        "uses_new_hotel_pricing": hotel_cost_info["uses_new_pricing"],
+        "num_travelers": total_travelers if travelers else num_travelers,
+        "base_experience_per_person": base_experience_per_person.quantize(q),
+        "uses_vehicle_allocation": uses_vehicle_allocation,
+        "vehicle_breakdown": vehicle_breakdown,
+        "total_markup": total_markup.quantize(q),
+        "total_discount": total_discount.quantize(q),
+        "final_total": final_total,
+        "applied_rules": applied_rules,
+        "chargeable_travelers": chargeable_travelers,
+        "total_travelers": total_travelers if travelers else num_travelers,
+        "total_amount": final_total,
+        "per_person_price": per_person_price,
+        "chargeable_age_threshold": age_threshold,
+    }
+
+
+class PriceQuoteEquivalenceTests(TestCase):
+    """The PriceQuote core must reproduce the historical breakdown exactly."""
+
+    def setUp(self):
+        city = City.objects.create(
+            name="Quote City", slug="quote-city", description="Test description"
+        )
+        self.package = Package.objects.create(
+            name="Quote Package",
+            slug="quote-package",
+            city=city,
+            description="Test package description",
+        )
+        self.experiences = [
+            Experience.objects.create(
+                name="Fort", description="Fort", base_price=Decimal("1299.99")
+            ),
+            Experience.objects.create(
+                name="Food Walk", description="Food", base_price=Decimal("450.50")
+            ),
+        ]
+        self.package.experiences.add(*self.experiences)
+        self.dated_tier = HotelTier.objects.create(
+            name="Heritage",
+            description="Heritage",
+            base_price_per_night=Decimal("1999.99"),
+            weekend_multiplier=Decimal("1.33"),
+            price_multiplier=Decimal("2.50"),
+        )
+        self.legacy_tier = HotelTier.objects.create(
+            name="Legacy",
+            description="Legacy",
+            price_multiplier=Decimal("1.75"),
+        )
+        self.package.hotel_tiers.add(self.dated_tier, self.legacy_tier)
+        self.cab = TransportOption.objects.create(
+            name="Cab",
+            description="Cab",
+            base_price=Decimal("750.00"),
+            base_price_per_day=Decimal("1200.00"),
+        )
+        self.van = TransportOption.objects.create(
+            name="Van", description="Van", base_price=Decimal("2100.00")
+        )
+        self.package.transport_options.add(self.cab)
+        now = timezone.now()
+        PricingRule.objects.create(
+            name="GST",
+            rule_type="MARKUP",
+            value=Decimal("18.00"),
+            is_percentage=True,
+            active_from=now - timedelta(days=2),
+        )
+        PricingRule.objects.create(
+            name="Flat off",
+            rule_type="DISCOUNT",
+            value=Decimal("333.33"),
+            is_percentage=False,
+            active_from=now - timedelta(days=1),
+            target_package=self.package,
+        )
+        PricingRule.objects.create(
+            name="Festive",
+            rule_type="DISCOUNT",
+            value=Decimal("7.50"),
+            is_percentage=True,
+            active_from=now - timedelta(hours=1),
+        )
+        PricingRule.objects.create(
+            name="Expired",
+            rule_type="MARKUP",
+            value=Decimal("50.00"),
+            is_percentage=True,
+            active_from=now - timedelta(days=10),
+            active_to=now - timedelta(days=5),
+        )
+
+    def scenarios(self):
+        thursday = date(2026, 3, 12)
+        yield {}
+        yield {"hotel_tier": self.legacy_tier}
+        yield {"start_date": thursday, "end_date": thursday + timedelta(days=4)}
+        yield {
+            "start_date": thursday,
+            "end_date": thursday + timedelta(days=17),
+            "num_rooms": 3,
+            "num_travelers": 5,
+        }
+        yield {
+            "start_date": thursday,
+            "end_date": thursday,
+        }
+        yield {
+            "hotel_tier": self.legacy_tier,
+            "start_date": thursday,
+            "end_date": thursday + timedelta(days=2),
+        }
+        yield {
+            "travelers": [{"age": 34}, {"age": 31}, {"age": 4}, {"age": 9}],
+            "start_date": thursday,
+            "end_date": thursday + timedelta(days=3),
+        }
+        yield {"travelers": [{"age": 2}], "num_travelers": 1}
+        yield {
+            "vehicle_allocation": [
+                {"transport_option_id": self.cab.id, "count": 2},
+                {"transport_option_id": self.van.id, "count": 1},
+                {"transport_option_id": 987654, "count": 1},
+            ],
+            "start_date": thursday,
+            "end_date": thursday + timedelta(days=6),
+            "num_travelers": 9,
+        }
+        yield {"transport_option": None, "experiences": []}
+
+    def _args(self, scenario):
+        kwargs = {
+            "experiences": self.experiences,
+            "hotel_tier": self.dated_tier,
+            "transport_option": self.cab,
+        }
+        kwargs.update(scenario)
+        return kwargs
+
+    def test_breakdown_matches_reference(self):
+        for scenario in self.scenarios():
+            kwargs = self._args(scenario)
+            with self.subTest(scenario=scenario):
+                expected = reference_breakdown(self.package, **kwargs)
+                actual = PricingService.get_price_breakdown(self.package, **kwargs)
+                self.assertIsInstance(actual, PriceBreakdown)
+                self.assertEqual(list(actual), list(expected))
+                self.assertEqual(actual.to_dict(), expected)
+
+    def test_calculate_total_matches_reference(self):
+        for scenario in self.scenarios():
+            kwargs = self._args(scenario)
+            with self.subTest(scenario=scenario):
+                self.assertEqual(
+                    PricingService.calculate_total(self.package, **kwargs),
+                    reference_breakdown(self.package, **kwargs)["final_total"],
+                )
+
+    def test_large_discount_clamps_to_zero(self):
+        PricingRule.objects.create(
+            name="Everything free",
+            rule_type="DISCOUNT",
+            value=Decimal("99999999.00"),
+            is_percentage=False,
+            active_from=timezone.now() - timedelta(minutes=5),
+        )
+        kwargs = self._args({})
+        breakdown = PricingService.get_price_breakdown(self.package, **kwargs)
+        self.assertEqual(breakdown["final_total"], Decimal("0.00"))
+        self.assertEqual(
+            breakdown.to_dict(), reference_breakdown(self.package, **kwargs)
+        )
+
+    def test_detail_fields_are_lazy(self):
+        breakdown = PricingService.get_price_breakdown(
+            self.package,
+            self.experiences,
+            self.dated_tier,
+            self.cab,
+            start_date=date(2026, 3, 12),
+            end_date=date(2026, 3, 20),
+        )
+        self.assertEqual(breakdown._details, {})
+        breakdown["final_total"]
+        self.assertIsNone(breakdown._scalars)
+        self.assertEqual(len(breakdown["hotel_breakdown"]), 8)
+        self.assertEqual(list(breakdown._details), ["hotel_breakdown"])
+
+    def test_count_weekend_nights(self):
+        start = date(2026, 3, 9)  # Monday
+        for nights in range(0, 30):
+            expected = sum(
+                1 for i in range(nights) if (start + timedelta(days=i)).weekday() >= 4
+            )
+            self.assertEqual(count_weekend_nights(start, nights), expected)
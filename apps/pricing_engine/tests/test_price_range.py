@@ -0,0 +1,250 @@
+"""
+Tests for materialized package price ranges.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from cities.models import City
+from packages.models import Experience, HotelTier, Package, TransportOption
+from pricing_engine.models import PackagePriceRange, PricingRule
+from pricing_engine.services.price_range import (
+    compute_price_range,
+    refresh_expired_price_ranges,
+)
+from pricing_engine.services.pricing_plan import clear_local_plans, get_pricing_plan
+from pricing_engine.services.pricing_service import PricingService
+from pricing_engine.services.rule_index import bump_rules_version
+from pricing_engine.tasks import refresh_all_price_ranges
+from rest_framework.test import APIClient
+
+
+def query_based_range(package):
+    """Frozen copy of the original per-request estimate"""
+    cheapest_hotel = (
+        package.hotel_tiers.filter(base_price_per_night__isnull=False)
+        .order_by("base_price_per_night")
+        .first()
+        or package.hotel_tiers.order_by("price_multiplier").first()
+    )
+    most_expensive_hotel = (
+        package.hotel_tiers.filter(base_price_per_night__isnull=False)
+        .order_by("-base_price_per_night")
+        .first()
+        or package.hotel_tiers.order_by("-price_multiplier").first()
+    )
+    return {
+        "min_price": PricingService.calculate_total(
+            package,
+            package.experiences.order_by("base_price")[:1],
+            cheapest_hotel,
+            package.transport_options.order_by("base_price").first(),
+        ),
+        "max_price": PricingService.calculate_total(
+            package,
+            package.experiences.order_by("-base_price")[:3],
+            most_expensive_hotel,
+            package.transport_options.order_by("-base_price").first(),
+        ),
+        "currency": "INR",
+    }
+
+
+class PackagePriceRangeTests(TestCase):
+    """Price ranges are materialized and refreshed on pricing changes."""
+
+    def setUp(self):
+        cache.clear()
+        clear_local_plans()
+        # Run the full refresh task inline, as an eager worker would
+        enqueue = mock.patch.object(
+            refresh_all_price_ranges, "delay", side_effect=refresh_all_price_ranges
+        )
+        self.delay = enqueue.start()
+        self.addCleanup(enqueue.stop)
+        city = City.objects.create(
+            name="Range City", slug="range-city", description="Test description"
+        )
+        self.package = Package.objects.create(
+            name="Range Package",
+            slug="range-package",
+            city=city,
+            description="Test package description",
+        )
+        self.experiences = [
+            Experience.objects.create(
+                name=f"Experience {price}",
+                description="Experience",
+                base_price=Decimal(price),
+            )
+            for price in ("300.00", "1200.00", "750.00", "2000.00")
+        ]
+        self.package.experiences.add(*self.experiences)
+        self.package.hotel_tiers.add(
+            HotelTier.objects.create(
+                name="Budget",
+                description="Budget",
+                base_price_per_night=Decimal("1000.00"),
+            ),
+            HotelTier.objects.create(
+                name="Luxury",
+                description="Luxury",
+                base_price_per_night=Decimal("6000.00"),
+            ),
+            HotelTier.objects.create(
+                name="Legacy", description="Legacy", price_multiplier=Decimal("3.00")
+            ),
+        )
+        self.package.transport_options.add(
+            TransportOption.objects.create(
+                name="Bus", description="Bus", base_price=Decimal("400.00")
+            ),
+            TransportOption.objects.create(
+                name="SUV", description="SUV", base_price=Decimal("3500.00")
+            ),
+        )
+        PricingRule.objects.create(
+            name="GST",
+            rule_type="MARKUP",
+            value=Decimal("18.00"),
+            is_percentage=True,
+            active_from=timezone.now() - timedelta(days=1),
+        )
+
+    def test_matches_query_based_estimate(self):
+        self.assertEqual(
+            compute_price_range(get_pricing_plan(self.package)),
+            query_based_range(self.package),
+        )
+
+    def test_legacy_tiers_used_without_per_night_pricing(self):
+        self.package.hotel_tiers.set(
+            HotelTier.objects.filter(base_price_per_night__isnull=True)
+        )
+        self.assertEqual(
+            compute_price_range(get_pricing_plan(self.package)),
+            query_based_range(self.package),
+        )
+
+    def test_package_without_hotel_tiers_has_zero_range(self):
+        self.package.hotel_tiers.clear()
+        price_range = compute_price_range(get_pricing_plan(self.package))
+        self.assertEqual(price_range["min_price"], Decimal("0.00"))
+        self.assertEqual(price_range["max_price"], Decimal("0.00"))
+
+    def test_command_materializes_all_packages(self):
+        out = StringIO()
+        call_command("refresh_price_ranges", stdout=out)
+        stored = PackagePriceRange.objects.get(package=self.package)
+        self.assertEqual(stored.as_dict(), query_based_range(self.package))
+        self.assertIn("Refreshed 1", out.getvalue())
+
+    def test_estimate_served_from_materialized_row(self):
+        call_command("refresh_price_ranges", stdout=StringIO())
+        package = Package.objects.select_related("price_range").get(pk=self.package.pk)
+        with self.assertNumQueries(0):
+            price_range = PricingService.get_price_estimate_range(package)
+        self.assertEqual(price_range, query_based_range(self.package))
+
+    def test_signals_refresh_after_commit(self):
+        call_command("refresh_price_ranges", stdout=StringIO())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cheapest = self.experiences[0]
+            cheapest.base_price = Decimal("100.00")
+            cheapest.save()
+        self.assertEqual(
+            PackagePriceRange.objects.get(package=self.package).as_dict(),
+            query_based_range(self.package),
+        )
+
+        # Global rules affect every package: refreshed by a task
+        self.delay.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            PricingRule.objects.create(
+                name="Festive",
+                rule_type="DISCOUNT",
+                value=Decimal("10.00"),
+                is_percentage=True,
+                active_from=timezone.now() - timedelta(minutes=1),
+            )
+        self.delay.assert_called_once_with()
+        self.assertEqual(
+            PackagePriceRange.objects.get(package=self.package).as_dict(),
+            query_based_range(self.package),
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.package.experiences.remove(self.experiences[-1])
+        self.assertEqual(
+            PackagePriceRange.objects.get(package=self.package).as_dict(),
+            query_based_range(self.package),
+        )
+
+    def start_scheduled_discount(self):
+        """A discount scheduled in an hour, then that hour passing"""
+        start = timezone.now() + timedelta(hours=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            rule = PricingRule.objects.create(
+                name="Flash sale",
+                rule_type="DISCOUNT",
+                value=Decimal("20.00"),
+                is_percentage=True,
+                active_from=start,
+            )
+        row = PackagePriceRange.objects.get(package=self.package)
+        self.assertEqual(row.valid_until, start)
+        before = row.as_dict()
+
+        # Saving without signals: only the passing of time changes the rules
+        PricingRule.objects.filter(pk=rule.pk).update(
+            active_from=timezone.now() - timedelta(seconds=1)
+        )
+        PackagePriceRange.objects.filter(package=self.package).update(
+            valid_until=timezone.now() - timedelta(seconds=1)
+        )
+        bump_rules_version()
+        clear_local_plans()
+        return before
+
+    def test_estimate_recomputed_after_rule_boundary(self):
+        before = self.start_scheduled_discount()
+
+        package = Package.objects.select_related("price_range").get(pk=self.package.pk)
+        price_range = PricingService.get_price_estimate_range(package)
+
+        self.assertEqual(price_range, query_based_range(self.package))
+        self.assertLess(price_range["min_price"], before["min_price"])
+        self.assertEqual(
+            PackagePriceRange.objects.get(package=self.package).as_dict(),
+            price_range,
+        )
+
+    def test_expired_ranges_refreshed_by_task(self):
+        before = self.start_scheduled_discount()
+
+        self.assertEqual(refresh_expired_price_ranges(), 1)
+
+        row = PackagePriceRange.objects.get(package=self.package)
+        self.assertEqual(row.as_dict(), query_based_range(self.package))
+        self.assertLess(row.min_price, before["min_price"])
+        self.assertIsNone(row.valid_until)
+        self.assertEqual(refresh_expired_price_ranges(), 0)
+
+    def test_listing_exposes_price_from(self):
+        call_command("refresh_price_ranges", stdout=StringIO())
+        response = APIClient().get("/api/packages/packages/")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        results = data["results"] if isinstance(data, dict) else data
+        self.assertEqual(
+            Decimal(results[0]["price_from"]),
+            query_based_range(self.package)["min_price"],
+        )
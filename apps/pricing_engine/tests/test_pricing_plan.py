@@ -0,0 +1,153 @@
+"""
+Tests for compiled pricing plans.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from cities.models import City
+from packages.models import Experience, HotelTier, Package, TransportOption
+from pricing_engine.models import PricingConfiguration, PricingRule
+from pricing_engine.services.pricing_plan import get_pricing_plan
+from pricing_engine.services.pricing_service import PricingService
+
+
+class PricingPlanTests(TestCase):
+    """Test plan compilation, warm-path behaviour and invalidation."""
+
+    def setUp(self):
+        self.city = City.objects.create(
+            name="Plan City", slug="plan-city", description="Test description"
+        )
+        self.package = Package.objects.create(
+            name="Plan Package",
+            slug="plan-package",
+            city=self.city,
+            description="Test package description",
+        )
+        self.experience = Experience.objects.create(
+            name="Walk", description="Walk", base_price=Decimal("1000.00")
+        )
+        self.package.experiences.add(self.experience)
+        self.hotel_tier = HotelTier.objects.create(
+            name="Standard",
+            description="Standard hotel",
+            base_price_per_night=Decimal("2000.00"),
+            weekend_multiplier=Decimal("1.50"),
+        )
+        self.package.hotel_tiers.add(self.hotel_tier)
+        self.transport = TransportOption.objects.create(
+            name="Cab",
+            description="Cab",
+            base_price=Decimal("500.00"),
+            base_price_per_day=Decimal("800.00"),
+            passenger_capacity=4,
+        )
+        self.package.transport_options.add(self.transport)
+        PricingRule.objects.create(
+            name="GST",
+            rule_type="MARKUP",
+            value=Decimal("18.00"),
+            is_percentage=True,
+            active_from=timezone.now() - timedelta(days=1),
+        )
+        self.start = date(2026, 3, 9)
+        self.end = date(2026, 3, 14)
+
+    def _breakdown(self, **kwargs):
+        return PricingService.get_price_breakdown(
+            self.package,
+            [self.experience],
+            self.hotel_tier,
+            self.transport,
+            start_date=self.start,
+            end_date=self.end,
+            num_rooms=2,
+            num_travelers=3,
+            **kwargs,
+        )
+
+    def test_plan_contains_package_components(self):
+        plan = get_pricing_plan(self.package)
+        self.assertEqual(list(plan.experiences), [self.experience.id])
+        self.assertEqual(list(plan.hotel_tiers), [self.hotel_tier.id])
+        self.assertEqual(list(plan.transport_options), [self.transport.id])
+        self.assertEqual([rule.name for rule in plan.active_rules()], ["GST"])
+
+    def test_warm_quote_issues_no_queries(self):
+        cold = self._breakdown(
+            vehicle_allocation=[{"transport_option_id": self.transport.id, "count": 2}]
+        )
+        with self.assertNumQueries(0):
+            warm = self._breakdown(
+                vehicle_allocation=[
+                    {"transport_option_id": self.transport.id, "count": 2}
+                ]
+            )
+        self.assertEqual(cold, warm)
+
+    def test_warm_plan_is_reused(self):
+        self.assertIs(get_pricing_plan(self.package), get_pricing_plan(self.package))
+
+    def test_rule_change_invalidates_plan(self):
+        before = self._breakdown()["final_total"]
+        PricingRule.objects.create(
+            name="Promo",
+            rule_type="DISCOUNT",
+            value=Decimal("100.00"),
+            is_percentage=False,
+            active_from=timezone.now() - timedelta(hours=1),
+        )
+        after = self._breakdown()["final_total"]
+        self.assertEqual(after, before - Decimal("100.00"))
+
+    def test_config_change_invalidates_plan(self):
+        travelers = [{"age": 30}, {"age": 8}, {"age": 3}]
+        self.assertEqual(
+            self._breakdown(travelers=travelers)["chargeable_travelers"], 2
+        )
+        config = PricingConfiguration.get_config()
+        config.chargeable_age_threshold = 10
+        config.save()
+        self.assertEqual(
+            self._breakdown(travelers=travelers)["chargeable_travelers"], 1
+        )
+
+    def test_m2m_change_invalidates_plan(self):
+        extra = Experience.objects.create(
+            name="Boat", description="Boat", base_price=Decimal("300.00")
+        )
+        self.assertNotIn(extra.id, get_pricing_plan(self.package).experiences)
+        self.package.experiences.add(extra)
+        self.assertIn(extra.id, get_pricing_plan(self.package).experiences)
+
+    def test_rules_respect_validity_window_without_recompile(self):
+        now = timezone.now()
+        PricingRule.objects.create(
+            name="Future",
+            rule_type="DISCOUNT",
+            value=Decimal("10.00"),
+            is_percentage=True,
+            active_from=now + timedelta(hours=2),
+            active_to=now + timedelta(hours=4),
+        )
+        plan = get_pricing_plan(self.package)
+        self.assertEqual([r.name for r in plan.active_rules(now)], ["GST"])
+        self.assertEqual(
+            [r.name for r in plan.active_rules(now + timedelta(hours=3))],
+            ["GST", "Future"],
+        )
+        self.assertEqual(
+            [r.name for r in plan.active_rules(now + timedelta(hours=5))], ["GST"]
+        )
+
+    def test_get_experiences_rejects_unknown_ids(self):
+        plan = get_pricing_plan(self.package)
+        self.assertIsNone(plan.get_experiences([self.experience.id, 999999]))
+        self.assertEqual(
+            [exp.id for exp in plan.get_experiences([self.experience.id])],
+            [self.experience.id],
+        )
@@ -0,0 +1,142 @@
+"""
+Tests for the shared pricing rule index.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.test import TestCase
+from django.utils import timezone
+
+from cities.models import City
+from packages.models import Package
+from pricing_engine.models import PricingRule
+from pricing_engine.services.pricing_plan import clear_local_plans, get_pricing_plan
+from pricing_engine.services.pricing_service import PricingService
+from pricing_engine.services.rule_index import get_rule_index
+
+
+def query_based_rules(package, moment):
+    """Frozen copy of the original per-request rule query"""
+    return list(
+        PricingRule.objects.filter(is_active=True, active_from__lte=moment)
+        .filter(Q(active_to__gte=moment) | Q(active_to__isnull=True))
+        .filter(Q(target_package=package) | Q(target_package__isnull=True))
+        .order_by("active_from")
+        .values_list("id", flat=True)
+    )
+
+
+class RuleIndexTests(TestCase):
+    """The rule index is exact at boundaries and shared by all packages."""
+
+    def setUp(self):
+        cache.clear()
+        clear_local_plans()
+        self.now = timezone.now().replace(microsecond=0)
+        city = City.objects.create(
+            name="Index City", slug="index-city", description="Test description"
+        )
+        self.package = Package.objects.create(
+            name="Index Package",
+            slug="index-package",
+            city=city,
+            description="Test package description",
+        )
+        self.other = Package.objects.create(
+            name="Other Package",
+            slug="other-package",
+            city=city,
+            description="Test package description",
+        )
+        self.gst = self._rule("GST", hours_from=-48)
+        self.flash = self._rule("Flash", hours_from=1, hours_to=3)
+        self.local = self._rule("Local", hours_from=-2, package=self.package)
+        self.expired = self._rule("Expired", hours_from=-10, hours_to=-1)
+        self.elsewhere = self._rule("Elsewhere", hours_from=-5, package=self.other)
+
+    def _rule(self, name, hours_from, hours_to=None, package=None):
+        return PricingRule.objects.create(
+            name=name,
+            rule_type="DISCOUNT",
+            value=Decimal("5.00"),
+            is_percentage=True,
+            target_package=package,
+            active_from=self.now + timedelta(hours=hours_from),
+            active_to=self.now + timedelta(hours=hours_to) if hours_to else None,
+        )
+
+    def _names(self, package_id, at):
+        return [rule.name for rule in get_rule_index().active_rules(package_id, at)]
+
+    def test_matches_query_based_lookup(self):
+        for hours in (0, 1, 2, 3, 4):
+            moment = self.now + timedelta(hours=hours)
+            for package in (None, self.package, self.other):
+                self.assertEqual(
+                    [
+                        rule.id
+                        for rule in get_rule_index().active_rules(
+                            package.id if package else None, moment
+                        )
+                    ],
+                    query_based_rules(package, moment),
+                )
+
+    def test_exact_at_boundaries(self):
+        starts = self.flash.active_from
+        ends = self.flash.active_to
+        tick = timedelta(microseconds=1)
+        self.assertNotIn("Flash", self._names(None, starts - tick))
+        self.assertIn("Flash", self._names(None, starts))
+        self.assertIn("Flash", self._names(None, ends))
+        self.assertNotIn("Flash", self._names(None, ends + tick))
+
+    def test_package_rules_merged_chronologically(self):
+        self.assertEqual(
+            self._names(self.package.id, self.now + timedelta(hours=2)),
+            ["GST", "Local", "Flash"],
+        )
+        self.assertEqual(self._names(self.other.id, self.now), ["GST", "Elsewhere"])
+        self.assertEqual(self._names(None, self.now), ["GST"])
+
+    def test_next_boundary(self):
+        index = get_rule_index()
+        self.assertEqual(index.next_boundary(self.now), self.flash.active_from)
+        self.assertEqual(
+            index.next_boundary(self.flash.active_from), self.flash.active_to
+        )
+        self.assertIsNone(
+            index.next_boundary(self.flash.active_to + timedelta(seconds=1))
+        )
+
+    def test_index_shared_by_all_plans(self):
+        self.assertIs(
+            get_pricing_plan(self.package).rule_index,
+            get_pricing_plan(self.other).rule_index,
+        )
+
+    def test_rule_change_rebuilds_index_without_recompiling_plans(self):
+        plan = get_pricing_plan(self.package)
+        index = plan.rule_index
+
+        self._rule("Monsoon", hours_from=-1)
+        # Only the index is rebuilt; package components are not reloaded
+        with self.assertNumQueries(1):
+            updated = get_pricing_plan(self.package)
+        self.assertIsNot(updated.rule_index, index)
+        self.assertIs(updated.experiences, plan.experiences)
+        self.assertIn("Monsoon", [rule.name for rule in updated.active_rules()])
+
+        self.gst.delete()
+        self.assertNotIn(
+            "GST", [rule.name for rule in get_pricing_plan(self.package).active_rules()]
+        )
+
+    def test_warm_lookup_issues_no_queries(self):
+        PricingService.get_applicable_rules(self.package)
+        with self.assertNumQueries(0):
+            rules = PricingService.get_applicable_rules(self.package)
+        self.assertEqual([rule.name for rule in rules], ["GST", "Local"])
@@ -3,10 +3,14 @@ Unit tests for vehicle optimization engine.
 Tests mathematical correctness, edge cases, and performance.
 """
 
+import itertools
+import random
 from decimal import Decimal
+from math import ceil
 
 import pytest
 from pricing_engine.services.vehicle_optimization import (
+    BacktrackingVehicleOptimizationEngine,
     VehicleCombination,
     VehicleOptimizationEngine,
     VehicleType,
@@ -14,6 +18,49 @@ from pricing_engine.services.vehicle_optimization import (
 )
 
 
+def exhaustive_solutions(vehicle_types, passenger_count, num_days):
+    """Reference: every bounded allocation, full dominance check, stable sort"""
+    vehicle_types = [v for v in vehicle_types if v.is_active]
+    days = max(1, ceil(num_days))
+    solutions = []
+    for counts in itertools.product(
+        *(
+            range(ceil(passenger_count / v.passenger_capacity) + 1)
+            for v in vehicle_types
+        )
+    ):
+        capacity = sum(c * v.passenger_capacity for c, v in zip(counts, vehicle_types))
+        if capacity < passenger_count:
+            continue
+        cost = sum(c * v.base_price_per_day for c, v in zip(counts, vehicle_types))
+        solutions.append(
+            VehicleCombination(
+                vehicles=[(v, c) for v, c in zip(vehicle_types, counts) if c > 0],
+                total_vehicle_count=sum(counts),
+                total_capacity=capacity,
+                unused_seats=capacity - passenger_count,
+                cost_per_day=cost,
+                total_cost=cost * days,
+                num_days=days,
+            )
+        )
+    front = [a for a in solutions if not any(b.dominates(a) for b in solutions)]
+    front.sort()
+    return front
+
+
+def summary(solutions):
+    return [
+        (
+            s.total_vehicle_count,
+            s.unused_seats,
+            s.total_cost,
+            [(vehicle.id, count) for vehicle, count in s.vehicles],
+        )
+        for s in solutions
+    ]
+
+
 @pytest.fixture
 def vehicle_types():
     """Standard set of vehicle types for testing"""
@@ -314,6 +361,177 @@ class TestVehicleOptimizationEngine:
         assert recommended.total_capacity >= 10
 
 
+class TestDynamicProgrammingSolver:
+    """The DP solver returns exactly the Pareto front of the full search space"""
+
+    def test_matches_exhaustive_search_on_random_fleets(self):
+        rng = random.Random(42)
+        for _ in range(200):
+            fleet = [
+                VehicleType(
+                    id=i + 1,
+                    name=f"Vehicle {i + 1}",
+                    passenger_capacity=rng.choice([2, 4, 5, 6, 7, 12, 17, 26]),
+                    luggage_capacity=2,
+                    base_price_per_day=Decimal(rng.choice([800, 1000, 1500, 2500])),
+                    is_active=True,
+                )
+                for i in range(rng.randint(1, 4))
+            ]
+            passengers = rng.randint(1, 30)
+            num_days = rng.randint(1, 5)
+
+            solutions = VehicleOptimizationEngine(fleet, passengers, num_days).optimize(
+                max_solutions=10
+            )
+
+            assert summary(solutions) == summary(
+                exhaustive_solutions(fleet, passengers, num_days)[:10]
+            )
+
+    def test_ties_kept_in_enumeration_order(self):
+        twins = [
+            VehicleType(
+                id=i,
+                name=f"Innova {i}",
+                passenger_capacity=7,
+                luggage_capacity=4,
+                base_price_per_day=Decimal("1500"),
+                is_active=True,
+            )
+            for i in (1, 2)
+        ]
+        solutions = VehicleOptimizationEngine(twins, 10, 1).optimize()
+
+        assert summary(solutions) == summary(exhaustive_solutions(twins, 10, 1))
+        # Same (count, unused, cost): ordered as the count vectors enumerate
+        assert [[(v.id, c) for v, c in s.vehicles] for s in solutions] == [
+            [(2, 2)],
+            [(1, 1), (2, 1)],
+            [(1, 2)],
+        ]
+
+    def test_best_tier_matches_backtracking_engine(self, vehicle_types):
+        for passengers in range(1, 61):
+            solutions = VehicleOptimizationEngine(
+                vehicle_types, passengers, 2
+            ).optimize(max_solutions=50)
+            legacy = BacktrackingVehicleOptimizationEngine(
+                vehicle_types, passengers, 2
+            ).optimize(max_solutions=50)
+
+            fewest = solutions[0].total_vehicle_count
+            assert summary(
+                [s for s in solutions if s.total_vehicle_count == fewest]
+            ) == summary([s for s in legacy if s.total_vehicle_count == fewest])
+
+    def test_sweep_matches_per_group_solves(self, vehicle_types):
+        fronts = VehicleOptimizationEngine(
+            vehicle_types, passenger_count=40, num_days=1
+        ).optimize_all_group_sizes()
+
+        assert sorted(fronts) == list(range(1, 41))
+        for passengers, front in fronts.items():
+            engine = VehicleOptimizationEngine(vehicle_types, passengers, 1)
+            engine.optimize()
+            assert front == engine.solutions
+
+    def test_large_fleet_stays_within_budget(self):
+        fleet = [
+            VehicleType(
+                id=i + 1,
+                name=f"Vehicle {i + 1}",
+                passenger_capacity=capacity,
+                luggage_capacity=2,
+                base_price_per_day=Decimal(capacity * (200 + 10 * i)),
+                is_active=True,
+            )
+            for i, capacity in enumerate([4, 5, 6, 7, 8, 10, 12, 14, 17, 20, 26, 45])
+        ]
+        engine = VehicleOptimizationEngine(fleet, passenger_count=40, num_days=1)
+        solutions = engine.optimize()
+
+        assert not engine.budget_exhausted
+        assert solutions
+        assert all(s.total_capacity >= 40 for s in solutions)
+
+    def test_duplicate_fleet_stays_within_budget(self):
+        twins = [
+            VehicleType(
+                id=i,
+                name=f"Innova {i}",
+                passenger_capacity=7,
+                luggage_capacity=4,
+                base_price_per_day=Decimal("1500"),
+                is_active=True,
+            )
+            for i in range(1, 13)
+        ]
+        for passengers in (40, 60):
+            engine = VehicleOptimizationEngine(twins, passengers, num_days=1)
+            solutions = engine.optimize()
+
+            assert not engine.budget_exhausted
+            assert engine.nodes_expanded <= engine.DEFAULT_MAX_NODES
+            assert len(solutions) == 10
+            assert solutions[0].total_vehicle_count == ceil(passengers / 7)
+
+            sweep = VehicleOptimizationEngine(twins, passengers, num_days=1)
+            assert len(sweep.optimize_all_group_sizes()) == passengers
+
+    def test_tied_allocations_count_against_the_node_budget(self):
+        twins = [
+            VehicleType(
+                id=i,
+                name=f"Innova {i}",
+                passenger_capacity=7,
+                luggage_capacity=4,
+                base_price_per_day=Decimal("1500"),
+                is_active=True,
+            )
+            for i in range(1, 9)
+        ]
+        engine = VehicleOptimizationEngine(
+            twins, passenger_count=40, num_days=1, max_nodes=1000, max_ties=10**9
+        )
+        solutions = engine.optimize()
+
+        # Far fewer than 1000 states, but every tied allocation is work
+        assert engine.budget_exhausted
+        assert solutions[0].total_capacity >= 40
+
+    def test_capped_ties_keep_the_first_solutions(self):
+        twins = [
+            VehicleType(
+                id=i,
+                name=f"Innova {i}",
+                passenger_capacity=7,
+                luggage_capacity=4,
+                base_price_per_day=Decimal("1500"),
+                is_active=True,
+            )
+            for i in range(1, 5)
+        ]
+        for passengers in (10, 15, 20):
+            solutions = VehicleOptimizationEngine(
+                twins, passengers, 1, max_ties=3
+            ).optimize(max_solutions=3)
+
+            assert summary(solutions) == summary(
+                exhaustive_solutions(twins, passengers, 1)[:3]
+            )
+
+    def test_exhausted_budget_still_returns_allocation(self, vehicle_types):
+        engine = VehicleOptimizationEngine(
+            vehicle_types, passenger_count=30, num_days=1, max_nodes=1
+        )
+        solutions = engine.optimize()
+
+        assert engine.budget_exhausted
+        assert solutions
+        assert solutions[0].total_capacity >= 30
+
+
 class TestCalculateVehiclePrice:
     """Test vehicle price calculation function"""
 
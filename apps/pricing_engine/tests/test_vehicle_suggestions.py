@@ -0,0 +1,140 @@
+"""
+Tests for memoized vehicle suggestions.
+"""
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from packages.models import TransportOption
+from pricing_engine.services.pricing_plan import clear_local_plans
+from pricing_engine.services.vehicle_optimization import (
+    VehicleOptimizationEngine,
+    VehicleType,
+)
+from pricing_engine.services.vehicle_suggestions import (
+    clear_local_suggestions,
+    get_active_fleet,
+    precompute_vehicle_suggestions,
+    suggest_vehicles,
+)
+from rest_framework.test import APIClient
+
+
+@override_settings(VEHICLE_SUGGESTIONS_PRECOMPUTED_PASSENGERS=20)
+class VehicleSuggestionTests(TestCase):
+    """Suggestions are served from per-fleet precomputed fronts."""
+
+    def setUp(self):
+        cache.clear()
+        clear_local_plans()
+        clear_local_suggestions()
+        self.sedan = TransportOption.objects.create(
+            name="Sedan",
+            description="Sedan",
+            base_price=Decimal("900.00"),
+            base_price_per_day=Decimal("1000.00"),
+            passenger_capacity=4,
+        )
+        self.suv = TransportOption.objects.create(
+            name="SUV",
+            description="SUV",
+            base_price=Decimal("1200.00"),
+            base_price_per_day=Decimal("1500.00"),
+            passenger_capacity=7,
+        )
+        self.van = TransportOption.objects.create(
+            name="Van",
+            description="Van",
+            base_price=Decimal("2500.00"),
+            passenger_capacity=12,
+        )
+        TransportOption.objects.create(
+            name="Retired Bus",
+            description="Bus",
+            base_price=Decimal("100.00"),
+            passenger_capacity=40,
+            is_active=False,
+        )
+
+    def _engine_solutions(self, passenger_count, num_days, max_solutions=10):
+        """What the endpoint computed per request before memoization"""
+        vehicle_types = [
+            VehicleType(
+                id=option.id,
+                name=option.name,
+                passenger_capacity=option.passenger_capacity,
+                luggage_capacity=option.luggage_capacity,
+                base_price_per_day=option.get_effective_price_per_day(),
+                is_active=option.is_active,
+            )
+            for option in TransportOption.objects.filter(is_active=True)
+        ]
+        return VehicleOptimizationEngine(
+            vehicle_types, passenger_count, num_days
+        ).optimize(max_solutions=max_solutions)
+
+    def test_matches_engine_for_every_group_size(self):
+        for passengers in range(1, 26):
+            for num_days in (1, 2.5, 7):
+                self.assertEqual(
+                    suggest_vehicles(passengers, num_days),
+                    self._engine_solutions(passengers, num_days),
+                )
+
+    def test_warm_lookup_issues_no_queries(self):
+        self.assertEqual(precompute_vehicle_suggestions(), 20)
+        with self.assertNumQueries(0):
+            solutions = suggest_vehicles(10, 3)
+        self.assertEqual(solutions[0].num_days, 3)
+        self.assertEqual(solutions[0].total_cost, solutions[0].cost_per_day * 3)
+
+    def test_fronts_shared_through_cache(self):
+        precompute_vehicle_suggestions()
+        clear_local_suggestions()
+        with self.assertNumQueries(0):
+            solutions = suggest_vehicles(12, 2)
+        self.assertEqual(solutions, self._engine_solutions(12, 2))
+
+    def test_fleet_change_changes_version(self):
+        fleet_hash, _ = get_active_fleet()
+        before = suggest_vehicles(12, 1)[0]
+        self.assertEqual(before.vehicles[0][0].name, "Van")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.van.is_active = False
+            self.van.save()
+
+        self.assertNotEqual(get_active_fleet()[0], fleet_hash)
+        with self.assertNumQueries(0):
+            after = suggest_vehicles(12, 1)
+        self.assertEqual(after, self._engine_solutions(12, 1))
+        self.assertNotIn("Van", [v.name for s in after for v, _ in s.vehicles])
+
+    def test_endpoint_response(self):
+        response = APIClient().post(
+            "/api/packages/vehicle-suggestions/",
+            {"passenger_count": 10, "num_days": 2.5, "max_solutions": 3},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["num_days"], 3)
+        self.assertEqual(
+            data["solutions"],
+            [
+                {**solution.to_dict(), "recommended": i == 0}
+                for i, solution in enumerate(self._engine_solutions(10, 2.5, 3))
+            ],
+        )
+
+    def test_endpoint_without_active_fleet(self):
+        TransportOption.objects.update(is_active=False)
+        clear_local_plans()
+        response = APIClient().post(
+            "/api/packages/vehicle-suggestions/",
+            {"passenger_count": 10, "num_days": 2},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
@@ -6,7 +6,7 @@ from django.contrib import admin
 from django.db.models import Avg, Count
 from django.utils.html import format_html
 
-from .models import PopularSearch, SearchClick, SearchQuery
+from .models import PopularSearch, SearchClick, SearchHourlyRollup, SearchQuery
 
 
 class ZeroResultsFilter(admin.SimpleListFilter):
@@ -212,7 +212,7 @@ class PopularSearchAdmin(admin.ModelAdmin):
         "avg_result_count",
         "last_searched",
     ]
-    ordering = ["-search_count"]
+    ordering = ["-score"]
 
     def click_through_rate(self, obj):
         """Calculate and display click-through rate"""
@@ -236,3 +236,25 @@ class PopularSearchAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         """Make read-only"""
         return False
+
+
+@admin.register(SearchHourlyRollup)
+class SearchHourlyRollupAdmin(admin.ModelAdmin):
+    """Hourly search totals (maintained by search.rollups)"""
+
+    list_display = [
+        "hour",
+        "search_count",
+        "zero_result_count",
+        "click_count",
+    ]
+    date_hierarchy = "hour"
+    ordering = ["-hour"]
+
+    def has_add_permission(self, request):
+        """Disable manual creation"""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Make read-only"""
+        return False
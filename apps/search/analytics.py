@@ -0,0 +1,219 @@
+"""
+Buffered search analytics
+
+Searches and result clicks are recorded as plain dicts in a bounded
+in-process buffer; nothing is written to the database inside the request.
+A background thread (started by backend.wsgi in server processes) writes
+them with bulk_create every FLUSH_INTERVAL seconds, or as soon as a batch
+is full. When the buffer is full the oldest events are dropped, so a slow
+or unavailable database never grows memory or slows searches down. The
+buffer is flushed when the process exits.
+
+Fields are truncated (and IP addresses validated) when recorded, since they
+come from the client. Each batch is written atomically; a batch that fails
+is split in halves and retried, so one bad event only drops itself.
+
+Outside server processes (tests, shell) no thread runs: call flush().
+"""
+
+import atexit
+import ipaddress
+import logging
+import os
+import threading
+from collections import deque
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from backend.metrics import SEARCH_ANALYTICS_DROPPED, SEARCH_ANALYTICS_WRITTEN
+
+from .models import SearchClick, SearchQuery
+
+logger = logging.getLogger(__name__)
+
+QUERY = "query"
+CLICK = "click"
+
+# Clicks without a valid search_query_id are linked to the latest search
+# recorded within this window (as the synchronous tracking used to do)
+CLICK_SEARCH_WINDOW = timedelta(minutes=5)
+
+
+def _analytics_setting(name, default):
+    return getattr(settings, "SEARCH_ANALYTICS", {}).get(name, default)
+
+
+def _valid_ip(value: Optional[str]) -> Optional[str]:
+    """The address, or None if it is not one (X-Forwarded-For is client input)"""
+    try:
+        return str(ipaddress.ip_address((value or "").strip()))
+    except ValueError:
+        return None
+
+
+class AnalyticsBuffer:
+    def __init__(self):
+        self._events = deque(maxlen=_analytics_setting("BUFFER_SIZE", 10000))
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker_pid: Optional[int] = None
+        self.dropped = 0
+
+    @property
+    def batch_size(self) -> int:
+        return _analytics_setting("BATCH_SIZE", 500)
+
+    def record_search(
+        self,
+        query: str,
+        user_id: Optional[int],
+        result_count: int,
+        search_time_ms: float,
+        categories: str,
+        ip_address: Optional[str],
+        user_agent: str,
+    ) -> None:
+        self._add(
+            QUERY,
+            {
+                "query": query[:200],
+                "user_id": user_id,
+                "result_count": result_count,
+                "search_time_ms": search_time_ms,
+                "categories": categories[:100],
+                "ip_address": _valid_ip(ip_address),
+                "user_agent": user_agent[:500],  # Truncate to avoid overflow
+                "timestamp": timezone.now(),
+            },
+        )
+
+    def record_click(
+        self,
+        search_query_id: Optional[int],
+        result_type: str,
+        result_id: int,
+        result_title: str,
+        position: int,
+    ) -> None:
+        self._add(
+            CLICK,
+            {
+                "search_query_id": search_query_id,
+                "result_type": result_type[:50],
+                "result_id": result_id,
+                "result_title": result_title[:255],
+                "position": position,
+                "timestamp": timezone.now(),
+            },
+        )
+
+    def _add(self, kind: str, fields: Dict) -> None:
+        if len(self._events) == self._events.maxlen:
+            # deque(maxlen) evicts the oldest event on append
+            self.dropped += 1
+            SEARCH_ANALYTICS_DROPPED.inc()
+        self._events.append((kind, fields))
+        if self._worker_pid is not None:
+            if self._worker_pid != os.getpid():
+                # Forked after start() (e.g. gunicorn --preload)
+                self.start()
+            if len(self._events) >= self.batch_size:
+                self._wakeup.set()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def start(self) -> None:
+        """Start the background writer of this process (idempotent)"""
+        if self._worker_pid == os.getpid():
+            return
+        self._worker_pid = os.getpid()
+        threading.Thread(target=self._run, name="search-analytics", daemon=True).start()
+        atexit.register(self.flush)
+
+    def _run(self) -> None:
+        interval = _analytics_setting("FLUSH_INTERVAL", 2.0)
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write every buffered event
+
+        Returns:
+            Number of events written
+        """
+        written = 0
+        with self._flush_lock:
+            while self._events:
+                written += self._write_or_split(self._take(self.batch_size))
+        return written
+
+    def _write_or_split(self, batch: List) -> int:
+        try:
+            with transaction.atomic():
+                return self._write(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                # Analytics never retry: the failing event is dropped
+                logger.error(f"Error writing a search analytics event: {str(e)}")
+                return 0
+        half = len(batch) // 2
+        return self._write_or_split(batch[:half]) + self._write_or_split(batch[half:])
+
+    def _take(self, count: int) -> List:
+        batch = []
+        while self._events and len(batch) < count:
+            batch.append(self._events.popleft())
+        return batch
+
+    def _write(self, batch: List) -> int:
+        queries = [SearchQuery(**fields) for kind, fields in batch if kind == QUERY]
+        SearchQuery.objects.bulk_create(queries)
+
+        clicks = [fields for kind, fields in batch if kind == CLICK]
+        if clicks:
+            # Searches of this batch are written first, so they can be linked
+            known_ids = set(
+                SearchQuery.objects.filter(
+                    id__in={c["search_query_id"] for c in clicks} - {None}
+                ).values_list("id", flat=True)
+            )
+            fallback_id = None
+            if any(c["search_query_id"] not in known_ids for c in clicks):
+                since = min(c["timestamp"] for c in clicks) - CLICK_SEARCH_WINDOW
+                fallback_id = (
+                    SearchQuery.objects.filter(timestamp__gte=since)
+                    .order_by("-timestamp")
+                    .values_list("id", flat=True)
+                    .first()
+                )
+
+            rows = []
+            for fields in clicks:
+                search_query_id = fields["search_query_id"]
+                if search_query_id not in known_ids:
+                    search_query_id = fallback_id
+                if search_query_id is None:
+                    logger.warning("Click tracked without associated search query")
+                    continue
+                rows.append(
+                    SearchClick(**{**fields, "search_query_id": search_query_id})
+                )
+            SearchClick.objects.bulk_create(rows)
+            clicks = rows
+
+        SEARCH_ANALYTICS_WRITTEN.labels(QUERY).inc(len(queries))
+        SEARCH_ANALYTICS_WRITTEN.labels(CLICK).inc(len(clicks))
+        return len(queries) + len(clicks)
+
+
+# Shared by every thread of the process
+search_analytics = AnalyticsBuffer()
@@ -0,0 +1,132 @@
+"""
+Search backends for universal search
+
+PostgreSQL: matches the stored, trigger-maintained ``search_vector`` column
+(GIN indexed, see migration 0003) and orders by ``SearchRank``.
+Other databases (SQLite in tests): ILIKE matching on the same fields with a
+constant rank, so callers get the same annotated queryset either way.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+
+# Fields that make up each model's search document (same fields the triggers
+# index, in weight order)
+SEARCH_FIELDS = {
+    "packages.package": ("name", "description"),
+    "packages.experience": ("name", "description"),
+    "cities.city": ("name", "description"),
+    "articles.article": ("title", "content", "author"),
+}
+
+# Rank reported by the fallback backend (previously hard-coded in the views)
+FALLBACK_RANK = 0.5
+
+TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def _search_fields(queryset):
+    return SEARCH_FIELDS[queryset.model._meta.label_lower]
+
+
+def _ordering(queryset):
+    """Existing ordering of the queryset, used to break rank ties"""
+    return list(queryset.query.order_by or queryset.model._meta.ordering)
+
+
+class SearchBackend:
+    """Base class; subclasses implement match() and rank()"""
+
+    def match(self, queryset, text):
+        """
+        Filter condition for rows matching text
+
+        Args:
+            queryset: Queryset of a model listed in SEARCH_FIELDS
+            text: User search text
+
+        Returns:
+            Q object
+        """
+        raise NotImplementedError
+
+    def rank(self, queryset, text):
+        """Expression scoring how well a row matches text"""
+        raise NotImplementedError
+
+    def search(self, queryset, text, extra_q=None):
+        """
+        Rows matching text (or extra_q), best matches first
+
+        Args:
+            queryset: Queryset of a model listed in SEARCH_FIELDS
+            text: User search text
+            extra_q: Optional Q object OR-ed with the text match
+
+        Returns:
+            Queryset annotated with ``rank`` and ordered by it, then by the
+            queryset's existing ordering
+        """
+        condition = self.match(queryset, text)
+        if extra_q is not None:
+            condition |= extra_q
+
+        return (
+            queryset.filter(condition)
+            .defer("search_vector")
+            .annotate(rank=self.rank(queryset, text))
+            .order_by("-rank", *_ordering(queryset))
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Full-text search on the stored, GIN-indexed search_vector column"""
+
+    config = "english"
+
+    def _query(self, text):
+        """
+        All terms must match; the last one as a prefix so results keep up
+        while the user is typing. Terms are reduced to word characters, so
+        the raw tsquery syntax cannot be injected.
+        """
+        terms = TERM_PATTERN.findall(text.lower())
+        if not terms:
+            return None
+        raw = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+        return SearchQuery(raw, search_type="raw", config=self.config)
+
+    def match(self, queryset, text):
+        query = self._query(text)
+        if query is None:
+            return Q(pk__in=[])
+        return Q(search_vector=query)
+
+    def rank(self, queryset, text):
+        query = self._query(text)
+        if query is None:
+            return Value(0.0, output_field=FloatField())
+        return SearchRank(F("search_vector"), query)
+
+
+class FallbackSearchBackend(SearchBackend):
+    """ILIKE matching for databases without full-text search"""
+
+    def match(self, queryset, text):
+        condition = Q()
+        for field in _search_fields(queryset):
+            condition |= Q(**{f"{field}__icontains": text})
+        return condition
+
+    def rank(self, queryset, text):
+        return Value(FALLBACK_RANK, output_field=FloatField())
+
+
+def get_search_backend():
+    """Backend for the default database connection"""
+    if connection.vendor == "postgresql":
+        return PostgresSearchBackend()
+    return FallbackSearchBackend()
@@ -1,15 +1,18 @@
 """
 Management command to aggregate popular searches
-Run this periodically (e.g., daily via cron) to update PopularSearch table
+Run with --incremental every few minutes (the search.aggregate_popular_searches
+task does) to merge new searches into the PopularSearch table; run without it
+to rebuild the table from the last --days days
 """
 
-from datetime import timedelta
-
 from django.core.management.base import BaseCommand
-from django.db.models import Avg, Count
-from django.utils import timezone
 
-from search.models import PopularSearch, SearchClick, SearchQuery
+from search.models import PopularSearch
+from search.popular import (
+    decayed_count,
+    merge_new_searches,
+    rebuild_popular_searches,
+)
 
 
 class Command(BaseCommand):
@@ -26,63 +29,40 @@ class Command(BaseCommand):
             "--min-searches",
             type=int,
             default=2,
-            help="Minimum number of searches to be considered popular (default: 2)",
+            help="Minimum number of searches to be considered popular, "
+            "also for new queries with --incremental (default: 2)",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only merge searches made since the last run "
+            "(rebuilds when there is no previous run)",
         )
 
     def handle(self, *args, **options):
         days = options["days"]
         min_searches = options["min_searches"]
 
-        self.stdout.write(f"Aggregating searches from last {days} days...")
-
-        # Calculate date threshold
-        date_threshold = timezone.now() - timedelta(days=days)
-
-        # Get search queries from the period
-        queries = (
-            SearchQuery.objects.filter(timestamp__gte=date_threshold)
-            .values("query")
-            .annotate(
-                search_count=Count("id"),
-                avg_result_count=Avg("result_count"),
-            )
-            .filter(search_count__gte=min_searches)
-            .order_by("-search_count")
+        result = (
+            merge_new_searches(days, min_searches) if options["incremental"] else None
         )
-
-        updated_count = 0
-        created_count = 0
-
-        for query_data in queries:
-            query_text = query_data["query"]
-
-            # Count clicks for this query
-            click_count = SearchClick.objects.filter(
-                search_query__query=query_text,
-                search_query__timestamp__gte=date_threshold,
-            ).count()
-
-            # Update or create popular search
-            popular_search, created = PopularSearch.objects.update_or_create(
-                query=query_text,
-                defaults={
-                    "search_count": query_data["search_count"],
-                    "click_count": click_count,
-                    "avg_result_count": query_data["avg_result_count"],
-                },
+        if result is not None:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Merged {result['searches']} new searches: "
+                    f"{result['written']} popular searches updated, "
+                    f"{result['pruned']} pruned"
+                )
             )
-
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
-
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Successfully aggregated popular searches: "
-                f"{created_count} created, {updated_count} updated"
+        else:
+            self.stdout.write(f"Aggregating searches from last {days} days...")
+            result = rebuild_popular_searches(days, min_searches)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Successfully aggregated popular searches: "
+                    f"{result['created']} created, {result['updated']} updated"
+                )
             )
-        )
 
         # Show top 10
         top_searches = PopularSearch.objects.all()[:10]
@@ -95,6 +75,7 @@ class Command(BaseCommand):
             )
             self.stdout.write(
                 f"  {i}. {search.query} - "
+                f"{decayed_count(search.score):.1f} recent, "
                 f"{search.search_count} searches, "
                 f"{search.click_count} clicks, "
                 f"{ctr:.1f}% CTR"
@@ -0,0 +1,47 @@
+"""
+Management command to roll up search analytics
+Run this periodically (e.g., every 10 minutes via cron) when Celery beat
+does not run the search.roll_up_analytics task
+"""
+
+from django.core.management.base import BaseCommand
+
+from search.rollups import prune_search_analytics, roll_up_search_analytics
+
+
+class Command(BaseCommand):
+    help = "Roll up search queries and clicks into the analytics rollup tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-hours",
+            type=int,
+            default=None,
+            help="Hours to roll up in this run (default: ROLLUP_MAX_HOURS setting)",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Also delete raw rows older than the retention period",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=None,
+            help="Days of raw rows kept by --prune (default: RAW_RETENTION_DAYS)",
+        )
+
+    def handle(self, *args, **options):
+        result = roll_up_search_analytics(max_hours=options["max_hours"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rolled up {result['hours']} hours "
+                f"(watermark: {result['watermark']})"
+            )
+        )
+
+        if options["prune"]:
+            deleted = prune_search_analytics(options["retention_days"])
+            self.stdout.write(
+                self.style.SUCCESS(f"Pruned {deleted} raw search queries")
+            )
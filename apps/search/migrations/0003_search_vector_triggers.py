@@ -0,0 +1,102 @@
+"""
+Maintain the stored search_vector columns with triggers and index them with GIN.
+
+The trigger recomputes the weighted document whenever one of the searched
+columns is written, so every write path (ORM save, bulk_create, admin, raw
+SQL) keeps it current. The expression indexes from 0001 are superseded by the
+stored columns and are dropped.
+
+Only PostgreSQL has tsvector; on other databases this migration is a no-op.
+"""
+
+from django.db import migrations
+
+# table -> ((column, weight), ...)
+SEARCH_DOCUMENTS = {
+    "packages_package": (("name", "A"), ("description", "B")),
+    "packages_experience": (("name", "A"), ("description", "B")),
+    "cities_city": (("name", "A"), ("description", "B")),
+    "articles_article": (("title", "A"), ("content", "B"), ("author", "C")),
+}
+
+LEGACY_INDEXES = {
+    "packages_package": "packages_package_search_idx",
+    "packages_experience": "packages_experience_search_idx",
+    "cities_city": "cities_city_search_idx",
+    "articles_article": "articles_article_search_idx",
+}
+
+
+def _document(columns, prefix):
+    return " || ".join(
+        f"setweight(to_tsvector('english', COALESCE({prefix}{column}, '')), '{weight}')"
+        for column, weight in columns
+    )
+
+
+def _legacy_index_sql(table, columns):
+    expression = " || ' ' || ".join(f"COALESCE({column}, '')" for column, _ in columns)
+    return (
+        f"CREATE INDEX IF NOT EXISTS {LEGACY_INDEXES[table]} ON {table} "
+        f"USING GIN (to_tsvector('english', {expression}))"
+    )
+
+
+def create_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for table, columns in SEARCH_DOCUMENTS.items():
+        column_list = ", ".join(column for column, _ in columns)
+        schema_editor.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {_document(columns, "NEW.")};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """
+        )
+        schema_editor.execute(
+            f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {column_list} ON {table}
+            FOR EACH ROW EXECUTE PROCEDURE {table}_search_vector_update()
+            """
+        )
+        schema_editor.execute(
+            f"UPDATE {table} SET search_vector = {_document(columns, '')}"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_search_vector_gin "
+            f"ON {table} USING GIN (search_vector)"
+        )
+        schema_editor.execute(f"DROP INDEX IF EXISTS {LEGACY_INDEXES[table]}")
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for table, columns in SEARCH_DOCUMENTS.items():
+        schema_editor.execute(_legacy_index_sql(table, columns))
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_search_vector_gin")
+        schema_editor.execute(
+            f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}"
+        )
+        schema_editor.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0002_initial"),
+        ("packages", "0014_experience_search_vector_package_search_vector"),
+        ("cities", "0004_city_search_vector"),
+        ("articles", "0004_article_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
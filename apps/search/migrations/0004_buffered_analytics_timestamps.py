@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-16 20:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0003_search_vector_triggers"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="searchclick",
+            name="timestamp",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="searchquery",
+            name="timestamp",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now, editable=False
+            ),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.16 on 2026-10-16 20:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0004_buffered_analytics_timestamps"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchHourlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField(unique=True)),
+                ("search_count", models.IntegerField(default=0)),
+                ("zero_result_count", models.IntegerField(default=0)),
+                ("result_count_sum", models.BigIntegerField(default=0)),
+                ("search_time_ms_sum", models.FloatField(default=0)),
+                ("click_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Search Hourly Rollup",
+                "verbose_name_plural": "Search Hourly Rollups",
+                "ordering": ["-hour"],
+            },
+        ),
+        migrations.CreateModel(
+            name="SearchDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[
+                            ("query", "Query"),
+                            ("category", "Categories"),
+                            ("click", "Clicked result"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("key", models.CharField(max_length=255)),
+                ("detail", models.CharField(blank=True, default="", max_length=50)),
+                ("count", models.IntegerField(default=0)),
+                ("zero_result_count", models.IntegerField(default=0)),
+                ("result_count_sum", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Search Daily Rollup",
+                "verbose_name_plural": "Search Daily Rollups",
+                "ordering": ["-day", "-count"],
+                "indexes": [
+                    models.Index(
+                        fields=["dimension", "day"],
+                        name="search_sear_dimensi_9ded69_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="searchdailyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("day", "dimension", "key", "detail"),
+                name="unique_search_daily_rollup",
+            ),
+        ),
+    ]
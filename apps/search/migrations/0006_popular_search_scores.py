@@ -0,0 +1,55 @@
+# Generated by Django 4.2.16 on 2026-10-16 20:37
+
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def score_existing_searches(apps, schema_editor):
+    """Rank existing rows by their current search count (see search.popular)"""
+    PopularSearch = apps.get_model("search", "PopularSearch")
+    epoch = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+    weight = 2 ** ((timezone.now() - epoch) / timedelta(days=7))
+    PopularSearch.objects.update(score=F("search_count") * weight)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0005_search_analytics_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchAggregationWatermark",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("processed_until", models.DateTimeField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Search Aggregation Watermark",
+                "verbose_name_plural": "Search Aggregation Watermarks",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="popularsearch",
+            options={
+                "ordering": ["-score"],
+                "verbose_name": "Popular Search",
+                "verbose_name_plural": "Popular Searches",
+            },
+        ),
+        migrations.AddField(
+            model_name="popularsearch",
+            name="score",
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.RunPython(score_existing_searches, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,7 @@ Models for search analytics and tracking
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class SearchQuery(models.Model):
@@ -22,7 +23,10 @@ class SearchQuery(models.Model):
     categories = models.CharField(max_length=100, blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Set when the search is recorded, not when the buffered row is written
+    timestamp = models.DateTimeField(
+        default=timezone.now, editable=False, db_index=True
+    )
 
     class Meta:
         verbose_name = "Search Query"
@@ -48,7 +52,7 @@ class SearchClick(models.Model):
     result_id = models.IntegerField()
     result_title = models.CharField(max_length=255)
     position = models.IntegerField()  # Position in search results
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         verbose_name = "Search Click"
@@ -70,12 +74,92 @@ class PopularSearch(models.Model):
     search_count = models.IntegerField(default=0)
     click_count = models.IntegerField(default=0)
     avg_result_count = models.FloatField(default=0)
+    # Search count decayed with a half-life, in units that grow over time
+    # (see popular.py): ranks like the decayed count without rewriting rows
+    score = models.FloatField(default=0, db_index=True)
     last_searched = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Popular Search"
         verbose_name_plural = "Popular Searches"
-        ordering = ["-search_count"]
+        ordering = ["-score"]
 
     def __str__(self):
         return f"{self.query} ({self.search_count} searches)"
+
+
+class SearchHourlyRollup(models.Model):
+    """
+    Search totals of one hour (see rollups.py). Every rolled up hour has a
+    row, even without searches: the latest one is the rollup watermark.
+    """
+
+    hour = models.DateTimeField(unique=True)
+    search_count = models.IntegerField(default=0)
+    zero_result_count = models.IntegerField(default=0)
+    result_count_sum = models.BigIntegerField(default=0)
+    search_time_ms_sum = models.FloatField(default=0)
+    click_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Search Hourly Rollup"
+        verbose_name_plural = "Search Hourly Rollups"
+        ordering = ["-hour"]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} ({self.search_count} searches)"
+
+
+class SearchDailyRollup(models.Model):
+    """Search and click counts of one day, per query, category or clicked result"""
+
+    QUERY = "query"
+    CATEGORY = "category"
+    CLICK = "click"
+    DIMENSION_CHOICES = [
+        (QUERY, "Query"),
+        (CATEGORY, "Categories"),
+        (CLICK, "Clicked result"),
+    ]
+
+    day = models.DateField()
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    # Query text, categories, or result title
+    key = models.CharField(max_length=255)
+    # Result type of clicked results
+    detail = models.CharField(max_length=50, blank=True, default="")
+    count = models.IntegerField(default=0)
+    zero_result_count = models.IntegerField(default=0)
+    result_count_sum = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Search Daily Rollup"
+        verbose_name_plural = "Search Daily Rollups"
+        ordering = ["-day", "-count"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "dimension", "key", "detail"],
+                name="unique_search_daily_rollup",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["dimension", "day"]),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.dimension}: {self.key} ({self.count})"
+
+
+class SearchAggregationWatermark(models.Model):
+    """Point up to which an incremental aggregation has processed raw rows"""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    processed_until = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Search Aggregation Watermark"
+        verbose_name_plural = "Search Aggregation Watermarks"
+
+    def __str__(self):
+        return f"{self.name}: {self.processed_until}"
@@ -0,0 +1,255 @@
+"""
+Popular searches aggregation
+
+PopularSearch rows are maintained set-based:
+
+- rebuild_popular_searches() recomputes the table from the raw searches of
+  the last days with one grouped statement (click counts come from a
+  per-search subquery, so the join does not inflate search counts or
+  averages) and one bulk upsert
+- merge_new_searches() only reads the searches and clicks recorded since
+  the previous run (the "popular_searches" watermark), merges them into the
+  touched rows with one bulk upsert and deletes rows whose decayed count
+  fell below PRUNE_BELOW. A query without a row is only added once it has
+  min_searches searches in the last days, like a rebuild would add it, so
+  one-off searches never become public suggestions. Its cost follows the
+  traffic since the last run, not the retained history, so it can run
+  every few minutes.
+
+Popularity decays with a half-life: a search made at time t adds
+decay_weight(t) = 2 ** ((t - SCORE_EPOCH) / half-life) to PopularSearch.score.
+Every score shrinks by the same factor as time passes, so ranking by score
+is ranking by decayed count and old rows never need rewriting;
+decayed_count() converts a score back to searches. At the default 7 day
+half-life floats hold scores for about 19 years after SCORE_EPOCH. Changing
+the half-life requires a rebuild.
+
+search_count, click_count and avg_result_count are totals since the last
+rebuild (or since the row was added); PopularSearchesView exposes the
+decayed count instead. Rows are only aggregated ROLLUP_LAG seconds after they are
+recorded, so buffered analytics (analytics.py) have been written.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import PopularSearch, SearchAggregationWatermark, SearchClick, SearchQuery
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "popular_searches"
+SCORE_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+# Rows whose decayed search count drops below this are deleted
+PRUNE_BELOW = 0.5
+
+UPDATE_FIELDS = [
+    "search_count",
+    "click_count",
+    "avg_result_count",
+    "score",
+    "last_searched",
+]
+
+
+def _analytics_setting(name, default):
+    return getattr(settings, "SEARCH_ANALYTICS", {}).get(name, default)
+
+
+def decay_weight(moment: datetime) -> float:
+    """Score added by one search made at `moment`"""
+    half_life = timedelta(days=_analytics_setting("POPULAR_HALF_LIFE_DAYS", 7))
+    return 2 ** ((moment - SCORE_EPOCH) / half_life)
+
+
+def decayed_count(score: float, now: Optional[datetime] = None) -> float:
+    """Searches a score is worth at `now` (default: current time)"""
+    return score / decay_weight(now or timezone.now())
+
+
+def _aggregation_end(now: Optional[datetime]) -> datetime:
+    lag = timedelta(seconds=_analytics_setting("ROLLUP_LAG", 300))
+    return (now or timezone.now()) - lag
+
+
+def rebuild_popular_searches(
+    days: int = 30, min_searches: int = 2, now: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    Recompute popular searches from the searches of the last `days` days
+
+    Args:
+        days: Number of days to look back
+        min_searches: Minimum number of searches to be considered popular
+        now: Current time (tests)
+
+    Returns:
+        Dict with the number of rows created and updated
+    """
+    end = _aggregation_end(now)
+    rows = _window_searches(end - timedelta(days=days), end).filter(
+        search_count__gte=min_searches
+    )
+
+    weight = decay_weight(end)
+    popular = [_popular_search(row, weight) for row in rows]
+
+    with transaction.atomic():
+        existing = set(
+            PopularSearch.objects.filter(
+                query__in=[p.query for p in popular]
+            ).values_list("query", flat=True)
+        )
+        _upsert(popular)
+        SearchAggregationWatermark.objects.update_or_create(
+            name=WATERMARK_NAME, defaults={"processed_until": end}
+        )
+
+    result = {
+        "created": len(popular) - len(existing),
+        "updated": len(existing),
+    }
+    logger.info(
+        f"Rebuilt popular searches: {result['created']} created, "
+        f"{result['updated']} updated"
+    )
+    return result
+
+
+def merge_new_searches(
+    days: int = 30, min_searches: int = 2, now: Optional[datetime] = None
+) -> Optional[Dict[str, int]]:
+    """
+    Merge the searches and clicks recorded since the last run into the
+    decayed popular searches
+
+    Args:
+        days: Number of days a new query's searches are counted over
+        min_searches: Searches a new query needs within `days` to be added
+        now: Current time (tests)
+
+    Returns:
+        Dict with the number of searches merged, rows written and rows
+        pruned, or None if there was no previous run (rebuild first)
+    """
+    end = _aggregation_end(now)
+    with transaction.atomic():
+        watermark = (
+            SearchAggregationWatermark.objects.select_for_update()
+            .filter(name=WATERMARK_NAME)
+            .first()
+        )
+        if watermark is None:
+            return None
+        start = watermark.processed_until
+        if end <= start:
+            return {"searches": 0, "written": 0, "pruned": 0}
+
+        searches = {
+            row["query"]: row
+            for row in SearchQuery.objects.filter(
+                timestamp__gte=start, timestamp__lt=end
+            )
+            .values("query")
+            .annotate(count=Count("id"), result_sum=Sum("result_count"))
+            .order_by()
+        }
+        clicks = dict(
+            SearchClick.objects.filter(timestamp__gte=start, timestamp__lt=end)
+            .values_list("search_query__query")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        existing = {
+            p.query: p
+            for p in PopularSearch.objects.filter(query__in=set(searches) | set(clicks))
+        }
+
+        weight = decay_weight(end)
+        # Queries without a row are counted over the window like a rebuild;
+        # their window totals already include the new searches and clicks
+        popular = [
+            _popular_search(row, weight)
+            for row in _window_searches(end - timedelta(days=days), end).filter(
+                query__in=set(searches) - set(existing),
+                search_count__gte=min_searches,
+            )
+        ]
+        for query, row in existing.items():
+            search = searches.get(query, {"count": 0, "result_sum": 0})
+            search_count = row.search_count + search["count"]
+            if search_count:
+                row.avg_result_count = (
+                    row.avg_result_count * row.search_count
+                    + (search["result_sum"] or 0)
+                ) / search_count
+            row.search_count = search_count
+            row.click_count += clicks.get(query, 0)
+            row.score += search["count"] * weight
+            popular.append(row)
+        _upsert(popular)
+
+        pruned, _ = PopularSearch.objects.filter(
+            score__lt=PRUNE_BELOW * weight
+        ).delete()
+        watermark.processed_until = end
+        watermark.save(update_fields=["processed_until", "updated_at"])
+
+    result = {
+        "searches": sum(row["count"] for row in searches.values()),
+        "written": len(popular),
+        "pruned": pruned,
+    }
+    logger.info(
+        f"Merged {result['searches']} searches into {result['written']} "
+        f"popular searches, pruned {result['pruned']}"
+    )
+    return result
+
+
+def _window_searches(start: datetime, end: datetime):
+    """Search and click counts per query between start and end"""
+    click_counts = (
+        SearchClick.objects.filter(search_query=OuterRef("pk"))
+        .order_by()
+        .values("search_query")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return (
+        SearchQuery.objects.filter(timestamp__gte=start, timestamp__lt=end)
+        .values("query")
+        .annotate(
+            search_count=Count("id"),
+            avg_result_count=Avg("result_count"),
+            click_count=Coalesce(Sum(Subquery(click_counts)), 0),
+        )
+        .order_by()
+    )
+
+
+def _popular_search(row: Dict, weight: float) -> PopularSearch:
+    return PopularSearch(
+        query=row["query"],
+        search_count=row["search_count"],
+        click_count=row["click_count"],
+        avg_result_count=row["avg_result_count"] or 0,
+        score=row["search_count"] * weight,
+    )
+
+
+def _upsert(popular) -> None:
+    PopularSearch.objects.bulk_create(
+        popular,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["query"],
+        update_fields=UPDATE_FIELDS,
+    )
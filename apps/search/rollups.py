@@ -0,0 +1,439 @@
+"""
+Search analytics rollups
+
+SearchAnalyticsView reads pre-aggregated counts instead of scanning the raw
+SearchQuery/SearchClick tables for the whole window:
+
+- SearchHourlyRollup: totals per hour (searches, zero-result searches,
+  result and latency sums, clicks)
+- SearchDailyRollup: counts per day and query, categories or clicked result
+
+roll_up_search_analytics() (search.roll_up_analytics task, every few
+minutes) aggregates complete hours after the watermark, the hour following
+the latest hourly row. Each hour is processed once: hourly rows are inserted
+and its counts are added to the daily rows. Hours are only rolled up
+ROLLUP_LAG seconds after they end, so buffered analytics (analytics.py)
+have been written by then.
+
+Reports combine the rollups up to the watermark with a raw-table tail from
+the watermark to now. Totals and daily trends start at the hour of the
+window start, breakdowns (top queries, clicks...) at its day.
+
+prune_search_analytics() deletes raw rows older than RAW_RETENTION_DAYS,
+never rows that are not rolled up yet.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from .models import SearchClick, SearchDailyRollup, SearchHourlyRollup, SearchQuery
+
+logger = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+# Hours aggregated per transaction
+HOURS_PER_CHUNK = 24
+# Rows per DELETE when pruning raw analytics
+PRUNE_BATCH_SIZE = 5000
+# Entries in the top queries and most clicked results lists
+TOP_LIMIT = 20
+
+
+def _analytics_setting(name, default):
+    return getattr(settings, "SEARCH_ANALYTICS", {}).get(name, default)
+
+
+def _floor_hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def rollup_watermark() -> Optional[datetime]:
+    """Start of the first hour that is not rolled up, None before the first run"""
+    latest = SearchHourlyRollup.objects.order_by("-hour").values_list("hour", flat=True)
+    latest = latest.first()
+    return latest + HOUR if latest is not None else None
+
+
+def roll_up_search_analytics(
+    max_hours: Optional[int] = None, now: Optional[datetime] = None
+) -> Dict[str, object]:
+    """
+    Roll up complete hours since the watermark
+
+    Args:
+        max_hours: Hours processed by this run (None = ROLLUP_MAX_HOURS);
+            the next run continues from the new watermark
+        now: Current time (tests)
+
+    Returns:
+        Dict with the number of hours rolled up and the new watermark
+    """
+    now = now or timezone.now()
+    max_hours = max_hours or _analytics_setting("ROLLUP_MAX_HOURS", 168)
+    end = _floor_hour(now - timedelta(seconds=_analytics_setting("ROLLUP_LAG", 300)))
+
+    start = rollup_watermark()
+    if start is None:
+        first = SearchQuery.objects.order_by("timestamp").values_list(
+            "timestamp", flat=True
+        )
+        first = first.first()
+        if first is None:
+            return {"hours": 0, "watermark": None}
+        start = _floor_hour(first)
+
+    end = min(end, start + max_hours * HOUR)
+    hours = 0
+    while start < end:
+        chunk_end = min(end, start + HOURS_PER_CHUNK * HOUR)
+        with transaction.atomic():
+            # The unique hour makes a concurrent run fail instead of
+            # counting the same hours twice
+            _roll_up_hours(start, chunk_end)
+        hours += int((chunk_end - start) / HOUR)
+        start = chunk_end
+
+    if hours:
+        logger.info(f"Rolled up {hours} hours of search analytics up to {start}")
+    return {"hours": hours, "watermark": start}
+
+
+def _roll_up_hours(start: datetime, end: datetime) -> None:
+    searches = SearchQuery.objects.filter(timestamp__gte=start, timestamp__lt=end)
+    clicks = SearchClick.objects.filter(timestamp__gte=start, timestamp__lt=end)
+
+    hourly = {}
+    hour = start
+    while hour < end:
+        hourly[hour] = SearchHourlyRollup(hour=hour)
+        hour += HOUR
+
+    for row in (
+        searches.annotate(bucket=TruncHour("timestamp"))
+        .values("bucket")
+        .annotate(**_search_totals())
+        .order_by()
+    ):
+        rollup = hourly[row["bucket"]]
+        rollup.search_count = row["searches"]
+        rollup.zero_result_count = row["zero_results"]
+        rollup.result_count_sum = row["result_sum"] or 0
+        rollup.search_time_ms_sum = row["time_sum"] or 0
+    for row in (
+        clicks.annotate(bucket=TruncHour("timestamp"))
+        .values("bucket")
+        .annotate(clicks=Count("id"))
+        .order_by()
+    ):
+        hourly[row["bucket"]].click_count = row["clicks"]
+    SearchHourlyRollup.objects.bulk_create(hourly.values())
+
+    daily = {}
+
+    def add(day, dimension, key, detail="", count=0, zero_results=0, result_sum=0):
+        row = daily.get((day, dimension, key, detail))
+        if row is None:
+            row = daily[(day, dimension, key, detail)] = SearchDailyRollup(
+                day=day, dimension=dimension, key=key, detail=detail
+            )
+        row.count += count
+        row.zero_result_count += zero_results
+        row.result_count_sum += result_sum or 0
+
+    by_day = searches.annotate(day=TruncDate("timestamp"))
+    for row in by_day.values("day", "query").annotate(**_search_totals()).order_by():
+        add(
+            row["day"],
+            SearchDailyRollup.QUERY,
+            row["query"],
+            count=row["searches"],
+            zero_results=row["zero_results"],
+            result_sum=row["result_sum"],
+        )
+    for row in (
+        by_day.values("day", "categories").annotate(searches=Count("id")).order_by()
+    ):
+        add(
+            row["day"],
+            SearchDailyRollup.CATEGORY,
+            row["categories"],
+            count=row["searches"],
+        )
+    for row in (
+        clicks.annotate(day=TruncDate("timestamp"))
+        .values("day", "result_title", "result_type")
+        .annotate(clicks=Count("id"))
+        .order_by()
+    ):
+        add(
+            row["day"],
+            SearchDailyRollup.CLICK,
+            row["result_title"],
+            row["result_type"],
+            count=row["clicks"],
+        )
+    _merge_daily(daily)
+
+
+def _merge_daily(daily: Dict[Tuple, SearchDailyRollup]) -> None:
+    """Add the counts to the stored daily rows (one read, one upsert)"""
+    if not daily:
+        return
+    existing = SearchDailyRollup.objects.filter(day__in={day for day, _, _, _ in daily})
+    for stored in existing.iterator():
+        row = daily.get((stored.day, stored.dimension, stored.key, stored.detail))
+        if row is not None:
+            row.count += stored.count
+            row.zero_result_count += stored.zero_result_count
+            row.result_count_sum += stored.result_count_sum
+
+    SearchDailyRollup.objects.bulk_create(
+        daily.values(),
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["day", "dimension", "key", "detail"],
+        update_fields=["count", "zero_result_count", "result_count_sum"],
+    )
+
+
+def _search_totals():
+    return {
+        "searches": Count("id"),
+        "zero_results": Count("id", filter=Q(result_count=0)),
+        "result_sum": Sum("result_count"),
+        "time_sum": Sum("search_time_ms"),
+    }
+
+
+def prune_search_analytics(
+    retention_days: Optional[int] = None, now: Optional[datetime] = None
+) -> int:
+    """
+    Delete raw searches (and their clicks) older than the retention period
+    that are already rolled up
+
+    Returns:
+        Number of searches deleted
+    """
+    retention_days = retention_days or _analytics_setting("RAW_RETENTION_DAYS", 90)
+    watermark = rollup_watermark()
+    if watermark is None:
+        return 0
+    cutoff = min((now or timezone.now()) - timedelta(days=retention_days), watermark)
+
+    deleted = 0
+    old_searches = SearchQuery.objects.filter(timestamp__lt=cutoff)
+    while True:
+        pks = list(old_searches.values_list("pk", flat=True)[:PRUNE_BATCH_SIZE])
+        if not pks:
+            break
+        with transaction.atomic():
+            SearchClick.objects.filter(search_query_id__in=pks).delete()
+            SearchQuery.objects.filter(pk__in=pks).delete()
+        deleted += len(pks)
+
+    if deleted:
+        logger.info(f"Pruned {deleted} raw search queries older than {cutoff}")
+    return deleted
+
+
+def search_analytics_report(days: int, now: Optional[datetime] = None) -> Dict:
+    """
+    SearchAnalyticsView payload for the last `days` days, from the rollups
+    plus the raw rows after the watermark
+    """
+    now = now or timezone.now()
+    window_start = _floor_hour(now - timedelta(days=days))
+    watermark = rollup_watermark()
+    if watermark is None or watermark <= window_start:
+        # Nothing rolled up in the window: everything comes from the tail
+        watermark = window_start
+
+    searches = SearchQuery.objects.filter(timestamp__gte=watermark)
+    clicks = SearchClick.objects.filter(timestamp__gte=watermark)
+
+    # Totals
+    hourly = SearchHourlyRollup.objects.filter(
+        hour__gte=window_start, hour__lt=watermark
+    )
+    totals = hourly.aggregate(
+        searches=Sum("search_count"),
+        zero_results=Sum("zero_result_count"),
+        result_sum=Sum("result_count_sum"),
+        time_sum=Sum("search_time_ms_sum"),
+        clicks=Sum("click_count"),
+    )
+    tail = searches.aggregate(**_search_totals())
+    total_searches = (totals["searches"] or 0) + tail["searches"]
+    zero_results = (totals["zero_results"] or 0) + tail["zero_results"]
+    result_sum = (totals["result_sum"] or 0) + (tail["result_sum"] or 0)
+    time_sum = (totals["time_sum"] or 0) + (tail["time_sum"] or 0)
+    total_clicks = (totals["clicks"] or 0) + clicks.count()
+
+    def percent(part, whole):
+        return part / whole * 100 if whole > 0 else 0
+
+    def average(total, count):
+        return total / count if count > 0 else 0
+
+    # Daily trends
+    daily_counts = _add_counts(
+        hourly.annotate(day=TruncDate("hour"))
+        .values_list("day")
+        .annotate(count=Sum("search_count"))
+        .order_by(),
+        searches.annotate(day=TruncDate("timestamp"))
+        .values_list("day")
+        .annotate(count=Count("id"))
+        .order_by(),
+    )
+    daily_trends = [
+        {"day": day, "count": count}
+        for (day,), count in sorted(daily_counts.items())
+        if count
+    ]
+
+    # Breakdowns
+    rollups = SearchDailyRollup.objects.filter(day__gte=window_start.date())
+    queries = rollups.filter(dimension=SearchDailyRollup.QUERY)
+
+    popular = _top(
+        queries,
+        searches.values_list("query").annotate(count=Count("id")).order_by(),
+        ["key"],
+        "count",
+    )
+    result_sums = _add_counts(
+        queries.filter(key__in=[key for (key,), _ in popular])
+        .values_list("key")
+        .annotate(total=Sum("result_count_sum"))
+        .order_by(),
+        searches.filter(query__in=[key for (key,), _ in popular])
+        .values_list("query")
+        .annotate(total=Sum("result_count"))
+        .order_by(),
+    )
+    popular_searches = [
+        {
+            "query": query,
+            "count": count,
+            "avg_results": average(result_sums.get((query,), 0), count),
+        }
+        for (query,), count in popular
+    ]
+
+    zero_result_queries = [
+        {"query": query, "count": count}
+        for (query,), count in _top(
+            queries.filter(zero_result_count__gt=0),
+            searches.filter(result_count=0)
+            .values_list("query")
+            .annotate(count=Count("id"))
+            .order_by(),
+            ["key"],
+            "zero_result_count",
+        )
+    ]
+
+    searches_by_category = [
+        {"categories": categories, "count": count}
+        for (categories,), count in _top(
+            rollups.filter(dimension=SearchDailyRollup.CATEGORY),
+            searches.values_list("categories").annotate(count=Count("id")).order_by(),
+            ["key"],
+            "count",
+            limit=None,
+        )
+    ]
+
+    click_rollups = rollups.filter(dimension=SearchDailyRollup.CLICK)
+    clicks_by_type = [
+        {"result_type": result_type, "count": count}
+        for (result_type,), count in _top(
+            click_rollups,
+            clicks.values_list("result_type").annotate(count=Count("id")).order_by(),
+            ["detail"],
+            "count",
+            limit=None,
+        )
+    ]
+    most_clicked = [
+        {"result_title": title, "result_type": result_type, "count": count}
+        for (title, result_type), count in _top(
+            click_rollups,
+            clicks.values_list("result_title", "result_type")
+            .annotate(count=Count("id"))
+            .order_by(),
+            ["key", "detail"],
+            "count",
+        )
+    ]
+
+    return {
+        "period_days": days,
+        "summary": {
+            "total_searches": total_searches,
+            "zero_results": zero_results,
+            "zero_results_percent": round(percent(zero_results, total_searches), 2),
+            "avg_results_per_search": round(average(result_sum, total_searches), 2),
+            "avg_search_time_ms": round(average(time_sum, total_searches), 2),
+            "total_clicks": total_clicks,
+            "click_through_rate": round(percent(total_clicks, total_searches), 2),
+        },
+        "popular_searches": popular_searches,
+        "zero_result_queries": zero_result_queries,
+        "searches_by_category": searches_by_category,
+        "clicks_by_type": clicks_by_type,
+        "most_clicked_results": most_clicked,
+        "daily_trends": daily_trends,
+    }
+
+
+def _add_counts(*groupings: Iterable[Tuple]) -> Dict[Tuple, int]:
+    """Sum (key..., count) rows of several groupings by key"""
+    counts = {}
+    for rows in groupings:
+        for *key, count in rows:
+            counts[tuple(key)] = counts.get(tuple(key), 0) + (count or 0)
+    return counts
+
+
+def _top(
+    rollups, tail, fields: List[str], count_field: str, limit: Optional[int] = TOP_LIMIT
+) -> List[Tuple[Tuple, int]]:
+    """
+    Largest combined counts of rollup rows grouped by fields and a grouped
+    raw tail, as [(key, count)]
+
+    A key missing from the tail can only rank in the combined top `limit`
+    if it ranks there in the rollups, so only the rollup top and the rollup
+    counts of the tail keys are read.
+    """
+    tail = _add_counts(tail)
+    grouped = rollups.values_list(*fields).annotate(total=Sum(count_field))
+    if limit is None:
+        counts = _add_counts(grouped.order_by())
+    else:
+        counts = _add_counts(grouped.order_by("-total", *fields)[:limit])
+        missing = {key for key in tail if key not in counts}
+        if missing:
+            candidates = grouped.filter(
+                **{f"{fields[0]}__in": {key[0] for key in missing}}
+            ).order_by()
+            counts.update(
+                (key, total)
+                for key, total in _add_counts(candidates).items()
+                if key in missing
+            )
+
+    for key, count in tail.items():
+        counts[key] = counts.get(key, 0) + count
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return ranked[:limit] if limit is not None else ranked
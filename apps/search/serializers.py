@@ -32,8 +32,12 @@ class PackageSearchSerializer(serializers.Serializer):
     slug = serializers.SlugField()
     url = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
+    # Materialized "from ₹X" price (PackagePriceRange)
     price = serializers.DecimalField(
-        source="base_price", max_digits=10, decimal_places=2
+        source="price_range.min_price",
+        max_digits=12,
+        decimal_places=2,
+        allow_null=True,
     )
     duration = serializers.SerializerMethodField()
     relevance_score = serializers.FloatField(source="rank")
@@ -0,0 +1,70 @@
+"""
+Celery tasks for search analytics.
+"""
+
+import logging
+
+from celery import shared_task
+
+from .popular import merge_new_searches, rebuild_popular_searches
+from .rollups import prune_search_analytics, roll_up_search_analytics
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="search.roll_up_analytics")
+def roll_up_analytics():
+    """
+    Roll up search analytics since the watermark (see rollups.py).
+
+    Schedule this task to run every few minutes:
+
+    CELERY_BEAT_SCHEDULE = {
+        'roll-up-search-analytics': {
+            'task': 'search.roll_up_analytics',
+            'schedule': crontab(minute='*/10'),  # Every 10 minutes
+        },
+    }
+    """
+    result = roll_up_search_analytics()
+    return {"hours": result["hours"]}
+
+
+@shared_task(name="search.prune_analytics")
+def prune_analytics():
+    """
+    Delete raw search analytics older than RAW_RETENTION_DAYS that are
+    already rolled up.
+
+    Schedule this task to run daily:
+
+    CELERY_BEAT_SCHEDULE = {
+        'prune-search-analytics': {
+            'task': 'search.prune_analytics',
+            'schedule': crontab(hour=3, minute=30),  # Every day at 03:30
+        },
+    }
+    """
+    deleted = prune_search_analytics()
+    return {"deleted": deleted}
+
+
+@shared_task(name="search.aggregate_popular_searches")
+def aggregate_popular_searches():
+    """
+    Merge searches made since the last run into the popular searches
+    (see popular.py); the first run rebuilds them from the last 30 days.
+
+    Schedule this task to run every few minutes:
+
+    CELERY_BEAT_SCHEDULE = {
+        'aggregate-popular-searches': {
+            'task': 'search.aggregate_popular_searches',
+            'schedule': crontab(minute='*/5'),  # Every 5 minutes
+        },
+    }
+    """
+    result = merge_new_searches()
+    if result is None:
+        result = rebuild_popular_searches()
+    return result
@@ -1 +1,682 @@
-# Create your tests here.
+"""
+Tests for universal search and its search backends
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DataError, connection
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from articles.models import Article
+from cities.models import City
+from packages.models import Experience, Package
+from rest_framework.test import APIClient
+
+from .analytics import AnalyticsBuffer, search_analytics
+from .backends import (
+    FALLBACK_RANK,
+    FallbackSearchBackend,
+    PostgresSearchBackend,
+    get_search_backend,
+)
+from .models import (
+    PopularSearch,
+    SearchAggregationWatermark,
+    SearchClick,
+    SearchDailyRollup,
+    SearchHourlyRollup,
+    SearchQuery,
+)
+from .popular import decayed_count, merge_new_searches, rebuild_popular_searches
+from .rollups import (
+    prune_search_analytics,
+    roll_up_search_analytics,
+    rollup_watermark,
+    search_analytics_report,
+)
+
+
+class PostgresQueryTests(TestCase):
+    """tsquery construction does not need a PostgreSQL server"""
+
+    def test_terms_are_anded_with_prefix_on_last(self):
+        query = PostgresSearchBackend()._query("Ayodhya Temple tou")
+        self.assertEqual(query.source_expressions[1].value, "ayodhya & temple & tou:*")
+
+    def test_tsquery_operators_are_stripped(self):
+        query = PostgresSearchBackend()._query("goa' | !(beach) <-> :*")
+        self.assertEqual(query.source_expressions[1].value, "goa & beach:*")
+
+    def test_text_without_terms_matches_nothing(self):
+        backend = PostgresSearchBackend()
+        self.assertIsNone(backend._query("!! --"))
+        self.assertFalse(backend.search(Package.objects.all(), "!! --").exists())
+
+
+class UnifiedSearchTests(TestCase):
+    """Search results on the fallback backend (SQLite)"""
+
+    def setUp(self):
+        cache.clear()
+        self.ayodhya = City.objects.create(
+            name="Ayodhya",
+            slug="ayodhya",
+            description="Temple town on the Sarayu",
+            status="PUBLISHED",
+        )
+        self.varanasi = City.objects.create(
+            name="Varanasi",
+            slug="varanasi",
+            description="Ghats and temple aartis",
+            status="PUBLISHED",
+        )
+        self.temple_tour = Package.objects.create(
+            city=self.ayodhya,
+            name="Ayodhya Temple Tour",
+            slug="ayodhya-temple-tour",
+            description="Ram Janmabhoomi darshan",
+        )
+        self.ghat_walk = Package.objects.create(
+            city=self.varanasi,
+            name="Ghat Walk",
+            slug="ghat-walk",
+            description="Sunrise temple walk along the ghats",
+        )
+        Package.objects.create(
+            city=self.varanasi,
+            name="Retired Temple Trip",
+            slug="retired-temple-trip",
+            description="No longer sold",
+            is_active=False,
+        )
+        self.aarti = Experience.objects.create(
+            name="Evening Aarti",
+            description="Temple aarti on the ghats",
+            base_price=0,
+            city=self.varanasi,
+        )
+        self.article = Article.objects.create(
+            city=self.ayodhya,
+            title="Temples of Ayodhya",
+            slug="temples-of-ayodhya",
+            content="A guide",
+            status="PUBLISHED",
+        )
+
+    def _search(self, q, **params):
+        response = APIClient().get("/api/search/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_fallback_backend_on_sqlite(self):
+        self.assertIsInstance(get_search_backend(), FallbackSearchBackend)
+
+    def test_response_shape_unchanged(self):
+        data = self._search("temple")
+
+        self.assertEqual(
+            set(data),
+            {
+                "query",
+                "parsed_query",
+                "results",
+                "total_count",
+                "search_time_ms",
+                "metadata",
+            },
+        )
+        self.assertEqual(
+            set(data["results"]), {"packages", "cities", "articles", "experiences"}
+        )
+        package = data["results"]["packages"][0]
+        self.assertEqual(
+            set(package),
+            {
+                "id",
+                "type",
+                "title",
+                "description",
+                "excerpt",
+                "slug",
+                "url",
+                "image",
+                "price",
+                "duration",
+                "relevance_score",
+                "content_type",
+                "breadcrumb",
+            },
+        )
+        self.assertEqual(package["relevance_score"], FALLBACK_RANK)
+        self.assertNotIn("search_vector", package)
+
+    def test_matches_keep_previous_ordering(self):
+        data = self._search("temple")
+
+        # Inactive packages are excluded; ties keep newest-first ordering
+        self.assertEqual(
+            [p["slug"] for p in data["results"]["packages"]],
+            ["ghat-walk", "ayodhya-temple-tour"],
+        )
+        self.assertEqual(
+            [c["slug"] for c in data["results"]["cities"]], ["ayodhya", "varanasi"]
+        )
+        self.assertEqual(len(data["results"]["experiences"]), 1)
+        self.assertEqual(len(data["results"]["articles"]), 1)
+        self.assertEqual(data["total_count"], 6)
+
+    def test_location_filters_by_city(self):
+        data = self._search("temple in ayodhya")
+
+        self.assertEqual(data["parsed_query"]["location"], "ayodhya")
+        self.assertEqual([c["slug"] for c in data["results"]["cities"]], ["ayodhya"])
+        self.assertEqual(data["results"]["experiences"], [])
+        # Articles also match on the location alone
+        self.assertEqual(
+            [a["slug"] for a in data["results"]["articles"]], ["temples-of-ayodhya"]
+        )
+
+    def test_unknown_location_matches_city_name(self):
+        backend = FallbackSearchBackend()
+        results = backend.search(
+            Package.objects.filter(is_active=True),
+            "sunrise",
+            extra_q=Q(city__name__icontains="ayodh"),
+        )
+        self.assertEqual(
+            list(results.values_list("slug", flat=True)),
+            ["ghat-walk", "ayodhya-temple-tour"],
+        )
+
+
+class BufferedAnalyticsTests(TestCase):
+    """Searches and clicks are queued and written in batches by flush()"""
+
+    def setUp(self):
+        cache.clear()
+        # Drain events queued by other tests
+        search_analytics.flush()
+        SearchQuery.objects.all().delete()
+
+    def _record_search(self, buffer, query="goa"):
+        buffer.record_search(
+            query=query,
+            user_id=None,
+            result_count=3,
+            search_time_ms=12.5,
+            categories="all",
+            ip_address="10.0.0.1",
+            user_agent="Mozilla/5.0" * 100,
+        )
+
+    def _record_click(self, buffer, search_query_id, result_id=1):
+        buffer.record_click(
+            search_query_id=search_query_id,
+            result_type="package",
+            result_id=result_id,
+            result_title="Goa Beaches",
+            position=1,
+        )
+
+    def test_search_response_does_not_write_analytics(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().get("/api/search/", {"q": "temple"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(
+            [q for q in queries if "search_searchquery" in q["sql"].lower()]
+        )
+        self.assertEqual(len(search_analytics), 1)
+
+        self.assertEqual(search_analytics.flush(), 1)
+        search = SearchQuery.objects.get()
+        self.assertEqual(search.query, "temple")
+        self.assertEqual(search.categories, "all")
+
+    def test_flush_writes_batches_with_bulk_create(self):
+        buffer = AnalyticsBuffer()
+        for i in range(5):
+            self._record_search(buffer, query=f"goa {i}")
+
+        with override_settings(SEARCH_ANALYTICS={"BATCH_SIZE": 2}):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(buffer.flush(), 5)
+
+        # One INSERT per batch of two (savepoint excluded)
+        self.assertEqual(len([q for q in queries if "SAVEPOINT" not in q["sql"]]), 3)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(SearchQuery.objects.count(), 5)
+        self.assertEqual(len(SearchQuery.objects.first().user_agent), 500)
+
+    def test_client_fields_are_truncated(self):
+        buffer = AnalyticsBuffer()
+        buffer.record_search(
+            query="goa",
+            user_id=None,
+            result_count=3,
+            search_time_ms=12.5,
+            categories="packages," * 50,
+            ip_address="not-an-ip",
+            user_agent="",
+        )
+        buffer.record_click(
+            search_query_id=None,
+            result_type="package" * 20,
+            result_id=1,
+            result_title="Goa Beaches",
+            position=1,
+        )
+
+        self.assertEqual(buffer.flush(), 2)
+        search = SearchQuery.objects.get()
+        self.assertEqual(len(search.categories), 100)
+        self.assertIsNone(search.ip_address)
+        self.assertEqual(len(SearchClick.objects.get().result_type), 50)
+
+    def test_failing_event_does_not_drop_its_batch(self):
+        buffer = AnalyticsBuffer()
+        for query in ("goa", "kerala", "bad", "ladakh", "manali"):
+            self._record_search(buffer, query=query)
+        bulk_create = SearchQuery.objects.bulk_create
+
+        def fail_on_bad(objs, *args, **kwargs):
+            if any(obj.query == "bad" for obj in objs):
+                raise DataError("value too long")
+            return bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(
+            SearchQuery.objects, "bulk_create", side_effect=fail_on_bad
+        ):
+            with self.assertLogs("search.analytics", "ERROR"):
+                self.assertEqual(buffer.flush(), 4)
+
+        self.assertEqual(
+            sorted(SearchQuery.objects.values_list("query", flat=True)),
+            ["goa", "kerala", "ladakh", "manali"],
+        )
+
+    def test_full_buffer_drops_oldest_events(self):
+        with override_settings(SEARCH_ANALYTICS={"BUFFER_SIZE": 3}):
+            buffer = AnalyticsBuffer()
+        for i in range(5):
+            self._record_search(buffer, query=f"goa {i}")
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.dropped, 2)
+        buffer.flush()
+        self.assertEqual(
+            sorted(SearchQuery.objects.values_list("query", flat=True)),
+            ["goa 2", "goa 3", "goa 4"],
+        )
+
+    def test_recorded_time_survives_buffering(self):
+        buffer = AnalyticsBuffer()
+        self._record_search(buffer)
+        recorded = buffer._events[0][1]["timestamp"]
+
+        buffer.flush()
+        self.assertEqual(SearchQuery.objects.get().timestamp, recorded)
+
+    def test_clicks_link_to_their_search_or_the_latest_one(self):
+        old = SearchQuery.objects.create(query="kerala")
+        SearchQuery.objects.filter(pk=old.pk).update(
+            timestamp=timezone.now() - timedelta(hours=1)
+        )
+        linked = SearchQuery.objects.create(query="goa")
+        buffer = AnalyticsBuffer()
+        self._record_search(buffer, query="goa beaches")
+        self._record_click(buffer, old.pk, result_id=1)
+        self._record_click(buffer, None, result_id=2)
+        self._record_click(buffer, 999999, result_id=3)
+
+        self.assertEqual(buffer.flush(), 4)
+        latest = SearchQuery.objects.get(query="goa beaches")
+        self.assertEqual(
+            dict(SearchClick.objects.values_list("result_id", "search_query_id")),
+            {1: old.pk, 2: latest.pk, 3: latest.pk},
+        )
+        self.assertFalse(linked.clicks.exists())
+
+    def test_click_without_any_search_is_dropped(self):
+        buffer = AnalyticsBuffer()
+        self._record_click(buffer, None)
+
+        self.assertEqual(buffer.flush(), 0)
+        self.assertFalse(SearchClick.objects.exists())
+
+    def test_track_click_queues_the_click(self):
+        search = SearchQuery.objects.create(query="goa")
+        client = APIClient()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(
+                "/api/search/track-click/",
+                {
+                    "search_query_id": search.pk,
+                    "result_type": "package",
+                    "result_id": "7",
+                    "result_title": "Goa Beaches",
+                    "position": 2,
+                },
+                format="json",
+            )
+        self.assertEqual(response.json(), {"status": "success"})
+        self.assertEqual(len(queries), 0)
+
+        search_analytics.flush()
+        click = SearchClick.objects.get()
+        self.assertEqual((click.search_query_id, click.result_id), (search.pk, 7))
+
+        response = client.post(
+            "/api/search/track-click/",
+            {"result_type": "package", "result_id": "x", "result_title": "Goa"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class SearchRollupTests(TestCase):
+    """Reports read from the rollups match reports computed from raw rows"""
+
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now().replace(minute=30, second=0, microsecond=0)
+        searches = [
+            # (hours ago, query, categories, result count, clicks)
+            (50, "goa", "all", 4, ["Goa Beaches"]),
+            (49, "goa", "packages", 2, ["Goa Beaches", "Old Goa"]),
+            (30, "kerala", "all", 0, []),
+            (26, "goa", "all", 3, []),
+            (5, "kerala", "all", 0, []),
+            (3, "manali", "all", 1, ["Manali Snow"]),
+            (0, "goa", "all", 5, ["Goa Beaches"]),
+            (0, "ladakh", "all", 0, []),
+        ]
+        for hours_ago, query, categories, result_count, titles in searches:
+            timestamp = self.now - timedelta(hours=hours_ago)
+            search = SearchQuery.objects.create(
+                query=query,
+                categories=categories,
+                result_count=result_count,
+                search_time_ms=10.0,
+                timestamp=timestamp,
+            )
+            for position, title in enumerate(titles):
+                SearchClick.objects.create(
+                    search_query=search,
+                    result_type="package",
+                    result_id=position,
+                    result_title=title,
+                    position=position,
+                    timestamp=timestamp,
+                )
+
+    def test_report_from_rollups_matches_raw_report(self):
+        raw = search_analytics_report(30, now=self.now)
+        self.assertEqual(raw["summary"]["total_searches"], 8)
+        self.assertEqual(raw["summary"]["zero_results"], 3)
+        self.assertEqual(raw["summary"]["total_clicks"], 5)
+
+        result = roll_up_search_analytics(now=self.now)
+        # The current hour is not complete yet
+        self.assertEqual(result["watermark"], self.now.replace(minute=0))
+        self.assertEqual(result["hours"], 50)
+        self.assertEqual(SearchHourlyRollup.objects.count(), 50)
+
+        self.assertEqual(search_analytics_report(30, now=self.now), raw)
+        self.assertEqual(
+            raw["popular_searches"][0], {"query": "goa", "count": 4, "avg_results": 3.5}
+        )
+        self.assertEqual(
+            raw["zero_result_queries"],
+            [{"query": "kerala", "count": 2}, {"query": "ladakh", "count": 1}],
+        )
+        self.assertEqual(
+            raw["most_clicked_results"][0],
+            {"result_title": "Goa Beaches", "result_type": "package", "count": 3},
+        )
+        self.assertEqual(sum(day["count"] for day in raw["daily_trends"]), 8)
+
+    def test_runs_continue_from_the_watermark(self):
+        first = roll_up_search_analytics(max_hours=10, now=self.now)
+        self.assertEqual(first["hours"], 10)
+        self.assertEqual(rollup_watermark(), first["watermark"])
+
+        roll_up_search_analytics(now=self.now)
+        self.assertEqual(roll_up_search_analytics(now=self.now)["hours"], 0)
+
+        # Daily counts were added up across runs, not overwritten
+        goa = SearchDailyRollup.objects.filter(
+            dimension=SearchDailyRollup.QUERY, key="goa"
+        )
+        self.assertEqual(sum(goa.values_list("count", flat=True)), 3)
+        self.assertEqual(
+            search_analytics_report(30, now=self.now)["summary"]["total_searches"], 8
+        )
+
+    def test_window_starts_at_the_hour(self):
+        roll_up_search_analytics(now=self.now)
+        report = search_analytics_report(1, now=self.now)
+
+        self.assertEqual(report["summary"]["total_searches"], 4)
+        self.assertEqual(report["summary"]["total_clicks"], 2)
+
+    def test_report_reads_a_bounded_number_of_queries(self):
+        roll_up_search_analytics(now=self.now)
+        with CaptureQueriesContext(connection) as queries:
+            search_analytics_report(30, now=self.now)
+        count = len(queries)
+
+        SearchQuery.objects.create(query="pune", timestamp=self.now)
+        with CaptureQueriesContext(connection) as queries:
+            search_analytics_report(30, now=self.now)
+        self.assertEqual(len(queries), count)
+
+    def test_prune_keeps_rows_that_are_not_rolled_up(self):
+        self.assertEqual(prune_search_analytics(retention_days=1, now=self.now), 0)
+
+        roll_up_search_analytics(max_hours=20, now=self.now)
+        # 50 and 49 hours ago are rolled up and past retention
+        self.assertEqual(prune_search_analytics(retention_days=1, now=self.now), 2)
+        self.assertEqual(SearchQuery.objects.count(), 6)
+        self.assertEqual(SearchClick.objects.count(), 2)
+
+        roll_up_search_analytics(now=self.now)
+        self.assertEqual(prune_search_analytics(retention_days=1, now=self.now), 2)
+        self.assertEqual(
+            search_analytics_report(30, now=self.now)["summary"]["total_searches"], 8
+        )
+
+    def test_analytics_view_reads_the_report(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="secret"
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+        roll_up_search_analytics()
+
+        response = client.get("/api/search/analytics/", {"days": 7})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["period_days"], 7)
+        self.assertEqual(data["summary"]["total_searches"], 8)
+        self.assertEqual(
+            data["searches_by_category"][0], {"categories": "all", "count": 7}
+        )
+
+
+class PopularSearchAggregationTests(TestCase):
+    """aggregate_popular_searches rebuilds or merges new searches set-based"""
+
+    def setUp(self):
+        self.now = timezone.now()
+
+    def _search(self, query, minutes_ago, result_count=1, clicks=0):
+        search = SearchQuery.objects.create(
+            query=query,
+            result_count=result_count,
+            timestamp=self.now - timedelta(minutes=minutes_ago),
+        )
+        for position in range(clicks):
+            SearchClick.objects.create(
+                search_query=search,
+                result_type="package",
+                result_id=position,
+                result_title="Goa Beaches",
+                position=position,
+                timestamp=search.timestamp,
+            )
+        return search
+
+    def test_rebuild_counts_searches_and_clicks(self):
+        self._search("goa", 60, result_count=4, clicks=3)
+        self._search("goa", 50, result_count=2)
+        self._search("kerala", 40, clicks=1)
+        self._search("kerala", 30)
+        self._search("ladakh", 20)
+
+        with CaptureQueriesContext(connection) as queries:
+            result = rebuild_popular_searches(now=self.now)
+
+        # Grouped read, existing rows, upsert, watermark (savepoint excluded)
+        self.assertLessEqual(
+            len([q for q in queries if "SAVEPOINT" not in q["sql"]]), 6
+        )
+        self.assertEqual(result, {"created": 2, "updated": 0})
+        goa = PopularSearch.objects.get(query="goa")
+        # Clicks do not inflate the search count or the average
+        self.assertEqual((goa.search_count, goa.click_count), (2, 3))
+        self.assertEqual(goa.avg_result_count, 3)
+        self.assertAlmostEqual(decayed_count(goa.score, self.now), 2, places=2)
+        self.assertFalse(PopularSearch.objects.filter(query="ladakh").exists())
+
+    def test_incremental_merges_only_new_searches(self):
+        self.assertIsNone(merge_new_searches(now=self.now))
+        for minutes_ago in (70, 65):
+            self._search("goa", minutes_ago, result_count=4)
+        rebuild_popular_searches(now=self.now - timedelta(minutes=30))
+
+        old = self._search("goa", 10, result_count=1)
+        self._search("goa", 10, result_count=1, clicks=1)
+        self._search("kerala", 10)
+        SearchClick.objects.create(
+            search_query=old,
+            result_type="package",
+            result_id=9,
+            result_title="Goa Beaches",
+            position=0,
+            timestamp=self.now - timedelta(minutes=8),
+        )
+        result = merge_new_searches(now=self.now)
+
+        self.assertEqual(result["searches"], 3)
+        goa = PopularSearch.objects.get(query="goa")
+        self.assertEqual((goa.search_count, goa.click_count), (4, 2))
+        self.assertEqual(goa.avg_result_count, 2.5)
+        # A single search does not make a query popular
+        self.assertFalse(PopularSearch.objects.filter(query="kerala").exists())
+
+        # Nothing new: the same rows are not merged twice
+        self.assertEqual(merge_new_searches(now=self.now)["searches"], 0)
+        self.assertEqual(PopularSearch.objects.get(query="goa").search_count, 4)
+
+    def test_new_queries_need_min_searches_in_the_window(self):
+        rebuild_popular_searches(now=self.now - timedelta(days=2))
+        self._search("kerala", 60 * 24 * 3, clicks=1)
+        self._search("john.doe@example.com phone 9999", 60 * 24 * 2 - 60)
+        merge_new_searches(now=self.now - timedelta(days=1))
+        self.assertFalse(PopularSearch.objects.exists())
+
+        self._search("kerala", 10, result_count=5)
+        self._search("john.doe@example.com phone 9999", 60 * 24 * 40)
+        merge_new_searches(now=self.now)
+
+        # Counted over the window, including searches before the watermark
+        kerala = PopularSearch.objects.get()
+        self.assertEqual(kerala.query, "kerala")
+        self.assertEqual((kerala.search_count, kerala.click_count), (2, 1))
+        self.assertEqual(kerala.avg_result_count, 3)
+
+        response = APIClient().get("/api/search/popular/")
+        self.assertEqual(
+            response.json()["popular_searches"],
+            [{"query": "kerala", "search_count": 2, "avg_result_count": 3.0}],
+        )
+
+    def test_popular_view_exposes_the_decayed_count(self):
+        SearchAggregationWatermark.objects.create(
+            name="popular_searches", processed_until=self.now - timedelta(days=30)
+        )
+        for _ in range(4):
+            self._search("goa", 60 * 24 * 7)
+        merge_new_searches(now=self.now - timedelta(days=7, minutes=-10))
+
+        response = APIClient().get("/api/search/popular/")
+        # Four searches a half-life ago
+        self.assertEqual(response.json()["popular_searches"][0]["search_count"], 2)
+
+    def test_incremental_cost_does_not_depend_on_history(self):
+        rebuild_popular_searches(now=self.now - timedelta(minutes=30))
+        self._search("goa", 10, clicks=1)
+        with CaptureQueriesContext(connection) as queries:
+            merge_new_searches(now=self.now)
+        count = len(queries)
+
+        PopularSearch.objects.bulk_create(
+            PopularSearch(query=f"old {i}", search_count=5, score=1e9)
+            for i in range(50)
+        )
+        for i in range(5):
+            self._search(f"new {i}", 1, clicks=1)
+        with CaptureQueriesContext(connection) as queries:
+            merge_new_searches(now=self.now + timedelta(minutes=10))
+        self.assertEqual(len(queries), count)
+
+    def test_recent_searches_outrank_old_ones(self):
+        SearchAggregationWatermark.objects.create(
+            name="popular_searches", processed_until=self.now - timedelta(days=30)
+        )
+        for _ in range(4):
+            self._search("goa", 60 * 24 * 21)
+        merge_new_searches(now=self.now - timedelta(days=21, minutes=-10))
+        for _ in range(2):
+            self._search("kerala", 10)
+        merge_new_searches(now=self.now)
+
+        # Three half-lives later four searches are worth half a search
+        self.assertEqual(
+            list(PopularSearch.objects.values_list("query", flat=True)),
+            ["kerala", "goa"],
+        )
+        goa = PopularSearch.objects.get(query="goa")
+        self.assertAlmostEqual(decayed_count(goa.score, self.now), 0.5, places=2)
+
+        self._search("manali", 10)
+        merge_new_searches(now=self.now + timedelta(days=1))
+        # Below half a search once decayed
+        self.assertFalse(PopularSearch.objects.filter(query="goa").exists())
+
+    def test_command_rebuilds_then_merges(self):
+        self._search("goa", 60)
+        self._search("goa", 50)
+
+        call_command("aggregate_popular_searches", "--incremental", stdout=StringIO())
+        self.assertEqual(PopularSearch.objects.get().search_count, 2)
+
+        SearchAggregationWatermark.objects.update(
+            processed_until=self.now - timedelta(minutes=30)
+        )
+        self._search("goa", 10)
+        out = StringIO()
+        call_command("aggregate_popular_searches", "--incremental", stdout=out)
+        self.assertIn("Merged 1 new searches", out.getvalue())
+        self.assertEqual(PopularSearch.objects.get().search_count, 3)
@@ -1,26 +1,33 @@
 """
 Universal search view with PostgreSQL full-text search and ILIKE fallback
+(see backends.py)
 Enhanced with natural language query parsing and analytics tracking
 """
 
 import logging
 import re
 import time
-from datetime import timedelta
 
 from django.core.cache import cache
-from django.db.models import Avg, Count, Q
+from django.db.models import Q
 from django.utils import timezone
 
 from articles.models import Article
 from cities.models import City
+from packages.cache import namespaced_key
 from packages.models import Experience, Package
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import PopularSearch, SearchClick, SearchQuery
+from backend.metrics import SEARCH_LATENCY
+
+from .analytics import search_analytics
+from .backends import get_search_backend
+from .models import PopularSearch
+from .popular import decayed_count
+from .rollups import search_analytics_report
 from .serializers import (
     ArticleSearchSerializer,
     CitySearchSerializer,
@@ -144,7 +151,7 @@ class QueryParser:
 class UnifiedSearchView(APIView):
     """
     Universal search across all content types
-    Uses ILIKE for simple, reliable search
+    Ranked full-text search on PostgreSQL, ILIKE elsewhere
     """
 
     permission_classes = [AllowAny]
@@ -200,7 +207,7 @@ class UnifiedSearchView(APIView):
         logger.info(f"Parsed query: {parsed_query}")
 
         # Check cache first
-        cache_key = f"search:{query}:{categories}:{limit}"
+        cache_key = namespaced_key("search", f"search:{query}:{categories}:{limit}")
         cached_result = cache.get(cache_key)
         if cached_result:
             logger.info(f'Cache hit for search query: "{query}"')
@@ -210,27 +217,18 @@ class UnifiedSearchView(APIView):
         try:
             results = {}
 
-            if categories in ["all", "packages"]:
-                results["packages"] = self._search_packages(query, limit, parsed_query)
-            else:
-                results["packages"] = []
-
-            if categories in ["all", "cities"]:
-                results["cities"] = self._search_cities(query, limit, parsed_query)
-            else:
-                results["cities"] = []
-
-            if categories in ["all", "articles"]:
-                results["articles"] = self._search_articles(query, limit, parsed_query)
-            else:
-                results["articles"] = []
-
-            if categories in ["all", "experiences"]:
-                results["experiences"] = self._search_experiences(
-                    query, limit, parsed_query
-                )
-            else:
-                results["experiences"] = []
+            searches = {
+                "packages": self._search_packages,
+                "cities": self._search_cities,
+                "articles": self._search_articles,
+                "experiences": self._search_experiences,
+            }
+            for category, search in searches.items():
+                if categories in ["all", category]:
+                    with SEARCH_LATENCY.labels(category).time():
+                        results[category] = search(query, limit, parsed_query)
+                else:
+                    results[category] = []
 
             total_count = sum(len(v) for v in results.values())
             search_time_ms = round((time.time() - start_time) * 1000, 2)
@@ -285,10 +283,10 @@ class UnifiedSearchView(APIView):
     def _track_search_query(
         self, request, query, result_count, search_time_ms, categories
     ):
-        """Track search query for analytics"""
+        """Queue the search for analytics (written in batches, see analytics.py)"""
         try:
             # Get user if authenticated
-            user = request.user if request.user.is_authenticated else None
+            user_id = request.user.pk if request.user.is_authenticated else None
 
             # Get IP address
             x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
@@ -297,18 +295,14 @@ class UnifiedSearchView(APIView):
             else:
                 ip_address = request.META.get("REMOTE_ADDR")
 
-            # Get user agent
-            user_agent = request.META.get("HTTP_USER_AGENT", "")
-
-            # Create search query record
-            SearchQuery.objects.create(
+            search_analytics.record_search(
                 query=query,
-                user=user,
+                user_id=user_id,
                 result_count=result_count,
                 search_time_ms=search_time_ms,
                 categories=categories,
                 ip_address=ip_address,
-                user_agent=user_agent[:500],  # Truncate to avoid overflow
+                user_agent=request.META.get("HTTP_USER_AGENT", ""),
             )
 
         except Exception as e:
@@ -317,12 +311,14 @@ class UnifiedSearchView(APIView):
 
     def _search_packages(self, query, limit, parsed_query):
         """
-        Search packages using ILIKE with natural language support
+        Search packages with natural language support
         Supports queries like "packages in ayodhya" or "hotels in mumbai"
         """
         try:
-            # Build base query
-            q_filter = Q(name__icontains=query) | Q(description__icontains=query)
+            backend = get_search_backend()
+            packages = Package.objects.select_related("price_range").filter(
+                is_active=True
+            )
 
             # If location is detected, filter by city
             if parsed_query.get("location"):
@@ -335,27 +331,18 @@ class UnifiedSearchView(APIView):
                 if city_match:
                     logger.info(f"Filtering packages by city: {city_match.name}")
                     # Filter packages by city AND search terms
-                    packages = Package.objects.filter(
-                        q_filter, city=city_match, is_active=True
-                    )[:limit]
+                    packages = backend.search(packages.filter(city=city_match), query)
                 else:
                     # City not found, search normally but include city name in search
-                    packages = Package.objects.filter(
-                        Q(name__icontains=query)
-                        | Q(description__icontains=query)
-                        | Q(city__name__icontains=location),
-                        is_active=True,
-                    )[:limit]
+                    packages = backend.search(
+                        packages, query, extra_q=Q(city__name__icontains=location)
+                    )
             else:
                 # No location specified, search normally
-                packages = Package.objects.filter(q_filter, is_active=True)[:limit]
-
-            # Add fake rank for consistency
-            for pkg in packages:
-                pkg.rank = 0.5
+                packages = backend.search(packages, query)
 
             serializer = PackageSearchSerializer(
-                packages, many=True, context={"query": query}
+                packages[:limit], many=True, context={"query": query}
             )
             return serializer.data
 
@@ -364,27 +351,16 @@ class UnifiedSearchView(APIView):
             return []
 
     def _search_cities(self, query, limit, parsed_query):
-        """Search cities using ILIKE with natural language support"""
+        """Search cities with natural language support"""
         try:
             # If location is detected, prioritize it
-            if parsed_query.get("location"):
-                location = parsed_query["location"]
-                cities = City.objects.filter(
-                    Q(name__icontains=location) | Q(description__icontains=location),
-                    status="PUBLISHED",
-                )[:limit]
-            else:
-                cities = City.objects.filter(
-                    Q(name__icontains=query) | Q(description__icontains=query),
-                    status="PUBLISHED",
-                )[:limit]
-
-            # Add fake rank for consistency
-            for city in cities:
-                city.rank = 0.5
+            text = parsed_query.get("location") or query
+            cities = get_search_backend().search(
+                City.objects.filter(status="PUBLISHED"), text
+            )
 
             serializer = CitySearchSerializer(
-                cities, many=True, context={"query": query}
+                cities[:limit], many=True, context={"query": query}
             )
             return serializer.data
 
@@ -393,32 +369,22 @@ class UnifiedSearchView(APIView):
             return []
 
     def _search_articles(self, query, limit, parsed_query):
-        """Search articles using ILIKE with natural language support"""
+        """Search articles with natural language support"""
         try:
-            # Build base query
-            q_filter = (
-                Q(title__icontains=query)
-                | Q(content__icontains=query)
-                | Q(author__icontains=query)
+            backend = get_search_backend()
+            articles = Article.objects.filter(status="PUBLISHED").order_by(
+                "-created_at"
             )
 
             # If location is detected, include it in search
+            extra_q = None
             if parsed_query.get("location"):
-                location = parsed_query["location"]
-                q_filter |= Q(title__icontains=location) | Q(
-                    content__icontains=location
-                )
-
-            articles = Article.objects.filter(q_filter, status="PUBLISHED").order_by(
-                "-created_at"
-            )[:limit]
+                extra_q = backend.match(articles, parsed_query["location"])
 
-            # Add fake rank for consistency
-            for article in articles:
-                article.rank = 0.5
+            articles = backend.search(articles, query, extra_q=extra_q)
 
             serializer = ArticleSearchSerializer(
-                articles, many=True, context={"query": query}
+                articles[:limit], many=True, context={"query": query}
             )
             return serializer.data
 
@@ -428,12 +394,12 @@ class UnifiedSearchView(APIView):
 
     def _search_experiences(self, query, limit, parsed_query):
         """
-        Search experiences using ILIKE with natural language support
+        Search experiences with natural language support
         Supports queries like "things to do in delhi"
         """
         try:
-            # Build base query
-            q_filter = Q(name__icontains=query) | Q(description__icontains=query)
+            backend = get_search_backend()
+            experiences = Experience.objects.all()
 
             # If location is detected, filter by city
             if parsed_query.get("location"):
@@ -445,26 +411,20 @@ class UnifiedSearchView(APIView):
 
                 if city_match:
                     logger.info(f"Filtering experiences by city: {city_match.name}")
-                    experiences = Experience.objects.filter(q_filter, city=city_match)[
-                        :limit
-                    ]
+                    experiences = backend.search(
+                        experiences.filter(city=city_match), query
+                    )
                 else:
                     # City not found, search normally but include city name
-                    experiences = Experience.objects.filter(
-                        Q(name__icontains=query)
-                        | Q(description__icontains=query)
-                        | Q(city__name__icontains=location)
-                    )[:limit]
+                    experiences = backend.search(
+                        experiences, query, extra_q=Q(city__name__icontains=location)
+                    )
             else:
                 # No location specified, search normally
-                experiences = Experience.objects.filter(q_filter)[:limit]
-
-            # Add fake rank for consistency
-            for exp in experiences:
-                exp.rank = 0.5
+                experiences = backend.search(experiences, query)
 
             serializer = ExperienceSearchSerializer(
-                experiences, many=True, context={"query": query}
+                experiences[:limit], many=True, context={"query": query}
             )
             return serializer.data
 
@@ -523,118 +483,9 @@ class SearchAnalyticsView(APIView):
         try:
             # Get time period from query params (default: last 30 days)
             days = int(request.query_params.get("days", 30))
-            date_threshold = timezone.now() - timedelta(days=days)
-
-            # Total searches
-            total_searches = SearchQuery.objects.filter(
-                timestamp__gte=date_threshold
-            ).count()
-
-            # Zero result searches
-            zero_results = SearchQuery.objects.filter(
-                timestamp__gte=date_threshold, result_count=0
-            ).count()
-
-            # Average results per search
-            avg_results = (
-                SearchQuery.objects.filter(timestamp__gte=date_threshold).aggregate(
-                    Avg("result_count")
-                )["result_count__avg"]
-                or 0
-            )
 
-            # Average search time
-            avg_time = (
-                SearchQuery.objects.filter(timestamp__gte=date_threshold).aggregate(
-                    Avg("search_time_ms")
-                )["search_time_ms__avg"]
-                or 0
-            )
-
-            # Total clicks
-            total_clicks = SearchClick.objects.filter(
-                timestamp__gte=date_threshold
-            ).count()
-
-            # Click-through rate
-            ctr = (total_clicks / total_searches * 100) if total_searches > 0 else 0
-
-            # Top 20 popular searches
-            popular_searches = list(
-                SearchQuery.objects.filter(timestamp__gte=date_threshold)
-                .values("query")
-                .annotate(count=Count("id"), avg_results=Avg("result_count"))
-                .order_by("-count")[:20]
-            )
-
-            # Zero result queries (top 20)
-            zero_result_queries = list(
-                SearchQuery.objects.filter(
-                    timestamp__gte=date_threshold, result_count=0
-                )
-                .values("query")
-                .annotate(count=Count("id"))
-                .order_by("-count")[:20]
-            )
-
-            # Searches by category
-            searches_by_category = list(
-                SearchQuery.objects.filter(timestamp__gte=date_threshold)
-                .values("categories")
-                .annotate(count=Count("id"))
-                .order_by("-count")
-            )
-
-            # Clicks by result type
-            clicks_by_type = list(
-                SearchClick.objects.filter(timestamp__gte=date_threshold)
-                .values("result_type")
-                .annotate(count=Count("id"))
-                .order_by("-count")
-            )
-
-            # Most clicked results
-            most_clicked = list(
-                SearchClick.objects.filter(timestamp__gte=date_threshold)
-                .values("result_title", "result_type")
-                .annotate(count=Count("id"))
-                .order_by("-count")[:20]
-            )
-
-            # Search trends (daily counts for the period)
-            daily_searches = list(
-                SearchQuery.objects.filter(timestamp__gte=date_threshold)
-                .extra(select={"day": "date(timestamp)"})
-                .values("day")
-                .annotate(count=Count("id"))
-                .order_by("day")
-            )
-
-            analytics_data = {
-                "period_days": days,
-                "summary": {
-                    "total_searches": total_searches,
-                    "zero_results": zero_results,
-                    "zero_results_percent": round(
-                        (
-                            (zero_results / total_searches * 100)
-                            if total_searches > 0
-                            else 0
-                        ),
-                        2,
-                    ),
-                    "avg_results_per_search": round(avg_results, 2),
-                    "avg_search_time_ms": round(avg_time, 2),
-                    "total_clicks": total_clicks,
-                    "click_through_rate": round(ctr, 2),
-                },
-                "popular_searches": popular_searches,
-                "zero_result_queries": zero_result_queries,
-                "searches_by_category": searches_by_category,
-                "clicks_by_type": clicks_by_type,
-                "most_clicked_results": most_clicked,
-                "daily_trends": daily_searches,
-            }
+            # Rollups plus the raw rows of the current hours (see rollups.py)
+            analytics_data = search_analytics_report(days)
 
             return Response(analytics_data)
 
@@ -662,10 +513,12 @@ class PopularSearchesView(APIView):
             # Get from PopularSearch table (pre-aggregated)
             popular = PopularSearch.objects.all()[:limit]
 
+            # Recent (decayed) searches, the count the ranking is based on
+            now = timezone.now()
             results = [
                 {
                     "query": p.query,
-                    "search_count": p.search_count,
+                    "search_count": round(decayed_count(p.score, now)),
                     "avg_result_count": round(p.avg_result_count, 1),
                 }
                 for p in popular
@@ -706,42 +559,26 @@ class SearchClickTrackingView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # If search_query_id is provided, link to it
-            search_query = None
-            if search_query_id:
-                try:
-                    search_query = SearchQuery.objects.get(id=search_query_id)
-                except SearchQuery.DoesNotExist:
-                    pass
-
-            # If no search_query_id, try to find recent search
-            if not search_query:
-                # Get user's most recent search (within last 5 minutes)
-                recent_threshold = timezone.now() - timedelta(minutes=5)
-                search_query = (
-                    SearchQuery.objects.filter(timestamp__gte=recent_threshold)
-                    .order_by("-timestamp")
-                    .first()
-                )
-
-            # Create click record if we have a search query
-            if search_query:
-                SearchClick.objects.create(
-                    search_query=search_query,
-                    result_type=result_type,
-                    result_id=result_id,
-                    result_title=result_title,
-                    position=position,
-                )
-
-                return Response({"status": "success"})
-            else:
-                # No search query found, but don't fail
-                logger.warning("Click tracked without associated search query")
+            try:
+                result_id = int(result_id)
+                position = int(position)
+                search_query_id = int(search_query_id) if search_query_id else None
+            except (TypeError, ValueError):
                 return Response(
-                    {"status": "success", "warning": "No search query found"}
+                    {"error": "Invalid result_id, position or search_query_id"},
+                    status=status.HTTP_400_BAD_REQUEST,
                 )
 
+            # Linked to its search (or the most recent one) when written
+            search_analytics.record_click(
+                search_query_id=search_query_id,
+                result_type=result_type,
+                result_id=result_id,
+                result_title=str(result_title),
+                position=position,
+            )
+            return Response({"status": "success"})
+
         except Exception as e:
             logger.error(f"Error tracking search click: {str(e)}")
             return Response(
@@ -3,6 +3,8 @@ from typing import Any, Dict, List
 from django.contrib.contenttypes.models import ContentType
 from django.db.models import Count, Q
 
+from backend.query_budget import query_budget
+
 from ..models import SEOData
 from ..utils import SEOAnalyzer, StructuredDataGenerator
 
@@ -283,6 +285,7 @@ class SEOService:
         }
 
     @staticmethod
+    @query_budget(3)
     def generate_sitemap_data(content_type: str) -> List[Dict[str, Any]]:
         """
         Generate sitemap data for SEO objects
@@ -290,8 +293,10 @@ class SEOService:
         app_label, model = content_type.split(".")
         ct = ContentType.objects.get(app_label=app_label, model=model)
 
-        seo_objects = SEOData.objects.filter(content_type=ct).select_related(
-            "content_type"
+        seo_objects = (
+            SEOData.objects.filter(content_type=ct)
+            .select_related("content_type")
+            .prefetch_related("content_object")
         )
 
         sitemap_data = []
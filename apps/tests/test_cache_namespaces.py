@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from cities.models import City
+from packages.cache import (
+    bump_namespace,
+    invalidate_cache,
+    namespace_for_prefix,
+    namespaced_key,
+)
+from packages.models import Package
+from pricing_engine.services.pricing_service import PricingService
+from rest_framework.test import APIClient
+from users.services.otp_service import OTPService
+
+
+class CacheNamespaceTests(TestCase):
+    """Namespace invalidation only touches the namespace it targets"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_invalidates_only_its_namespace(self):
+        cache.set(namespaced_key("search", "search:goa"), "results")
+        cache.set(namespaced_key("packages", "packages:list"), "listing")
+
+        bump_namespace("search")
+
+        self.assertIsNone(cache.get(namespaced_key("search", "search:goa")))
+        self.assertEqual(
+            cache.get(namespaced_key("packages", "packages:list")), "listing"
+        )
+
+    def test_unknown_namespace_rejected(self):
+        with self.assertRaises(ValueError):
+            bump_namespace("otp")
+
+    def test_prefix_mapping(self):
+        self.assertEqual(namespace_for_prefix("experiences:*"), "experiences")
+        self.assertEqual(namespace_for_prefix("api:package:*goa*"), "packages")
+        self.assertEqual(namespace_for_prefix("price_range"), "pricing")
+        self.assertIsNone(namespace_for_prefix("otp:*"))
+
+    def test_clear_pricing_cache_keeps_unrelated_data(self):
+        OTPService.store_otp("+919999999999", "123456")
+        cache.set(namespaced_key("pricing", "price_calendar:1:abc"), "calendar")
+
+        PricingService.clear_pricing_cache()
+
+        self.assertIsNone(cache.get(namespaced_key("pricing", "price_calendar:1:abc")))
+        self.assertTrue(OTPService.verify_otp("+919999999999", "123456"))
+
+    def test_pattern_fallback_never_clears_cache(self):
+        OTPService.store_otp("+919999999999", "123456")
+        invalidate_cache("experiences:*")
+        invalidate_cache("otp:*")
+        self.assertTrue(OTPService.verify_otp("+919999999999", "123456"))
+
+    def test_cached_listing_refreshed_after_bump(self):
+        city = City.objects.create(
+            name="Cache City", slug="cache-city", description="Test description"
+        )
+        client = APIClient()
+
+        def listed_names():
+            data = client.get("/api/packages/packages/").json()
+            results = data["results"] if isinstance(data, dict) else data
+            return [package["name"] for package in results]
+
+        self.assertEqual(listed_names(), [])
+        # bulk_create sends no post_save, so the listing is not evicted
+        Package.objects.bulk_create(
+            [
+                Package(
+                    name="Fresh Package",
+                    slug="fresh-package",
+                    city=city,
+                    description="Test package description",
+                )
+            ]
+        )
+        # Still served from cache
+        self.assertEqual(listed_names(), [])
+
+        bump_namespace("packages")
+        self.assertEqual(listed_names(), ["Fresh Package"])
@@ -0,0 +1,148 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from packages import cache as packages_cache
+from packages.cache import (
+    CachedResponse,
+    bump_namespace,
+    cache_response,
+    cache_stats,
+    get_cache_key,
+    namespaced_key,
+)
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+LOCMEM = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "cache-stampede-tests",
+    }
+}
+
+
+class CountingView:
+    """Stands in for a viewset; counts how often the view body runs"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    @cache_response(timeout=60, key_prefix="packages")
+    def list(self, request):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(self.delay)
+        return Response({"calls": calls})
+
+
+@override_settings(CACHES=LOCMEM)
+class CacheStampedeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        cache_stats.reset()
+        self.factory = APIRequestFactory()
+
+    def get(self, view):
+        request = APIView().initialize_request(self.factory.get("/"))
+        return view.list(request)
+
+    def cache_key(self):
+        return namespaced_key("packages", get_cache_key("packages", "list"))
+
+    def test_hits_and_misses_are_counted(self):
+        view = CountingView()
+
+        self.assertEqual(self.get(view).data, {"calls": 1})
+        self.assertEqual(self.get(view).data, {"calls": 1})
+
+        self.assertEqual((cache_stats.hits, cache_stats.misses), (1, 1))
+        self.assertIsNone(cache.get(f"lock:{self.cache_key()}"))
+
+    def test_concurrent_requests_after_invalidation_recompute_once(self):
+        view = CountingView(delay=0.3)
+        self.get(view)
+        bump_namespace("packages")
+
+        responses = []
+
+        def worker():
+            responses.append(self.get(view).data)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(view.calls, 2)
+        # Everyone else got the previous entry meanwhile
+        self.assertEqual(responses.count({"calls": 1}), 7)
+        self.assertEqual(responses.count({"calls": 2}), 1)
+        self.assertEqual(cache_stats.stale, 7)
+        self.assertEqual(self.get(view).data, {"calls": 2})
+
+    def test_cold_key_waits_for_the_worker_holding_the_lock(self):
+        view = CountingView(delay=0.3)
+        responses = []
+
+        def worker():
+            responses.append(self.get(view).data)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(view.calls, 1)
+        self.assertEqual(responses, [{"calls": 1}] * 4)
+
+    def test_soft_expired_entry_served_while_locked(self):
+        view = CountingView()
+        self.get(view)
+        entry = cache.get(self.cache_key())
+        cache.set(self.cache_key(), entry._replace(fresh_until=time.time() - 1))
+        cache.add(f"lock:{self.cache_key()}", 1)
+
+        self.assertEqual(self.get(view).data, {"calls": 1})
+        self.assertEqual(cache_stats.stale, 1)
+
+        cache.delete(f"lock:{self.cache_key()}")
+        self.assertEqual(self.get(view).data, {"calls": 2})
+
+    def test_lock_holder_gone_does_not_block_forever(self):
+        view = CountingView()
+        cache.add(f"lock:{self.cache_key()}", 1)
+
+        with mock.patch.object(packages_cache, "RECOMPUTE_WAIT", 0.1):
+            self.assertEqual(self.get(view).data, {"calls": 1})
+
+    def test_early_refresh(self):
+        entry = CachedResponse.build(
+            {}, fresh_until=time.time() + 10, compute_time=0.001
+        )
+        self.assertFalse(entry.needs_refresh())
+        self.assertFalse(entry._replace(compute_time=100).needs_refresh(beta=0))
+
+        with mock.patch("packages.cache.random.random", return_value=0.99):
+            self.assertTrue(entry._replace(compute_time=5).needs_refresh())
+        self.assertTrue(entry._replace(fresh_until=time.time() - 1).needs_refresh())
+
+    def test_failed_view_releases_lock(self):
+        @cache_response(timeout=60, key_prefix="packages")
+        def failing(view, request):
+            raise RuntimeError("boom")
+
+        request = APIView().initialize_request(self.factory.get("/"))
+        with self.assertRaises(RuntimeError):
+            failing(None, request)
+        key = namespaced_key("packages", get_cache_key("packages", "failing"))
+        self.assertIsNone(cache.get(f"lock:{key}"))
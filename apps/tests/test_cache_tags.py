@@ -0,0 +1,170 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from cities.models import City
+from media_library.models import Media
+from packages.cache import (
+    invalidate_experience_cache,
+    invalidate_tags,
+    register_tags,
+    tag_response,
+)
+from packages.models import Experience, HotelTier, Package, TransportOption
+from rest_framework.test import APIClient
+
+
+class CacheTagIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_invalidation_deletes_exactly_the_tagged_keys(self):
+        cache.set_many({"a": 1, "b": 2, "c": 3})
+        register_tags("a", ["package:1", "media:7"], 60)
+        register_tags("b", ["package:2"], 60)
+        register_tags("c", ["media:7"], 60)
+
+        self.assertEqual(invalidate_tags("media:7"), 2)
+
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"b": 2})
+        self.assertEqual(invalidate_tags("media:7"), 0)
+
+    def test_expired_keys_leave_the_index(self):
+        register_tags("old", ["experiences"], -1)  # Already expired
+        register_tags("new", ["experiences"], 60)
+
+        self.assertEqual(set(cache.get("tag_index:experiences")), {"new"})
+
+    def test_tag_response_outside_cached_view_is_a_noop(self):
+        tag_response("experiences", package=1, media=None)
+
+
+class TaggedCatalogResponseTests(TestCase):
+    """Writes evict only the cached responses that embed the changed object"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.city = City.objects.create(
+            name="Goa", slug="goa", description="Beaches", status="PUBLISHED"
+        )
+        self.image = Media.objects.create(file="library/goa.jpg", title="Goa")
+        self.other_image = Media.objects.create(file="library/other.jpg")
+        self.package = Package.objects.create(
+            city=self.city,
+            name="Goa Beaches",
+            slug="goa-beaches",
+            description="Tour",
+            featured_image=self.image,
+        )
+        self.experience = Experience.objects.create(
+            name="Sunset cruise",
+            description="Boat",
+            base_price=1000,
+            city=self.city,
+        )
+        self.package.experiences.add(self.experience)
+
+    def listed_names(self):
+        return [
+            p["name"]
+            for p in self.client.get("/api/packages/packages/").json()["results"]
+        ]
+
+    def rename_package(self, name):
+        # Queryset update: no signal, so only cache invalidation shows it
+        Package.objects.filter(pk=self.package.pk).update(name=name)
+
+    def test_media_change_evicts_responses_embedding_it(self):
+        self.listed_names()
+        self.rename_package("Renamed")
+
+        self.other_image.title = "Unrelated"
+        self.other_image.save()
+        self.assertEqual(self.listed_names(), ["Goa Beaches"])
+
+        self.image.alt_text = "Beach at dusk"
+        self.image.save()
+        self.assertEqual(self.listed_names(), ["Renamed"])
+
+    def test_city_change_evicts_package_responses(self):
+        url = f"/api/packages/packages/{self.package.slug}/"
+        self.client.get(url)
+        self.rename_package("Renamed")
+
+        self.city.name = "North Goa"
+        self.city.save()
+
+        data = self.client.get(url).json()
+        self.assertEqual((data["name"], data["city_name"]), ("Renamed", "North Goa"))
+
+    def test_experience_invalidation(self):
+        url = f"/api/packages/experiences/{self.experience.pk}/"
+        self.client.get(url)
+        self.listed_names()
+        Experience.objects.filter(pk=self.experience.pk).update(name="Night cruise")
+        self.rename_package("Renamed")
+
+        invalidate_experience_cache(self.experience.pk)
+
+        self.assertEqual(self.client.get(url).json()["name"], "Night cruise")
+        # The listing embeds the experience too
+        self.assertEqual(self.listed_names(), ["Renamed"])
+
+    def test_model_changes_evict_responses_embedding_them(self):
+        url = f"/api/packages/packages/{self.package.slug}/"
+        self.client.get(url)
+        self.listed_names()
+
+        self.package.name = "Renamed"
+        self.package.save()
+        self.assertEqual(self.client.get(url).json()["name"], "Renamed")
+        self.assertEqual(self.listed_names(), ["Renamed"])
+
+        self.experience.name = "Night cruise"
+        self.experience.save()
+        data = self.client.get(url).json()
+        self.assertEqual(data["experiences"][0]["name"], "Night cruise")
+
+    def test_new_objects_evict_the_listings(self):
+        self.client.get("/api/packages/experiences/")
+        self.listed_names()
+
+        Package.objects.create(
+            city=self.city, name="Goa Forts", slug="goa-forts", description="Tour"
+        )
+        Experience.objects.create(
+            name="Fort walk", description="Walk", base_price=500, city=self.city
+        )
+
+        self.assertEqual(sorted(self.listed_names()), ["Goa Beaches", "Goa Forts"])
+        names = [
+            e["name"]
+            for e in self.client.get("/api/packages/experiences/").json()["results"]
+        ]
+        self.assertIn("Fort walk", names)
+
+    def test_component_changes_evict_the_package(self):
+        url = f"/api/packages/packages/{self.package.slug}/"
+        tier = HotelTier.objects.create(
+            name="Budget", description="Basic", price_multiplier=1
+        )
+        transport = TransportOption.objects.create(
+            name="Bus", description="AC bus", base_price=500
+        )
+        self.package.hotel_tiers.add(tier)
+        self.client.get(url)
+
+        transport.package_set.add(self.package)
+        data = self.client.get(url).json()
+        self.assertEqual([t["name"] for t in data["transport_options"]], ["Bus"])
+
+        transport.name = "Van"
+        transport.save()
+        tier.name = "Deluxe"
+        tier.save()
+        data = self.client.get(url).json()
+        self.assertEqual(data["transport_options"][0]["name"], "Van")
+        self.assertEqual(data["hotel_tiers"][0]["name"], "Deluxe")
+
+        tier.package_set.clear()
+        self.assertEqual(self.client.get(url).json()["hotel_tiers"], [])
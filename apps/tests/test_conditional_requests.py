@@ -0,0 +1,137 @@
+"""
+Tests for ETag / Last-Modified handling of cached catalog endpoints.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+
+from articles.models import Article
+from cities.models import City
+from packages.cache import CachedResponse, compute_etag, is_not_modified
+from rest_framework.test import APIClient, APIRequestFactory
+
+
+class ValidatorTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_etag_ignores_key_order(self):
+        self.assertEqual(compute_etag({"a": 1, "b": 2}), compute_etag({"b": 2, "a": 1}))
+        self.assertNotEqual(compute_etag({"a": 1}), compute_etag({"a": 2}))
+        self.assertTrue(compute_etag([]).startswith('W/"'))
+
+    def test_if_none_match(self):
+        entry = CachedResponse.build({"name": "Goa"})
+        strong = entry.etag.removeprefix("W/")
+
+        for header in (entry.etag, strong, f'"other", {entry.etag}', "*"):
+            request = self.factory.get("/", HTTP_IF_NONE_MATCH=header)
+            self.assertTrue(is_not_modified(request, entry.etag, entry.last_modified))
+
+        request = self.factory.get("/", HTTP_IF_NONE_MATCH='"other"')
+        self.assertFalse(is_not_modified(request, entry.etag, entry.last_modified))
+
+    def test_if_none_match_takes_precedence(self):
+        entry = CachedResponse.build({"name": "Goa"})
+        request = self.factory.get(
+            "/",
+            HTTP_IF_NONE_MATCH='"other"',
+            HTTP_IF_MODIFIED_SINCE=http_date(entry.last_modified),
+        )
+        self.assertFalse(is_not_modified(request, entry.etag, entry.last_modified))
+
+    def test_if_modified_since(self):
+        entry = CachedResponse.build({"name": "Goa"})
+
+        request = self.factory.get(
+            "/", HTTP_IF_MODIFIED_SINCE=http_date(entry.last_modified)
+        )
+        self.assertTrue(is_not_modified(request, entry.etag, entry.last_modified))
+
+        request = self.factory.get(
+            "/", HTTP_IF_MODIFIED_SINCE=http_date(entry.last_modified - 60)
+        )
+        self.assertFalse(is_not_modified(request, entry.etag, entry.last_modified))
+
+    def test_only_safe_methods(self):
+        entry = CachedResponse.build({"name": "Goa"})
+        request = self.factory.post("/", HTTP_IF_NONE_MATCH=entry.etag)
+        self.assertFalse(is_not_modified(request, entry.etag, entry.last_modified))
+
+
+class ConditionalCatalogRequestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.city = City.objects.create(
+            name="Goa", slug="goa", description="Beaches", status="PUBLISHED"
+        )
+        self.article = Article.objects.create(
+            city=self.city,
+            title="Beaches of Goa",
+            slug="beaches-of-goa",
+            content="Text",
+            status="PUBLISHED",
+        )
+
+    def test_responses_carry_validators(self):
+        for url in (
+            "/api/cities/",
+            f"/api/cities/{self.city.pk}/",
+            "/api/articles/",
+            "/api/articles/beaches-of-goa/",
+        ):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertTrue(response["ETag"].startswith('W/"'), url)
+            self.assertIn("Last-Modified", response)
+
+    def test_matching_etag_returns_not_modified_without_queries(self):
+        etag = self.client.get("/api/articles/").headers["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/articles/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(len(queries), 0)
+
+    def test_first_request_can_be_not_modified(self):
+        etag = self.client.get("/api/cities/").headers["ETag"]
+        cache.clear()
+
+        response = self.client.get("/api/cities/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since_returns_not_modified(self):
+        last_modified = self.client.get("/api/cities/").headers["Last-Modified"]
+
+        response = self.client.get("/api/cities/", HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_content_changes_invalidate_validators(self):
+        article_etag = self.client.get("/api/articles/").headers["ETag"]
+        city_etag = self.client.get("/api/cities/").headers["ETag"]
+
+        self.article.title = "Best beaches of Goa"
+        self.article.save()
+        response = self.client.get("/api/articles/", HTTP_IF_NONE_MATCH=article_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["title"], "Best beaches of Goa")
+        article_etag = response["ETag"]
+
+        # Articles embed the city name, so city changes refresh both
+        self.city.name = "North Goa"
+        self.city.save()
+        for url, etag in (
+            ("/api/articles/", article_etag),
+            ("/api/cities/", city_etag),
+        ):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, url)
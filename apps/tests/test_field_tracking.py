@@ -0,0 +1,116 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from bookings.models import Booking
+from cities.models import City
+from media_library.models import Media
+from packages.models import HotelTier, Package, TransportOption
+from payments.models import Payment
+
+User = get_user_model()
+
+
+class FieldTrackingTests(TestCase):
+    """Status changes are detected without re-reading the row"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="tracker@example.com", password="testpass123"
+        )
+        city = City.objects.create(
+            name="Test City", slug="test-city", description="Test"
+        )
+        package = Package.objects.create(
+            city=city, name="Test Package", slug="test-package", description="Test"
+        )
+        self.booking = Booking.objects.create(
+            user=self.user,
+            package=package,
+            selected_hotel_tier=HotelTier.objects.create(
+                name="Budget", description="Budget tier", price_multiplier=1.0
+            ),
+            selected_transport=TransportOption.objects.create(
+                name="Bus", description="Bus transport", base_price=50
+            ),
+            total_price=Decimal("1500.00"),
+            status="PENDING_PAYMENT",
+        )
+
+    def test_loaded_instance_tracks_changes(self):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        self.assertFalse(booking.has_changed("status"))
+
+        booking.status = "CONFIRMED"
+        self.assertTrue(booking.has_changed("status"))
+        self.assertEqual(booking.original_value("status"), "PENDING_PAYMENT")
+
+        booking.save()
+        self.assertFalse(booking.has_changed("status"))
+        self.assertEqual(booking.original_value("status"), "CONFIRMED")
+
+    def test_refresh_and_deferred_fields(self):
+        booking = Booking.objects.only("id").get(pk=self.booking.pk)
+        self.assertFalse(booking.has_changed("status"))
+        self.assertEqual(booking.status, "PENDING_PAYMENT")  # loads the field
+
+        booking.status = "CANCELLED"
+        self.assertTrue(booking.has_changed("status"))
+        booking.refresh_from_db()
+        self.assertFalse(booking.has_changed("status"))
+
+    def test_status_change_saves_with_a_single_query(self):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.status = "CANCELLED"
+
+        with CaptureQueriesContext(connection) as queries:
+            booking.save(update_fields=["status"])
+
+        self.assertEqual(len(queries), 1, [q["sql"] for q in queries])
+        self.assertTrue(queries[0]["sql"].startswith("UPDATE"))
+
+    def test_payment_status_tracked(self):
+        Payment.objects.create(
+            booking=self.booking, razorpay_order_id="order_1", amount=1500
+        )
+        payment = Payment.objects.get(razorpay_order_id="order_1")
+        payment.status = "FAILED"
+
+        self.assertTrue(payment.has_changed("status"))
+
+        with CaptureQueriesContext(connection) as queries:
+            payment.save(update_fields=["status"])
+
+        self.assertEqual(len(queries), 1)
+        self.assertFalse(payment.has_changed("status"))
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    }
+)
+class MediaFileTrackingTests(TestCase):
+    def test_replacing_file_deletes_previous(self):
+        media = Media.objects.create(file=ContentFile(b"old", name="old.jpg"))
+        media = Media.objects.get(pk=media.pk)
+        old_name = media.file.name
+
+        with mock.patch(
+            "media_library.signals.MediaService.delete_media_file"
+        ) as delete_file:
+            media.file = ContentFile(b"new", name="new.jpg")
+            media.save()
+            media.title = "Renamed"
+            media.save()
+
+        delete_file.assert_called_once()
+        self.assertEqual(delete_file.call_args.args[0].file.name, old_name)
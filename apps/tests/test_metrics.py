@@ -0,0 +1,137 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from cities.models import City
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from backend.metrics import UNRESOLVED_ROUTE
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        City.objects.create(
+            name="Goa", slug="goa", description="Beaches", status="PUBLISHED"
+        )
+
+    def test_request_metrics_by_route(self):
+        labels = {"route": "city-list"}
+        requests = sample(
+            "django_http_request_duration_seconds_count", method="GET", **labels
+        )
+        queries = sample("django_http_request_db_queries_sum", **labels)
+        ok = sample("django_http_responses_total", method="GET", status="200", **labels)
+
+        self.client.get("/api/cities/")
+
+        self.assertEqual(
+            sample(
+                "django_http_request_duration_seconds_count", method="GET", **labels
+            ),
+            requests + 1,
+        )
+        self.assertGreater(
+            sample("django_http_request_db_queries_sum", **labels), queries
+        )
+        self.assertEqual(
+            sample("django_http_responses_total", method="GET", status="200", **labels),
+            ok + 1,
+        )
+        self.assertGreater(sample("django_http_response_size_bytes_sum", **labels), 0)
+
+    def test_unresolved_routes_share_one_label(self):
+        before = sample(
+            "django_http_responses_total",
+            route=UNRESOLVED_ROUTE,
+            method="GET",
+            status="404",
+        )
+
+        self.client.get("/no-such-page-1/")
+        self.client.get("/no-such-page-2/")
+
+        self.assertEqual(
+            sample(
+                "django_http_responses_total",
+                route=UNRESOLVED_ROUTE,
+                method="GET",
+                status="404",
+            ),
+            before + 2,
+        )
+
+    def test_cache_lookups_by_prefix(self):
+        hits = sample("django_cache_requests_total", prefix="cities", result="hit")
+        misses = sample("django_cache_requests_total", prefix="cities", result="miss")
+
+        self.client.get("/api/cities/")
+        self.client.get("/api/cities/")
+
+        self.assertEqual(
+            sample("django_cache_requests_total", prefix="cities", result="miss"),
+            misses + 1,
+        )
+        self.assertEqual(
+            sample("django_cache_requests_total", prefix="cities", result="hit"),
+            hits + 1,
+        )
+
+    def test_search_latency_per_category(self):
+        before = sample("search_category_duration_seconds_count", category="cities")
+        packages = sample("search_category_duration_seconds_count", category="packages")
+
+        self.client.get("/api/search/", {"q": "goa", "categories": "cities"})
+
+        self.assertEqual(
+            sample("search_category_duration_seconds_count", category="cities"),
+            before + 1,
+        )
+        self.assertEqual(
+            sample("search_category_duration_seconds_count", category="packages"),
+            packages,
+        )
+
+    def test_metrics_endpoint(self):
+        self.client.get("/api/cities/")
+
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn("django_http_request_duration_seconds_bucket", body)
+        self.assertIn('route="city-list"', body)
+
+    @override_settings(METRICS={"TOKEN": "s3cret", "ALLOWED_IPS": ["10.0.0.0/8"]})
+    def test_metrics_endpoint_is_internal(self):
+        outside = {"REMOTE_ADDR": "203.0.113.7"}
+        self.assertEqual(self.client.get("/metrics", **outside).status_code, 403)
+        self.assertEqual(
+            self.client.get(
+                "/metrics", HTTP_AUTHORIZATION="Bearer wrong", **outside
+            ).status_code,
+            403,
+        )
+        # Forwarded addresses are not trusted
+        self.assertEqual(
+            self.client.get(
+                "/metrics", HTTP_X_FORWARDED_FOR="10.1.2.3", **outside
+            ).status_code,
+            403,
+        )
+
+        self.assertEqual(
+            self.client.get(
+                "/metrics", HTTP_AUTHORIZATION="Bearer s3cret", **outside
+            ).status_code,
+            200,
+        )
+        self.assertEqual(
+            self.client.get("/metrics", REMOTE_ADDR="10.1.2.3").status_code, 200
+        )
@@ -0,0 +1,197 @@
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from bookings.models import Booking
+from cities.models import City
+from notifications.models import Notification
+from packages.models import HotelTier, Package, TransportOption
+from payments.models import Payment, WebhookEvent
+from payments.services.webhook_service import WebhookService
+from payments.tasks import WEBHOOK_MAX_RETRIES, process_webhook_event
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+WEBHOOK_URL = "/api/payments/webhook/razorpay/"
+
+
+class RazorpayWebhookInboxTests(TestCase):
+    """The webhook only records events; the worker applies them once"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="payer@example.com", password="testpass123"
+        )
+        city = City.objects.create(
+            name="Test City", slug="test-city", description="Test", status="PUBLISHED"
+        )
+        package = Package.objects.create(
+            city=city, name="Test Package", slug="test-package", description="Test"
+        )
+        self.booking = Booking.objects.create(
+            user=self.user,
+            package=package,
+            selected_hotel_tier=HotelTier.objects.create(
+                name="Budget", description="Budget tier", price_multiplier=1.0
+            ),
+            selected_transport=TransportOption.objects.create(
+                name="Bus", description="Bus transport", base_price=50
+            ),
+            total_price=Decimal("1500.00"),
+            total_amount_paid=Decimal("1500.00"),
+            status="PENDING_PAYMENT",
+        )
+        self.payment = Payment.objects.create(
+            booking=self.booking,
+            razorpay_order_id="order_123",
+            amount=Decimal("1500.00"),
+        )
+        enqueue = mock.patch.object(process_webhook_event, "delay")
+        self.delay = enqueue.start()
+        self.addCleanup(enqueue.stop)
+
+    def payload(self, event="payment.captured", amount=150000, payment_id="pay_1"):
+        return {
+            "event": event,
+            "payload": {
+                "payment": {
+                    "entity": {
+                        "id": payment_id,
+                        "order_id": "order_123",
+                        "amount": amount,
+                        "status": (
+                            "captured" if event == "payment.captured" else "failed"
+                        ),
+                    }
+                }
+            },
+        }
+
+    def post(self, data, event_id="evt_1", secret=None):
+        body = json.dumps(data)
+        signature = hmac.new(
+            (secret or settings.RAZORPAY_WEBHOOK_SECRET).encode(),
+            body.encode(),
+            hashlib.sha256,
+        ).hexdigest()
+        with self.captureOnCommitCallbacks(execute=True):
+            return APIClient().post(
+                WEBHOOK_URL,
+                body,
+                content_type="application/json",
+                HTTP_X_RAZORPAY_SIGNATURE=signature,
+                HTTP_X_RAZORPAY_EVENT_ID=event_id,
+            )
+
+    def test_webhook_records_event_and_acks(self):
+        response = self.post(self.payload())
+
+        self.assertEqual(response.status_code, 200)
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.event_id, "evt_1")
+        self.assertEqual(event.status, "PENDING")
+        self.delay.assert_called_once_with(event.pk)
+        # Nothing is applied inside the request
+        self.payment.refresh_from_db()
+        self.booking.refresh_from_db()
+        self.assertEqual(self.payment.status, "PENDING")
+        self.assertEqual(self.booking.status, "PENDING_PAYMENT")
+
+    def test_redelivery_is_stored_once(self):
+        self.post(self.payload())
+        response = self.post(self.payload())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        self.assertEqual(self.delay.call_count, 1)
+
+    def test_invalid_signature_rejected(self):
+        response = self.post(self.payload(), secret="wrong")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_capture_confirms_booking_once(self):
+        self.post(self.payload(), event_id="evt_1")
+        self.post(self.payload(), event_id="evt_replay")
+        first, replay = WebhookEvent.objects.order_by("pk")
+
+        self.assertEqual(WebhookService.process_event(first.pk), "PROCESSED")
+        notifications = Notification.objects.count()
+        self.assertEqual(WebhookService.process_event(first.pk), "PROCESSED")
+        self.assertEqual(WebhookService.process_event(replay.pk), "PROCESSED")
+
+        self.payment.refresh_from_db()
+        self.booking.refresh_from_db()
+        self.assertEqual(self.payment.status, "SUCCESS")
+        self.assertEqual(self.payment.razorpay_payment_id, "pay_1")
+        self.assertEqual(self.booking.status, "CONFIRMED")
+        self.assertEqual(Notification.objects.count(), notifications)
+        first.refresh_from_db()
+        self.assertEqual(first.attempts, 1)
+
+    def test_amount_mismatch_is_not_applied(self):
+        self.post(self.payload(amount=100))
+        event = WebhookEvent.objects.get()
+
+        self.assertEqual(WebhookService.process_event(event.pk), "FAILED")
+
+        event.refresh_from_db()
+        self.booking.refresh_from_db()
+        self.assertIn("validation failed", event.last_error)
+        self.assertEqual(self.booking.status, "PENDING_PAYMENT")
+
+    def test_failed_event_after_capture_is_ignored(self):
+        self.post(self.payload(), event_id="evt_1")
+        self.post(
+            self.payload(event="payment.failed", payment_id="pay_0"),
+            event_id="evt_2",
+        )
+        captured, failed = WebhookEvent.objects.order_by("pk")
+
+        WebhookService.process_event(captured.pk)
+        self.assertEqual(WebhookService.process_event(failed.pk), "PROCESSED")
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, "SUCCESS")
+
+    def test_unknown_event_ignored(self):
+        self.post({"event": "order.paid", "payload": {}})
+        event = WebhookEvent.objects.get()
+
+        self.assertEqual(WebhookService.process_event(event.pk), "IGNORED")
+
+    def test_transient_errors_retry_then_fail(self):
+        self.payment.delete()
+        self.post(self.payload())
+        event = WebhookEvent.objects.get()
+
+        with mock.patch("payments.tasks.retry_countdown", return_value=0):
+            result = process_webhook_event.apply(args=[event.pk])
+
+        self.assertEqual(result.get(), "FAILED")
+        event.refresh_from_db()
+        self.assertEqual(event.status, "FAILED")
+        self.assertEqual(event.attempts, WEBHOOK_MAX_RETRIES + 1)
+
+    def test_sweep_enqueues_stranded_events(self):
+        self.post(self.payload(), event_id="evt_old")
+        self.post(self.payload(), event_id="evt_new")
+        WebhookEvent.objects.filter(event_id="evt_old").update(
+            received_at=timezone.now() - timedelta(minutes=5)
+        )
+        self.delay.reset_mock()
+
+        self.assertEqual(WebhookService.enqueue_pending_events(), 1)
+        self.delay.assert_called_once_with(
+            WebhookEvent.objects.get(event_id="evt_old").pk
+        )
@@ -0,0 +1,167 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from bookings.models import Booking
+from cities.models import City
+from media_library.models import Media
+from packages.models import Experience, HotelTier, Package, TransportOption
+from rest_framework.test import APIClient
+from seo.models import SEOData
+from seo.services.seo_service import SEOService
+
+from backend.query_budget import (
+    QueryBudgetExceeded,
+    QueryBudgetTestMixin,
+    assert_query_budget,
+    fingerprint,
+    query_budget,
+)
+
+User = get_user_model()
+
+
+@query_budget(1)
+def load_cities():
+    return [city.name for city in City.objects.all()]
+
+
+@query_budget(10)
+def load_cities_one_by_one(pks):
+    return [City.objects.get(pk=pk).name for pk in pks]
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        self.cities = [
+            City.objects.create(name=f"City {i}", slug=f"city-{i}", description="Test")
+            for i in range(6)
+        ]
+
+    def test_fingerprint_collapses_literals_and_in_lists(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND x = 'a''b'"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s) AND x = 'c'"),
+        )
+        self.assertEqual(
+            fingerprint("SELECT  *\nFROM t1 LIMIT 21"), "SELECT * FROM t1 LIMIT ?"
+        )
+
+    def test_block_budget(self):
+        with assert_query_budget(1) as profile:
+            list(City.objects.all())
+        self.assertEqual(profile.count, 1)
+
+        with self.assertRaisesMessage(QueryBudgetExceeded, "ran 2 queries (budget 1)"):
+            with assert_query_budget(1):
+                City.objects.count()
+                list(City.objects.all())
+
+    def test_repeated_statements_are_flagged(self):
+        pks = [city.pk for city in self.cities]
+
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            with assert_query_budget(10):
+                load_cities_one_by_one(pks)
+
+        self.assertIn("load_cities_one_by_one ran 6 queries", str(raised.exception))
+        self.assertIn("6x SELECT", str(raised.exception))
+
+    def test_decorated_views_enforced_inside_block(self):
+        with assert_query_budget(10, max_repeats=10):
+            load_cities()
+            with self.assertRaises(QueryBudgetExceeded):
+                load_cities_one_by_one([city.pk for city in self.cities])
+
+    @override_settings(QUERY_BUDGET={"SAMPLE_RATE": 1.0})
+    def test_sampled_offenders_are_logged(self):
+        with self.assertLogs("backend.query_budget", "WARNING") as logs:
+            names = load_cities_one_by_one([city.pk for city in self.cities])
+
+        self.assertEqual(len(names), 6)
+        self.assertIn("load_cities_one_by_one", logs.output[0])
+
+    @override_settings(QUERY_BUDGET={"SAMPLE_RATE": 0.0})
+    def test_unsampled_calls_are_not_profiled(self):
+        with self.assertNoLogs("backend.query_budget"):
+            load_cities_one_by_one([city.pk for city in self.cities])
+
+
+class HotEndpointBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Query counts of hot endpoints do not grow with the number of rows"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="budget@example.com", password="testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.hotel_tier = HotelTier.objects.create(
+            name="Budget", description="Budget tier", price_multiplier=1.0
+        )
+        self.transport = TransportOption.objects.create(
+            name="Bus", description="Bus transport", base_price=50
+        )
+        for i in range(6):
+            self.add_package(i)
+
+    def add_package(self, i):
+        city = City.objects.create(
+            name=f"City {i}", slug=f"city-{i}", description="Test", status="PUBLISHED"
+        )
+        image = Media.objects.create(file=f"library/package-{i}.jpg")
+        package = Package.objects.create(
+            city=city,
+            name=f"Package {i}",
+            slug=f"package-{i}",
+            description="Test",
+            featured_image=image,
+        )
+        package.experiences.add(
+            Experience.objects.create(
+                name=f"Experience {i}",
+                description="Test",
+                base_price=100,
+                city=city,
+                featured_image=image,
+            )
+        )
+        package.hotel_tiers.add(self.hotel_tier)
+        package.transport_options.add(self.transport)
+        Booking.objects.create(
+            user=self.user,
+            package=package,
+            selected_hotel_tier=self.hotel_tier,
+            selected_transport=self.transport,
+            total_price=Decimal("1000.00"),
+            price_breakdown={"final_total": "1000.00"},
+        )
+        SEOData.objects.create(
+            content_type=ContentType.objects.get_for_model(City),
+            object_id=city.pk,
+            title=f"City {i}",
+            description="Test",
+        )
+
+    def test_package_list(self):
+        with self.assertQueryBudget(7):
+            response = self.client.get("/api/packages/packages/")
+        self.assertEqual(len(response.json()["results"]), 6)
+
+    def test_booking_list(self):
+        with self.assertQueryBudget(8):
+            response = self.client.get("/api/bookings/")
+        self.assertEqual(len(response.json()["results"]), 6)
+
+    def test_city_list(self):
+        with self.assertQueryBudget(2):
+            self.client.get("/api/cities/")
+
+    def test_sitemap_data(self):
+        with self.assertQueryBudget(3):
+            data = SEOService.generate_sitemap_data("cities.city")
+        self.assertEqual(len(data), 6)
@@ -0,0 +1,59 @@
+"""
+Celery application (celery -A backend worker / beat)
+
+Tasks are declared with @shared_task in the apps and configured by the
+CELERY_* settings.
+
+Prometheus metrics recorded by tasks (webhook processing...) live in the
+worker processes, which the web /metrics endpoint never sees. As under
+gunicorn (gunicorn.conf.py), pool processes write their samples to files
+in a multiprocess directory; the main worker process serves the aggregate
+on CELERY_METRICS_PORT (default 9808), the celery-worker job of
+monitoring/prometheus.yml. The port is only meant for the internal network.
+"""
+
+import os
+import tempfile
+
+from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
+
+# Set before any module imports prometheus_client (Django is set up, and
+# metrics are created, before the worker starts). The worker uses its own
+# directory: gunicorn empties the web one when it starts.
+os.environ["PROMETHEUS_MULTIPROC_DIR"] = os.environ.get(
+    "CELERY_PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "prometheus_multiproc_celery"),
+)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings.production")
+
+app = Celery("backend")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
+
+
+@worker_init.connect
+def start_metrics_server(**kwargs):
+    """Serve the metrics of every pool process (main process, before forking)"""
+    from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+    # Samples of a previous run are not reported again (files are named
+    # <type>_<pid>.db; this process already has its own)
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    for name in os.listdir(path):
+        if not name.endswith(f"_{os.getpid()}.db"):
+            os.remove(os.path.join(path, name))
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    start_http_server(
+        int(os.environ.get("CELERY_METRICS_PORT", "9808")), registry=registry
+    )
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,205 @@
+"""
+Prometheus instrumentation
+
+- MetricsMiddleware records, per resolved route: request latency, response
+  size, and the number and total time of database queries (counted with
+  connection.execute_wrapper, so nothing is sampled or logged)
+- cache_response counts hits, stale responses and misses per key prefix
+- services record domain metrics (pricing evaluations, search latency per
+  category, webhook processing, push deliveries) on the objects below
+- metrics_view exposes everything in the Prometheus text format to
+  scrapers allowed by settings.METRICS (bearer token or client address)
+
+Under gunicorn every worker is a separate process: with
+PROMETHEUS_MULTIPROC_DIR set (see gunicorn.conf.py) each worker writes its
+samples to files in that directory and metrics_view aggregates them, so a
+scrape sees the whole server and not just the worker that answered it.
+Celery workers serve their own metrics (see backend.celery).
+"""
+
+import hmac
+import ipaddress
+import os
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, HttpResponseForbidden
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Route label of requests that did not resolve to a view (404s)
+UNRESOLVED_ROUTE = "<unresolved>"
+
+REQUEST_LATENCY = Histogram(
+    "django_http_request_duration_seconds",
+    "Request latency by route",
+    ["route", "method"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RESPONSES = Counter(
+    "django_http_responses_total",
+    "Responses by route and status code",
+    ["route", "method", "status"],
+)
+RESPONSE_SIZE = Histogram(
+    "django_http_response_size_bytes",
+    "Response body size by route (streaming responses excluded)",
+    ["route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+REQUEST_QUERIES = Histogram(
+    "django_http_request_db_queries",
+    "Database queries per request by route",
+    ["route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250),
+)
+REQUEST_QUERY_TIME = Histogram(
+    "django_http_request_db_duration_seconds",
+    "Total database time per request by route",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+CACHE_REQUESTS = Counter(
+    "django_cache_requests_total",
+    "cache_response lookups by key prefix and result (hit, stale, miss)",
+    ["prefix", "result"],
+)
+
+QUERY_BUDGET_VIOLATIONS = Counter(
+    "django_query_budget_violations_total",
+    "Calls that broke their declared query budget (see backend.query_budget)",
+    ["view"],
+)
+
+PRICING_EVALUATIONS = Counter(
+    "pricing_evaluations_total",
+    "Price quotes computed, by entry point",
+    ["operation"],
+)
+SEARCH_LATENCY = Histogram(
+    "search_category_duration_seconds",
+    "Unified search latency per category (cache misses only)",
+    ["category"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+SEARCH_ANALYTICS_WRITTEN = Counter(
+    "search_analytics_events_written_total",
+    "Buffered search analytics events written to the database, by kind",
+    ["kind"],
+)
+SEARCH_ANALYTICS_DROPPED = Counter(
+    "search_analytics_events_dropped_total",
+    "Search analytics events dropped because the buffer was full",
+)
+WEBHOOK_EVENTS = Counter(
+    "payment_webhook_events_total",
+    "Webhook events processed, by event type and resulting status",
+    ["event_type", "status"],
+)
+WEBHOOK_LATENCY = Histogram(
+    "payment_webhook_processing_seconds",
+    "Time to apply one webhook event",
+    ["event_type"],
+)
+PUSH_NOTIFICATIONS = Counter(
+    "push_notifications_total",
+    "Push deliveries by outcome (sent, failed, gone)",
+    ["outcome"],
+)
+
+
+class QueryCounter:
+    """execute_wrapper that counts queries and their total time"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def route_name(request) -> str:
+    """Resolved route of a request, bounded in cardinality (no raw paths)"""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNRESOLVED_ROUTE
+    return match.view_name or match.route or UNRESOLVED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Record latency, response size and database usage of every request.
+    Keep it first in MIDDLEWARE so the other middleware are timed too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        route = route_name(request)
+        REQUEST_LATENCY.labels(route, request.method).observe(duration)
+        RESPONSES.labels(route, request.method, response.status_code).inc()
+        REQUEST_QUERIES.labels(route).observe(queries.count)
+        REQUEST_QUERY_TIME.labels(route).observe(queries.duration)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(route).observe(len(response.content))
+        return response
+
+
+def _metrics_setting(name, default):
+    return getattr(settings, "METRICS", {}).get(name, default)
+
+
+def scrape_allowed(request) -> bool:
+    """
+    Whether the request may read the metrics: it carries the configured
+    bearer token, or comes from an allowed address or network
+    """
+    token = _metrics_setting("TOKEN", "")
+    authorization = request.META.get("HTTP_AUTHORIZATION", "")
+    if token and hmac.compare_digest(authorization, f"Bearer {token}"):
+        return True
+
+    # REMOTE_ADDR only: forwarded headers can be set by the client
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in _metrics_setting("ALLOWED_IPS", [])
+    )
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint (internal, see scrape_allowed)"""
+    if not scrape_allowed(request):
+        return HttpResponseForbidden()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
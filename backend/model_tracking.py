@@ -0,0 +1,70 @@
+"""
+Field change tracking for models
+
+Signal handlers used to re-read a row in pre_save just to compare one field
+with its stored value. FieldTrackerMixin keeps the values a row was loaded
+with instead, so the comparison costs no query:
+
+    class Booking(FieldTrackerMixin, models.Model):
+        tracked_fields = ("status",)
+
+    booking.has_changed("status")
+    booking.original_value("status")
+
+Originals are captured in from_db, refreshed by refresh_from_db and reset
+after every successful save, so post_save handlers still see the values
+the row had before the save.
+"""
+
+from django.db.models.fields.files import FieldFile
+
+
+class FieldTrackerMixin:
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._store_tracked_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._store_tracked_values(fields)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._store_tracked_values(kwargs.get("update_fields"))
+
+    def has_changed(self, field_name):
+        """
+        True if field_name differs from the value the row was loaded with.
+        Instances that are not saved yet count as changed; fields deferred
+        at load time are only tracked once they have been loaded.
+        """
+        if self._state.adding:
+            return True
+        attname = self._meta.get_field(field_name).attname
+        originals = self.__dict__.get("_tracked_originals", {})
+        if attname not in originals or attname not in self.__dict__:
+            return False
+        return originals[attname] != self._tracked_value(attname)
+
+    def original_value(self, field_name):
+        """Value of field_name when the row was loaded (None if unknown)"""
+        attname = self._meta.get_field(field_name).attname
+        return self.__dict__.get("_tracked_originals", {}).get(attname)
+
+    def _tracked_value(self, attname):
+        value = self.__dict__.get(attname)
+        # Files are compared by name; the FieldFile itself is mutable
+        return value.name if isinstance(value, FieldFile) else value
+
+    def _store_tracked_values(self, fields=None):
+        originals = self.__dict__.setdefault("_tracked_originals", {})
+        for field_name in self.tracked_fields:
+            attname = self._meta.get_field(field_name).attname
+            if fields is not None and not {field_name, attname} & set(fields):
+                continue
+            if attname in self.__dict__:
+                originals[attname] = self._tracked_value(attname)
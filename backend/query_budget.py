@@ -0,0 +1,190 @@
+"""
+Query budgets and N+1 detection
+
+Views (or any function) declare how many queries they may run:
+
+    class CityListView(generics.ListAPIView):
+        @query_budget(3)
+        def get(self, request, *args, **kwargs):
+            ...
+
+Queries are captured with connection.execute_wrapper and grouped by
+fingerprint (the SQL with literals and IN lists collapsed), so the same
+statement run once per row shows up as one fingerprint with a high count.
+A call breaks its budget when it runs more than max_queries queries or
+repeats one fingerprint more than max_repeats times.
+
+- In tests, assert_query_budget() (self.assertQueryBudget() in TestCases
+  using QueryBudgetTestMixin) raises QueryBudgetExceeded, both for its own
+  block and for any decorated view called inside it.
+  QUERY_BUDGET["ENFORCE"] does the same globally, e.g. for CI settings.
+- In production, QUERY_BUDGET["SAMPLE_RATE"] of the calls are profiled and
+  offenders are logged with their most repeated statements. The other calls
+  run unwrapped.
+"""
+
+import logging
+import random
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+
+from .metrics import QUERY_BUDGET_VIOLATIONS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPEAT_THRESHOLD = 5
+# Statements listed in a violation report
+MAX_REPORTED_STATEMENTS = 3
+
+_IN_LIST = re.compile(r"\bIN \((?:%s|\?)(?:, ?(?:%s|\?))*\)", re.IGNORECASE)
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+_enforcing: ContextVar[bool] = ContextVar("query_budget_enforcing", default=False)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _setting(name, default):
+    return getattr(settings, "QUERY_BUDGET", {}).get(name, default)
+
+
+def fingerprint(sql: str) -> str:
+    """SQL with literals and IN lists collapsed, so per-row repeats match"""
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _LITERALS.sub("?", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryProfile:
+    """execute_wrapper that counts queries per fingerprint"""
+
+    def __init__(self):
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.fingerprints[fingerprint(sql)] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def count(self) -> int:
+        return sum(self.fingerprints.values())
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Fingerprints run more than threshold times, most repeated first"""
+        return [
+            (sql, count)
+            for sql, count in self.fingerprints.most_common()
+            if count > threshold
+        ]
+
+    def violation(
+        self, name: str, max_queries: int, max_repeats: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Describe how the profiled code broke its budget
+
+        Returns:
+            Report string, or None within budget
+        """
+        if max_repeats is None:
+            max_repeats = _setting("REPEAT_THRESHOLD", DEFAULT_REPEAT_THRESHOLD)
+        repeated = self.repeated(max_repeats)
+        if self.count <= max_queries and not repeated:
+            return None
+
+        lines = [f"{name} ran {self.count} queries (budget {max_queries})"]
+        for sql, count in (
+            repeated or self.fingerprints.most_common(MAX_REPORTED_STATEMENTS)
+        )[:MAX_REPORTED_STATEMENTS]:
+            lines.append(f"  {count}x {sql}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile_queries():
+    """Capture the queries run on the default connection"""
+    profile = QueryProfile()
+    with connection.execute_wrapper(profile):
+        yield profile
+
+
+@contextmanager
+def assert_query_budget(max_queries: int, max_repeats: Optional[int] = None):
+    """
+    Fail if the block runs more than max_queries queries or repeats one
+    statement more than max_repeats times. Decorated views called inside
+    the block enforce their own budgets too.
+
+    Example:
+        with assert_query_budget(4):
+            self.client.get("/api/cities/")
+    """
+    token = _enforcing.set(True)
+    try:
+        with profile_queries() as profile:
+            yield profile
+    finally:
+        _enforcing.reset(token)
+    report = profile.violation("Block", max_queries, max_repeats)
+    if report:
+        raise QueryBudgetExceeded(report)
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin locking in the query count of hot code paths:
+
+        class CityListTests(QueryBudgetTestMixin, TestCase):
+            def test_city_list(self):
+                with self.assertQueryBudget(2):
+                    self.client.get("/api/cities/")
+    """
+
+    def assertQueryBudget(self, max_queries: int, max_repeats: Optional[int] = None):
+        return assert_query_budget(max_queries, max_repeats)
+
+
+def query_budget(max_queries: int, max_repeats: Optional[int] = None):
+    """
+    Declare the query budget of a view method or function
+
+    Args:
+        max_queries: Maximum number of queries per call
+        max_repeats: Maximum runs of one statement per call
+            (None = QUERY_BUDGET["REPEAT_THRESHOLD"])
+    """
+
+    def decorator(func):
+        name = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            enforce = _enforcing.get() or _setting("ENFORCE", False)
+            if not enforce and random.random() >= _setting("SAMPLE_RATE", 0.0):
+                return func(*args, **kwargs)
+
+            with profile_queries() as profile:
+                result = func(*args, **kwargs)
+
+            report = profile.violation(name, max_queries, max_repeats)
+            if report:
+                QUERY_BUDGET_VIOLATIONS.labels(name).inc()
+                if enforce:
+                    raise QueryBudgetExceeded(report)
+                logger.warning(f"Query budget exceeded: {report}")
+            return result
+
+        wrapper.query_budget = max_queries
+        return wrapper
+
+    return decorator
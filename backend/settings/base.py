@@ -55,6 +55,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "backend.metrics.MetricsMiddleware",  # First, so it times everything below
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -322,7 +323,54 @@ CACHE_TTL = {
     "package_detail": 600,  # 10 minutes
     "package_list": 300,  # 5 minutes
     "city_list": 3600,  # 1 hour
+    "city_context": 3600,  # 1 hour (keyed on the city content version)
     "price_range": 600,  # 10 minutes
+    "price_calendar": 900,  # 15 minutes (capped at the next pricing rule change)
+    "vehicle_suggestions": 86400,  # 1 day (keyed on the fleet version)
+}
+
+# Vehicle suggestions for groups up to this size are precomputed per fleet
+VEHICLE_SUGGESTIONS_PRECOMPUTED_PASSENGERS = 60
+
+# Declared per-view query budgets (see backend.query_budget)
+QUERY_BUDGET = {
+    # Raise QueryBudgetExceeded instead of logging (CI / test settings)
+    "ENFORCE": os.environ.get("QUERY_BUDGET_ENFORCE") == "True",
+    # Fraction of calls to budgeted views profiled in production
+    "SAMPLE_RATE": float(os.environ.get("QUERY_BUDGET_SAMPLE_RATE", "0.01")),
+    # Runs of one statement per call flagged as an N+1 pattern
+    "REPEAT_THRESHOLD": 5,
+}
+
+# Prometheus scrape endpoint /metrics (backend.metrics.metrics_view)
+METRICS = {
+    # Scrapers send "Authorization: Bearer <token>" (empty: no token access)
+    "TOKEN": os.environ.get("METRICS_TOKEN", ""),
+    # Client addresses or networks (REMOTE_ADDR) allowed without a token
+    "ALLOWED_IPS": [
+        network.strip()
+        for network in os.environ.get("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",")
+        if network.strip()
+    ],
+}
+
+# Buffered search analytics (search.analytics)
+SEARCH_ANALYTICS = {
+    # Events kept in memory per process; the oldest are dropped beyond this
+    "BUFFER_SIZE": 10000,
+    # Rows per bulk_create; a full batch wakes the writer early
+    "BATCH_SIZE": 500,
+    # Seconds between flushes of the background writer
+    "FLUSH_INTERVAL": 2.0,
+    # Seconds before recorded events are aggregated (search.rollups after
+    # the end of their hour, search.popular after their timestamp)
+    "ROLLUP_LAG": 300,
+    # Hours rolled up per run, so catching up on old history stays bounded
+    "ROLLUP_MAX_HOURS": 168,
+    # Days of raw SearchQuery/SearchClick rows kept once rolled up
+    "RAW_RETENTION_DAYS": 90,
+    # Half-life of PopularSearch scores (rebuild after changing it)
+    "POPULAR_HALF_LIFE_DAYS": 7,
 }
 
 # Celery settings - disabled for development
@@ -475,4 +523,9 @@ PUSH_NOTIFICATION_SETTINGS = {
     "MAX_FAILURES_BEFORE_DEACTIVATE": 3,  # Deactivate subscription after 3 failed attempts
     "NOTIFICATION_TTL": 86400,  # Time to live: 24 hours
     "NOTIFICATION_URGENCY": "normal",  # Options: very-low, low, normal, high
+    # Broadcast fan-out (see notifications.services.push_fanout)
+    "FANOUT_MAX_WORKERS": 32,  # Concurrent deliveries
+    "FANOUT_PER_HOST_LIMIT": 8,  # Concurrent deliveries per push service host
+    "FANOUT_BATCH_SIZE": 500,  # Subscriptions read and bookkept per batch
+    "FANOUT_TIMEOUT": 10,  # Seconds per push request
 }
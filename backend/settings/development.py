@@ -184,4 +184,28 @@ CELERY_BEAT_SCHEDULE = {
         "schedule": crontab(minute=0),  # Every hour
         "options": {"expires": 3300},  # Task expires after 55 minutes
     },
+    "refresh-expired-price-ranges": {
+        "task": "pricing.refresh_expired_price_ranges",
+        "schedule": crontab(),  # Every minute
+        "options": {"expires": 50},  # Task expires after 50 seconds
+    },
+    "enqueue-pending-webhook-events": {
+        "task": "payments.enqueue_pending_webhook_events",
+        "schedule": crontab(),  # Every minute
+        "options": {"expires": 50},  # Task expires after 50 seconds
+    },
+    "aggregate-popular-searches": {
+        "task": "search.aggregate_popular_searches",
+        "schedule": crontab(minute="*/5"),  # Every 5 minutes
+        "options": {"expires": 240},  # Task expires after 4 minutes
+    },
+    "roll-up-search-analytics": {
+        "task": "search.roll_up_analytics",
+        "schedule": crontab(minute="*/10"),  # Every 10 minutes
+        "options": {"expires": 540},  # Task expires after 9 minutes
+    },
+    "prune-search-analytics": {
+        "task": "search.prune_analytics",
+        "schedule": crontab(hour=3, minute=30),  # Every day at 03:30
+    },
 }
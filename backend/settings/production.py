@@ -263,4 +263,29 @@ CELERY_BEAT_SCHEDULE = {
         "task": "bookings.cleanup_expired_drafts",
         "schedule": crontab(minute=0),  # Every hour
     },
+    # Recompute price ranges once a scheduled pricing rule starts or expires
+    "refresh-expired-price-ranges": {
+        "task": "pricing.refresh_expired_price_ranges",
+        "schedule": crontab(),  # Every minute
+    },
+    # Re-enqueue Razorpay webhook events no worker picked up
+    "enqueue-pending-webhook-events": {
+        "task": "payments.enqueue_pending_webhook_events",
+        "schedule": crontab(),  # Every minute
+    },
+    # Merge new searches into the popular searches
+    "aggregate-popular-searches": {
+        "task": "search.aggregate_popular_searches",
+        "schedule": crontab(minute="*/5"),  # Every 5 minutes
+    },
+    # Roll up search analytics for SearchAnalyticsView
+    "roll-up-search-analytics": {
+        "task": "search.roll_up_analytics",
+        "schedule": crontab(minute="*/10"),  # Every 10 minutes
+    },
+    # Delete raw search analytics past their retention
+    "prune-search-analytics": {
+        "task": "search.prune_analytics",
+        "schedule": crontab(hour=3, minute=30),  # Every day at 03:30
+    },
 }
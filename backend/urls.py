@@ -8,6 +8,7 @@ from django.shortcuts import redirect
 from django.urls import include, path
 from django.views.static import serve
 
+from .metrics import metrics_view
 from .swagger_views import (
     SecureSpectacularAPIView,
     SecureSpectacularRedocView,
@@ -150,6 +151,7 @@ urlpatterns = [
     path(
         "api/health/", health_check, name="api-health-check"
     ),  # Alternative path for Railway
+    path("metrics", metrics_view, name="metrics"),  # Prometheus scrape target
     path("admin/", admin.site.urls),
     path("api/auth/", include("users.urls")),
     path("api/cities/", include("cities.urls")),
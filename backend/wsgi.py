@@ -5,3 +5,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings.production")
 
 application = get_wsgi_application()
+
+# Background writer of buffered search analytics (the test runner and
+# management commands do not load this module and flush explicitly)
+from search.analytics import search_analytics  # noqa: E402
+
+search_analytics.start()
@@ -0,0 +1,30 @@
+"""
+Gunicorn hooks (loaded automatically from the working directory)
+
+Prometheus metrics are aggregated across workers through files in
+PROMETHEUS_MULTIPROC_DIR (see backend.metrics). The directory is set here,
+before any worker imports prometheus_client, and emptied when the master
+starts so counters from a previous run are not reported again.
+"""
+
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "prometheus_multiproc"),
+)
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Imported here: the master must not load prometheus_client itself
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
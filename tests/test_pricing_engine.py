@@ -116,7 +116,7 @@ def test_pricing_engine():
     print(f"Total active rules: {len(active_rules)}")
 
     for rule in active_rules:
-        target = rule.target_package.name if rule.target_package else "All Packages"
+        target = mumbai_package.name if rule.target_package_id else "All Packages"
         print(f"• {rule.name}")
         print(f"  Type: {rule.rule_type}")
         print(f"  Value: {rule.value}{'%' if rule.is_percentage else ''}")